@@ -8,8 +8,14 @@ import sys
 import os
 import time
 import json
+import random
+import re
+import threading
+import urllib.parse
+import urllib.request
+import urllib.error
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 import platform
 
 
@@ -47,6 +53,10 @@ class MonitoringStackDeployer:
         self.script_dir = Path(__file__).parent
         self.project_root = project_root or self.script_dir.parent
         self.compose_file = self.project_root / "docker-compose.yml"
+        self.jaeger_override_file = self.project_root / "docker-compose.jaeger.yml"
+        self.sampling_file = self.project_root / "jaeger" / "sampling_strategies.json"
+        self.jaeger_query_url = "http://localhost:16686/jaeger"  # QUERY_BASE_PATH=/jaeger
+        self.jaeger_otlp_url = "http://localhost:4318"
         self.is_windows = platform.system() == "Windows"
         
     def print_header(self, message: str):
@@ -97,6 +107,18 @@ class MonitoringStackDeployer:
         except Exception as e:
             return (False, "", str(e))
     
+    def compose_files(self) -> List[str]:
+        """
+        Build the -f arguments for Docker Compose.
+        
+        Returns:
+            List of arguments including the Jaeger override when present
+        """
+        files = ["-f", str(self.compose_file)]
+        if self.jaeger_override_file.exists():
+            files += ["-f", str(self.jaeger_override_file)]
+        return files
+    
     def check_docker_installed(self) -> bool:
         """
         Check if Docker is installed and running.
@@ -172,14 +194,14 @@ class MonitoringStackDeployer:
         self.print_info("Validating docker-compose.yml syntax...")
         
         success, output, error = self.run_command(
-            ["docker", "compose", "-f", str(self.compose_file), "config"],
+            ["docker", "compose", *self.compose_files(), "config"],
             capture_output=True
         )
         
         if not success:
             # Try old docker-compose command
             success, output, error = self.run_command(
-                ["docker-compose", "-f", str(self.compose_file), "config"],
+                ["docker-compose", *self.compose_files(), "config"],
                 capture_output=True
             )
         
@@ -266,14 +288,14 @@ class MonitoringStackDeployer:
         self.print_info("This may take several minutes on first run...")
         
         success, output, error = self.run_command(
-            ["docker", "compose", "-f", str(self.compose_file), "pull"],
+            ["docker", "compose", *self.compose_files(), "pull"],
             capture_output=False
         )
         
         if not success:
             # Try old docker-compose command
             success, output, error = self.run_command(
-                ["docker-compose", "-f", str(self.compose_file), "pull"],
+                ["docker-compose", *self.compose_files(), "pull"],
                 capture_output=False
             )
         
@@ -297,14 +319,14 @@ class MonitoringStackDeployer:
         self.print_info("Starting all services...")
         
         success, output, error = self.run_command(
-            ["docker", "compose", "-f", str(self.compose_file), "up", "-d"],
+            ["docker", "compose", *self.compose_files(), "up", "-d"],
             capture_output=False
         )
         
         if not success:
             # Try old docker-compose command
             success, output, error = self.run_command(
-                ["docker-compose", "-f", str(self.compose_file), "up", "-d"],
+                ["docker-compose", *self.compose_files(), "up", "-d"],
                 capture_output=False
             )
         
@@ -419,6 +441,489 @@ class MonitoringStackDeployer:
         print(f"{Colors.GREEN}💡 Tip:{Colors.END} Run 'python deploy_local.py --stop' to stop all services")
         print(f"{Colors.GREEN}💡 Tip:{Colors.END} Run 'python deploy_local.py --logs <service>' to view logs")
     
+    # =========================================================================
+    # JAEGER - Sampling strategies and storage mode
+    # =========================================================================
+    
+    def fetch_jaeger_json(self, path: str, timeout: int = 30) -> Dict:
+        """
+        Fetch a JSON document from the Jaeger query API.
+        
+        Args:
+            path: API path (e.g. /api/services)
+            timeout: Request timeout in seconds
+            
+        Returns:
+            Decoded JSON response
+        """
+        with urllib.request.urlopen(self.jaeger_query_url + path, timeout=timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+    
+    def observe_span_rates(self, lookback: str = "1h", limit: int = 1500) -> Dict[str, Dict[str, float]]:
+        """
+        Measure spans/s per service and operation from traces Jaeger holds.
+        
+        Args:
+            lookback: Jaeger lookback window (e.g. 1h, 6h)
+            limit: Maximum traces fetched per service
+            
+        Returns:
+            Dictionary of service -> operation -> spans per second
+        """
+        rates = {}
+        services = self.fetch_jaeger_json("/api/services").get('data') or []
+        
+        for service in services:
+            query = urllib.parse.urlencode({'service': service, 'lookback': lookback, 'limit': limit})
+            traces = self.fetch_jaeger_json(f"/api/traces?{query}").get('data') or []
+            
+            counts = {}
+            first_start = None
+            last_start = None
+            
+            for trace in traces:
+                processes = trace.get('processes', {})
+                for span in trace.get('spans', []):
+                    span_service = processes.get(span.get('processID'), {}).get('serviceName')
+                    if span_service != service:
+                        continue
+                    operation = span.get('operationName', '')
+                    counts[operation] = counts.get(operation, 0) + 1
+                    start = span.get('startTime', 0)
+                    first_start = start if first_start is None else min(first_start, start)
+                    last_start = start if last_start is None else max(last_start, start)
+            
+            if not counts:
+                continue
+            
+            # startTime is in microseconds; never assume less than a minute of data
+            window = max((last_start - first_start) / 1e6, 60.0)
+            rates[service] = {op: count / window for op, count in counts.items()}
+        
+        return rates
+    
+    def generate_sampling_strategies(self, target_rate: float = 1.0, default_probability: float = 0.1,
+                                     lookback: str = "1h") -> bool:
+        """
+        Write jaeger/sampling_strategies.json from observed span rates.
+        
+        Each operation gets probability = target_rate / observed rate (capped at 1),
+        so every endpoint keeps roughly target_rate traces per second regardless of
+        how hot it is.
+        
+        Args:
+            target_rate: Desired sampled traces/s per operation
+            default_probability: Probability for services/operations not observed
+            lookback: Observation window passed to the Jaeger API
+            
+        Returns:
+            True if the file was written, False otherwise
+        """
+        self.print_header("GENERATING JAEGER SAMPLING STRATEGIES")
+        self.print_info(f"Observing span rates over the last {lookback} from {self.jaeger_query_url}...")
+        
+        try:
+            rates = self.observe_span_rates(lookback)
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            self.print_error(f"Could not query Jaeger: {e}")
+            return False
+        
+        if not rates:
+            self.print_warning("No spans observed - writing default strategy only")
+        
+        service_strategies = []
+        for service, operations in sorted(rates.items()):
+            operation_strategies = []
+            for operation, rate in sorted(operations.items()):
+                probability = min(1.0, target_rate / rate) if rate > 0 else 1.0
+                operation_strategies.append({
+                    "operation": operation,
+                    "type": "probabilistic",
+                    "param": round(probability, 6)
+                })
+                print(f"  {service:25} {operation[:35]:35} {rate:>9.2f} spans/s → p={probability:.4f}")
+            
+            total_rate = sum(operations.values())
+            service_probability = min(1.0, target_rate * len(operations) / total_rate) if total_rate else 1.0
+            service_strategies.append({
+                "service": service,
+                "type": "probabilistic",
+                "param": round(service_probability, 6),
+                "operation_strategies": operation_strategies
+            })
+        
+        strategies = {
+            "service_strategies": service_strategies,
+            "default_strategy": {
+                "type": "probabilistic",
+                "param": default_probability
+            }
+        }
+        
+        self.sampling_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.sampling_file, 'w', encoding='utf-8') as f:
+            json.dump(strategies, f, indent=2)
+        
+        self.print_success(f"Sampling strategies written to {self.sampling_file}")
+        return True
+    
+    def current_jaeger_storage(self) -> str:
+        """
+        Detect the Jaeger storage mode configured by the override file.
+        
+        Returns:
+            'badger' or 'memory'
+        """
+        if self.jaeger_override_file.exists():
+            if "SPAN_STORAGE_TYPE=badger" in self.jaeger_override_file.read_text(encoding='utf-8'):
+                return "badger"
+        return "memory"
+    
+    def current_jaeger_ttl(self, default: str = "72h") -> str:
+        """
+        Read the Badger span retention configured by the override file.
+        
+        Args:
+            default: Value used when no override sets BADGER_SPAN_STORE_TTL
+            
+        Returns:
+            Go duration such as 72h or 168h
+        """
+        if self.jaeger_override_file.exists():
+            for line in self.jaeger_override_file.read_text(encoding='utf-8').splitlines():
+                _, found, value = line.partition("BADGER_SPAN_STORE_TTL=")
+                if found and value.strip():
+                    return value.strip().strip('"\'')
+        return default
+    
+    def write_jaeger_override(self, storage: str = "memory", ttl: str = "72h") -> bool:
+        """
+        Write docker-compose.jaeger.yml with the storage mode and sampling file.
+        
+        Args:
+            storage: 'memory' or 'badger'
+            ttl: Span retention for Badger (Go duration, e.g. 72h)
+            
+        Returns:
+            True if an override is in place, False if none is needed
+        """
+        environment = []
+        volumes = []
+        
+        if storage == "badger":
+            environment += [
+                "SPAN_STORAGE_TYPE=badger",
+                "BADGER_EPHEMERAL=false",
+                "BADGER_DIRECTORY_KEY=/badger/key",
+                "BADGER_DIRECTORY_VALUE=/badger/data",
+                f"BADGER_SPAN_STORE_TTL={ttl}",
+            ]
+            volumes.append("jaeger_badger_data:/badger")
+        
+        if self.sampling_file.exists():
+            environment.append("SAMPLING_STRATEGIES_FILE=/etc/jaeger/sampling_strategies.json")
+            volumes.append("./jaeger/sampling_strategies.json:/etc/jaeger/sampling_strategies.json:ro")
+        
+        if not environment:
+            if self.jaeger_override_file.exists():
+                self.jaeger_override_file.unlink()
+            return False
+        
+        lines = [
+            "# Jaeger overrides - generated by deploys/deploy_local.py",
+            "# Regenerate with --jaeger-storage / --jaeger-sampling instead of editing",
+            "",
+            "services:",
+            "  jaeger:",
+        ]
+        if storage == "badger":
+            # The image runs as uid 10001, which cannot write to a fresh named volume
+            lines.append("    user: \"0\"")
+        lines.append("    environment:")
+        lines += [f"      - {item}" for item in environment]
+        lines.append("    volumes:")
+        lines += [f"      - {item}" for item in volumes]
+        if storage == "badger":
+            lines += ["", "volumes:", "  jaeger_badger_data:"]
+        
+        with open(self.jaeger_override_file, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        return True
+    
+    def apply_jaeger_config(self) -> bool:
+        """
+        Recreate the Jaeger container with the current compose files.
+        
+        Returns:
+            True if Jaeger was recreated, False otherwise
+        """
+        self.print_info("Recreating Jaeger container...")
+        success, _, error = self.run_command(
+            ["docker", "compose", *self.compose_files(), "up", "-d", "--no-deps", "--force-recreate", "jaeger"]
+        )
+        if not success:
+            self.print_error(f"Failed to recreate Jaeger: {error.strip()}")
+            return False
+        
+        # Wait for the query API to answer again
+        deadline = time.time() + 90
+        while time.time() < deadline:
+            try:
+                self.fetch_jaeger_json("/api/services", timeout=5)
+                self.print_success("Jaeger is up")
+                return True
+            except (urllib.error.URLError, OSError, ValueError):
+                time.sleep(2)
+        
+        self.print_warning("Jaeger did not answer within 90 seconds")
+        return False
+    
+    def configure_jaeger(self, storage: Optional[str] = None, ttl: Optional[str] = None) -> bool:
+        """
+        Switch Jaeger storage and/or pick up a new sampling strategies file.
+        
+        Args:
+            storage: 'memory', 'badger', or None to keep the current mode
+            ttl: Badger span retention, or None to keep the configured one
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        storage = storage or self.current_jaeger_storage()
+        ttl = ttl or self.current_jaeger_ttl()
+        self.print_header(f"CONFIGURING JAEGER ({storage.upper()} STORAGE)")
+        
+        if self.write_jaeger_override(storage, ttl):
+            self.print_success(f"Override written: {self.jaeger_override_file.name}")
+        else:
+            self.print_info("Using docker-compose.yml defaults (no override needed)")
+        
+        return self.apply_jaeger_config()
+    
+    def load_trace_templates(self, limit: int = 200) -> List[Dict]:
+        """
+        Collect recent traces from Jaeger to replay as load.
+        
+        Falls back to synthetic traces shaped like the stack's services when
+        Jaeger holds nothing yet.
+        
+        Args:
+            limit: Maximum traces fetched per service
+            
+        Returns:
+            List of Jaeger-format traces
+        """
+        templates = []
+        try:
+            for service in self.fetch_jaeger_json("/api/services").get('data') or []:
+                query = urllib.parse.urlencode({'service': service, 'lookback': '6h', 'limit': limit})
+                templates += self.fetch_jaeger_json(f"/api/traces?{query}").get('data') or []
+        except (urllib.error.URLError, OSError, ValueError):
+            pass
+        
+        if templates:
+            return templates
+        
+        services = ["user-service", "order-service", "product-service"]
+        for i in range(50):
+            processes = {f"p{n}": {"serviceName": name} for n, name in enumerate(services)}
+            spans = []
+            for n in range(8):
+                spans.append({
+                    "spanID": f"{n + 1:016x}",
+                    "operationName": f"GET /api/{services[n % 3].split('-')[0]}/{n}",
+                    "references": [] if n == 0 else [{"refType": "CHILD_OF", "spanID": f"{1:016x}"}],
+                    "startTime": 0,
+                    "duration": random.randint(2000, 200000),
+                    "tags": [{"key": "error", "value": True}] if i % 25 == 0 and n == 7 else [],
+                    "processID": f"p{n % 3}"
+                })
+            templates.append({"spans": spans, "processes": processes})
+        return templates
+    
+    def trace_to_otlp_json(self, trace: Dict) -> bytes:
+        """
+        Convert a Jaeger API trace into an OTLP/JSON export request with fresh IDs.
+        
+        Args:
+            trace: Jaeger-format trace
+            
+        Returns:
+            OTLP/JSON request body
+        """
+        trace_id = os.urandom(16).hex()
+        span_ids = {span["spanID"]: os.urandom(8).hex() for span in trace.get("spans", [])}
+        now_us = int(time.time() * 1e6)
+        base = min((span.get("startTime", 0) for span in trace.get("spans", [])), default=0)
+        
+        by_service = {}
+        for span in trace.get("spans", []):
+            service = trace.get("processes", {}).get(span.get("processID"), {}).get("serviceName", "unknown")
+            parent = ""
+            for ref in span.get("references", []):
+                if ref.get("refType") == "CHILD_OF":
+                    parent = span_ids.get(ref.get("spanID"), "")
+            start_us = now_us + span.get("startTime", 0) - base
+            is_error = any(t.get("key") == "error" and t.get("value") in (True, "true") for t in span.get("tags", []))
+            by_service.setdefault(service, []).append({
+                "traceId": trace_id,
+                "spanId": span_ids[span["spanID"]],
+                "parentSpanId": parent,
+                "name": span.get("operationName", ""),
+                "kind": 2,
+                "startTimeUnixNano": str(start_us * 1000),
+                "endTimeUnixNano": str((start_us + span.get("duration", 0)) * 1000),
+                "status": {"code": 2 if is_error else 0}
+            })
+        
+        resource_spans = [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service}}]},
+            "scopeSpans": [{"scope": {"name": "deploy_local.load"}, "spans": spans}]
+        } for service, spans in by_service.items()]
+        return json.dumps({"resourceSpans": resource_spans}).encode('utf-8')
+    
+    def jaeger_memory_mb(self) -> Optional[float]:
+        """
+        Read the Jaeger container's memory usage from docker stats.
+        
+        Returns:
+            Memory usage in MiB, or None if unavailable
+        """
+        success, output, _ = self.run_command(
+            ["docker", "stats", "--no-stream", "--format", "{{.MemUsage}}", "jaeger"]
+        )
+        if not success or not output.strip():
+            return None
+        
+        match = re.match(r"([\d.]+)\s*([KMG]i?B)", output.strip())
+        if not match:
+            return None
+        value, unit = float(match.group(1)), match.group(2)
+        factor = {"KiB": 1 / 1024, "KB": 1 / 1024, "MiB": 1, "MB": 1, "GiB": 1024, "GB": 1024}.get(unit, 1)
+        return value * factor
+    
+    def run_trace_load(self, templates: List[Dict], duration: int, workers: int = 4) -> Tuple[int, int, float]:
+        """
+        Replay traces to Jaeger's OTLP/HTTP endpoint as fast as it accepts them.
+        
+        Args:
+            templates: Jaeger-format traces to replay
+            duration: Load duration in seconds
+            workers: Concurrent sender threads
+            
+        Returns:
+            Tuple of (spans accepted, spans rejected, peak memory MiB)
+        """
+        accepted = [0]
+        rejected = [0]
+        peak = [0.0]
+        lock = threading.Lock()
+        stop = threading.Event()
+        
+        def sender():
+            while not stop.is_set():
+                trace = random.choice(templates)
+                body = self.trace_to_otlp_json(trace)
+                spans = len(trace.get("spans", []))
+                request = urllib.request.Request(
+                    f"{self.jaeger_otlp_url}/v1/traces", data=body,
+                    headers={"Content-Type": "application/json"}, method="POST"
+                )
+                try:
+                    with urllib.request.urlopen(request, timeout=10) as response:
+                        ok = response.status == 200
+                except (urllib.error.URLError, OSError):
+                    ok = False
+                with lock:
+                    if ok:
+                        accepted[0] += spans
+                    else:
+                        rejected[0] += spans
+        
+        def sampler():
+            while not stop.is_set():
+                memory = self.jaeger_memory_mb()
+                if memory is not None:
+                    peak[0] = max(peak[0], memory)
+                stop.wait(2)
+        
+        threads = [threading.Thread(target=sender, daemon=True) for _ in range(workers)]
+        threads.append(threading.Thread(target=sampler, daemon=True))
+        for thread in threads:
+            thread.start()
+        
+        end = time.time() + duration
+        while time.time() < end:
+            print(f"\r{Colors.CYAN}  Spans sent: {accepted[0]:,}{Colors.END}", end='', flush=True)
+            time.sleep(1)
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=15)
+        print()
+        
+        return (accepted[0], rejected[0], peak[0])
+    
+    def compare_jaeger_modes(self, duration: int = 60, ttl: Optional[str] = None) -> bool:
+        """
+        Compare memory and ingest throughput of memory vs Badger storage.
+        
+        Replays the stack's own recent traces (or a synthetic equivalent) into
+        each mode and restores the original mode afterwards.
+        
+        Args:
+            duration: Seconds of load per mode
+            ttl: Badger span retention used during the test (None: the configured one)
+            
+        Returns:
+            True if both modes were measured, False otherwise
+        """
+        self.print_header("JAEGER STORAGE MODE COMPARISON")
+        original = self.current_jaeger_storage()
+        original_ttl = self.current_jaeger_ttl()
+        ttl = ttl or original_ttl
+        templates = self.load_trace_templates()
+        spans_per_trace = sum(len(t.get("spans", [])) for t in templates) / max(len(templates), 1)
+        self.print_info(f"Replaying {len(templates)} trace shapes (~{spans_per_trace:.1f} spans each) "
+                        f"for {duration}s per mode")
+        
+        results = []
+        for mode in ("memory", "badger"):
+            self.print_info(f"Mode: {mode}")
+            self.write_jaeger_override(mode, ttl)
+            if not self.apply_jaeger_config():
+                results.append((mode, None))
+                continue
+            
+            idle = self.jaeger_memory_mb()
+            accepted, rejected, peak = self.run_trace_load(templates, duration)
+            after = self.jaeger_memory_mb()
+            results.append((mode, {
+                "idle_mb": idle, "peak_mb": peak, "after_mb": after,
+                "spans_per_s": accepted / duration, "rejected": rejected
+            }))
+        
+        self.print_info(f"Restoring {original} storage...")
+        self.write_jaeger_override(original, original_ttl)
+        self.apply_jaeger_config()
+        
+        self.print_header("COMPARISON RESULTS")
+        print(f"  {'Mode':10} {'Spans/s':>10} {'Rejected':>10} {'Idle MiB':>10} {'Peak MiB':>10} {'After MiB':>10}")
+        
+        def fmt(value):
+            return f"{value:>10.1f}" if isinstance(value, (int, float)) else f"{'n/a':>10}"
+        
+        for mode, data in results:
+            if data is None:
+                print(f"  {mode:10} {'failed to start':>54}")
+                continue
+            print(f"  {mode:10} {data['spans_per_s']:>10,.0f} {data['rejected']:>10,} "
+                  f"{fmt(data['idle_mb'])} {fmt(data['peak_mb'])} {fmt(data['after_mb'])}")
+        
+        print()
+        self.print_info("Memory storage grows with every span held; Badger keeps spans on disk")
+        self.print_info("and holds memory roughly flat at the cost of some ingest throughput.")
+        return all(data is not None for _, data in results)
+    
     def deploy(self) -> bool:
         """
         Main deployment workflow.
@@ -476,6 +981,9 @@ Examples:
   python deploy_local.py --stop       # Stop all services
   python deploy_local.py --restart    # Restart all services
   python deploy_local.py --logs prometheus  # View service logs
+  python deploy_local.py --jaeger-sampling    # Generate per-operation sampling strategies
+  python deploy_local.py --jaeger-storage badger --jaeger-ttl 168h  # Persist spans on disk
+  python deploy_local.py --jaeger-compare --compare-duration 120    # Memory vs Badger
         """
     )
     
@@ -504,6 +1012,59 @@ Examples:
         help="View logs for a specific service"
     )
     
+    parser.add_argument(
+        "--jaeger-sampling",
+        action="store_true",
+        help="Generate jaeger/sampling_strategies.json from observed span rates and apply it"
+    )
+    
+    parser.add_argument(
+        "--sampling-target",
+        type=float,
+        default=1.0,
+        help="Sampled traces per second to keep per operation (default: 1.0)"
+    )
+    
+    parser.add_argument(
+        "--sampling-default",
+        type=float,
+        default=0.1,
+        help="Sampling probability for unobserved services (default: 0.1)"
+    )
+    
+    parser.add_argument(
+        "--sampling-lookback",
+        type=str,
+        default="1h",
+        help="Window of traces used to measure span rates (default: 1h)"
+    )
+    
+    parser.add_argument(
+        "--jaeger-storage",
+        choices=["memory", "badger"],
+        help="Switch Jaeger span storage (badger persists spans on a volume)"
+    )
+    
+    parser.add_argument(
+        "--jaeger-ttl",
+        type=str,
+        default=None,
+        help="Span retention for Badger storage (default: keep the configured value, else 72h)"
+    )
+    
+    parser.add_argument(
+        "--jaeger-compare",
+        action="store_true",
+        help="Compare memory and throughput of memory vs Badger storage"
+    )
+    
+    parser.add_argument(
+        "--compare-duration",
+        type=int,
+        default=60,
+        help="Seconds of trace load per storage mode (default: 60)"
+    )
+    
     args = parser.parse_args()
     
     deployer = MonitoringStackDeployer()
@@ -517,7 +1078,7 @@ Examples:
     if args.stop:
         deployer.print_header("STOPPING ALL SERVICES")
         success, _, _ = deployer.run_command(
-            ["docker", "compose", "down"],
+            ["docker", "compose", *deployer.compose_files(), "down"],
             capture_output=False
         )
         if success:
@@ -528,7 +1089,7 @@ Examples:
     
     if args.restart:
         deployer.print_header("RESTARTING ALL SERVICES")
-        deployer.run_command(["docker", "compose", "restart"], capture_output=False)
+        deployer.run_command(["docker", "compose", *deployer.compose_files(), "restart"], capture_output=False)
         deployer.wait_for_services()
         deployer.show_service_status()
         return
@@ -536,11 +1097,20 @@ Examples:
     if args.logs:
         deployer.print_header(f"LOGS FOR {args.logs.upper()}")
         deployer.run_command(
-            ["docker", "compose", "logs", "-f", "--tail=100", args.logs],
+            ["docker", "compose", *deployer.compose_files(), "logs", "-f", "--tail=100", args.logs],
             capture_output=False
         )
         return
     
+    if args.jaeger_compare:
+        sys.exit(0 if deployer.compare_jaeger_modes(args.compare_duration, args.jaeger_ttl) else 1)
+    
+    if args.jaeger_sampling or args.jaeger_storage:
+        if args.jaeger_sampling and not deployer.generate_sampling_strategies(
+                args.sampling_target, args.sampling_default, args.sampling_lookback):
+            sys.exit(1)
+        sys.exit(0 if deployer.configure_jaeger(args.jaeger_storage, args.jaeger_ttl) else 1)
+    
     # Default: Deploy the stack
     deployer.print_header("MONITORING STACK LOCAL DEPLOYMENT")
     
@@ -0,0 +1,285 @@
+"""
+Large Artifact Handling
+An LFS-style content-addressed store (wired in through a git clean/smudge
+filter) and pack maintenance helpers for the GitHub sync workflow
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+
+class Colors:
+    """ANSI color codes for terminal output"""
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    END = '\033[0m'
+    BOLD = '\033[1m'
+
+
+CHUNK = 1 << 20
+FILTER_NAME = 'artifacts'
+POINTER_VERSION = b'version https://git-lfs.github.com/spec/v1\n'
+# Pointers are tiny; anything larger cannot be one
+POINTER_MAX = 200
+
+
+def is_binary(path: Path) -> bool:
+    """Whether the file looks binary (NUL byte in the first 8000 bytes, as git checks)"""
+    with open(path, 'rb') as f:
+        return b'\0' in f.read(8000)
+
+
+def format_size(size: float) -> str:
+    """Human-readable byte count"""
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if abs(size) < 1024 or unit == 'GiB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+# ============================================================================
+# Content-addressed store
+# ============================================================================
+
+def make_pointer(oid: str, size: int) -> bytes:
+    """Git LFS v1 pointer text"""
+    return POINTER_VERSION + f"oid sha256:{oid}\nsize {size}\n".encode('ascii')
+
+
+def parse_pointer(data: bytes) -> Optional[Tuple[str, int]]:
+    """(sha256, size) if data is a pointer, else None"""
+    if len(data) > POINTER_MAX or not data.startswith(POINTER_VERSION):
+        return None
+    fields = dict(line.split(' ', 1) for line in data.decode('ascii', 'replace').splitlines()[1:] if ' ' in line)
+    oid = fields.get('oid', '')
+    if not oid.startswith('sha256:') or not fields.get('size', '').isdigit():
+        return None
+    return oid[len('sha256:'):], int(fields['size'])
+
+
+class ArtifactStore:
+    """
+    Directory of objects named by SHA-256, laid out like Git LFS
+    (objects/ab/cd/abcd...). Any shared path works as a store: a network
+    share, a synced folder or a directory served by a web server.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def path(self, oid: str) -> Path:
+        return self.directory / 'objects' / oid[:2] / oid[2:4] / oid
+
+    def has(self, oid: str) -> bool:
+        return self.path(oid).exists()
+
+    def put_stream(self, source: BinaryIO) -> Tuple[str, int]:
+        """Copy a stream into the store; returns (sha256, size)"""
+        temp_dir = self.directory / 'tmp'
+        temp_dir.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp = tempfile.mkstemp(dir=str(temp_dir))
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                for chunk in iter(lambda: source.read(CHUNK), b''):
+                    digest.update(chunk)
+                    size += len(chunk)
+                    out.write(chunk)
+            oid = digest.hexdigest()
+            target = self.path(oid)
+            if target.exists():
+                os.unlink(temp)
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(temp, str(target))
+        except BaseException:
+            if os.path.exists(temp):
+                os.unlink(temp)
+            raise
+        return oid, size
+
+    def put(self, path: Path) -> Tuple[str, int]:
+        with open(path, 'rb') as f:
+            return self.put_stream(f)
+
+    def copy_to(self, oid: str, out: BinaryIO):
+        with open(self.path(oid), 'rb') as f:
+            shutil.copyfileobj(f, out, CHUNK)
+
+
+def clean(store: ArtifactStore, threshold: int, source: BinaryIO, out: BinaryIO):
+    """
+    Git clean filter: files of at least threshold bytes go to the store and
+    a pointer is committed in their place; smaller files pass through.
+    """
+    head = source.read(max(threshold, POINTER_MAX + 1))
+    if len(head) < threshold or parse_pointer(head):
+        out.write(head)
+        shutil.copyfileobj(source, out, CHUNK)
+        return
+
+    class Chained:
+        def __init__(self):
+            self.pending = head
+
+        def read(self, size: int) -> bytes:
+            if self.pending:
+                data, self.pending = self.pending, b''
+                return data
+            return source.read(size)
+
+    oid, size = store.put_stream(Chained())
+    out.write(make_pointer(oid, size))
+
+
+def smudge(store: ArtifactStore, source: BinaryIO, out: BinaryIO):
+    """Git smudge filter: replace pointers by the stored content when available"""
+    data = source.read(POINTER_MAX + 1)
+    pointer = parse_pointer(data)
+    if pointer and store.has(pointer[0]):
+        store.copy_to(pointer[0], out)
+        return
+    if pointer:
+        sys.stderr.write(f"artifacts: object {pointer[0][:12]} is not in {store.directory}; "
+                         f"keeping the pointer\n")
+    out.write(data)
+    shutil.copyfileobj(source, out, CHUNK)
+
+
+def install_filter(repo: Path, store: Path, threshold: int, patterns: List[str]) -> bool:
+    """
+    Route matching files through the store.
+
+    Sets filter.artifacts.* in the repository's git config and adds
+    `pattern filter=artifacts` lines to .gitattributes.
+
+    Returns:
+        True if .gitattributes changed (and needs to be committed)
+    """
+    script = Path(__file__).resolve()
+    command = f'"{sys.executable}" "{script}" --store "{store}"'
+    settings = {
+        f'filter.{FILTER_NAME}.clean': f'{command} clean --threshold {threshold}',
+        f'filter.{FILTER_NAME}.smudge': f'{command} smudge',
+        f'filter.{FILTER_NAME}.required': 'true',
+    }
+    for key, value in settings.items():
+        subprocess.run(['git', 'config', key, value], cwd=repo, check=True, capture_output=True)
+
+    attributes = repo / '.gitattributes'
+    existing = attributes.read_text(encoding='utf-8').splitlines() if attributes.exists() else []
+    wanted = [f"{pattern} filter={FILTER_NAME}" for pattern in patterns]
+    missing = [line for line in wanted if line not in existing]
+    if missing:
+        with open(attributes, 'a', encoding='utf-8') as f:
+            if existing and existing[-1].strip():
+                f.write('\n')
+            f.write('# Large binaries are stored outside git (gitcode/artifacts.py)\n')
+            f.write('\n'.join(missing) + '\n')
+    return bool(missing)
+
+
+# ============================================================================
+# Pack maintenance
+# ============================================================================
+
+def pack_stats(repo: Path) -> Dict[str, int]:
+    """`git count-objects -v` in bytes/counts (size-pack, size, count, packs)"""
+    result = subprocess.run(['git', 'count-objects', '-v'], cwd=repo, capture_output=True, text=True)
+    stats = {}
+    for line in result.stdout.splitlines():
+        key, _, value = line.partition(':')
+        if value.strip().isdigit():
+            stats[key.strip()] = int(value)
+    for key in ('size', 'size-pack', 'size-garbage'):
+        stats[key] = stats.get(key, 0) * 1024
+    return stats
+
+
+def maintain(repo: Path) -> Tuple[Dict[str, int], Dict[str, int], float, List[str]]:
+    """
+    Incremental maintenance before a push: pack loose objects into a
+    geometric pack sequence (no full repack) and refresh the commit-graph.
+
+    Returns:
+        (stats before, stats after, seconds, warnings)
+    """
+    before = pack_stats(repo)
+    started = time.perf_counter()
+    warnings = []
+    steps = [
+        ['git', 'repack', '-d', '-q', '--geometric=2'],
+        ['git', 'commit-graph', 'write', '--reachable', '--split', '--changed-paths'],
+    ]
+    for command in steps:
+        result = subprocess.run(command, cwd=repo, capture_output=True, text=True)
+        if result.returncode != 0 and command[1] == 'repack':
+            # git < 2.32 has no geometric repacking; pack loose objects only
+            result = subprocess.run(['git', 'repack', '-d', '-q'], cwd=repo, capture_output=True, text=True)
+        if result.returncode != 0:
+            warnings.append(f"{' '.join(command[1:3])}: {result.stderr.strip() or 'failed'}")
+    return before, pack_stats(repo), time.perf_counter() - started, warnings
+
+
+def main():
+    """Entry point for the git clean/smudge filter"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="LFS-style artifact store filter (run by git, see filter.artifacts.* in git config)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python artifacts.py --store /srv/artifacts clean --threshold 5242880 < big.bin > pointer
+  python artifacts.py --store /srv/artifacts smudge < pointer > big.bin
+  python artifacts.py --repo .. stats
+        """
+    )
+
+    parser.add_argument("--store", help="Artifact store directory")
+    parser.add_argument("--repo", default=".", help="Repository for stats/maintain")
+    parser.add_argument("--threshold", type=int, default=5 * 1024 * 1024, help="Minimum size routed to the store")
+    parser.add_argument("action", choices=['clean', 'smudge', 'stats', 'maintain'])
+
+    args = parser.parse_args()
+
+    if args.action in ('clean', 'smudge'):
+        if not args.store:
+            parser.error("--store is required for clean/smudge")
+        store = ArtifactStore(Path(args.store))
+        if args.action == 'clean':
+            clean(store, args.threshold, sys.stdin.buffer, sys.stdout.buffer)
+        else:
+            smudge(store, sys.stdin.buffer, sys.stdout.buffer)
+        sys.stdout.buffer.flush()
+        return
+
+    if args.action == 'stats':
+        stats = pack_stats(Path(args.repo))
+        print(f"{Colors.CYAN}ℹ {stats.get('packs', 0)} pack(s), {format_size(stats['size-pack'])}; "
+              f"{stats.get('count', 0)} loose object(s), {format_size(stats['size'])}{Colors.END}")
+        return
+
+    before, after, elapsed, warnings = maintain(Path(args.repo))
+    for warning in warnings:
+        print(f"{Colors.YELLOW}⚠ {warning}{Colors.END}")
+    print(f"{Colors.GREEN}✓ Maintenance in {elapsed:.2f}s: packs {before.get('packs', 0)} → {after.get('packs', 0)}, "
+          f"loose objects {before.get('count', 0)} → {after.get('count', 0)}, "
+          f"pack size {format_size(before['size-pack'])} → {format_size(after['size-pack'])}{Colors.END}")
+
+
+if __name__ == "__main__":
+    main()
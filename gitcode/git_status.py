@@ -0,0 +1,456 @@
+"""
+Git Status Snapshot
+Streams `git status --porcelain=v2 -z` into compact records that the GitHub
+sync workflow shares between its steps, plus staged line counts from a single
+`git diff --cached --numstat -z`
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class Colors:
+    """ANSI color codes for terminal output"""
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    END = '\033[0m'
+    BOLD = '\033[1m'
+
+
+READ_SIZE = 1 << 16
+
+
+class GitStatusError(RuntimeError):
+    """git status or git diff failed"""
+
+
+class StatusEntry:
+    """
+    One changed path.
+
+    index and worktree are the porcelain XY letters ('.' for unchanged,
+    '?' for untracked, '!' for ignored). orig_path is set for renames and
+    copies; oid is the index blob id for tracked entries.
+    """
+
+    __slots__ = ('path', 'orig_path', 'index', 'worktree', 'kind', 'oid')
+
+    def __init__(self, kind: str, index: str, worktree: str, path: str,
+                 orig_path: Optional[str] = None, oid: Optional[str] = None):
+        self.kind = kind
+        self.index = index
+        self.worktree = worktree
+        self.path = path
+        self.orig_path = orig_path
+        self.oid = oid
+
+    @property
+    def category(self) -> str:
+        """new, renamed, deleted, modified, conflicted or ignored"""
+        if self.kind == 'unmerged':
+            return 'conflicted'
+        if self.kind in ('untracked', 'ignored'):
+            return 'new' if self.kind == 'untracked' else 'ignored'
+        if self.kind in ('renamed', 'copied'):
+            return 'renamed' if self.kind == 'renamed' else 'new'
+        if self.index == 'A':
+            return 'new'
+        if 'D' in (self.index, self.worktree):
+            return 'deleted'
+        return 'modified'
+
+    @property
+    def staged(self) -> bool:
+        return self.kind not in ('untracked', 'ignored') and self.index != '.'
+
+    def __repr__(self) -> str:
+        origin = f" <- {self.orig_path}" if self.orig_path else ''
+        return f"StatusEntry({self.index}{self.worktree} {self.path}{origin})"
+
+
+class StatusSnapshot:
+    """Parsed `git status --porcelain=v2 --branch` output"""
+
+    def __init__(self):
+        self.entries: List[StatusEntry] = []
+        self.oid: Optional[str] = None
+        self.head: Optional[str] = None
+        self.upstream: Optional[str] = None
+        self.ahead = 0
+        self.behind = 0
+        self.elapsed = 0.0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def paths(self, category: str) -> List[str]:
+        return [entry.path for entry in self.entries if entry.category == category]
+
+    @property
+    def renamed(self) -> List[Tuple[str, str]]:
+        """(old path, new path) pairs"""
+        return [(entry.orig_path, entry.path) for entry in self.entries if entry.kind == 'renamed']
+
+    @property
+    def staged(self) -> List[StatusEntry]:
+        return [entry for entry in self.entries if entry.staged]
+
+    def counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for entry in self.entries:
+            counts[entry.category] = counts.get(entry.category, 0) + 1
+        return counts
+
+    def legacy(self) -> Tuple[List[str], List[str], List[str]]:
+        """
+        (new_files, modified_files, deleted_files) as returned by
+        GitHubManager.get_git_status; renamed and conflicted paths count as
+        modified under their new name.
+        """
+        new_files, modified_files, deleted_files = [], [], []
+        for entry in self.entries:
+            category = entry.category
+            if category == 'new':
+                new_files.append(entry.path)
+            elif category == 'deleted':
+                deleted_files.append(entry.path)
+            elif category != 'ignored':
+                modified_files.append(entry.path)
+        return new_files, modified_files, deleted_files
+
+
+def split_nul(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Yield NUL-terminated fields from a stream of byte chunks"""
+    tail = b''
+    for chunk in chunks:
+        if not chunk:
+            continue
+        fields = (tail + chunk).split(b'\0') if tail else chunk.split(b'\0')
+        tail = fields.pop()
+        yield from fields
+    if tail:
+        yield tail
+
+
+def parse_porcelain_v2(chunks: Iterable[bytes]) -> StatusSnapshot:
+    """
+    Parse `git status --porcelain=v2 -z [--branch]` output.
+
+    With -z paths are never quoted, and a rename record is followed by its
+    original path as a separate NUL-terminated field.
+    """
+    snapshot = StatusSnapshot()
+    entries = snapshot.entries
+    decode = os.fsdecode
+    fields = split_nul(chunks)
+    for field in fields:
+        tag = field[:1]
+        if tag == b'1':
+            parts = field.split(b' ', 8)
+            xy = parts[1].decode('ascii')
+            entries.append(StatusEntry('ordinary', xy[0], xy[1], decode(parts[8]), oid=parts[7].decode('ascii')))
+        elif tag == b'?':
+            entries.append(StatusEntry('untracked', '?', '?', decode(field[2:])))
+        elif tag == b'2':
+            parts = field.split(b' ', 9)
+            xy = parts[1].decode('ascii')
+            kind = 'renamed' if parts[8][:1] == b'R' else 'copied'
+            orig = decode(next(fields))
+            entries.append(StatusEntry(kind, xy[0], xy[1], decode(parts[9]), orig, parts[7].decode('ascii')))
+        elif tag == b'u':
+            parts = field.split(b' ', 10)
+            xy = parts[1].decode('ascii')
+            entries.append(StatusEntry('unmerged', xy[0], xy[1], decode(parts[10])))
+        elif tag == b'!':
+            entries.append(StatusEntry('ignored', '!', '!', decode(field[2:])))
+        elif tag == b'#':
+            key, _, value = field[2:].decode('utf-8', 'replace').partition(' ')
+            if key == 'branch.oid':
+                snapshot.oid = None if value == '(initial)' else value
+            elif key == 'branch.head':
+                snapshot.head = None if value == '(detached)' else value
+            elif key == 'branch.upstream':
+                snapshot.upstream = value
+            elif key == 'branch.ab':
+                ahead, behind = value.split()
+                snapshot.ahead, snapshot.behind = int(ahead), -int(behind)
+    return snapshot
+
+
+def parse_numstat(chunks: Iterable[bytes]) -> Dict[str, Tuple[Optional[int], Optional[int]]]:
+    """
+    Parse `git diff --numstat -z` output into path -> (added, deleted) lines.
+
+    Binary files report (None, None). Renames are keyed by their new path.
+    """
+    stats: Dict[str, Tuple[Optional[int], Optional[int]]] = {}
+    fields = split_nul(chunks)
+    for field in fields:
+        added, deleted, path = field.split(b'\t', 2)
+        if not path:
+            next(fields)
+            path = next(fields)
+        stats[os.fsdecode(path)] = (None if added == b'-' else int(added),
+                                    None if deleted == b'-' else int(deleted))
+    return stats
+
+
+def _stream(command: List[str], cwd: Path, parse):
+    """Run a git command and parse its stdout as it arrives"""
+    try:
+        process = subprocess.Popen(command, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        raise GitStatusError(str(e))
+    with process:
+        result = parse(iter(lambda: process.stdout.read(READ_SIZE), b''))
+        error = process.stderr.read()
+    if process.returncode != 0:
+        raise GitStatusError(error.decode('utf-8', 'replace').strip() or f"{command[1]} failed")
+    return result
+
+
+def read_status(repo: Path, untracked: str = 'all', ignored: bool = False) -> StatusSnapshot:
+    """
+    Take a status snapshot of a repository.
+
+    Args:
+        repo: Working tree
+        untracked: --untracked-files mode (all lists files inside new directories)
+        ignored: Also report ignored files
+
+    Raises:
+        GitStatusError: If git is missing or the command fails
+    """
+    command = ['git', '-c', 'core.quotepath=false', 'status', '--porcelain=v2', '-z', '--branch',
+               f'--untracked-files={untracked}']
+    if ignored:
+        command.append('--ignored')
+    started = time.perf_counter()
+    snapshot = _stream(command, repo, parse_porcelain_v2)
+    snapshot.elapsed = time.perf_counter() - started
+    return snapshot
+
+
+def read_numstat(repo: Path) -> Dict[str, Tuple[Optional[int], Optional[int]]]:
+    """Added/deleted lines per staged path (one `git diff --cached` call)"""
+    return _stream(['git', 'diff', '--cached', '--numstat', '-z', '--find-renames', '--no-color'],
+                   repo, parse_numstat)
+
+
+class StatusCache:
+    """
+    One status snapshot shared by every step of a sync.
+
+    The snapshot is taken on first use and kept until invalidate() is
+    called by an operation that changes the index (git add, commit,
+    init), so status, staging summary and commit message read the same
+    data instead of walking the tree three times.
+    """
+
+    def __init__(self, repo: Path):
+        self.repo = repo
+        self._snapshot: Optional[StatusSnapshot] = None
+        self._numstat: Optional[Dict[str, Tuple[Optional[int], Optional[int]]]] = None
+        self.reads = 0
+
+    def get(self) -> StatusSnapshot:
+        if self._snapshot is None:
+            self._snapshot = read_status(self.repo)
+            self.reads += 1
+        return self._snapshot
+
+    def numstat(self) -> Dict[str, Tuple[Optional[int], Optional[int]]]:
+        if self._numstat is None:
+            self._numstat = read_numstat(self.repo)
+        return self._numstat
+
+    def invalidate(self):
+        self._snapshot = None
+        self._numstat = None
+
+
+def line_totals(numstat: Dict[str, Tuple[Optional[int], Optional[int]]]) -> Tuple[int, int, int]:
+    """(lines added, lines deleted, binary files)"""
+    added = deleted = binary = 0
+    for plus, minus in numstat.values():
+        if plus is None:
+            binary += 1
+        else:
+            added += plus
+            deleted += minus
+    return added, deleted, binary
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+def legacy_status(repo: Path) -> Tuple[List[str], List[str], List[str]]:
+    """The fixed-offset `git status --porcelain` parser this module replaces"""
+    result = subprocess.run(['git', 'status', '--porcelain'], cwd=repo, capture_output=True, text=True)
+    new_files, modified_files, deleted_files = [], [], []
+    for line in result.stdout.strip().split('\n'):
+        if not line:
+            continue
+        status, filename = line[:2], line[3:]
+        if status.strip() in ['??', 'A']:
+            new_files.append(filename)
+        elif status.strip() in ['M', 'MM']:
+            modified_files.append(filename)
+        elif status.strip() == 'D':
+            deleted_files.append(filename)
+    return new_files, modified_files, deleted_files
+
+
+def build_benchmark_repo(root: Path, files: int, html_kb: int):
+    """Commit a tree of files (a tenth of them large generated HTML), then change some"""
+    def git(*args):
+        subprocess.run(['git', *args], cwd=root, check=True, capture_output=True)
+
+    git('init', '-q')
+    git('config', 'user.email', 'bench@example.com')
+    git('config', 'user.name', 'bench')
+    git('config', 'commit.gpgsign', 'false')
+    filler = ('<p>generated documentation line</p>\n' * (html_kb * 1024 // 36 + 1)).encode('utf-8')
+    for index in range(files):
+        directory = root / f"dir{index // 1000:03d}"
+        if index % 1000 == 0:
+            directory.mkdir()
+        if index % 10 == 0:
+            (directory / f"page {index}.html").write_bytes(filler)
+        else:
+            (directory / f"file{index}.txt").write_bytes(f"line {index}\n".encode('utf-8'))
+    git('add', '.')
+    git('commit', '-q', '-m', 'baseline')
+
+    # ~1% modified, renames with spaces and non-ASCII names, deletions, untracked
+    for index in range(1, files, 100):
+        path = root / f"dir{index // 1000:03d}" / f"file{index}.txt"
+        if path.exists():
+            path.write_bytes(b'changed\n')
+    for index in range(0, min(files, 20000), 1000):
+        git('mv', f"dir{index // 1000:03d}/page {index}.html", f"dir{index // 1000:03d}/seite ü {index}.html")
+    for index in range(3, files, 997):
+        path = root / f"dir{index // 1000:03d}" / f"file{index}.txt"
+        if path.exists():
+            path.unlink()
+    for index in range(0, 500):
+        (root / f"dir{index % max(files // 1000, 1):03d}" / f"new file {index}.txt").write_bytes(b'new\n')
+
+
+def run_benchmark(files: int, runs: int, html_kb: int) -> bool:
+    """Compare three legacy status calls per sync with one shared snapshot"""
+    root = Path(tempfile.mkdtemp(prefix='git-status-bench-'))
+    try:
+        started = time.perf_counter()
+        build_benchmark_repo(root, files, html_kb)
+        print(f"{Colors.CYAN}ℹ Built a {files:,}-file repository in {time.perf_counter() - started:.1f}s "
+              f"({root}){Colors.END}")
+        subprocess.run(['git', 'status', '--porcelain'], cwd=root, capture_output=True)
+
+        legacy_times, snapshot_times = [], []
+        for _ in range(runs):
+            started = time.perf_counter()
+            for _ in range(3):
+                legacy = legacy_status(root)
+            legacy_times.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            cache = StatusCache(root)
+            for _ in range(3):
+                snapshot = cache.get()
+            snapshot_times.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        numstat = read_numstat(root)
+        numstat_time = time.perf_counter() - started
+
+        legacy_seconds, snapshot_seconds = min(legacy_times), min(snapshot_times)
+        print(f"{Colors.GREEN}✓ Legacy: 3 × git status --porcelain  {legacy_seconds * 1000:>8.1f} ms{Colors.END}")
+        print(f"{Colors.GREEN}✓ Shared porcelain=v2 snapshot       {snapshot_seconds * 1000:>8.1f} ms "
+              f"({legacy_seconds / snapshot_seconds:.1f}x faster){Colors.END}")
+        print(f"{Colors.GREEN}✓ Staged numstat (one diff --cached)  {numstat_time * 1000:>8.1f} ms, "
+              f"{len(numstat):,} paths{Colors.END}")
+
+        counts = snapshot.counts()
+        print(f"{Colors.CYAN}ℹ Snapshot: {len(snapshot):,} entries "
+              + ', '.join(f"{name} {count:,}" for name, count in sorted(counts.items())) + Colors.END)
+        renamed = snapshot.renamed
+        legacy_seen = set(legacy[0]) | set(legacy[1]) | set(legacy[2])
+        mangled = [new for _, new in renamed if new not in legacy_seen]
+        ok = bool(renamed) and all(new in numstat for _, new in renamed)
+        if mangled:
+            print(f"{Colors.YELLOW}⚠ The legacy parser lost or mangled {len(mangled)} of {len(renamed)} "
+                  f"renames (e.g. {mangled[0]!r}){Colors.END}")
+        return ok
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    """Main entry point for the git status snapshot"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Show a porcelain=v2 status snapshot or benchmark it on a large repository",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python git_status.py                    # Status of the project root
+  python git_status.py --repo /path/to/repo --numstat
+  python git_status.py --benchmark --files 100000
+        """
+    )
+
+    parser.add_argument("--repo", default=str(Path(__file__).parent.parent), help="Working tree")
+    parser.add_argument("--numstat", action="store_true", help="Also show staged line counts")
+    parser.add_argument("--benchmark", action="store_true", help="Benchmark on a generated repository")
+    parser.add_argument("--files", type=int, default=100000, help="Benchmark repository size")
+    parser.add_argument("--html-kb", type=int, default=64, help="Size of each generated HTML file (KiB)")
+    parser.add_argument("--runs", type=int, default=3, help="Benchmark repetitions (best is reported)")
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print(f"{Colors.HEADER}{Colors.BOLD}Git Status Benchmark{Colors.END}")
+        if not run_benchmark(args.files, args.runs, args.html_kb):
+            print(f"\n{Colors.RED}✗ Renames were not reported consistently{Colors.END}")
+            sys.exit(1)
+        print(f"\n{Colors.GREEN}{Colors.BOLD}🎉 Git status benchmark completed successfully!{Colors.END}\n")
+        sys.exit(0)
+
+    try:
+        snapshot = read_status(Path(args.repo))
+        numstat = read_numstat(Path(args.repo)) if args.numstat else {}
+    except GitStatusError as e:
+        print(f"{Colors.RED}✗ {e}{Colors.END}")
+        sys.exit(1)
+
+    branch = snapshot.head or '(detached)'
+    tracking = f" → {snapshot.upstream} (+{snapshot.ahead}/-{snapshot.behind})" if snapshot.upstream else ''
+    print(f"{Colors.CYAN}ℹ {branch}{tracking}: {len(snapshot):,} changed path(s) in "
+          f"{snapshot.elapsed * 1000:.1f} ms{Colors.END}")
+    for entry in snapshot.entries:
+        origin = f" ← {entry.orig_path}" if entry.orig_path else ''
+        lines = ''
+        if entry.path in numstat:
+            added, deleted = numstat[entry.path]
+            lines = '  (binary)' if added is None else f"  +{added} -{deleted}"
+        print(f"  {entry.index}{entry.worktree} {entry.path}{origin}{lines}")
+    if args.numstat:
+        added, deleted, binary = line_totals(numstat)
+        print(f"{Colors.GREEN}✓ Staged: +{added:,} -{deleted:,} lines, {binary} binary file(s){Colors.END}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,642 @@
+"""
+GitHub API Client
+Keep-alive REST client for the GitHub sync scripts with an on-disk
+ETag/Last-Modified cache (304 responses do not count against the rate limit)
+and a scheduler that paces calls from the X-RateLimit-* headers
+"""
+
+import hashlib
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+class Colors:
+    """ANSI color codes for terminal output"""
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    END = '\033[0m'
+    BOLD = '\033[1m'
+
+
+DEFAULT_API_URL = 'https://api.github.com'
+USER_AGENT = 'monitoring-stack-github-sync'
+
+
+class GitHubAPIError(Exception):
+    """A GitHub API call failed"""
+
+    def __init__(self, message: str, status: int = 0):
+        super().__init__(message)
+        self.status = status
+
+
+class APIResponse:
+    """Status, lower-cased headers and decoded JSON body of one call"""
+
+    __slots__ = ('status', 'headers', 'data', 'cached')
+
+    def __init__(self, status: int, headers: Dict[str, str], data: Any, cached: bool = False):
+        self.status = status
+        self.headers = headers
+        self.data = data
+        self.cached = cached
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    @property
+    def message(self) -> str:
+        if isinstance(self.data, dict) and self.data.get('message'):
+            return str(self.data['message'])
+        return f"HTTP {self.status}"
+
+
+class ConnectionPool:
+    """Bounded pool of persistent HTTP(S) connections to one host"""
+
+    def __init__(self, base_url: str, size: int = 4, timeout: float = 30.0):
+        parsed = urlparse(base_url)
+        if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+            raise ValueError(f"Unsupported API URL: {base_url}")
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.prefix = parsed.path.rstrip('/')
+        self.timeout = timeout
+        self.size = size
+        self.opened = 0
+        self._idle: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def acquire(self) -> Tuple[http.client.HTTPConnection, bool]:
+        """Take a connection; the flag tells whether it was reused"""
+        self._slots.acquire()
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+            self.opened += 1
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout), False
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+
+    def release(self, connection: http.client.HTTPConnection, reusable: bool):
+        if reusable:
+            with self._lock:
+                self._idle.append(connection)
+        else:
+            connection.close()
+        self._slots.release()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+class ResponseCache:
+    """
+    Conditional-request cache on disk.
+
+    One JSON file per URL and token holds the validators and body of the
+    last 200 response; files are private to the user since bodies may
+    describe private repositories.
+    """
+
+    def __init__(self, directory: Optional[Path], identity: str):
+        self.directory = directory
+        self.identity = identity
+        if directory is not None:
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def _file(self, url: str) -> Optional[Path]:
+        if self.directory is None:
+            return None
+        key = hashlib.sha256(f"{self.identity}\n{url}".encode('utf-8')).hexdigest()
+        return self.directory / f"{key[:32]}.json"
+
+    def load(self, url: str) -> Optional[Dict]:
+        path = self._file(url)
+        if path is None or not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get('url') == url else None
+
+    def store(self, url: str, headers: Dict[str, str], data: Any):
+        path = self._file(url)
+        if path is None:
+            return
+        entry = {'url': url, 'etag': headers.get('etag'), 'last_modified': headers.get('last-modified'),
+                 'stored': time.time(), 'data': data}
+        temp = path.with_suffix('.tmp')
+        fd = os.open(str(temp), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(str(temp), str(path))
+
+    def drop(self, url: str):
+        path = self._file(url)
+        if path is not None and path.exists():
+            path.unlink()
+
+
+class RateLimiter:
+    """
+    Schedules calls from the X-RateLimit-* headers of previous responses.
+
+    While plenty of quota is left calls go out immediately. Below
+    pace_below of the limit, calls are spread evenly over the time left
+    until the reset; at reserve or less they wait for the reset. Writes
+    are additionally spaced by mutation_interval, as GitHub asks of
+    integrations to avoid secondary rate limits.
+    """
+
+    def __init__(self, reserve: int = 20, pace_below: float = 0.1, mutation_interval: float = 1.0,
+                 max_wait: float = 900.0):
+        self.reserve = reserve
+        self.pace_below = pace_below
+        self.mutation_interval = mutation_interval
+        self.max_wait = max_wait
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset: Optional[float] = None
+        self.waited = 0.0
+        self._last_slot = 0.0
+        self._next_mutation = 0.0
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def update(self, headers: Dict[str, str]):
+        """Record the quota reported by a response"""
+        try:
+            limit = int(headers['x-ratelimit-limit'])
+            remaining = int(headers['x-ratelimit-remaining'])
+            reset = float(headers['x-ratelimit-reset'])
+        except (KeyError, ValueError):
+            return
+        with self._lock:
+            # Responses to concurrent calls may arrive out of order
+            if self.reset == reset and self.remaining is not None and remaining > self.remaining:
+                return
+            self.limit, self.remaining, self.reset = limit, remaining, reset
+
+    def block(self, seconds: float):
+        """Hold every call for a while (secondary rate limit, Retry-After)"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.time() + seconds)
+
+    def acquire(self, method: str):
+        """Wait until the next call may be sent"""
+        with self._lock:
+            now = time.time()
+            at = max(now, self._blocked_until)
+            if self.remaining is not None and self.reset is not None and self.reset > now:
+                left = self.remaining
+                if left <= self.reserve:
+                    at = max(at, self.reset + 1.0)
+                elif self.limit and left < self.limit * self.pace_below:
+                    at = max(at, self._last_slot + (self.reset - now) / (left - self.reserve))
+            if method != 'GET':
+                at = max(at, self._next_mutation)
+                self._next_mutation = at + self.mutation_interval
+            self._last_slot = at
+            delay = at - now
+        if delay > self.max_wait:
+            raise GitHubAPIError(f"Rate limit exhausted; quota resets in {delay:.0f}s", 403)
+        if delay > 0:
+            self.waited += delay
+            time.sleep(delay)
+
+
+class GitHubAPI:
+    """
+    Thread-safe GitHub REST client.
+
+    Every call goes through a persistent connection pool and the rate
+    limiter; GETs are revalidated against the disk cache with
+    If-None-Match/If-Modified-Since. Point base_url at a local stand-in
+    (see LocalGitHub) to exercise it without network access.
+    """
+
+    def __init__(self, token: Optional[str], base_url: str = DEFAULT_API_URL, cache_dir: Optional[Path] = None,
+                 max_connections: int = 4, timeout: float = 30.0, retries: int = 3,
+                 limiter: Optional[RateLimiter] = None):
+        """
+        Initialize the client.
+
+        Args:
+            token: Personal Access Token (None for anonymous calls)
+            base_url: API root, e.g. https://api.github.com or a GitHub Enterprise /api/v3 URL
+            cache_dir: Directory for the conditional-request cache (None disables it)
+            max_connections: Persistent connections (and concurrent calls)
+            timeout: Socket timeout in seconds
+            retries: Retries for secondary rate limits, 5xx responses and dropped connections
+            limiter: Shared rate limiter
+        """
+        self.token = token
+        self.base_url = base_url.rstrip('/')
+        self.pool = ConnectionPool(self.base_url, max_connections, timeout)
+        identity = hashlib.sha256((token or 'anonymous').encode('utf-8')).hexdigest()[:16]
+        self.cache = ResponseCache(cache_dir, f"{self.base_url}|{identity}")
+        self.retries = retries
+        self.limiter = limiter or RateLimiter()
+        self.calls = 0
+        self.not_modified = 0
+        self.retried = 0
+        self._stats_lock = threading.Lock()
+
+    def _headers(self, extra: Optional[Dict[str, str]]) -> Dict[str, str]:
+        headers = {'Accept': 'application/vnd.github+json', 'User-Agent': USER_AGENT,
+                   'X-GitHub-Api-Version': '2022-11-28'}
+        if self.token:
+            headers['Authorization'] = f"token {self.token}"
+        if extra:
+            headers.update(extra)
+        return headers
+
+    def _send(self, method: str, path: str, body: Optional[bytes],
+              headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        """One HTTP exchange, retrying once when a kept-alive connection went stale"""
+        for attempt in (0, 1):
+            connection, reused = self.pool.acquire()
+            try:
+                connection.request(method, self.pool.prefix + path, body, headers)
+                response = connection.getresponse()
+                payload = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                self.pool.release(connection, False)
+                if reused and attempt == 0:
+                    continue
+                raise GitHubAPIError(f"{method} {path}: {e}")
+            except (OSError, http.client.HTTPException) as e:
+                self.pool.release(connection, False)
+                raise GitHubAPIError(f"{method} {path}: {e}")
+            self.pool.release(connection, not response.will_close)
+            return response.status, {k.lower(): v for k, v in response.getheaders()}, payload
+        raise GitHubAPIError(f"{method} {path}: connection lost")
+
+    def request(self, method: str, path: str, data: Any = None,
+                headers: Optional[Dict[str, str]] = None) -> APIResponse:
+        """
+        Call the API.
+
+        Args:
+            method: HTTP method
+            path: Path below the API root, e.g. /repos/owner/name
+            data: JSON-serialisable request body
+            headers: Extra request headers
+
+        Returns:
+            APIResponse; a 304 revalidation is returned as the cached 200 with cached=True
+
+        Raises:
+            GitHubAPIError: On network failures or when the rate limit cannot be waited out
+        """
+        request_headers = self._headers(headers)
+        body = None
+        if data is not None:
+            body = json.dumps(data).encode('utf-8')
+            request_headers['Content-Type'] = 'application/json'
+        cached = self.cache.load(path) if method == 'GET' else None
+        if cached:
+            if cached.get('etag'):
+                request_headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                request_headers['If-Modified-Since'] = cached['last_modified']
+
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire(method)
+            status, response_headers, payload = self._send(method, path, body, request_headers)
+            self.limiter.update(response_headers)
+            with self._stats_lock:
+                self.calls += 1
+                if status == 304:
+                    self.not_modified += 1
+
+            retry_after = response_headers.get('retry-after')
+            limited = status in (403, 429) and (retry_after or response_headers.get('x-ratelimit-remaining') == '0')
+            if (limited or status in (502, 503, 504)) and attempt < self.retries:
+                if retry_after:
+                    delay = float(retry_after) if retry_after.isdigit() else 60.0
+                elif limited and response_headers.get('x-ratelimit-reset'):
+                    delay = float(response_headers['x-ratelimit-reset']) - time.time() + 1.0
+                else:
+                    delay = 2.0 ** attempt
+                if delay > self.limiter.max_wait:
+                    break
+                self.limiter.block(max(delay, 0.0))
+                with self._stats_lock:
+                    self.retried += 1
+                continue
+            break
+
+        if status == 304 and cached:
+            return APIResponse(200, response_headers, cached.get('data'), cached=True)
+        try:
+            decoded = json.loads(payload.decode('utf-8')) if payload else None
+        except ValueError:
+            decoded = payload.decode('utf-8', 'replace')
+        if method == 'GET' and status == 200 and ('etag' in response_headers or 'last-modified' in response_headers):
+            self.cache.store(path, response_headers, decoded)
+        elif method != 'GET' and 200 <= status < 300:
+            self.cache.drop(path)
+        return APIResponse(status, response_headers, decoded)
+
+    def get(self, path: str, **kwargs) -> APIResponse:
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path: str, data: Any = None, **kwargs) -> APIResponse:
+        return self.request('POST', path, data, **kwargs)
+
+    def patch(self, path: str, data: Any = None, **kwargs) -> APIResponse:
+        return self.request('PATCH', path, data, **kwargs)
+
+    def put(self, path: str, data: Any = None, **kwargs) -> APIResponse:
+        return self.request('PUT', path, data, **kwargs)
+
+    def delete(self, path: str, **kwargs) -> APIResponse:
+        return self.request('DELETE', path, **kwargs)
+
+    def summary(self) -> str:
+        """One line of call statistics"""
+        quota = ''
+        if self.limiter.remaining is not None:
+            quota = f", quota {self.limiter.remaining}/{self.limiter.limit}"
+        waited = f", waited {self.limiter.waited:.1f}s" if self.limiter.waited >= 0.05 else ''
+        return (f"{self.calls} API call(s), {self.not_modified} answered from cache (304), "
+                f"{self.pool.opened} connection(s){quota}{waited}")
+
+    def close(self):
+        self.pool.close()
+
+
+# ============================================================================
+# Local stand-in
+# ============================================================================
+
+class LocalGitHub:
+    """
+    In-process stand-in for the parts of the GitHub REST API the sync uses.
+
+    It keeps repositories in memory, answers conditional GETs with 304
+    (which, as on GitHub, do not use quota), reports X-RateLimit-* headers
+    from a small quota and counts the TCP connections it accepts.
+    """
+
+    def __init__(self, user: str = 'standin', limit: int = 60, host: str = '127.0.0.1', port: int = 0):
+        self.user = user
+        self.limit = limit
+        self.remaining = limit
+        self.reset = int(time.time()) + 3600
+        self.repos: Dict[Tuple[str, str], Dict] = {}
+        self.labels: Dict[Tuple[str, str], Dict[str, Dict]] = {}
+        self.topics: Dict[Tuple[str, str], List[str]] = {}
+        self.requests: List[Tuple[str, str, int]] = []
+        self.connections = 0
+        self.lock = threading.Lock()
+        # Imported here so that the sync scripts do not pay for http.server on every run
+        from http.server import ThreadingHTTPServer
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'LocalGitHub':
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def add_repo(self, owner: str, name: str, **fields) -> Dict:
+        repo = {'name': name, 'full_name': f"{owner}/{name}", 'owner': {'login': owner}, 'private': False,
+                'description': None, 'has_issues': True, 'has_wiki': True, 'has_projects': True,
+                'html_url': f"https://github.com/{owner}/{name}", 'updated_at': time.strftime('%Y-%m-%dT%H:%M:%SZ')}
+        repo.update(fields)
+        self.repos[(owner, name)] = repo
+        self.labels.setdefault((owner, name), {})
+        self.topics.setdefault((owner, name), [])
+        return repo
+
+    def route(self, method: str, parts: List[str], body: Any) -> Tuple[int, Any]:
+        """Handle one API call; returns (status, JSON body)"""
+        if parts[:1] == ['repos'] and len(parts) >= 4 and (parts[1], parts[2]) not in self.repos:
+            return 404, {'message': 'Not Found'}
+        if parts[:1] == ['repos'] and len(parts) >= 4:
+            key = (parts[1], parts[2])
+            if parts[3] == 'topics':
+                if method == 'PUT':
+                    self.topics[key] = list((body or {}).get('names', []))
+                return 200, {'names': self.topics[key]}
+            if parts[3] == 'labels':
+                return self._route_labels(method, self.labels[key], parts[4:], body or {})
+        if method == 'GET' and parts[:1] == ['repos'] and len(parts) == 3:
+            repo = self.repos.get((parts[1], parts[2]))
+            return (200, repo) if repo else (404, {'message': 'Not Found'})
+        if method == 'POST' and parts == ['user', 'repos']:
+            name = (body or {}).get('name')
+            if not name:
+                return 422, {'message': 'Validation Failed'}
+            if (self.user, name) in self.repos:
+                return 422, {'message': 'Repository creation failed.',
+                             'errors': [{'message': 'name already exists on this account'}]}
+            fields = {k: v for k, v in body.items() if k != 'name' and k != 'auto_init'}
+            return 201, self.add_repo(self.user, name, **fields)
+        if method == 'PATCH' and parts[:1] == ['repos'] and len(parts) == 3:
+            repo = self.repos.get((parts[1], parts[2]))
+            if not repo:
+                return 404, {'message': 'Not Found'}
+            repo.update(body or {})
+            repo['updated_at'] = time.strftime('%Y-%m-%dT%H:%M:%SZ')
+            return 200, repo
+        return 404, {'message': 'Not Found'}
+
+    @staticmethod
+    def _route_labels(method: str, labels: Dict[str, Dict], rest: List[str], body: Dict) -> Tuple[int, Any]:
+        if not rest and method == 'GET':
+            return 200, sorted(labels.values(), key=lambda label: label['name'].lower())
+        if not rest and method == 'POST':
+            if body.get('name', '').lower() in labels:
+                return 422, {'message': 'Validation Failed', 'errors': [{'code': 'already_exists'}]}
+            label = {'name': body['name'], 'color': body.get('color', 'ededed'),
+                     'description': body.get('description')}
+            labels[label['name'].lower()] = label
+            return 201, label
+        current = labels.get(unquote(rest[0]).lower()) if rest else None
+        if current is None:
+            return 404, {'message': 'Not Found'}
+        if method == 'PATCH':
+            del labels[current['name'].lower()]
+            current.update({k: v for k, v in body.items() if k in ('color', 'description')})
+            current['name'] = body.get('new_name', current['name'])
+            labels[current['name'].lower()] = current
+            return 200, current
+        return 200, current
+
+    def _handler(self):
+        from http.server import BaseHTTPRequestHandler
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with standin.lock:
+                    standin.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def _serve(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                path, _, query = self.path.partition('?')
+                parts = [part for part in path.split('/') if part]
+                with standin.lock:
+                    if parts == ['rate_limit']:
+                        status, data = 200, {'resources': {'core': {
+                            'limit': standin.limit, 'remaining': standin.remaining, 'reset': standin.reset}}}
+                    else:
+                        try:
+                            body = json.loads(raw.decode('utf-8')) if raw else None
+                        except ValueError:
+                            body = None
+                        status, data = standin.route(self.command, parts, body)
+                        if isinstance(data, list):
+                            params = parse_qs(query)
+                            per_page = int(params.get('per_page', ['30'])[0])
+                            page = int(params.get('page', ['1'])[0])
+                            data = data[(page - 1) * per_page:page * per_page]
+                    payload = json.dumps(data, sort_keys=True).encode('utf-8') if data is not None else b''
+                    etag = '"' + hashlib.sha1(payload).hexdigest() + '"'
+                    if (self.command == 'GET' and status == 200
+                            and self.headers.get('If-None-Match') == etag and parts != ['rate_limit']):
+                        status, payload = 304, b''
+                    elif parts != ['rate_limit']:
+                        if standin.remaining <= 0:
+                            status, payload = 403, b'{"message": "API rate limit exceeded"}'
+                        else:
+                            standin.remaining -= 1
+                    standin.requests.append((self.command, path, status))
+                    remaining = standin.remaining
+
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.send_header('X-RateLimit-Limit', str(standin.limit))
+                self.send_header('X-RateLimit-Remaining', str(remaining))
+                self.send_header('X-RateLimit-Reset', str(standin.reset))
+                self.send_header('X-RateLimit-Resource', 'core')
+                if self.command == 'GET' and status in (200, 304):
+                    self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _serve
+
+        return Handler
+
+
+def run_stand_in_demo(syncs: int, cache_dir: Path) -> bool:
+    """Run repeated repository checks against a local stand-in"""
+    standin = LocalGitHub().start()
+    print(f"{Colors.CYAN}ℹ Local GitHub stand-in on {standin.url} (quota {standin.limit}/h){Colors.END}")
+    repo = 'devops-prom-graf-esearch-lstash-kibana-jaeger-mtring-observ-stack'
+    ok = True
+    try:
+        for run in range(1, syncs + 1):
+            api = GitHubAPI('stand-in-token', standin.url, cache_dir,
+                            limiter=RateLimiter(mutation_interval=0.0))
+            started = time.perf_counter()
+            response = api.get(f"/repos/{standin.user}/{repo}")
+            if response.status == 404:
+                response = api.post('/user/repos', {'name': repo, 'private': False})
+            for _ in range(4):
+                check = api.get(f"/repos/{standin.user}/{repo}")
+                ok = ok and check.ok
+            elapsed = time.perf_counter() - started
+            print(f"{Colors.GREEN}✓ Sync {run}: {api.summary()} in {elapsed * 1000:.1f} ms{Colors.END}")
+            api.close()
+    finally:
+        standin.stop()
+    used = standin.limit - standin.remaining
+    print(f"{Colors.CYAN}ℹ Stand-in saw {len(standin.requests)} request(s) on {standin.connections} "
+          f"connection(s); quota used {used}{Colors.END}")
+    return ok and used < len(standin.requests)
+
+
+def main():
+    """Main entry point for the GitHub API client"""
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(
+        description="GitHub API client: show the rate limit or exercise the client against a local stand-in",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python github_api.py --token ghp_xxx              # Show remaining quota
+  python github_api.py --stand-in                   # Repeated syncs against a local fake API
+  python github_api.py --api-url https://ghe.example.com/api/v3 --token ghp_xxx
+        """
+    )
+
+    parser.add_argument("--token", default=os.environ.get('GITHUB_TOKEN'), help="Personal Access Token")
+    parser.add_argument("--api-url", default=DEFAULT_API_URL, help="API root URL")
+    parser.add_argument("--stand-in", action="store_true", help="Run against a local stand-in API")
+    parser.add_argument("--syncs", type=int, default=3, help="Stand-in sync repetitions")
+
+    args = parser.parse_args()
+
+    if args.stand_in:
+        print(f"{Colors.HEADER}{Colors.BOLD}GitHub API Stand-in{Colors.END}")
+        with tempfile.TemporaryDirectory(prefix='github-api-cache-') as cache_dir:
+            ok = run_stand_in_demo(args.syncs, Path(cache_dir))
+        if not ok:
+            print(f"\n{Colors.RED}✗ Conditional requests did not save quota{Colors.END}")
+            sys.exit(1)
+        print(f"\n{Colors.GREEN}{Colors.BOLD}🎉 GitHub API stand-in run completed successfully!{Colors.END}\n")
+        sys.exit(0)
+
+    api = GitHubAPI(args.token, args.api_url)
+    try:
+        response = api.get('/rate_limit')
+    except GitHubAPIError as e:
+        print(f"{Colors.RED}✗ {e}{Colors.END}")
+        sys.exit(1)
+    finally:
+        api.close()
+    if not response.ok:
+        print(f"{Colors.RED}✗ {response.message}{Colors.END}")
+        sys.exit(1)
+    core = response.data.get('resources', {}).get('core', {})
+    reset = time.strftime('%H:%M:%S', time.localtime(core.get('reset', 0)))
+    print(f"{Colors.GREEN}✓ Core quota: {core.get('remaining')}/{core.get('limit')} (resets at {reset}){Colors.END}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,8 +12,14 @@ from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 import re
-import urllib.request
-import urllib.error
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import quote
+import time
+
+from artifacts import format_size, install_filter, is_binary, maintain, pack_stats
+from github_api import DEFAULT_API_URL, GitHubAPI, GitHubAPIError, RateLimiter
+from git_status import GitStatusError, StatusCache, StatusSnapshot, line_totals
 
 
 class Colors:
@@ -36,12 +42,35 @@ class GitHubManager:
     - Automatic git initialization
     - Intelligent commit message generation
     - GitHub repository creation
+    - Label, topic and description provisioning
     - Automatic .gitignore creation
     - Branch management
     - Tag creation
     - Detailed logging
     """
     
+    DESCRIPTION = ("Production-ready monitoring stack with Prometheus, Grafana, Elasticsearch, Logstash, "
+                   "Kibana, Jaeger, and AlertManager for complete observability")
+    
+    TOPICS = [
+        "prometheus", "grafana", "elasticsearch", "logstash", "kibana", "jaeger",
+        "monitoring", "observability", "metrics", "logs", "traces", "docker"
+    ]
+    
+    LABELS = [
+        ("prometheus", "ff9900", "Prometheus metrics"),
+        ("grafana", "f46800", "Grafana dashboards"),
+        ("elasticsearch", "005571", "Elasticsearch logs"),
+        ("logstash", "00bfb3", "Logstash processing"),
+        ("kibana", "e8488b", "Kibana visualization"),
+        ("jaeger", "60d0e4", "Jaeger tracing"),
+        ("alertmanager", "d93f0b", "AlertManager config"),
+        ("documentation", "0075ca", "Documentation updates"),
+        ("deployment", "1d76db", "Deployment scripts"),
+        ("bug", "d73a4a", "Bug fixes"),
+        ("enhancement", "a2eeef", "New features")
+    ]
+    
     def __init__(self, project_root: Optional[Path] = None):
         """
         Initialize the GitHub manager.
@@ -54,6 +83,8 @@ class GitHubManager:
         self.repo_name = "devops-prom-graf-esearch-lstash-kibana-jaeger-mtring-observ-stack"
         self.git_dir = self.project_root / ".git"
         self.config = self.load_config()
+        self.status = StatusCache(self.project_root)
+        self.api: Optional[GitHubAPI] = None
         
     def load_config(self) -> Dict:
         """
@@ -96,6 +127,33 @@ class GitHubManager:
             self.print_warning(f"Could not load config.yaml: {e}")
             return {}
     
+    def get_api(self, token: Optional[str], max_connections: int = 4) -> GitHubAPI:
+        """
+        Get the shared GitHub API client.
+        
+        The client keeps its connections open for the whole run and caches
+        GET responses under .git/github-api-cache (next to the sync manifest,
+        never in the working tree where a sync would commit them), so
+        repeated checks are revalidated with ETags instead of using rate
+        limit. Outside a repository the cache is disabled.
+        
+        Args:
+            token: Personal Access Token
+            max_connections: Persistent connections (and concurrent calls)
+            
+        Returns:
+            GitHubAPI client (api_url from config.yaml, default api.github.com)
+        """
+        if self.api is None or self.api.token != token or self.api.pool.size < max_connections:
+            if self.api is not None:
+                self.api.close()
+            github = self.config.get('github') or {}
+            limiter = RateLimiter(mutation_interval=float(github.get('write_interval', 1.0)))
+            cache_dir = self.git_dir / "github-api-cache" if self.is_git_repo() else None
+            self.api = GitHubAPI(token, github.get('api_url') or DEFAULT_API_URL, cache_dir=cache_dir,
+                                 max_connections=max_connections, limiter=limiter)
+        return self.api
+    
     def create_github_repo(self, username: str, token: str) -> bool:
         """
         Create GitHub repository using GitHub API.
@@ -109,77 +167,51 @@ class GitHubManager:
         """
         self.print_info("Checking if repository exists on GitHub...")
         
-        # Check if repo exists
-        check_url = f"https://api.github.com/repos/{username}/{self.repo_name}"
+        api = self.get_api(token)
         
         try:
-            req = urllib.request.Request(check_url)
-            req.add_header('Authorization', f'token {token}')
-            req.add_header('Accept', 'application/vnd.github.v3+json')
-            
-            with urllib.request.urlopen(req) as response:
-                if response.status == 200:
-                    self.print_success("Repository already exists on GitHub")
-                    return True
-        except urllib.error.HTTPError as e:
-            if e.code == 404:
-                # Repository doesn't exist, create it
-                self.print_info("Repository not found. Creating it now...")
-                
-                create_url = "https://api.github.com/user/repos"
-                
-                repo_data = {
-                    "name": self.repo_name,
-                    "description": "Production-ready monitoring stack with Prometheus, Grafana, Elasticsearch, Logstash, Kibana, Jaeger, and AlertManager for complete observability",
-                    "private": False,
-                    "has_issues": True,
-                    "has_wiki": True,
-                    "has_projects": True,
-                    "auto_init": False
-                }
-                
-                try:
-                    data = json.dumps(repo_data).encode('utf-8')
-                    req = urllib.request.Request(create_url, data=data, method='POST')
-                    req.add_header('Authorization', f'token {token}')
-                    req.add_header('Accept', 'application/vnd.github.v3+json')
-                    req.add_header('Content-Type', 'application/json')
-                    
-                    with urllib.request.urlopen(req) as response:
-                        if response.status == 201:
-                            self.print_success(f"Repository created successfully!")
-                            self.print_success(f"URL: https://github.com/{username}/{self.repo_name}")
-                            return True
-                        else:
-                            self.print_error(f"Unexpected response: {response.status}")
-                            return False
-                            
-                except urllib.error.HTTPError as create_error:
-                    error_data = create_error.read().decode('utf-8')
-                    try:
-                        error_json = json.loads(error_data)
-                        error_msg = error_json.get('message', str(create_error))
-                    except:
-                        error_msg = str(create_error)
-                    
-                    self.print_error(f"Failed to create repository: {error_msg}")
-                    
-                    if 'Bad credentials' in error_msg:
-                        self.print_error("Your Personal Access Token is invalid")
-                        self.print_info("Generate a new token at: https://github.com/settings/tokens")
-                        self.print_info("Required scope: 'repo'")
-                    
-                    return False
-                except Exception as e:
-                    self.print_error(f"Error creating repository: {str(e)}")
-                    return False
-            else:
-                self.print_error(f"Error checking repository: {e}")
+            response = api.get(f"/repos/{username}/{self.repo_name}")
+            
+            if response.ok:
+                cached = " (unchanged since last check)" if response.cached else ""
+                self.print_success(f"Repository already exists on GitHub{cached}")
+                return True
+            
+            if response.status != 404:
+                self.print_error(f"Error checking repository: {response.message}")
                 return False
-        except Exception as e:
-            self.print_error(f"Error checking repository: {str(e)}")
+            
+            # Repository doesn't exist, create it
+            self.print_info("Repository not found. Creating it now...")
+            
+            repo_data = {
+                "name": self.repo_name,
+                "description": self.DESCRIPTION,
+                "private": False,
+                "has_issues": True,
+                "has_wiki": True,
+                "has_projects": True,
+                "auto_init": False
+            }
+            
+            response = api.post("/user/repos", repo_data)
+        except GitHubAPIError as e:
+            self.print_error(f"Error talking to the GitHub API: {e}")
             return False
         
+        if response.status == 201:
+            self.print_success(f"Repository created successfully!")
+            self.print_success(f"URL: https://github.com/{username}/{self.repo_name}")
+            return True
+        
+        error_msg = response.message
+        self.print_error(f"Failed to create repository: {error_msg}")
+        
+        if 'Bad credentials' in error_msg:
+            self.print_error("Your Personal Access Token is invalid")
+            self.print_info("Generate a new token at: https://github.com/settings/tokens")
+            self.print_info("Required scope: 'repo'")
+        
         return False
         
     def print_header(self, message: str):
@@ -204,13 +236,16 @@ class GitHubManager:
         """Print an info message"""
         print(f"{Colors.CYAN}ℹ {message}{Colors.END}")
         
-    def run_command(self, command: List[str], cwd: Optional[Path] = None) -> Tuple[bool, str, str]:
+    def run_command(self, command: List[str], cwd: Optional[Path] = None,
+                    timeout: Optional[float] = None, input: Optional[str] = None) -> Tuple[bool, str, str]:
         """
         Run a shell command and return the result.
         
         Args:
             command: Command to run as list of strings
             cwd: Working directory (defaults to project root)
+            timeout: Seconds before the command is killed (None waits forever)
+            input: Text passed on stdin
             
         Returns:
             Tuple of (success: bool, output: str, error: str)
@@ -221,9 +256,13 @@ class GitHubManager:
                 cwd=cwd or self.project_root,
                 capture_output=True,
                 text=True,
-                check=False
+                check=False,
+                timeout=timeout,
+                input=input
             )
             return (result.returncode == 0, result.stdout.strip(), result.stderr.strip())
+        except subprocess.TimeoutExpired:
+            return (False, "", f"timed out after {timeout:g}s")
         except Exception as e:
             return (False, "", str(e))
     
@@ -274,6 +313,7 @@ class GitHubManager:
             self.print_error(f"Failed to initialize git: {error}")
             return False
             
+        self.status.invalidate()
         self.print_success("Git repository initialized")
         return True
     
@@ -343,43 +383,38 @@ secrets/
         try:
             with open(gitignore_path, 'w', encoding='utf-8') as f:
                 f.write(gitignore_content)
+            self.status.invalidate()
             self.print_success(".gitignore created")
             return True
         except Exception as e:
             self.print_error(f"Failed to create .gitignore: {str(e)}")
             return False
     
+    def get_status_snapshot(self) -> StatusSnapshot:
+        """
+        Get the shared status snapshot.
+        
+        The snapshot is taken once and reused until an operation that changes
+        the index (init, add, commit) invalidates it.
+        
+        Returns:
+            StatusSnapshot (empty if git status fails)
+        """
+        try:
+            return self.status.get()
+        except GitStatusError as e:
+            self.print_warning(f"Could not read git status: {e}")
+            return StatusSnapshot()
+    
     def get_git_status(self) -> Tuple[List[str], List[str], List[str]]:
         """
         Get current git status.
         
         Returns:
-            Tuple of (new_files, modified_files, deleted_files)
+            Tuple of (new_files, modified_files, deleted_files); renamed files
+            are listed as modified under their new path
         """
-        success, output, _ = self.run_command(["git", "status", "--porcelain"])
-        
-        if not success:
-            return ([], [], [])
-        
-        new_files = []
-        modified_files = []
-        deleted_files = []
-        
-        for line in output.split('\n'):
-            if not line:
-                continue
-                
-            status = line[:2]
-            filename = line[3:]
-            
-            if status.strip() in ['??', 'A']:
-                new_files.append(filename)
-            elif status.strip() in ['M', 'MM']:
-                modified_files.append(filename)
-            elif status.strip() == 'D':
-                deleted_files.append(filename)
-        
-        return (new_files, modified_files, deleted_files)
+        return self.get_status_snapshot().legacy()
     
     def generate_commit_message(self) -> str:
         """
@@ -388,7 +423,9 @@ secrets/
         Returns:
             Generated commit message
         """
-        new_files, modified_files, deleted_files = self.get_git_status()
+        snapshot = self.get_status_snapshot()
+        new_files, modified_files, deleted_files = snapshot.legacy()
+        renamed_files = snapshot.renamed
         
         # Count changes
         total_changes = len(new_files) + len(modified_files) + len(deleted_files)
@@ -469,9 +506,21 @@ secrets/
         if modified_files:
             details.append(f"📝 Modified files: {len(modified_files)}")
         
+        if renamed_files:
+            details.append(f"🔀 Renamed files: {len(renamed_files)}")
+        
         if deleted_files:
             details.append(f"🗑️  Deleted files: {len(deleted_files)}")
         
+        try:
+            added, removed, binary = line_totals(self.status.numstat())
+        except GitStatusError:
+            added = removed = binary = 0
+        if added or removed:
+            details.append(f"➕ Lines: +{added} / -{removed}")
+        if binary:
+            details.append(f"📦 Binary files: {binary}")
+        
         message_parts.extend(details)
         message_parts.append("")
         
@@ -490,23 +539,120 @@ secrets/
         
         return '\n'.join(message_parts)
     
+    def get_artifact_settings(self) -> Dict:
+        """
+        Get large-artifact settings from the `artifacts` section of config.yaml.
+        
+        Returns:
+            Dictionary with threshold (bytes), store (Path or None), patterns and maintenance
+        """
+        artifacts = self.config.get('artifacts') or {}
+        patterns = artifacts.get('patterns', "*.png *.jpg *.jpeg *.gif *.pdf *.zip *.tar.gz *.bin")
+        if isinstance(patterns, str):
+            patterns = patterns.split()
+        store = artifacts.get('store')
+        maintenance = artifacts.get('maintenance', True)
+        return {
+            'threshold': int(float(artifacts.get('threshold_mb', 5)) * 1024 * 1024),
+            'store': (self.project_root / store).resolve() if store else None,
+            'patterns': list(patterns),
+            'maintenance': str(maintenance).lower() not in ('false', 'no', 'off', '0')
+        }
+    
+    def plan_staging(self, threshold: int) -> Tuple[List[str], List[Tuple[str, int, bool]]]:
+        """
+        Decide what to stage from the status snapshot.
+        
+        Only paths git reports as changed are staged; git status already
+        re-hashes stat-dirty files through their filters, so rewrites that
+        stage nothing never reach this list. Large files (at least threshold
+        bytes) are listed for the report.
+        
+        Args:
+            threshold: Size in bytes from which a file counts as large
+            
+        Returns:
+            Tuple of (paths to stage, large files as (path, size, binary))
+        """
+        paths, large = [], []
+        for entry in self.get_status_snapshot().entries:
+            if entry.kind == 'ignored':
+                continue
+            file_path = self.project_root / entry.path
+            try:
+                size = file_path.stat().st_size if entry.worktree != 'D' else 0
+            except OSError:
+                size = 0
+            if size >= threshold and file_path.is_file():
+                large.append((entry.path, size, is_binary(file_path)))
+            paths.append(entry.path)
+        return paths, large
+    
+    def prepare_artifact_store(self, settings: Dict) -> bool:
+        """
+        Install the clean/smudge filter that routes big binaries to the store.
+        
+        Args:
+            settings: From get_artifact_settings
+            
+        Returns:
+            True if successful (or no store is configured), False otherwise
+        """
+        if settings['store'] is None:
+            return True
+        try:
+            settings['store'].mkdir(parents=True, exist_ok=True)
+            if install_filter(self.project_root, settings['store'], settings['threshold'], settings['patterns']):
+                self.print_info(f"Routing {' '.join(settings['patterns'])} of "
+                                f"{format_size(settings['threshold'])} or more to {settings['store']}")
+                self.status.invalidate()
+        except (OSError, subprocess.CalledProcessError) as e:
+            self.print_error(f"Could not set up the artifact store: {e}")
+            return False
+        return True
+    
     def stage_changes(self) -> bool:
         """
         Stage all changes for commit.
         
+        Stages exactly the paths in the status snapshot (one `git add` fed
+        from stdin instead of walking the tree again) and reports large
+        artifacts.
+        
         Returns:
             True if successful, False otherwise
         """
         self.print_info("Staging changes...")
         
-        success, _, error = self.run_command(["git", "add", "."])
-        
-        if not success:
-            self.print_error(f"Failed to stage changes: {error}")
+        settings = self.get_artifact_settings()
+        if not self.prepare_artifact_store(settings):
             return False
+        
+        paths, large = self.plan_staging(settings['threshold'])
+        
+        if paths:
+            success, _, error = self.run_command(
+                ["git", "--literal-pathspecs", "add", "-A", "--pathspec-from-file=-", "--pathspec-file-nul"],
+                input="\0".join(paths) + "\0"
+            )
+            self.status.invalidate()
             
-        new_files, modified_files, deleted_files = self.get_git_status()
-        total = len(new_files) + len(modified_files) + len(deleted_files)
+            if not success:
+                self.print_error(f"Failed to stage changes: {error}")
+                return False
+        
+        if large:
+            total_size = sum(size for _, size, _ in large)
+            self.print_warning(f"{len(large)} large file(s) staged ({format_size(total_size)}, "
+                               f"threshold {format_size(settings['threshold'])}):")
+            for path, size, binary in sorted(large, key=lambda item: -item[1])[:10]:
+                routed = settings['store'] is not None and any(Path(path).match(p) for p in settings['patterns'])
+                kind = "→ artifact store" if routed else ("binary" if binary else "text")
+                print(f"  {format_size(size):>10}  {path}  ({kind})")
+            if len(large) > 10:
+                print(f"  ... and {len(large) - 10} more")
+            
+        total = len(self.get_status_snapshot().staged)
         
         self.print_success(f"Staged {total} files")
         return True
@@ -527,6 +673,8 @@ secrets/
         self.print_info("Committing changes...")
         
         success, output, error = self.run_command(["git", "commit", "-m", message])
+        if success:
+            self.status.invalidate()
         
         if not success:
             if "nothing to commit" in error.lower():
@@ -539,14 +687,17 @@ secrets/
         self.print_info(f"Commit message:\n{Colors.CYAN}{message[:200]}...{Colors.END}")
         return True
     
-    def get_remote_url(self) -> Optional[str]:
+    def get_remote_url(self, remote: str = "origin") -> Optional[str]:
         """
         Get the current remote URL.
         
+        Args:
+            remote: Remote name
+            
         Returns:
             Remote URL or None
         """
-        success, output, _ = self.run_command(["git", "remote", "get-url", "origin"])
+        success, output, _ = self.run_command(["git", "remote", "get-url", remote])
         
         if success and output:
             return output
@@ -581,6 +732,121 @@ secrets/
         self.print_success(f"Remote added: {github_url}")
         return True
     
+    def load_sync_manifest(self) -> Dict:
+        """
+        Load the sync manifest (last synced commit and tree per remote).
+        
+        Returns:
+            Manifest dictionary ({remote: {url, refs: {branch: {commit, tree, synced_at}}}})
+        """
+        try:
+            with open(self.git_dir / "github-sync.json", 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def record_sync(self, remote: str, branch: str, commit: str, tree: str, url: Optional[str], **details):
+        """
+        Record that a remote branch holds a commit.
+        
+        Args:
+            remote: Remote name
+            branch: Branch name
+            commit: Commit id now on the remote
+            tree: Tree id of that commit
+            url: Remote URL at the time of the sync
+            **details: Extra facts about the push (push_seconds, size_pack)
+        """
+        manifest = self.load_sync_manifest()
+        entry = manifest.setdefault(remote, {})
+        if entry.get('url') != url:
+            entry['refs'] = {}
+        entry['url'] = url
+        entry.setdefault('refs', {})[branch] = {
+            'commit': commit,
+            'tree': tree,
+            'synced_at': datetime.now().isoformat(timespec='seconds'),
+            **details
+        }
+        path = self.git_dir / "github-sync.json"
+        temp = path.with_suffix('.tmp')
+        try:
+            with open(temp, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(temp, path)
+        except OSError as e:
+            self.print_warning(f"Could not write sync manifest: {e}")
+    
+    def read_refs(self, branch: str, remote: str = "origin") -> Dict[str, Tuple[str, str]]:
+        """
+        Read the local branch and its remote-tracking ref in one git call.
+        
+        Returns:
+            {'local': (commit, tree), 'tracking': (commit, tree)} for the refs that exist
+        """
+        success, output, _ = self.run_command([
+            "git", "for-each-ref", "--format=%(refname) %(objectname) %(tree)",
+            f"refs/heads/{branch}", f"refs/remotes/{remote}/{branch}"
+        ])
+        refs = {}
+        if success:
+            for line in output.splitlines():
+                refname, commit, tree = line.split(" ")
+                refs['local' if refname.startswith("refs/heads/") else 'tracking'] = (commit, tree)
+        return refs
+    
+    def check_sync_state(self, branch: str = "main", remote: str = "origin",
+                         verify_remote: bool = True) -> Tuple[bool, str]:
+        """
+        Decide whether a push would be a no-op, touching the network at most once.
+        
+        The branch is in sync if the manifest records its commit for the
+        current remote URL, or if the remote-tracking ref (updated by every
+        push and fetch) points at it. Without either, one `git ls-remote`
+        asks the remote, unless verify_remote is False.
+        
+        Args:
+            branch: Branch that would be pushed
+            remote: Remote name
+            verify_remote: Allow the `git ls-remote` fallback
+            
+        Returns:
+            Tuple of (in sync, explanation)
+        """
+        refs = self.read_refs(branch, remote)
+        if 'local' not in refs:
+            return (False, f"branch {branch} does not exist yet")
+        commit, tree = refs['local']
+        url = self.get_remote_url(remote)
+        if url is None:
+            return (False, f"remote {remote} is not configured")
+        
+        entry = self.load_sync_manifest().get(remote, {})
+        synced = entry.get('refs', {}).get(branch, {}) if entry.get('url') == url else {}
+        if synced.get('commit') == commit:
+            return (True, f"{branch} at {commit[:7]} was synced to {remote} at {synced.get('synced_at')}")
+        
+        if 'tracking' in refs:
+            if refs['tracking'][0] == commit:
+                self.record_sync(remote, branch, commit, tree, url)
+                return (True, f"{branch} at {commit[:7]} matches {remote}/{branch}")
+            success, output, _ = self.run_command([
+                "git", "rev-list", "--left-right", "--count", f"{branch}...{remote}/{branch}"
+            ])
+            if success:
+                ahead, behind = output.split()
+                return (False, f"{branch} is {ahead} ahead, {behind} behind {remote}/{branch}")
+            return (False, f"{branch} differs from {remote}/{branch}")
+        
+        if synced or not verify_remote:
+            return (False, f"{branch} at {commit[:7]} has not been synced to {remote}")
+        
+        success, output, _ = self.run_command(["git", "ls-remote", "--heads", remote, f"refs/heads/{branch}"])
+        if success and output.split()[:1] == [commit]:
+            self.record_sync(remote, branch, commit, tree, url)
+            return (True, f"{remote} already has {branch} at {commit[:7]}")
+        return (False, f"{remote} does not have {branch} at {commit[:7]}")
+    
     def push_to_github(self, branch: str = "main") -> bool:
         """
         Push commits to GitHub.
@@ -594,6 +860,7 @@ secrets/
         self.print_info(f"Pushing to GitHub ({branch})...")
         
         # Try to push
+        started = time.monotonic()
         success, output, error = self.run_command(["git", "push", "-u", "origin", branch])
         
         if not success:
@@ -611,33 +878,452 @@ secrets/
             self.print_info(f"   Repository: https://github.com/YOUR_USERNAME/{self.repo_name}")
             return False
             
-        self.print_success(f"Pushed to GitHub ({branch})")
+        elapsed = time.monotonic() - started
+        previous = self.last_push_seconds("origin", branch)
+        self.status.invalidate()
+        refs = self.read_refs(branch)
+        if 'local' in refs:
+            self.record_sync("origin", branch, *refs['local'], self.get_remote_url(),
+                             push_seconds=round(elapsed, 3), size_pack=pack_stats(self.project_root)['size-pack'])
+        
+        self.print_success(f"Pushed to GitHub ({branch}) in {elapsed:.1f}s{self.format_delta(elapsed, previous)}")
         return True
     
-    def create_github_labels(self):
-        """Display GitHub labels to create"""
-        self.print_header("RECOMMENDED GITHUB LABELS")
+    def last_push_seconds(self, remote: str, branch: str) -> Optional[float]:
+        """Duration of the previous recorded push of a branch to a remote"""
+        return self.load_sync_manifest().get(remote, {}).get('refs', {}).get(branch, {}).get('push_seconds')
+    
+    @staticmethod
+    def format_delta(elapsed: float, previous: Optional[float]) -> str:
+        """' (last sync: 2.3s, -1.1s)' or '' without a previous push"""
+        if previous is None:
+            return ""
+        return f" (last sync: {previous:.1f}s, {elapsed - previous:+.1f}s)"
+    
+    def optimize_repository(self, branch: str = "main"):
+        """
+        Run incremental pack maintenance before a push and report pack sizes.
+        
+        Loose objects are packed geometrically (no full repack) and the
+        commit-graph is refreshed; the pack size is compared with the one
+        recorded at the last sync to origin.
+        
+        Args:
+            branch: Branch about to be pushed
+        """
+        settings = self.get_artifact_settings()
+        last = self.load_sync_manifest().get('origin', {}).get('refs', {}).get(branch, {}).get('size_pack')
+        
+        if settings['maintenance']:
+            before, after, elapsed, warnings = maintain(self.project_root)
+            for warning in warnings:
+                self.print_warning(f"Maintenance: {warning}")
+            self.print_info(f"Pack maintenance in {elapsed:.1f}s: {before.get('packs', 0)} → "
+                            f"{after.get('packs', 0)} pack(s), {before.get('count', 0)} → "
+                            f"{after.get('count', 0)} loose object(s), "
+                            f"{format_size(before['size-pack'] + before['size'])} → "
+                            f"{format_size(after['size-pack'] + after['size'])} on disk")
+        else:
+            after = pack_stats(self.project_root)
+        
+        if last is not None:
+            delta = after['size-pack'] - last
+            sign = "+" if delta >= 0 else "-"
+            self.print_info(f"Pack size {format_size(after['size-pack'])} "
+                            f"({sign}{format_size(abs(delta))} since the last sync)")
+    
+    def get_sync_remotes(self) -> List[Dict]:
+        """
+        Get the remotes every sync pushes to.
+        
+        origin (GitHub) always comes first; further mirrors come from the
+        `remotes` section of config.yaml, either as `name: url` pairs or,
+        with PyYAML, as mappings/list items with url, timeout and retries.
+        Defaults come from the `mirror` section.
+        
+        Returns:
+            List of {name, url, timeout, retries} dictionaries (url None = keep as configured in git)
+        """
+        mirror = self.config.get('mirror') or {}
+        timeout = float(mirror.get('timeout', 300))
+        retries = int(mirror.get('retries', 2))
+        remotes = [{'name': 'origin', 'url': None, 'timeout': timeout, 'retries': retries}]
+        
+        configured = self.config.get('remotes') or {}
+        if isinstance(configured, dict):
+            configured = [dict(value, name=name) if isinstance(value, dict) else {'name': name, 'url': value}
+                          for name, value in configured.items()]
+        
+        for spec in configured:
+            if not isinstance(spec, dict) or not spec.get('name'):
+                self.print_warning(f"Ignoring remote entry without a name in config.yaml: {spec}")
+                continue
+            remote = {
+                'name': str(spec['name']),
+                'url': spec.get('url') or None,
+                'timeout': float(spec.get('timeout', timeout)),
+                'retries': int(spec.get('retries', retries))
+            }
+            if remote['name'] == 'origin':
+                remotes[0] = remote
+            elif remote['url']:
+                remotes.append(remote)
+            else:
+                self.print_warning(f"Ignoring remote {remote['name']}: no url in config.yaml")
+        return remotes
+    
+    def get_remote_urls(self) -> Dict[str, str]:
+        """
+        Get the URLs of all configured git remotes in one call.
+        
+        Returns:
+            Dictionary of remote name to URL
+        """
+        success, output, _ = self.run_command(["git", "config", "--get-regexp", r"^remote\..*\.url$"])
+        urls = {}
+        if success:
+            for line in output.splitlines():
+                key, _, url = line.partition(" ")
+                urls[key[len("remote."):-len(".url")]] = url
+        return urls
+    
+    def configure_remotes(self, remotes: List[Dict]) -> bool:
+        """
+        Add or update the git remotes listed in config.yaml.
+        
+        Args:
+            remotes: Remotes from get_sync_remotes
+            
+        Returns:
+            True if every remote is configured, False otherwise
+        """
+        urls = self.get_remote_urls()
+        for remote in remotes:
+            name, url = remote['name'], remote['url']
+            if url is None:
+                if name not in urls:
+                    self.print_error(f"Remote {name} is not configured")
+                    return False
+                continue
+            if urls.get(name) == url:
+                continue
+            action = "set-url" if name in urls else "add"
+            success, _, error = self.run_command(["git", "remote", action, name, url])
+            if not success:
+                self.print_error(f"Failed to configure remote {name}: {error}")
+                return False
+            self.print_success(f"Remote {name}: {url}")
+        return True
+    
+    def push_remote(self, remote: Dict, branch: str) -> Dict:
+        """
+        Push a branch to one remote with its own timeout and retries.
         
-        labels = [
-            ("prometheus", "ff9900", "Prometheus metrics"),
-            ("grafana", "f46800", "Grafana dashboards"),
-            ("elasticsearch", "005571", "Elasticsearch logs"),
-            ("logstash", "00bfb3", "Logstash processing"),
-            ("kibana", "e8488b", "Kibana visualization"),
-            ("jaeger", "60d0e4", "Jaeger tracing"),
-            ("alertmanager", "d93f0b", "AlertManager config"),
-            ("documentation", "0075ca", "Documentation updates"),
-            ("deployment", "1d76db", "Deployment scripts"),
-            ("bug", "d73a4a", "Bug fixes"),
-            ("enhancement", "a2eeef", "New features")
-        ]
+        Safe to run from worker threads: it only runs git and returns a result.
         
-        print(f"{Colors.CYAN}Add these labels to your GitHub repository:{Colors.END}\n")
+        Args:
+            remote: Remote from get_sync_remotes
+            branch: Branch to push
+            
+        Returns:
+            Dictionary with name, ok, attempts, elapsed and detail
+        """
+        name = remote['name']
+        command = ["git", "push", "--porcelain"]
+        if name == "origin":
+            command.append("-u")
+        command += [name, f"refs/heads/{branch}:refs/heads/{branch}"]
+        
+        result = {'name': name, 'ok': False, 'attempts': 0, 'elapsed': 0.0, 'detail': ''}
+        started = time.monotonic()
+        for attempt in range(1, remote['retries'] + 2):
+            result['attempts'] = attempt
+            success, output, error = self.run_command(command, timeout=remote['timeout'])
+            refs = [line.split("\t") for line in output.splitlines() if "\t" in line]
+            if success:
+                flag, _, summary = refs[0][:3] if refs and len(refs[0]) >= 3 else ("", "", "pushed")
+                result['ok'] = True
+                result['detail'] = {"*": "new branch", "=": "up to date"}.get(flag, summary.strip("[]"))
+                break
+            messages = [line for line in error.splitlines() if line.startswith(("fatal:", "error:"))]
+            result['detail'] = (messages or error.splitlines() or ["push failed"])[0]
+            if any(ref[0] == "!" for ref in refs):
+                # Rejected (e.g. non-fast-forward): retrying will not help
+                result['detail'] = refs[0][-1].strip()
+                break
+            if attempt <= remote['retries']:
+                time.sleep(min(2 ** (attempt - 1), 30))
+        result['elapsed'] = time.monotonic() - started
+        return result
+    
+    def push_to_remotes(self, branch: str = "main") -> bool:
+        """
+        Push to GitHub and every mirror from config.yaml.
+        
+        With only origin configured this is push_to_github; otherwise all
+        remotes are pushed concurrently (mirror.workers at a time) and a
+        failing mirror does not hold up the others.
+        
+        Args:
+            branch: Branch name to push
+            
+        Returns:
+            True if every remote has the branch, False otherwise
+        """
+        remotes = self.get_sync_remotes()
+        self.optimize_repository(branch)
+        
+        if len(remotes) == 1 and remotes[0]['url'] is None:
+            return self.push_to_github(branch)
+        
+        refs = self.read_refs(branch)
+        if 'local' not in refs:
+            self.print_warning(f"Creating {branch} branch...")
+            self.run_command(["git", "branch", "-M", branch])
+            refs = self.read_refs(branch)
+            if 'local' not in refs:
+                self.print_error(f"Branch {branch} does not exist")
+                return False
+        if not self.configure_remotes(remotes):
+            return False
         
-        for name, color, description in labels:
-            print(f"  {name:20} #{color:6} - {description}")
+        commit, tree = refs['local']
+        urls = self.get_remote_urls()
+        manifest = self.load_sync_manifest()
+        previous = {remote['name']: self.last_push_seconds(remote['name'], branch) for remote in remotes}
+        results = []
+        pending = []
+        for remote in remotes:
+            entry = manifest.get(remote['name'], {})
+            synced = entry.get('refs', {}).get(branch, {}).get('commit') if entry.get('url') == urls.get(remote['name']) else None
+            if synced == commit:
+                results.append({'name': remote['name'], 'ok': True, 'attempts': 0, 'elapsed': 0.0,
+                                'detail': 'already synced'})
+            else:
+                pending.append(remote)
+        
+        workers = max(1, min(int((self.config.get('mirror') or {}).get('workers', 4)), len(pending) or 1))
+        self.print_info(f"Pushing {branch} ({commit[:7]}) to {len(pending)} of {len(remotes)} remote(s), "
+                        f"{workers} at a time...")
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self.push_remote, remote, branch) for remote in pending]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                if result['ok']:
+                    self.print_success(f"{result['name']}: {result['detail']} ({result['elapsed']:.1f}s)")
+                else:
+                    self.print_error(f"{result['name']}: {result['detail']}")
+        
+        size_pack = pack_stats(self.project_root)['size-pack']
+        for result in results:
+            if result['ok'] and result['attempts']:
+                self.record_sync(result['name'], branch, commit, tree, urls.get(result['name']),
+                                 push_seconds=round(result['elapsed'], 3), size_pack=size_pack)
+        self.status.invalidate()
+        
+        order = {remote['name']: index for index, remote in enumerate(remotes)}
+        results.sort(key=lambda result: order[result['name']])
+        print(f"\n  {'Remote':<20} {'Result':<8} {'Attempts':>8} {'Time':>8} {'vs last':>8}  Detail")
+        for result in results:
+            mark = f"{Colors.GREEN}✓ ok    {Colors.END}" if result['ok'] else f"{Colors.RED}✗ failed{Colors.END}"
+            last = previous.get(result['name'])
+            delta = f"{result['elapsed'] - last:+.1f}s" if last is not None and result['attempts'] else "-"
+            print(f"  {result['name']:<20} {mark} {result['attempts']:>8} {result['elapsed']:>7.1f}s "
+                  f"{delta:>8}  {result['detail']}")
+        print()
         
-        print(f"\n{Colors.YELLOW}You can add these via GitHub → Repository → Issues → Labels{Colors.END}")
+        failed = [result['name'] for result in results if not result['ok']]
+        if failed:
+            self.print_error(f"Push failed for {', '.join(failed)}")
+            return False
+        self.print_success(f"Pushed to {len(remotes)} remote(s) ({branch})")
+        return True
+    
+    def create_github_labels(self, username: Optional[str] = None, token: Optional[str] = None,
+                             repos: Optional[List[str]] = None) -> bool:
+        """
+        Provision labels, topics and description, or display them without a token.
+        
+        Args:
+            username: GitHub username (owner of the repository)
+            token: Personal Access Token; without one the labels are only printed
+            repos: owner/name repositories to provision (defaults to this one)
+            
+        Returns:
+            True if every repository was provisioned (or nothing could be done)
+        """
+        if not token:
+            self.print_header("RECOMMENDED GITHUB LABELS")
+            
+            print(f"{Colors.CYAN}Add these labels to your GitHub repository:{Colors.END}\n")
+            
+            for name, color, description in self.LABELS:
+                print(f"  {name:20} #{color:6} - {description}")
+            
+            print(f"\n{Colors.YELLOW}You can add these via GitHub → Repository → Issues → Labels{Colors.END}")
+            print(f"{Colors.YELLOW}(or add a token to config.yaml and they are created automatically){Colors.END}")
+            return True
+        
+        return self.provision_repositories(repos or [f"{username}/{self.repo_name}"], token)
+    
+    def fetch_labels(self, api: GitHubAPI, full_name: str) -> Dict[str, Dict]:
+        """
+        Fetch all labels of a repository.
+        
+        Args:
+            api: API client
+            full_name: owner/name
+            
+        Returns:
+            Labels keyed by lower-cased name (GitHub label names are case-insensitive)
+        """
+        labels = {}
+        page = 1
+        while True:
+            response = api.get(f"/repos/{full_name}/labels?per_page=100&page={page}")
+            if not response.ok:
+                raise GitHubAPIError(f"listing labels: {response.message}", response.status)
+            for label in response.data:
+                labels[label['name'].lower()] = label
+            if len(response.data) < 100:
+                return labels
+            page += 1
+    
+    def plan_provisioning(self, full_name: str, labels: Dict[str, Dict], topics: List[str],
+                          repo: Dict) -> Tuple[List[Tuple[str, str, Dict, str]], List[str]]:
+        """
+        Diff the wanted labels, topics and description against the current state.
+        
+        Existing topics are kept; labels that are not in LABELS are left alone.
+        
+        Returns:
+            Tuple of (writes as (method, path, body, what), items already up to date)
+        """
+        writes = []
+        skipped = []
+        
+        for name, color, description in self.LABELS:
+            current = labels.get(name.lower())
+            body = {"color": color, "description": description}
+            if current is None:
+                writes.append(("POST", f"/repos/{full_name}/labels", dict(body, name=name), f"label {name}"))
+            elif (current.get('color', '').lower() != color or (current.get('description') or '') != description
+                  or current['name'] != name):
+                path = f"/repos/{full_name}/labels/{quote(current['name'], safe='')}"
+                writes.append(("PATCH", path, dict(body, new_name=name), f"label {name}"))
+            else:
+                skipped.append(f"label {name}")
+        
+        missing = [topic for topic in self.TOPICS if topic not in topics]
+        if not missing:
+            skipped.append("topics")
+        else:
+            wanted = list(topics) + missing
+            if len(wanted) > 20:
+                self.print_warning(f"{full_name}: GitHub allows 20 topics; dropping some existing ones")
+                wanted = (self.TOPICS + [topic for topic in topics if topic not in self.TOPICS])[:20]
+            writes.append(("PUT", f"/repos/{full_name}/topics", {"names": wanted}, "topics"))
+        
+        if (repo.get('description') or '') == self.DESCRIPTION:
+            skipped.append("description")
+        else:
+            writes.append(("PATCH", f"/repos/{full_name}", {"description": self.DESCRIPTION}, "description"))
+        
+        return writes, skipped
+    
+    def provision_repositories(self, repos: List[str], token: str, workers: Optional[int] = None) -> bool:
+        """
+        Provision labels, topics and description on one or more repositories.
+        
+        Current state is read for all repositories concurrently (revalidated
+        from the API cache where possible), then only the missing or changed
+        items are written, again concurrently with a bounded pool.
+        
+        Args:
+            repos: owner/name repositories
+            token: Personal Access Token
+            workers: Concurrent API calls (default: github.workers from config.yaml or 8)
+            
+        Returns:
+            True if every repository was provisioned, False otherwise
+        """
+        github = self.config.get('github') or {}
+        workers = int(workers or github.get('workers') or 8)
+        self.print_header("PROVISIONING GITHUB LABELS, TOPICS AND DESCRIPTION")
+        
+        api = self.get_api(token, max_connections=workers)
+        calls_before = api.calls
+        started = time.monotonic()
+        errors: Dict[str, str] = {}
+        plans: Dict[str, Tuple[List, List]] = {}
+        done: Dict[str, List[str]] = {repo: [] for repo in repos}
+        
+        def read_state(full_name: str):
+            labels = self.fetch_labels(api, full_name)
+            topics = api.get(f"/repos/{full_name}/topics")
+            repo = api.get(f"/repos/{full_name}")
+            for response in (topics, repo):
+                if not response.ok:
+                    raise GitHubAPIError(response.message, response.status)
+            return labels, topics.data.get('names', []), repo.data
+        
+        def write(full_name: str, method: str, path: str, body: Dict, what: str):
+            response = api.request(method, path, body)
+            if not response.ok:
+                raise GitHubAPIError(f"{what}: {response.message}", response.status)
+            return what
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            reads = {pool.submit(read_state, repo): repo for repo in repos}
+            for future in as_completed(reads):
+                full_name = reads[future]
+                try:
+                    plans[full_name] = self.plan_provisioning(full_name, *future.result())
+                except GitHubAPIError as e:
+                    errors[full_name] = str(e)
+            
+            writes = {}
+            for full_name, (planned, _) in plans.items():
+                for method, path, body, what in planned:
+                    writes[pool.submit(write, full_name, method, path, body, what)] = full_name
+            for future in as_completed(writes):
+                full_name = writes[future]
+                try:
+                    done[full_name].append(future.result())
+                except GitHubAPIError as e:
+                    errors.setdefault(full_name, str(e))
+        
+        elapsed = time.monotonic() - started
+        
+        print(f"  {'Repository':<60} {'Written':>8} {'Skipped':>8}  Status")
+        total_written = total_skipped = 0
+        for full_name in repos:
+            planned, skipped = plans.get(full_name, ([], []))
+            total_written += len(done[full_name])
+            total_skipped += len(skipped)
+            if full_name in errors:
+                status = f"{Colors.RED}✗ {errors[full_name]}{Colors.END}"
+            elif planned:
+                labels = sum(1 for what in done[full_name] if what.startswith("label "))
+                items = ([f"{labels} label(s)"] if labels else []) + \
+                    [what for what in done[full_name] if not what.startswith("label ")]
+                status = f"{Colors.GREEN}✓ wrote {', '.join(items)}{Colors.END}"
+            else:
+                status = f"{Colors.GREEN}✓ up to date{Colors.END}"
+            print(f"  {full_name:<60} {len(done[full_name]):>8} {len(skipped):>8}  {status}")
+        print()
+        
+        calls = api.calls - calls_before
+        self.print_info(f"{calls} API call(s) made in {elapsed:.1f}s, {total_written} write(s), "
+                        f"{total_skipped} write(s) skipped as already up to date")
+        
+        if errors:
+            self.print_error(f"Provisioning failed for {len(errors)} of {len(repos)} repositories")
+            return False
+        self.print_success(f"Provisioned {len(repos)} repositories")
+        return True
     
     def show_next_steps(self):
         """Display next steps after pushing"""
@@ -646,13 +1332,13 @@ secrets/
         print(f"{Colors.CYAN}1. Visit your repository:{Colors.END}")
         print(f"   https://github.com/YOUR_USERNAME/{self.repo_name}")
         print()
-        print(f"{Colors.CYAN}2. Add repository description:{Colors.END}")
+        print(f"{Colors.CYAN}2. Add repository description (automatic with a token in config.yaml):{Colors.END}")
         print(f"   'Production-ready monitoring stack with Prometheus, Grafana,")
         print(f"    Elasticsearch, Logstash, Kibana, Jaeger, and AlertManager'")
         print()
-        print(f"{Colors.CYAN}3. Add repository topics (tags):{Colors.END}")
-        print(f"   prometheus grafana elasticsearch logstash kibana jaeger")
-        print(f"   monitoring observability metrics logs traces docker")
+        print(f"{Colors.CYAN}3. Add repository topics (automatic with a token in config.yaml):{Colors.END}")
+        print(f"   {' '.join(self.TOPICS[:6])}")
+        print(f"   {' '.join(self.TOPICS[6:])}")
         print()
         print(f"{Colors.CYAN}4. Enable GitHub features:{Colors.END}")
         print(f"   • Wiki (for additional docs)")
@@ -661,13 +1347,14 @@ secrets/
         print()
         print(f"{Colors.GREEN}💡 Tip:{Colors.END} Run this script again to push future updates")
     
-    def sync_to_github(self, username: str, auto_commit: bool = True) -> bool:
+    def sync_to_github(self, username: str, auto_commit: bool = True, full: bool = False) -> bool:
         """
         Main workflow to sync project to GitHub.
         
         Args:
             username: GitHub username
             auto_commit: Whether to auto-commit changes
+            full: Run every step even when nothing changed since the last sync
             
         Returns:
             True if successful, False otherwise
@@ -687,12 +1374,24 @@ secrets/
                 self.create_gitignore()
             
             # Check for changes
-            new_files, modified_files, deleted_files = self.get_git_status()
+            snapshot = self.get_status_snapshot()
+            new_files, modified_files, deleted_files = snapshot.legacy()
             total_changes = len(new_files) + len(modified_files) + len(deleted_files)
             
             if total_changes == 0:
                 self.print_info("No changes to commit")
                 
+                # Nothing new since the last sync: skip remote setup, API calls and the push
+                if not full:
+                    states = [self.check_sync_state(remote=remote['name']) for remote in self.get_sync_remotes()]
+                    if all(in_sync for in_sync, _ in states):
+                        for _, reason in states:
+                            self.print_success(f"Already in sync: {reason}")
+                        return True
+                    for in_sync, reason in states:
+                        if not in_sync:
+                            self.print_info(f"Sync needed: {reason}")
+                
                 # Still try to push in case there are unpushed commits
                 if not self.add_remote(username):
                     return False
@@ -702,14 +1401,15 @@ secrets/
                     token = self.config['github']['token']
                     self.create_github_repo(username, token)
                     
-                self.push_to_github()
-                return True
+                return self.push_to_remotes()
             
             self.print_info(f"Found {total_changes} changes:")
             if new_files:
                 print(f"  {Colors.GREEN}✨ New: {len(new_files)}{Colors.END}")
             if modified_files:
                 print(f"  {Colors.YELLOW}📝 Modified: {len(modified_files)}{Colors.END}")
+            if snapshot.renamed:
+                print(f"  {Colors.YELLOW}🔀 Renamed: {len(snapshot.renamed)}{Colors.END}")
             if deleted_files:
                 print(f"  {Colors.RED}🗑️  Deleted: {len(deleted_files)}{Colors.END}")
             
@@ -739,11 +1439,11 @@ secrets/
                     self.print_warning("Repository creation failed, but will try to push anyway...")
             
             # Push
-            if not self.push_to_github():
+            if not self.push_to_remotes():
                 return False
             
-            # Show labels
-            self.create_github_labels()
+            # Provision labels, topics and description (or show them without a token)
+            self.create_github_labels(username, self.config.get('github', {}).get('token'))
             
             # Show next steps
             self.show_next_steps()
@@ -757,6 +1457,11 @@ secrets/
         except Exception as e:
             self.print_error(f"Unexpected error: {str(e)}")
             return False
+        finally:
+            if self.api is not None:
+                self.print_info(f"GitHub API: {self.api.summary()}")
+                self.api.close()
+                self.api = None
 
 
 def main():
@@ -775,7 +1480,13 @@ Examples:
   
   OR (if config.yaml is configured):
   python github_sync.py                        # Uses username from config
-        """
+  
+  Provision labels, topics and description only (token required):
+  python github_sync.py --provision                            # This repository
+  python github_sync.py --provision team/fork-a team/fork-b    # Any number of forks
+  python github_sync.py --provision @forks.txt --workers 16    # One owner/name per line
+        """,
+        fromfile_prefix_chars='@'
     )
     
     parser.add_argument(
@@ -792,6 +1503,27 @@ Examples:
         help="Manually enter commit message instead of auto-generating"
     )
     
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Run remote setup, API calls and push even when nothing changed since the last sync"
+    )
+    
+    parser.add_argument(
+        "--provision",
+        nargs='*',
+        metavar="OWNER/REPO",
+        default=None,
+        help="Only provision labels, topics and description (default: this repository)"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Concurrent API calls when provisioning (default: 8)"
+    )
+    
     args = parser.parse_args()
     
     manager = GitHubManager()
@@ -811,11 +1543,27 @@ Examples:
         print(f"    token: YOUR_TOKEN")
         sys.exit(1)
     
+    if args.provision is not None:
+        token = manager.config.get('github', {}).get('token')
+        if not token:
+            print(f"{Colors.RED}✗ Provisioning needs github.token in config.yaml{Colors.END}")
+            sys.exit(1)
+        repos = args.provision or [f"{username}/{manager.repo_name}"]
+        try:
+            ok = manager.provision_repositories(repos, token, workers=args.workers)
+        finally:
+            manager.api.close()
+        if ok:
+            print(f"\n{Colors.GREEN}{Colors.BOLD}🎉 Provisioning completed successfully!{Colors.END}\n")
+            sys.exit(0)
+        print(f"\n{Colors.RED}{Colors.BOLD}❌ Provisioning failed{Colors.END}\n")
+        sys.exit(1)
+    
     manager.print_header("GITHUB REPOSITORY SYNC")
     manager.print_info(f"Repository: {manager.repo_name}")
     manager.print_info(f"Username: {username}")
     
-    if manager.sync_to_github(username, auto_commit=not args.manual):
+    if manager.sync_to_github(username, auto_commit=not args.manual, full=args.full):
         print(f"\n{Colors.GREEN}{Colors.BOLD}🎉 Successfully synced to GitHub!{Colors.END}\n")
         sys.exit(0)
     else:
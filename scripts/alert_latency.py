@@ -0,0 +1,680 @@
+"""
+Alert Pipeline Latency Harness
+Injects faults (target down, error-rate or latency spike) into a local stub
+exporter scraped by Prometheus, records Alertmanager webhook deliveries and
+reports time-to-pending, time-to-firing and time-to-notify for every alert
+"""
+
+import asyncio
+import json
+import math
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import promql
+import yaml_lite
+from alert_replay import (PROMETHEUS_DIR, STALE, AlertReplay, Evaluator, SeriesStore, labels_key,
+                          load_rule_groups, selector_labels)
+from async_http import HTTPClient, HTTPServer, Request, Response
+from prom_metrics import CONTENT_TYPE, Registry
+from target_registry import atomic_write
+
+
+class Colors:
+    """ANSI color codes for terminal output"""
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    END = '\033[0m'
+    BOLD = '\033[1m'
+
+
+ALERTMANAGER_CONFIG = Path(__file__).parent.parent / 'alertmanager' / 'config.yml'
+
+FAULTS = ('down', 'errors', 'latency')
+
+# Request latency mix as (seconds, share); the slow mix puts p95 near 4.8s
+LATENCY_PROFILES = {
+    False: ((0.02, 0.70), (0.08, 0.25), (0.4, 0.04), (1.5, 0.01)),
+    True: ((0.4, 0.05), (1.5, 0.15), (4.0, 0.80)),
+}
+
+
+def format_span(seconds: Optional[float]) -> str:
+    """Seconds as 4m35s (or - when unknown)"""
+    if seconds is None:
+        return '-'
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    return f"{seconds // 60}m{seconds % 60:02d}s"
+
+
+def parse_rfc3339(value: str) -> float:
+    """RFC3339 timestamp (nanosecond precision allowed) to unix seconds"""
+    value = value.replace('Z', '+00:00')
+    if '.' in value:
+        head, rest = value.split('.', 1)
+        digits = len(rest) - len(rest.lstrip('0123456789'))
+        value = f"{head}.{rest[:min(digits, 6)]:0<6}{rest[digits:]}"
+    return datetime.fromisoformat(value).timestamp()
+
+
+# ============================================================================
+# Stub exporter
+# ============================================================================
+
+class StubExporter:
+    """
+    Application-like exporter whose health is switched at runtime.
+
+    Requests are accounted from the clock at each scrape, so the counters
+    are the same whether it is scraped by Prometheus or by the simulator.
+    Faults: down (scrapes fail, up == 0), errors (error_ratio of requests
+    return 500) and latency (the slow latency mix).
+    """
+
+    def __init__(self, service: str, rps: float = 20.0, error_ratio: float = 0.5, now: float = 0.0):
+        self.service = service
+        self.rps = rps
+        self.error_ratio = error_ratio
+        self.fault: Optional[str] = None
+        self.scrapes = 0
+        self._last = now
+        self._carry = 0.0
+        self.registry = Registry()
+        self.requests = self.registry.counter('http_requests_total', 'HTTP requests by status code',
+                                              ['service', 'status'])
+        self.duration = self.registry.histogram('http_request_duration_seconds', 'HTTP request latency',
+                                                ['service'])
+        for status in ('200', '500'):
+            self.requests.inc(service, status, amount=0)
+        self.duration.observe(0.0, service, count=0)
+
+    def set_fault(self, fault: Optional[str], now: float):
+        """Account traffic up to now under the old state, then switch"""
+        if fault is not None and fault not in FAULTS:
+            raise ValueError(f"Unknown fault: {fault}")
+        self.advance(now)
+        self.fault = fault
+
+    def advance(self, now: float):
+        """Account the requests served since the last call"""
+        elapsed = max(now - self._last, 0.0)
+        self._last = now
+        if self.fault == 'down':
+            return
+        total = self._carry + self.rps * elapsed
+        count = int(total)
+        self._carry = total - count
+        errors = int(round(count * self.error_ratio)) if self.fault == 'errors' else 0
+        self.requests.inc(self.service, '200', amount=count - errors)
+        self.requests.inc(self.service, '500', amount=errors)
+        share = 0.0
+        assigned = 0
+        for latency, fraction in LATENCY_PROFILES[self.fault == 'latency']:
+            share += fraction
+            upto = int(round(count * share))
+            self.duration.observe(latency, self.service, count=upto - assigned)
+            assigned = upto
+
+    def scrape(self, now: float) -> Optional[bytes]:
+        """Exposition text, or None while the target is down"""
+        self.advance(now)
+        self.scrapes += 1
+        if self.fault == 'down':
+            return None
+        return self.registry.render()
+
+    async def handle(self, request: Request) -> Response:
+        if request.path == '/metrics':
+            body = self.scrape(time.time())
+            if body is None:
+                return Response(503, b'service unavailable\n', content_type='text/plain')
+            return Response(200, body, content_type=CONTENT_TYPE)
+        if request.path == '/fault':
+            # Manual control: /fault?set=down|errors|latency|none
+            wanted = request.arg('set')
+            if wanted is not None:
+                try:
+                    self.set_fault(None if wanted == 'none' else wanted, time.time())
+                except ValueError as e:
+                    return Response(400, f"{e}\n".encode('utf-8'), content_type='text/plain')
+            body = json.dumps({'service': self.service, 'fault': self.fault}).encode('utf-8')
+            return Response(200, body, content_type='application/json')
+        return Response(404, b'not found\n', content_type='text/plain')
+
+
+# ============================================================================
+# Webhook receiver
+# ============================================================================
+
+class Notification:
+    """One alert as delivered in an Alertmanager webhook"""
+
+    __slots__ = ('arrived', 'status', 'alertname', 'labels', 'group_key')
+
+    def __init__(self, arrived: float, status: str, labels: Dict[str, str], group_key: str):
+        self.arrived = arrived
+        self.status = status
+        self.alertname = labels.get('alertname', '')
+        self.labels = labels
+        self.group_key = group_key
+
+
+class WebhookReceiver:
+    """Records when each alert of each Alertmanager webhook arrives"""
+
+    def __init__(self):
+        self.notifications: List[Notification] = []
+        self.requests = 0
+
+    async def handle(self, request: Request) -> Response:
+        if request.method != 'POST':
+            return Response(405, b'method not allowed\n', content_type='text/plain')
+        arrived = time.time()
+        try:
+            payload = json.loads(request.body.decode('utf-8'))
+        except ValueError:
+            return Response(400, b'invalid JSON\n', content_type='text/plain')
+        self.requests += 1
+        for alert in payload.get('alerts', []):
+            self.notifications.append(Notification(arrived, alert.get('status', payload.get('status', '')),
+                                                   alert.get('labels', {}), payload.get('groupKey', '')))
+        return Response(200, b'ok\n', content_type='text/plain')
+
+    def first(self, alertname: str, status: str, since: float) -> Optional[float]:
+        """Arrival time of the first matching notification at or after since"""
+        for notification in self.notifications:
+            if (notification.arrived >= since and notification.status == status
+                    and notification.alertname == alertname):
+                return notification.arrived
+        return None
+
+
+# ============================================================================
+# Measurements and reporting
+# ============================================================================
+
+class Measurement:
+    """Pipeline timings of one alert in one trial, in seconds after the fault"""
+
+    def __init__(self, fault: str, trial: int, alert: str):
+        self.fault = fault
+        self.trial = trial
+        self.alert = alert
+        self.pending: Optional[float] = None
+        self.firing: Optional[float] = None
+        self.notified: Optional[float] = None
+        # Seconds after the fault was cleared
+        self.resolved: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            'fault': self.fault,
+            'trial': self.trial,
+            'alert': self.alert,
+            'pending': self.pending,
+            'firing': self.firing,
+            'notified': self.notified,
+            'resolved': self.resolved,
+        }
+
+
+def _stages(measurement: Measurement) -> List[Optional[float]]:
+    """Detection, hold and delivery durations"""
+    m = measurement
+    hold = m.firing - m.pending if m.firing is not None and m.pending is not None else None
+    delivery = m.notified - m.firing if m.notified is not None and m.firing is not None else None
+    return [m.pending, hold, delivery, m.notified]
+
+
+def print_trials(measurements: List[Measurement]):
+    print(f"\n{Colors.HEADER}{Colors.BOLD}Alert timings (after fault injection){Colors.END}")
+    if not measurements:
+        print(f"  {Colors.YELLOW}⚠ No alert became active{Colors.END}")
+        return
+    print(f"  {'Fault':<8} {'#':>3} {'Alert':<28} {'Pending':>8} {'Firing':>8} {'Notified':>9} {'Resolved':>9}")
+    for m in measurements:
+        color = Colors.GREEN if m.notified is not None else Colors.YELLOW
+        print(f"  {m.fault:<8} {m.trial:>3} {color}{m.alert:<28}{Colors.END} {format_span(m.pending):>8} "
+              f"{format_span(m.firing):>8} {format_span(m.notified):>9} {format_span(m.resolved):>9}")
+
+
+def print_summary(measurements: List[Measurement]):
+    """Per alert percentiles of each pipeline stage"""
+    groups: Dict[Tuple[str, str], List[Measurement]] = {}
+    for m in measurements:
+        groups.setdefault((m.fault, m.alert), []).append(m)
+    if not groups:
+        return
+    print(f"\n{Colors.HEADER}{Colors.BOLD}Pipeline stages (p50 / p95 / max){Colors.END}")
+    print(f"  Detection = fault to pending (scrape + evaluation interval), hold = for:,")
+    print(f"  delivery = firing to webhook (group_wait / group_interval)")
+    print(f"  {'Fault':<8} {'Alert':<28} {'n':>4}  {'Detection':<24} {'Hold':<24} {'Delivery':<24} Total")
+    for (fault, alert), items in sorted(groups.items()):
+        cells = []
+        for stage in zip(*[_stages(m) for m in items]):
+            values = sorted(v for v in stage if v is not None)
+            if not values:
+                cells.append('-')
+                continue
+            p95 = values[min(len(values) - 1, int(math.ceil(0.95 * len(values))) - 1)]
+            cells.append(f"{format_span(statistics.median(values))} / {format_span(p95)} / "
+                         f"{format_span(values[-1])}")
+        print(f"  {fault:<8} {alert:<28} {len(items):>4}  {cells[0]:<24} {cells[1]:<24} {cells[2]:<24} "
+              f"{cells[3]}")
+
+
+# ============================================================================
+# Live harness
+# ============================================================================
+
+class LatencyHarness:
+    """Drives faults through the running Prometheus and Alertmanager"""
+
+    def __init__(self, prometheus_url: str, exporter: StubExporter, receiver: WebhookReceiver,
+                 job: str, poll: float = 1.0, timeout: float = 1200.0):
+        self.prometheus = HTTPClient(prometheus_url, max_connections=2, timeout=10.0)
+        self.exporter = exporter
+        self.receiver = receiver
+        self.job = job
+        self.poll = poll
+        self.timeout = timeout
+        self.holds: Dict[str, Tuple[float, float]] = {}
+
+    async def api(self, path: str) -> Dict:
+        status, _, body = await self.prometheus.request('GET', path)
+        if status != 200:
+            raise RuntimeError(f"Prometheus returned HTTP {status} for {path.split('?')[0]}")
+        return json.loads(body.decode('utf-8'))['data']
+
+    async def load_rules(self):
+        """for: duration and group interval of every alerting rule"""
+        data = await self.api('/api/v1/rules?type=alert')
+        for group in data.get('groups', []):
+            for rule in group.get('rules', []):
+                self.holds[rule['name']] = (float(rule.get('duration', 0)), float(group.get('interval', 15)))
+
+    async def target_up(self) -> bool:
+        query = f'up{{job="{self.job}",service="{self.exporter.service}"}}'
+        data = await self.api('/api/v1/query?' + urlencode({'query': query}))
+        return any(sample['value'][1] == '1' for sample in data.get('result', []))
+
+    async def alerts(self) -> List[Dict]:
+        data = await self.api('/api/v1/alerts')
+        return [alert for alert in data.get('alerts', [])
+                if alert.get('labels', {}).get('service') == self.exporter.service]
+
+    async def wait_until_up(self, warmup: float):
+        print(f"{Colors.CYAN}ℹ Waiting for Prometheus to scrape the stub exporter...{Colors.END}")
+        deadline = time.time() + self.timeout
+        while not await self.target_up():
+            if time.time() > deadline:
+                raise RuntimeError("The stub exporter was never scraped - is the file_sd target reachable?")
+            await asyncio.sleep(self.poll)
+        print(f"{Colors.GREEN}✓ Target is up; collecting {format_span(warmup)} of healthy data{Colors.END}")
+        await asyncio.sleep(warmup)
+
+    async def wait_quiet(self):
+        """Wait until no alert of the stub service is pending or firing"""
+        deadline = time.time() + self.timeout
+        while await self.alerts():
+            if time.time() > deadline:
+                raise RuntimeError("Alerts for the stub service did not clear")
+            await asyncio.sleep(self.poll)
+
+    async def trial(self, fault: str, number: int) -> List[Measurement]:
+        """Inject one fault, follow its alerts to notification, then recover"""
+        await self.wait_quiet()
+        injected = time.time()
+        self.exporter.set_fault(fault, injected)
+        print(f"{Colors.BLUE}→ Trial {number}: injected '{fault}'{Colors.END}")
+        found: Dict[str, Measurement] = {}
+
+        deadline = injected + self.timeout
+        while time.time() < deadline:
+            now = time.time()
+            for alert in await self.alerts():
+                name = alert['labels'].get('alertname', '')
+                m = found.get(name)
+                if m is None:
+                    m = found[name] = Measurement(fault, number, name)
+                    m.pending = parse_rfc3339(alert['activeAt']) - injected
+                    print(f"  {Colors.YELLOW}… {name} pending after {format_span(m.pending)}{Colors.END}")
+                if alert['state'] == 'firing' and m.firing is None:
+                    # Rules fire on the first evaluation at least for: after activeAt
+                    hold, interval = self.holds.get(name, (0.0, 0.0))
+                    steps = math.ceil(hold / interval) if interval else 0
+                    m.firing = min(m.pending + steps * interval, now - injected)
+            for m in found.values():
+                if m.notified is None:
+                    arrived = self.receiver.first(m.alert, 'firing', injected)
+                    if arrived is not None:
+                        m.notified = arrived - injected
+                        print(f"  {Colors.GREEN}✓ {m.alert} notified after {format_span(m.notified)}{Colors.END}")
+            if found and all(m.notified is not None for m in found.values()):
+                break
+            await asyncio.sleep(self.poll)
+        else:
+            print(f"  {Colors.YELLOW}⚠ Timed out after {format_span(self.timeout)}{Colors.END}")
+
+        cleared = time.time()
+        self.exporter.set_fault(None, cleared)
+        while time.time() < cleared + self.timeout:
+            for m in found.values():
+                if m.notified is not None and m.resolved is None:
+                    arrived = self.receiver.first(m.alert, 'resolved', cleared)
+                    if arrived is not None:
+                        m.resolved = arrived - cleared
+            if all(m.resolved is not None for m in found.values() if m.notified is not None):
+                break
+            await asyncio.sleep(self.poll)
+        return list(found.values())
+
+    async def close(self):
+        await self.prometheus.close()
+
+
+async def run_live(args, faults: List[str]) -> List[Measurement]:
+    """Serve the stub and webhook, register the target and run every trial"""
+    exporter = StubExporter(args.service, args.rps, args.error_ratio, time.time())
+    receiver = WebhookReceiver()
+    exporter_server = HTTPServer(exporter.handle, args.listen, args.exporter_port)
+    webhook_server = HTTPServer(receiver.handle, args.listen, args.webhook_port)
+    await exporter_server.start()
+    await webhook_server.start()
+    print(f"{Colors.GREEN}✓ Stub exporter on :{exporter_server.port}, webhook receiver on "
+          f":{webhook_server.port}{Colors.END}")
+
+    target_file = Path(args.targets_dir) / f"_{args.job}.json"
+    entry = [{'targets': [f"{args.advertise}:{exporter_server.port}"],
+              'labels': {'job': args.job, 'service': args.service}}]
+    target_file.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write(target_file, json.dumps(entry, indent=2, sort_keys=True) + '\n')
+    print(f"{Colors.GREEN}✓ Registered {entry[0]['targets'][0]} in {target_file}{Colors.END}")
+
+    harness = LatencyHarness(args.prometheus, exporter, receiver, args.job,
+                             promql.parse_duration(args.poll), promql.parse_duration(args.timeout))
+    measurements = []
+    try:
+        await harness.load_rules()
+        await harness.wait_until_up(promql.parse_duration(args.warmup))
+        for number in range(1, args.trials + 1):
+            for fault in faults:
+                measurements.extend(await harness.trial(fault, number))
+    finally:
+        try:
+            target_file.unlink()
+        except OSError:
+            pass
+        await harness.close()
+        await exporter_server.close()
+        await webhook_server.close()
+    if not receiver.requests:
+        print(f"{Colors.YELLOW}⚠ No webhook arrived - does alertmanager/config.yml route "
+              f"service=\"{args.service}\" to this receiver?{Colors.END}")
+    return measurements
+
+
+# ============================================================================
+# Simulation
+# ============================================================================
+
+class GroupingModel:
+    """Alertmanager aggregation groups: first flush after group_wait, then every group_interval"""
+
+    def __init__(self, group_by: List[str], group_wait: float, group_interval: float):
+        self.group_by = group_by
+        self.group_wait = group_wait
+        self.group_interval = group_interval
+        self.flushes: Dict[Tuple, float] = {}
+
+    def notify_at(self, labels: Dict[str, str], received: float) -> float:
+        """When a newly firing alert received at the given time is sent out"""
+        key = tuple(labels.get(name, '') for name in self.group_by)
+        first = self.flushes.get(key)
+        if first is None:
+            first = self.flushes[key] = received + self.group_wait
+        if received <= first:
+            return first
+        return first + math.ceil((received - first) / self.group_interval) * self.group_interval
+
+
+class PipelineSimulator:
+    """
+    Runs the pipeline with the real rule files on simulated time.
+
+    Each trial scrapes the stub exporter into an in-memory store with a
+    random scrape phase, replays the rules with random group phases and
+    passes firing alerts through the Alertmanager grouping timers.
+    """
+
+    def __init__(self, args, scrape_interval: float, default_interval: float,
+                 group_by: List[str], group_wait: float, group_interval: float):
+        self.args = args
+        self.scrape_interval = scrape_interval
+        self.default_interval = default_interval
+        self.group_by = group_by
+        self.group_wait = group_wait
+        self.group_interval = group_interval
+        self.interval_override = (promql.parse_duration(args.evaluation_interval)
+                                  if args.evaluation_interval else None)
+        self.rule_paths = [p for p in (PROMETHEUS_DIR / 'recording-rules', PROMETHEUS_DIR / 'alerts')
+                           if p.exists()]
+        self.target = {'job': args.job, 'instance': f"{args.advertise}:{args.exporter_port}",
+                       'service': args.service}
+        self._parsed: Dict[str, Tuple] = {}
+        self.evaluations = 0
+
+    def _series(self, selector: str) -> Tuple:
+        """Scraped series with target labels attached (honor_labels: false)"""
+        key = self._parsed.get(selector)
+        if key is None:
+            labels = selector_labels(selector)
+            for name, value in self.target.items():
+                if name in labels:
+                    labels['exported_' + name] = labels[name]
+                labels[name] = value
+            key = self._parsed[selector] = labels_key(labels)
+        return key
+
+    def scrape(self, store: SeriesStore, exporter: StubExporter, t: float, seen: set):
+        body = exporter.scrape(t)
+        store.append(labels_key(dict(self.target, __name__='up')), t, 0.0 if body is None else 1.0)
+        if body is None:
+            # A failed scrape marks everything the target exposed as stale
+            for key in seen:
+                store.append(key, t, STALE)
+            seen.clear()
+            return
+        for line in body.decode('utf-8').splitlines():
+            if not line or line.startswith('#'):
+                continue
+            selector, value = line.rsplit(' ', 1)
+            key = self._series(selector)
+            seen.add(key)
+            store.append(key, t, float(value))
+
+    def trial(self, fault: str, number: int, rng: random.Random) -> List[Measurement]:
+        warmup = promql.parse_duration(self.args.warmup)
+        horizon = promql.parse_duration(self.args.timeout)
+        injected = warmup
+        end = injected + horizon
+
+        store = SeriesStore()
+        exporter = StubExporter(self.args.service, self.args.rps, self.args.error_ratio, 0.0)
+        seen: set = set()
+        t = rng.uniform(0, self.scrape_interval)
+        while t <= end:
+            if exporter.fault is None and t >= injected:
+                exporter.set_fault(fault, injected)
+            self.scrape(store, exporter, t, seen)
+            t += self.scrape_interval
+
+        groups = load_rule_groups(self.rule_paths, Evaluator(store), self.default_interval)
+        if self.interval_override:
+            for group in groups:
+                group.interval = self.interval_override
+        replay = AlertReplay(store, groups)
+        first = injected - max(g.interval for g in groups)
+        replay.run(first, end, [rng.uniform(0, g.interval) for g in groups])
+        self.evaluations += replay.evaluations
+
+        grouping = GroupingModel(self.group_by, self.group_wait, self.group_interval)
+        found: Dict[str, Measurement] = {}
+        events = sorted((e for e in replay.events if dict(e.labels).get('service') == self.args.service
+                         and e.pending_at >= injected), key=lambda e: e.pending_at)
+        for event in events:
+            if event.alert in found:
+                continue
+            m = found[event.alert] = Measurement(fault, number, event.alert)
+            m.pending = event.pending_at - injected
+            if event.firing_at is not None:
+                m.firing = event.firing_at - injected
+                # Prometheus sends firing alerts right after the evaluation
+                m.notified = grouping.notify_at(dict(event.labels), event.firing_at) - injected
+        return list(found.values())
+
+
+def load_alertmanager_route(path: Path) -> Tuple[List[str], float, float]:
+    """Root route group_by, group_wait and group_interval"""
+    route = (yaml_lite.load_file(path) or {}).get('route', {})
+    return ([str(name) for name in route.get('group_by', [])],
+            promql.parse_duration(str(route.get('group_wait', '30s'))),
+            promql.parse_duration(str(route.get('group_interval', '5m'))))
+
+
+def load_intervals(path: Path) -> Tuple[float, float]:
+    """Global scrape and evaluation intervals from prometheus.yml"""
+    config = (yaml_lite.load_file(path) or {}).get('global', {})
+    return (promql.parse_duration(str(config.get('scrape_interval', '1m'))),
+            promql.parse_duration(str(config.get('evaluation_interval', '1m'))))
+
+
+def run_simulation(args, faults: List[str]) -> List[Measurement]:
+    scrape_interval, evaluation_interval = load_intervals(PROMETHEUS_DIR / 'prometheus.yml')
+    group_by, group_wait, group_interval = load_alertmanager_route(ALERTMANAGER_CONFIG)
+    if args.scrape_interval:
+        scrape_interval = promql.parse_duration(args.scrape_interval)
+    if args.group_wait:
+        group_wait = promql.parse_duration(args.group_wait)
+    if args.group_interval:
+        group_interval = promql.parse_duration(args.group_interval)
+
+    eval_text = args.evaluation_interval or f"rule files (default {format_span(evaluation_interval)})"
+    print(f"{Colors.CYAN}ℹ scrape {format_span(scrape_interval)}, evaluation {eval_text}, "
+          f"group_by {group_by}, group_wait {format_span(group_wait)}, "
+          f"group_interval {format_span(group_interval)}{Colors.END}")
+
+    simulator = PipelineSimulator(args, scrape_interval, evaluation_interval, group_by, group_wait, group_interval)
+    rng = random.Random(args.seed)
+    measurements = []
+    started = time.time()
+    for fault in faults:
+        for number in range(1, args.trials + 1):
+            measurements.extend(simulator.trial(fault, number, rng))
+    elapsed = time.time() - started
+    simulated = len(faults) * args.trials * (promql.parse_duration(args.timeout) +
+                                                  promql.parse_duration(args.warmup))
+    print(f"{Colors.GREEN}✓ Simulated {len(faults) * args.trials} trial(s) ({simulator.evaluations:,} rule "
+          f"evaluations) in {elapsed:.2f}s - {simulated / max(elapsed, 1e-9):,.0f}x real time{Colors.END}")
+    return measurements
+
+
+def main():
+    """Main entry point for the alert latency harness"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Measure fault-to-notification latency through Prometheus and Alertmanager",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python alert_latency.py
+  python alert_latency.py --faults down,errors,latency --trials 3 -o latency.json
+  python alert_latency.py --simulate --trials 200
+  python alert_latency.py --simulate --group-wait 30s --scrape-interval 30s
+
+The live run serves a stub exporter and a webhook receiver on this host,
+registers the exporter as prometheus/targets/_<job>.json (picked up by the
+docker-targets file_sd job) and expects alertmanager/config.yml to route
+service="alert-latency" to http://host.docker.internal:9497/.
+
+--simulate replays the real rule files and Alertmanager timers on simulated
+time with random scrape/evaluation phases; the interval and group options
+override the configured values to try out changes before deploying them.
+        """
+    )
+
+    parser.add_argument("--prometheus", default="http://localhost:9090", help="Prometheus URL")
+    parser.add_argument("--faults", default="down,errors",
+                        help=f"Comma-separated faults to inject ({', '.join(FAULTS)})")
+    parser.add_argument("--trials", type=int, help="Trials per fault (default: 1 live, 100 simulated)")
+    parser.add_argument("--service", default="alert-latency", help="service label of the stub exporter")
+    parser.add_argument("--job", default="alert-latency", help="job label of the stub exporter")
+    parser.add_argument("--rps", type=float, default=20.0, help="Simulated requests per second")
+    parser.add_argument("--error-ratio", type=float, default=0.5, help="Share of 500s during the errors fault")
+    parser.add_argument("--listen", default="0.0.0.0", help="Listen address for the exporter and receiver")
+    parser.add_argument("--exporter-port", type=int, default=9496, help="Stub exporter port")
+    parser.add_argument("--webhook-port", type=int, default=9497, help="Webhook receiver port")
+    parser.add_argument("--advertise", default="host.docker.internal",
+                        help="Host name Prometheus uses to reach this machine")
+    parser.add_argument("--targets-dir", default=str(PROMETHEUS_DIR / 'targets'), help="file_sd directory")
+    parser.add_argument("--warmup", default="6m", help="Healthy data before the first fault")
+    parser.add_argument("--timeout", default="20m", help="Give up on an alert (or recovery) after this long")
+    parser.add_argument("--poll", default="1s", help="Prometheus alert polling interval")
+    parser.add_argument("--simulate", action="store_true", help="Simulate the pipeline offline")
+    parser.add_argument("--scrape-interval", help="Override the scrape interval (--simulate)")
+    parser.add_argument("--evaluation-interval", help="Override every rule group interval (--simulate)")
+    parser.add_argument("--group-wait", help="Override Alertmanager group_wait (--simulate)")
+    parser.add_argument("--group-interval", help="Override Alertmanager group_interval (--simulate)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for --simulate")
+    parser.add_argument("-o", "--output", help="Write the measurements as JSON")
+
+    args = parser.parse_args()
+
+    faults = [f.strip() for f in args.faults.split(',') if f.strip()]
+    unknown = [f for f in faults if f not in FAULTS]
+    if unknown or not faults:
+        parser.error(f"--faults must list some of: {', '.join(FAULTS)}")
+    if args.trials is None:
+        args.trials = 100 if args.simulate else 1
+
+    print(f"{Colors.HEADER}{Colors.BOLD}Alert Pipeline Latency{Colors.END}")
+    try:
+        if args.simulate:
+            measurements = run_simulation(args, faults)
+        else:
+            measurements = asyncio.run(run_live(args, faults))
+    except KeyboardInterrupt:
+        print(f"\n{Colors.YELLOW}⚠ Stopped{Colors.END}")
+        sys.exit(130)
+    except (OSError, asyncio.TimeoutError, RuntimeError, ValueError, KeyError) as e:
+        print(f"{Colors.RED}✗ {e}{Colors.END}")
+        sys.exit(1)
+
+    if args.trials <= 3:
+        print_trials(measurements)
+    print_summary(measurements)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump([m.to_dict() for m in measurements], f, indent=2)
+        print(f"\n{Colors.GREEN}✓ Measurements written to {args.output}{Colors.END}")
+
+    print(f"\n{Colors.GREEN}{Colors.BOLD}🎉 Alert latency run completed successfully!{Colors.END}\n")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
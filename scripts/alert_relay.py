@@ -0,0 +1,838 @@
+"""
+Batching Alertmanager Webhook Relay
+Asyncio webhook receiver for Alertmanager that spools alerts to SQLite, drops
+repeated notifications, coalesces bursts into digest messages and fans them out
+to chat/paging webhooks with per-sink concurrency limits and persistent retries
+"""
+
+import asyncio
+import hashlib
+import heapq
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import promql
+from async_http import HTTPClient, HTTPServer, Request, Response
+from prom_metrics import CONTENT_TYPE, Registry
+
+
+class Colors:
+    """ANSI color codes for terminal output"""
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    END = '\033[0m'
+    BOLD = '\033[1m'
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY,
+    received REAL NOT NULL,
+    group_key TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    status TEXT NOT NULL,
+    starts_at TEXT NOT NULL,
+    receiver TEXT NOT NULL,
+    alert TEXT NOT NULL,
+    digest_id INTEGER,
+    UNIQUE (group_key, fingerprint, status, starts_at)
+);
+CREATE INDEX IF NOT EXISTS alerts_undigested ON alerts (id) WHERE digest_id IS NULL;
+CREATE TABLE IF NOT EXISTS digests (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    body BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS deliveries (
+    digest_id INTEGER NOT NULL,
+    sink TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    PRIMARY KEY (digest_id, sink)
+);
+CREATE INDEX IF NOT EXISTS deliveries_pending ON deliveries (sink) WHERE state = 'pending';
+"""
+
+# Sink responses worth retrying; anything else 4xx is a permanent rejection
+RETRYABLE_STATUS = {0, 408, 425, 429, 500, 502, 503, 504}
+
+
+def fingerprint(labels: Dict[str, str]) -> str:
+    """Stable label-set hash for senders that do not include Alertmanager's fingerprint"""
+    text = '\xff'.join(f"{k}\xfe{v}" for k, v in sorted(labels.items()))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+# ============================================================================
+# Spool
+# ============================================================================
+
+class Spool:
+    """
+    SQLite spool owned by a single worker thread.
+
+    Alerts are written in group commits (one transaction per batch of
+    webhooks) and acknowledged to Alertmanager only after the commit, so an
+    accepted alert survives a crash or restart. The UNIQUE constraint on
+    (group key, fingerprint, status, startsAt) drops the repeats Alertmanager
+    sends every group_interval/repeat_interval.
+    """
+
+    def __init__(self, path: str, synchronous: str = 'FULL'):
+        self.path = path
+        self.synchronous = synchronous
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='spool')
+        self._db: Optional[sqlite3.Connection] = None
+
+    async def call(self, fn, *args):
+        """Run a spool method on the spool thread"""
+        return await asyncio.get_event_loop().run_in_executor(self._executor, fn, *args)
+
+    def open(self):
+        self._db = sqlite3.connect(self.path, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(f'PRAGMA synchronous={self.synchronous}')
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+    def commit(self, alerts: List[Tuple], outcomes: List[Tuple]) -> Tuple[List[int], int]:
+        """
+        Store webhook alerts and delivery outcomes in one transaction.
+
+        Args:
+            alerts: Per webhook, a list of alert rows
+            outcomes: (state, attempts, next_attempt, digest_id, sink) updates
+
+        Returns:
+            (alerts accepted per webhook, total duplicates)
+        """
+        db = self._db
+        accepted = []
+        duplicates = 0
+        db.execute('BEGIN')
+        try:
+            for rows in alerts:
+                cursor = db.executemany(
+                    'INSERT OR IGNORE INTO alerts (received, group_key, fingerprint, status, starts_at, '
+                    'receiver, alert) VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+                accepted.append(cursor.rowcount)
+                duplicates += len(rows) - cursor.rowcount
+            if outcomes:
+                db.executemany('UPDATE deliveries SET state = ?, attempts = ?, next_attempt = ? '
+                               'WHERE digest_id = ? AND sink = ?', outcomes)
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        return accepted, duplicates
+
+    def take_digest(self, limit: int, sinks: List[str]) -> Optional[Tuple[int, int, bytes]]:
+        """Turn up to limit undigested alerts into a digest queued for every sink"""
+        db = self._db
+        rows = db.execute('SELECT id, received, group_key, receiver, alert FROM alerts '
+                          'WHERE digest_id IS NULL ORDER BY id LIMIT ?', (limit,)).fetchall()
+        if not rows:
+            return None
+        now = time.time()
+        db.execute('BEGIN')
+        try:
+            cursor = db.execute('INSERT INTO digests (created, body) VALUES (?, ?)', (now, b''))
+            digest_id = cursor.lastrowid
+            body = build_digest(digest_id, now, rows)
+            db.execute('UPDATE digests SET body = ? WHERE id = ?', (body, digest_id))
+            db.execute('UPDATE alerts SET digest_id = ? WHERE digest_id IS NULL AND id BETWEEN ? AND ?',
+                       (digest_id, rows[0][0], rows[-1][0]))
+            db.executemany('INSERT INTO deliveries (digest_id, sink, next_attempt) VALUES (?, ?, ?)',
+                           [(digest_id, sink, now) for sink in sinks])
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        return digest_id, len(rows), body
+
+    def body(self, digest_id: int) -> bytes:
+        row = self._db.execute('SELECT body FROM digests WHERE id = ?', (digest_id,)).fetchone()
+        return bytes(row[0]) if row else b''
+
+    def pending_deliveries(self) -> List[Tuple[int, str, int, float]]:
+        return self._db.execute('SELECT digest_id, sink, attempts, next_attempt FROM deliveries '
+                                'WHERE state = ? ORDER BY next_attempt', ('pending',)).fetchall()
+
+    def undigested(self) -> int:
+        return self._db.execute('SELECT count(*) FROM alerts WHERE digest_id IS NULL').fetchone()[0]
+
+    def prune(self, before: float) -> int:
+        """Forget delivered digests and their alerts older than before; returns alerts removed"""
+        db = self._db
+        db.execute('BEGIN')
+        try:
+            db.execute("DELETE FROM digests WHERE created < ? AND id NOT IN "
+                       "(SELECT digest_id FROM deliveries WHERE state = 'pending')", (before,))
+            db.execute('DELETE FROM deliveries WHERE digest_id NOT IN (SELECT id FROM digests)')
+            removed = db.execute('DELETE FROM alerts WHERE digest_id IS NOT NULL AND digest_id NOT IN '
+                                 '(SELECT id FROM digests)').rowcount
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        return removed
+
+
+def build_digest(digest_id: int, created: float, rows: List[Tuple]) -> bytes:
+    """
+    Render spooled alerts as one digest message.
+
+    Alerts are grouped by Alertmanager group key; an alert seen more than
+    once in the window keeps its latest state and is marked as flapping
+    when its status changed.
+    """
+    groups: Dict[str, Dict] = OrderedDict()
+    for _, received, group_key, receiver, alert_json in rows:
+        alert = json.loads(alert_json)
+        group = groups.get(group_key)
+        if group is None:
+            group = groups[group_key] = {'groupKey': group_key, 'receiver': receiver, 'alerts': OrderedDict()}
+        fp = alert.get('fingerprint') or fingerprint(alert.get('labels', {}))
+        previous = group['alerts'].get(fp)
+        if previous is not None and previous.get('status') != alert.get('status'):
+            alert['flapped'] = True
+        group['alerts'][fp] = alert
+
+    counts = {'firing': {}, 'resolved': {}}
+    for group in groups.values():
+        for alert in group['alerts'].values():
+            labels = alert.get('labels', {})
+            name = f"{labels.get('alertname', '?')} ({labels.get('severity', 'none')})"
+            bucket = counts['resolved' if alert.get('status') == 'resolved' else 'firing']
+            bucket[name] = bucket.get(name, 0) + 1
+    parts = []
+    for status in ('firing', 'resolved'):
+        if counts[status]:
+            top = sorted(counts[status].items(), key=lambda item: (-item[1], item[0]))
+            shown = ', '.join(f"{name} ×{count}" for name, count in top[:5])
+            more = f" and {len(top) - 5} more" if len(top) > 5 else ''
+            parts.append(f"{sum(counts[status].values())} {status}: {shown}{more}")
+
+    return json.dumps({
+        'digest': digest_id,
+        'created': created,
+        'window': [rows[0][1], rows[-1][1]],
+        'firing': sum(counts['firing'].values()),
+        'resolved': sum(counts['resolved'].values()),
+        'text': '; '.join(parts),
+        'groups': [dict(group, alerts=list(group['alerts'].values())) for group in groups.values()],
+    }).encode('utf-8')
+
+
+# ============================================================================
+# Relay
+# ============================================================================
+
+class Sink:
+    """A downstream webhook with its own worker pool and retry schedule"""
+
+    def __init__(self, name: str, url: str, concurrency: int = 4, timeout: float = 10.0):
+        parsed = urlparse(url)
+        if parsed.scheme != 'http' or not parsed.hostname:
+            raise ValueError(f"Sink {name}: only http:// URLs are supported ({url})")
+        self.name = name
+        self.url = url
+        self.path = parsed.path or '/'
+        if parsed.query:
+            self.path += '?' + parsed.query
+        self.concurrency = concurrency
+        self.client = HTTPClient(f"http://{parsed.netloc}", max_connections=concurrency, timeout=timeout)
+        self.in_flight = 0
+        self._schedule: List[Tuple[float, int, int]] = []
+        self._ready: Optional[asyncio.Queue] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def submit(self, digest_id: int, attempts: int, at: float):
+        heapq.heappush(self._schedule, (at, digest_id, attempts))
+        self._wake.set()
+
+    @property
+    def backlog(self) -> int:
+        return len(self._schedule) + (self._ready.qsize() if self._ready else 0) + self.in_flight
+
+
+def parse_sink(text: str, default_concurrency: int) -> Sink:
+    """NAME=URL[,concurrency=N]"""
+    name, sep, rest = text.partition('=')
+    if not sep or not name or not rest:
+        raise ValueError(f"Sink must look like NAME=URL[,concurrency=N]: {text}")
+    url, _, option = rest.partition(',concurrency=')
+    return Sink(name.strip(), url.strip(), int(option) if option else default_concurrency)
+
+
+class AlertRelay:
+    """
+    Alertmanager webhook endpoint in front of rate-limited sinks.
+
+    POST / accepts Alertmanager webhook payloads. Alerts are spooled, new
+    ones open a digest window, and when it closes everything received is
+    sent as digests of at most max_digest alerts to every sink. Failed
+    deliveries are retried with exponential backoff (honouring
+    Retry-After) and survive restarts. GET /metrics serves relay metrics.
+    """
+
+    def __init__(self, spool: Spool, sinks: List[Sink], host: str = '0.0.0.0', port: int = 9099,
+                 window: float = 10.0, max_digest: int = 500, max_attempts: int = 10,
+                 retry_base: float = 1.0, retry_max: float = 300.0, retention: float = 86400.0):
+        """
+        Initialize the relay.
+
+        Args:
+            spool: Spool (opened by start())
+            sinks: Downstream webhooks
+            host: Listen address
+            port: Listen port (0 picks a free port)
+            window: Seconds a digest window stays open after the first new alert
+            max_digest: Alerts per digest message
+            max_attempts: Delivery attempts before a digest is dead-lettered for a sink
+            retry_base: First retry delay in seconds, doubled per attempt
+            retry_max: Longest retry delay in seconds
+            retention: Seconds delivered alerts are remembered for deduplication
+        """
+        self.spool = spool
+        self.sinks = {sink.name: sink for sink in sinks}
+        self.server = HTTPServer(self.handle, host, port)
+        self.window = window
+        self.max_digest = max_digest
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.retention = retention
+        self._incoming: List[Tuple[List[Tuple], asyncio.Future]] = []
+        self._outcomes: List[Tuple] = []
+        self._commit_wake: Optional[asyncio.Event] = None
+        self._digest_wake: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._rng = random.Random()
+
+        self.registry = Registry()
+        self.m_webhooks = self.registry.counter('alert_relay_webhooks_total', 'Webhook requests', ['code'])
+        self.m_alerts = self.registry.counter('alert_relay_alerts_total', 'Alerts received', ['outcome'])
+        self.m_commits = self.registry.counter('alert_relay_spool_commits_total', 'Spool transactions')
+        self.m_digests = self.registry.counter('alert_relay_digests_total', 'Digest messages created')
+        self.m_digest_alerts = self.registry.counter('alert_relay_digest_alerts_total', 'Alerts put in digests')
+        self.m_deliveries = self.registry.counter('alert_relay_deliveries_total', 'Delivery attempts',
+                                                  ['sink', 'outcome'])
+        self.m_delay = self.registry.histogram('alert_relay_delivery_delay_seconds',
+                                               'Digest creation to successful delivery', ['sink'],
+                                               buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300))
+        self.m_backlog = self.registry.gauge('alert_relay_sink_backlog', 'Digests waiting per sink', ['sink'])
+        self.created: Dict[int, float] = {}
+
+    # -- intake ---------------------------------------------------------------
+
+    async def handle(self, request: Request) -> Response:
+        """Route one HTTP request"""
+        if request.method == 'POST' and request.path in ('/', '/alerts', '/api/v1/alerts'):
+            return await self._receive(request)
+        if request.path == '/metrics' and request.method == 'GET':
+            for sink in self.sinks.values():
+                self.m_backlog.set(sink.backlog, sink.name)
+            return Response(200, self.registry.render(), content_type=CONTENT_TYPE)
+        if request.path == '/-/healthy':
+            return Response(200, b'ok\n', content_type='text/plain')
+        return Response(404, b'not found\n', content_type='text/plain')
+
+    async def _receive(self, request: Request) -> Response:
+        try:
+            payload = json.loads(request.body.decode('utf-8'))
+            received = time.time()
+            group_key = str(payload.get('groupKey', ''))
+            receiver = str(payload.get('receiver', ''))
+            rows = []
+            for alert in payload.get('alerts', []):
+                labels = alert.get('labels', {})
+                rows.append((received, group_key, alert.get('fingerprint') or fingerprint(labels),
+                             alert.get('status', payload.get('status', 'firing')), alert.get('startsAt', ''),
+                             receiver, json.dumps(alert, separators=(',', ':'))))
+        except (ValueError, AttributeError, TypeError) as e:
+            self.m_webhooks.inc('400')
+            return Response(400, f"invalid webhook payload: {e}\n".encode('utf-8'), content_type='text/plain')
+
+        future = asyncio.get_event_loop().create_future()
+        self._incoming.append((rows, future))
+        self._commit_wake.set()
+        try:
+            accepted = await future
+        except sqlite3.Error as e:
+            # Alertmanager retries non-2xx responses, so nothing is lost
+            self.m_webhooks.inc('503')
+            return Response(503, f"spool unavailable: {e}\n".encode('utf-8'), content_type='text/plain')
+        self.m_webhooks.inc('200')
+        self.m_alerts.inc('accepted', amount=accepted)
+        self.m_alerts.inc('duplicate', amount=len(rows) - accepted)
+        body = json.dumps({'accepted': accepted, 'duplicates': len(rows) - accepted}).encode('utf-8')
+        return Response(200, body, content_type='application/json')
+
+    async def _commit_loop(self):
+        """Group commit: every webhook and delivery outcome waiting goes into one transaction"""
+        while True:
+            await self._commit_wake.wait()
+            self._commit_wake.clear()
+            incoming, self._incoming = self._incoming, []
+            outcomes, self._outcomes = self._outcomes, []
+            if not incoming and not outcomes:
+                continue
+            try:
+                accepted, _ = await self.spool.call(self.spool.commit, [rows for rows, _ in incoming], outcomes)
+            except sqlite3.Error as e:
+                for _, future in incoming:
+                    if not future.done():
+                        future.set_exception(e)
+                self._outcomes = outcomes + self._outcomes
+                print(f"{Colors.RED}✗ Spool write failed: {e}{Colors.END}")
+                await asyncio.sleep(1.0)
+                continue
+            self.m_commits.inc()
+            for (_, future), count in zip(incoming, accepted):
+                if not future.done():
+                    future.set_result(count)
+            if any(accepted):
+                self._digest_wake.set()
+
+    # -- digests --------------------------------------------------------------
+
+    async def _digest_loop(self):
+        """Close a digest window `window` seconds after new alerts arrive"""
+        sinks = list(self.sinks)
+        while True:
+            await self._digest_wake.wait()
+            await asyncio.sleep(self.window)
+            self._digest_wake.clear()
+            while True:
+                try:
+                    taken = await self.spool.call(self.spool.take_digest, self.max_digest, sinks)
+                except sqlite3.Error as e:
+                    print(f"{Colors.RED}✗ Digest creation failed: {e}{Colors.END}")
+                    self._digest_wake.set()
+                    break
+                if taken is None:
+                    break
+                digest_id, count, _ = taken
+                self.m_digests.inc()
+                self.m_digest_alerts.inc(amount=count)
+                now = time.time()
+                self.created[digest_id] = now
+                for sink in self.sinks.values():
+                    sink.submit(digest_id, 0, now)
+                if count < self.max_digest:
+                    break
+
+    # -- delivery -------------------------------------------------------------
+
+    async def _scheduler(self, sink: Sink):
+        """Move deliveries whose retry time has come to the sink's ready queue"""
+        while True:
+            now = time.time()
+            while sink._schedule and sink._schedule[0][0] <= now:
+                _, digest_id, attempts = heapq.heappop(sink._schedule)
+                sink._ready.put_nowait((digest_id, attempts))
+            sink._wake.clear()
+            timeout = sink._schedule[0][0] - now if sink._schedule else None
+            try:
+                await asyncio.wait_for(sink._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _retry_delay(self, attempts: int, headers: Dict[str, str]) -> float:
+        retry_after = headers.get('retry-after')
+        if retry_after:
+            try:
+                return min(max(float(retry_after), 0.0), self.retry_max)
+            except ValueError:
+                pass
+        delay = min(self.retry_base * 2 ** (attempts - 1), self.retry_max)
+        return delay * self._rng.uniform(0.5, 1.0)
+
+    async def _worker(self, sink: Sink):
+        while True:
+            digest_id, attempts = await sink._ready.get()
+            sink.in_flight += 1
+            try:
+                body = await self.spool.call(self.spool.body, digest_id)
+                try:
+                    status, headers, _ = await sink.client.request(
+                        'POST', sink.path, body, {'Content-Type': 'application/json',
+                                                  'Idempotency-Key': f"alert-relay-{digest_id}"})
+                except (OSError, asyncio.TimeoutError, ConnectionError):
+                    status, headers = 0, {}
+                attempts += 1
+                now = time.time()
+                if 200 <= status < 300:
+                    self.m_deliveries.inc(sink.name, 'ok')
+                    created = self.created.get(digest_id)
+                    if created is not None:
+                        self.m_delay.observe(now - created, sink.name)
+                    self._outcomes.append(('done', attempts, now, digest_id, sink.name))
+                elif status in RETRYABLE_STATUS and attempts < self.max_attempts:
+                    self.m_deliveries.inc(sink.name, 'retry')
+                    at = now + self._retry_delay(attempts, headers)
+                    self._outcomes.append(('pending', attempts, at, digest_id, sink.name))
+                    sink.submit(digest_id, attempts, at)
+                else:
+                    self.m_deliveries.inc(sink.name, 'dead')
+                    self._outcomes.append(('dead', attempts, now, digest_id, sink.name))
+                    print(f"{Colors.RED}✗ Digest {digest_id} dead-lettered for {sink.name} "
+                          f"(HTTP {status or 'error'} after {attempts} attempt(s)){Colors.END}")
+                self._commit_wake.set()
+            finally:
+                sink.in_flight -= 1
+
+    async def _prune_loop(self):
+        while True:
+            await asyncio.sleep(min(self.retention, 3600.0))
+            try:
+                await self.spool.call(self.spool.prune, time.time() - self.retention)
+            except sqlite3.Error as e:
+                print(f"{Colors.YELLOW}⚠ Spool pruning failed: {e}{Colors.END}")
+
+    # -- lifecycle ------------------------------------------------------------
+
+    async def start(self):
+        """Open the spool, requeue unfinished work and start listening"""
+        await self.spool.call(self.spool.open)
+        self._commit_wake = asyncio.Event()
+        self._digest_wake = asyncio.Event()
+        for sink in self.sinks.values():
+            sink._ready = asyncio.Queue()
+            sink._wake = asyncio.Event()
+
+        pending = await self.spool.call(self.spool.pending_deliveries)
+        orphaned = 0
+        for digest_id, name, attempts, at in pending:
+            if name in self.sinks:
+                self.sinks[name].submit(digest_id, attempts, at)
+            else:
+                orphaned += 1
+        undigested = await self.spool.call(self.spool.undigested)
+        if pending or undigested:
+            print(f"{Colors.CYAN}ℹ Recovered {len(pending) - orphaned} pending deliveries and "
+                  f"{undigested} undigested alert(s) from {self.spool.path}{Colors.END}")
+        if orphaned:
+            print(f"{Colors.YELLOW}⚠ {orphaned} pending deliveries belong to sinks that are no longer "
+                  f"configured{Colors.END}")
+        if undigested:
+            self._digest_wake.set()
+
+        loop = asyncio.get_event_loop()
+        self._tasks = [loop.create_task(self._commit_loop()), loop.create_task(self._digest_loop()),
+                       loop.create_task(self._prune_loop())]
+        for sink in self.sinks.values():
+            self._tasks.append(loop.create_task(self._scheduler(sink)))
+            self._tasks.extend(loop.create_task(self._worker(sink)) for _ in range(sink.concurrency))
+        await self.server.start()
+
+    async def stop(self):
+        """Stop accepting webhooks, write outstanding outcomes and close the spool"""
+        await self.server.close()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._outcomes:
+            await self.spool.call(self.spool.commit, [], self._outcomes)
+            self._outcomes = []
+        for sink in self.sinks.values():
+            await sink.client.close()
+        await self.spool.call(self.spool.close)
+
+    async def drained(self) -> bool:
+        """Whether every spooled alert has been digested and delivered (or dead-lettered)"""
+        if self._incoming or self._outcomes or any(sink.backlog for sink in self.sinks.values()):
+            return False
+        return not await self.spool.call(self.spool.undigested)
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+class FakeSink:
+    """Local webhook that is slow, rate-limits or fails at a configured rate"""
+
+    def __init__(self, name: str, latency: float, failure_rate: float, status: int, seed: int):
+        self.name = name
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.status = status
+        self.rng = random.Random(seed)
+        self.digests = set()
+        self.alerts = set()
+        self.requests = 0
+        self.server = HTTPServer(self.handle, '127.0.0.1', 0)
+
+    async def handle(self, request: Request) -> Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.rng.random() < self.failure_rate:
+            headers = {'Retry-After': '0.2'} if self.status == 429 else {}
+            return Response(self.status, b'try later\n', headers, content_type='text/plain')
+        digest = json.loads(request.body.decode('utf-8'))
+        self.digests.add(digest['digest'])
+        for group in digest['groups']:
+            for alert in group['alerts']:
+                self.alerts.add((group['groupKey'], alert['fingerprint'], alert['status']))
+        return Response(200, b'ok\n', content_type='text/plain')
+
+
+def synthetic_webhooks(count: int, alerts_per_webhook: int, repeat_share: float,
+                       seed: int = 42) -> Tuple[List[bytes], set]:
+    """
+    Alertmanager-style payloads: new groups firing, later resolving, and
+    repeats of earlier notifications (group_interval/repeat_interval resends).
+
+    Returns:
+        (payloads, unique (group key, fingerprint, status) sent)
+    """
+    rng = random.Random(seed)
+    payloads = []
+    unique = set()
+    sent: List[bytes] = []
+    group = 0
+    while len(payloads) < count:
+        if sent and rng.random() < repeat_share:
+            payloads.append(rng.choice(sent))
+            continue
+        group += 1
+        group_key = f'{{}}:{{alertname="Synthetic{group % 50}", severity="critical", batch="{group}"}}'
+        status = 'resolved' if group % 4 == 0 else 'firing'
+        alerts = []
+        for index in range(alerts_per_webhook):
+            labels = {'alertname': f"Synthetic{group % 50}", 'severity': 'critical',
+                      'instance': f"host-{group}-{index}:9100", 'batch': str(group)}
+            fp = fingerprint(labels)
+            alerts.append({'status': status, 'labels': labels,
+                           'annotations': {'summary': f"Synthetic alert {index} of batch {group}"},
+                           'startsAt': '2026-01-01T00:00:00Z', 'endsAt': '0001-01-01T00:00:00Z',
+                           'generatorURL': 'http://prometheus:9090/graph', 'fingerprint': fp})
+            unique.add((group_key, fp, status))
+        body = json.dumps({'version': '4', 'groupKey': group_key, 'status': status, 'receiver': 'relay',
+                           'groupLabels': {}, 'commonLabels': {}, 'commonAnnotations': {},
+                           'externalURL': 'http://alertmanager:9093', 'alerts': alerts}).encode('utf-8')
+        payloads.append(body)
+        sent.append(body)
+    return payloads, unique
+
+
+async def run_benchmark(webhooks: int, alerts_per_webhook: int, senders: int, window: float,
+                        max_digest: int) -> bool:
+    """
+    Measure sustained alerts/s into the spool and check that nothing is lost.
+
+    The relay is restarted on the same spool halfway through the load, while
+    digests are still queued, windows open and sinks failing.
+    """
+    payloads, unique = synthetic_webhooks(webhooks, alerts_per_webhook, repeat_share=0.3)
+    total_alerts = sum(len(json.loads(p)['alerts']) for p in payloads)
+    fakes = [FakeSink('chat', 0.02, 0.15, 429, 1), FakeSink('pager', 0.005, 0.05, 503, 2),
+             FakeSink('archive', 0.0, 0.0, 200, 3)]
+    for fake in fakes:
+        await fake.server.start()
+    print(f"{Colors.CYAN}ℹ {webhooks:,} webhooks / {total_alerts:,} alerts ({len(unique):,} unique), "
+          f"{senders} senders; sinks: chat (429 15%), pager (503 5%), archive{Colors.END}")
+
+    workdir = tempfile.mkdtemp(prefix='alert-relay-')
+    spool_path = os.path.join(workdir, 'spool.sqlite3')
+
+    def make_relay() -> AlertRelay:
+        sinks = [Sink(fake.name, f"http://127.0.0.1:{fake.server.port}/hook", concurrency=4) for fake in fakes]
+        return AlertRelay(Spool(spool_path), sinks, '127.0.0.1', 0, window=window, max_digest=max_digest,
+                          retry_base=0.05, retry_max=1.0)
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for body in payloads:
+        queue.put_nowait(body)
+    errors = 0
+
+    async def sender(port: int, stop_at: int):
+        nonlocal errors
+        http = HTTPClient(f"http://127.0.0.1:{port}", max_connections=1)
+        try:
+            while not queue.empty() and queue.qsize() > stop_at:
+                body = queue.get_nowait()
+                status, _, _ = await http.request('POST', '/', body, {'Content-Type': 'application/json'})
+                if status != 200:
+                    errors += 1
+        finally:
+            await http.close()
+
+    relay = make_relay()
+    await relay.start()
+    started = time.perf_counter()
+    await asyncio.gather(*[sender(relay.server.port, webhooks // 2) for _ in range(senders)])
+    first_half = time.perf_counter() - started
+    await relay.stop()
+    relay.spool.shutdown()
+    runs = [relay]
+    print(f"{Colors.YELLOW}⚠ Relay restarted on the same spool after {webhooks - queue.qsize():,} webhooks{Colors.END}")
+
+    relay = make_relay()
+    await relay.start()
+    resumed = time.perf_counter()
+    await asyncio.gather(*[sender(relay.server.port, 0) for _ in range(senders)])
+    ingest = first_half + time.perf_counter() - resumed
+
+    deadline = time.time() + 120
+    while not await relay.drained() and time.time() < deadline:
+        await asyncio.sleep(0.1)
+    drain = time.perf_counter() - started
+    await relay.stop()
+    runs.append(relay)
+    digests = sum(run.m_digests.get() for run in runs)
+    commits = sum(run.m_commits.get() for run in runs)
+    outcomes: Dict[str, float] = {}
+    for run in runs:
+        for (_, outcome), value in run.m_deliveries.values.items():
+            outcomes[outcome] = outcomes.get(outcome, 0) + value
+    relay.spool.shutdown()
+    for fake in fakes:
+        await fake.server.close()
+    spool_size = sum(os.path.getsize(os.path.join(workdir, name)) for name in os.listdir(workdir))
+    for name in os.listdir(workdir):
+        os.unlink(os.path.join(workdir, name))
+    os.rmdir(workdir)
+
+    print(f"{Colors.GREEN}✓ Ingest: {total_alerts / ingest:>10,.0f} alerts/s ({webhooks / ingest:,.0f} webhooks/s, "
+          f"{webhooks / max(commits, 1):.1f} webhooks per spool commit){Colors.END}")
+    print(f"{Colors.GREEN}✓ Drained in {drain:.2f}s: {digests:,.0f} digests, deliveries "
+          f"ok {outcomes.get('ok', 0):,.0f} / retried {outcomes.get('retry', 0):,.0f} / "
+          f"dead {outcomes.get('dead', 0):,.0f}; spool {spool_size / 1024 / 1024:.1f} MiB{Colors.END}")
+    ok = not errors
+    for fake in fakes:
+        missing = len(unique - fake.alerts)
+        color = Colors.GREEN if not missing else Colors.RED
+        print(f"  {color}{fake.name:<8} {len(fake.alerts):>9,} unique alerts in {len(fake.digests):,} digests "
+              f"({fake.requests:,} requests), missing {missing:,}{Colors.END}")
+        ok = ok and not missing
+    if errors:
+        print(f"{Colors.RED}✗ {errors} webhook(s) were not accepted{Colors.END}")
+    return ok
+
+
+def main():
+    """Main entry point for the alert relay"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Batching Alertmanager webhook receiver with digests, fan-out and a persistent spool",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python alert_relay.py --sink chat=http://chat-bridge:8080/hook --sink pager=http://pager:9000/v1/events,concurrency=1
+  python alert_relay.py --sink chat=http://localhost:8080/hook --window 30s --max-digest 200
+  python alert_relay.py --benchmark --webhooks 20000
+
+Point an Alertmanager webhook receiver at the relay, e.g.
+  receivers:
+    - name: 'relay'
+      webhook_configs:
+        - url: 'http://host.docker.internal:9099/'
+          send_resolved: true
+
+Webhooks are acknowledged once spooled; repeats of an alert already spooled
+(same group key, fingerprint, status and startsAt) are dropped. Metrics are
+served at /metrics.
+        """
+    )
+
+    parser.add_argument("--host", default="0.0.0.0", help="Listen address")
+    parser.add_argument("--port", type=int, default=9099, help="Listen port (default: 9099)")
+    parser.add_argument("--sink", action="append", default=[], help="NAME=URL[,concurrency=N] (repeatable)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Default in-flight requests per sink")
+    parser.add_argument("--spool", default="alert-relay.sqlite3", help="SQLite spool file")
+    parser.add_argument("--window", default="10s", help="Digest window after the first new alert")
+    parser.add_argument("--max-digest", type=int, default=500, help="Alerts per digest message")
+    parser.add_argument("--max-attempts", type=int, default=10, help="Delivery attempts per sink")
+    parser.add_argument("--retry-max", default="5m", help="Longest delay between delivery attempts")
+    parser.add_argument("--retention", default="24h", help="How long delivered alerts are kept for dedup")
+    parser.add_argument("--synchronous", choices=['FULL', 'NORMAL'], default='FULL',
+                        help="SQLite synchronous mode (NORMAL survives process crashes, not power loss)")
+    parser.add_argument("--benchmark", action="store_true", help="Run the alerts/s benchmark and exit")
+    parser.add_argument("--webhooks", type=int, default=20000, help="Benchmark webhooks")
+    parser.add_argument("--alerts-per-webhook", type=int, default=20, help="Benchmark alerts per webhook")
+    parser.add_argument("--senders", type=int, default=32, help="Benchmark concurrent senders")
+
+    args = parser.parse_args()
+
+    try:
+        window = promql.parse_duration(args.window)
+        retry_max = promql.parse_duration(args.retry_max)
+        retention = promql.parse_duration(args.retention)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.benchmark:
+        print(f"{Colors.HEADER}{Colors.BOLD}Alert Relay Benchmark{Colors.END}")
+        try:
+            ok = asyncio.run(run_benchmark(args.webhooks, args.alerts_per_webhook, args.senders,
+                                           min(window, 0.5), args.max_digest))
+        except KeyboardInterrupt:
+            print(f"\n{Colors.YELLOW}⚠ Stopped{Colors.END}")
+            sys.exit(130)
+        if not ok:
+            print(f"\n{Colors.RED}✗ Alerts were lost{Colors.END}")
+            sys.exit(1)
+        print(f"\n{Colors.GREEN}{Colors.BOLD}🎉 Alert relay benchmark completed successfully!{Colors.END}\n")
+        sys.exit(0)
+
+    if not args.sink:
+        parser.error("at least one --sink is required")
+    try:
+        sinks = [parse_sink(text, args.concurrency) for text in args.sink]
+    except ValueError as e:
+        parser.error(str(e))
+    if len({sink.name for sink in sinks}) != len(sinks):
+        parser.error("sink names must be unique")
+
+    relay = AlertRelay(Spool(str(Path(args.spool)), args.synchronous), sinks, args.host, args.port,
+                       window=window, max_digest=args.max_digest, max_attempts=args.max_attempts,
+                       retry_max=retry_max, retention=retention)
+
+    async def serve():
+        await relay.start()
+        names = ', '.join(f"{sink.name} (×{sink.concurrency})" for sink in sinks)
+        print(f"{Colors.GREEN}✓ Alert relay listening on {args.host}:{relay.server.port} → {names}{Colors.END}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await relay.stop()
+            relay.spool.shutdown()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print(f"\n{Colors.YELLOW}⚠ Stopped{Colors.END}")
+    except (OSError, sqlite3.Error) as e:
+        print(f"{Colors.RED}✗ {e}{Colors.END}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
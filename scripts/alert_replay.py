@@ -0,0 +1,1183 @@
+"""
+Offline Alert Rule Replay
+Evaluates the recording and alerting rules against an in-memory columnar series
+store loaded from synthetic (promtool-style) or exported data, and reports the
+exact evaluation at which every alert went pending, fired and resolved
+"""
+
+import heapq
+import json
+import math
+import random
+import re
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import promql
+import yaml_lite
+
+
+class Colors:
+    """ANSI color codes for terminal output"""
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    END = '\033[0m'
+    BOLD = '\033[1m'
+
+
+PROMETHEUS_DIR = Path(__file__).parent.parent / 'prometheus'
+
+# Prometheus' default lookback for instant selectors
+LOOKBACK_SECONDS = 300.0
+
+# Stale markers are stored as NaN and skipped by selectors
+STALE = float('nan')
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def labels_key(labels: Dict[str, str]) -> Labels:
+    """Hashable, sorted form of a label set"""
+    return tuple(sorted(labels.items()))
+
+
+def format_labels(labels: Labels) -> str:
+    name = ''
+    pairs = []
+    for label, value in labels:
+        if label == '__name__':
+            name = value
+        else:
+            pairs.append(f'{label}="{value}"')
+    return name + ('{' + ', '.join(pairs) + '}' if pairs or not name else '')
+
+
+def drop_name(labels: Labels) -> Labels:
+    return tuple(pair for pair in labels if pair[0] != '__name__')
+
+
+# ============================================================================
+# Series store
+# ============================================================================
+
+class Series:
+    """One series as parallel timestamp/value arrays"""
+
+    __slots__ = ('labels', 'timestamps', 'values', 'has_stale')
+
+    def __init__(self, labels: Labels):
+        self.labels = labels
+        self.timestamps = array('d')
+        self.values = array('d')
+        self.has_stale = False
+
+
+class SeriesStore:
+    """Columnar in-memory TSDB indexed by metric name"""
+
+    def __init__(self):
+        self.series: Dict[Labels, Series] = {}
+        self.by_name: Dict[str, List[Series]] = {}
+        self.version = 0
+
+    def _get(self, labels: Labels) -> Series:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = Series(labels)
+            name = dict(labels).get('__name__', '')
+            self.by_name.setdefault(name, []).append(series)
+            self.version += 1
+        return series
+
+    def add(self, labels: Dict[str, str], samples: Iterable[Tuple[float, float]]):
+        """Bulk-load samples for a series, keeping them sorted by time"""
+        series = self._get(labels_key(labels))
+        merged = sorted(list(zip(series.timestamps, series.values)) + list(samples))
+        series.timestamps = array('d', (t for t, _ in merged))
+        series.values = array('d', (v for _, v in merged))
+        series.has_stale = any(v != v for v in series.values)
+
+    def append(self, labels: Labels, timestamp: float, value: float):
+        """Append a sample newer than any already stored for the series"""
+        series = self._get(labels)
+        series.timestamps.append(timestamp)
+        series.values.append(value)
+        if value != value:
+            series.has_stale = True
+
+    def candidates(self, name: Optional[str]) -> List[Series]:
+        if name is not None:
+            return self.by_name.get(name, [])
+        return list(self.series.values())
+
+    def time_range(self) -> Tuple[float, float]:
+        starts = [s.timestamps[0] for s in self.series.values() if s.timestamps]
+        ends = [s.timestamps[-1] for s in self.series.values() if s.timestamps]
+        if not starts:
+            raise ValueError("The series store is empty")
+        return min(starts), max(ends)
+
+    @property
+    def samples(self) -> int:
+        return sum(len(s.timestamps) for s in self.series.values())
+
+
+# ============================================================================
+# Data loading
+# ============================================================================
+
+EXPANDING_RE = re.compile(r'^([-+]?[\d.eE+-]+?|_)(?:([+-])([\d.eE+-]+))?x(\d+)$')
+
+
+def expand_values(text: str) -> List[Optional[float]]:
+    """
+    Expand promtool's series notation.
+
+    '0+10x3' -> 0 10 20 30, '5x2' -> 5 5 5, '_x2' -> two gaps, 'stale' ->
+    a stale marker, plain numbers are taken as-is.
+
+    Returns:
+        Values with None for gaps
+    """
+    values: List[Optional[float]] = []
+    for token in text.split():
+        if token == '_':
+            values.append(None)
+            continue
+        if token == 'stale':
+            values.append(STALE)
+            continue
+        match = EXPANDING_RE.match(token)
+        if not match:
+            values.append(float(token))
+            continue
+        start, sign, step, count = match.groups()
+        count = int(count)
+        if start == '_':
+            values.extend([None] * count)
+            continue
+        start = float(start)
+        delta = float(step or 0) * (-1 if sign == '-' else 1)
+        values.extend(start + delta * i for i in range(count + 1))
+    return values
+
+
+def selector_labels(text: str) -> Dict[str, str]:
+    """Labels of a series written as a selector, e.g. up{job="app"}"""
+    node = promql.parse(text)
+    if not isinstance(node, promql.VectorSelector) or any(m.op != '=' for m in node.matchers):
+        raise ValueError(f"Series must be a selector with '=' matchers: {text}")
+    labels = {m.label: m.value for m in node.matchers}
+    if node.name:
+        labels['__name__'] = node.name
+    return labels
+
+
+def load_scenario(store: SeriesStore, path: Path) -> Dict:
+    """
+    Load a promtool-style scenario into the store.
+
+    The file holds interval, optional start (unix seconds, default 0),
+    input_series entries of series/values and optional expect entries.
+
+    Returns:
+        The parsed scenario document
+    """
+    document = yaml_lite.load_file(path) or {}
+    interval = promql.parse_duration(str(document.get('interval', '15s')))
+    start = float(document.get('start', 0))
+    for entry in document.get('input_series', []):
+        values = expand_values(str(entry['values']))
+        samples = [(start + i * interval, v) for i, v in enumerate(values) if v is not None]
+        store.add(selector_labels(entry['series']), samples)
+    return document
+
+
+def load_export(store: SeriesStore, path: Path) -> int:
+    """
+    Load a Prometheus query_range JSON response (or its result list).
+
+    Returns:
+        Number of series loaded
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        payload = json.load(f)
+    if isinstance(payload, dict):
+        payload = payload.get('data', payload).get('result', [])
+    for entry in payload:
+        values = entry.get('values') or ([entry['value']] if 'value' in entry else [])
+        store.add(entry['metric'], [(float(t), float(v)) for t, v in values])
+    return len(payload)
+
+
+def generate_synthetic(store: SeriesStore, services: int, hours: float, interval: float = 15.0,
+                       seed: int = 42) -> Tuple[float, float]:
+    """
+    Fill the store with application and node metrics plus one incident.
+
+    The first service has a 5xx and latency incident during the second
+    quarter of the window and its up series drops out for ten minutes.
+
+    Returns:
+        (incident start, incident end) in seconds
+    """
+    rng = random.Random(seed)
+    steps = int(hours * 3600 / interval) + 1
+    incident = (hours * 3600 * 0.25, hours * 3600 * 0.5)
+    outage = (hours * 3600 * 0.75, hours * 3600 * 0.75 + 600)
+    buckets = ['0.1', '0.25', '0.5', '1', '2.5', '5', '+Inf']
+    bucket_share = {
+        False: [0.55, 0.80, 0.93, 0.98, 0.995, 0.999, 1.0],
+        True: [0.05, 0.10, 0.20, 0.40, 0.70, 0.90, 1.0],
+    }
+
+    for index in range(services):
+        service = f"svc-{index:02d}"
+        instance = f"{service}:8080"
+        counters = {'200': 0.0, '404': 0.0, '500': 0.0}
+        bucket_counts = [0.0] * len(buckets)
+        cpu_idle = 0.0
+        columns: Dict[Labels, Tuple[array, array]] = {}
+
+        def put(labels: Dict[str, str], t: float, value: float):
+            key = labels_key(labels)
+            if key not in columns:
+                columns[key] = (array('d'), array('d'))
+            columns[key][0].append(t)
+            columns[key][1].append(value)
+
+        for step in range(steps):
+            t = step * interval
+            bad = index == 0 and incident[0] <= t < incident[1]
+            requests = rng.uniform(40, 60) * interval
+            error_share = 0.12 if bad else 0.002
+            counters['500'] += requests * error_share
+            counters['404'] += requests * 0.03
+            counters['200'] += requests * (1 - error_share - 0.03)
+            for code, value in counters.items():
+                put({'__name__': 'http_requests_total', 'service': service, 'job': 'app', 'status': code},
+                    t, round(value))
+            shares = bucket_share[bad]
+            for i, le in enumerate(buckets):
+                bucket_counts[i] += requests * shares[i]
+                put({'__name__': 'http_request_duration_seconds_bucket', 'service': service, 'le': le},
+                    t, round(bucket_counts[i]))
+            cpu_idle += interval * (0.02 if bad else rng.uniform(0.5, 0.8))
+            put({'__name__': 'node_cpu_seconds_total', 'instance': instance, 'mode': 'idle', 'cpu': '0'},
+                t, cpu_idle)
+            down = index == 0 and outage[0] <= t < outage[1]
+            put({'__name__': 'up', 'job': 'app-metrics', 'instance': instance}, t, 0.0 if down else 1.0)
+
+        for key, (timestamps, values) in columns.items():
+            series = store._get(key)
+            series.timestamps = timestamps
+            series.values = values
+    return incident
+
+
+# ============================================================================
+# Evaluator
+# ============================================================================
+
+Vector = Dict[Labels, float]
+
+
+def _divide(a: float, b: float) -> float:
+    if b == 0:
+        if a == 0 or a != a:
+            return math.nan
+        return math.copysign(math.inf, a) * math.copysign(1, b)
+    return a / b
+
+
+def _modulo(a: float, b: float) -> float:
+    return math.fmod(a, b) if b != 0 else math.nan
+
+
+def _power(a: float, b: float) -> float:
+    try:
+        return math.pow(a, b)
+    except (OverflowError, ValueError):
+        return math.nan
+
+
+ARITHMETIC = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+    '/': _divide,
+    '%': _modulo,
+    '^': _power,
+    'atan2': math.atan2,
+}
+
+COMPARISON = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '>': lambda a, b: a > b,
+    '<': lambda a, b: a < b,
+    '>=': lambda a, b: a >= b,
+    '<=': lambda a, b: a <= b,
+}
+
+MATH_FUNCTIONS = {
+    'abs': abs,
+    'ceil': math.ceil,
+    'floor': math.floor,
+    'exp': math.exp,
+    'sqrt': lambda v: math.sqrt(v) if v >= 0 else math.nan,
+    'ln': lambda v: math.log(v) if v > 0 else (-math.inf if v == 0 else math.nan),
+    'log2': lambda v: math.log2(v) if v > 0 else (-math.inf if v == 0 else math.nan),
+    'log10': lambda v: math.log10(v) if v > 0 else (-math.inf if v == 0 else math.nan),
+    'sgn': lambda v: (v > 0) - (v < 0),
+}
+
+
+def extrapolated_rate(timestamps, values, range_start: float, range_end: float,
+                      is_counter: bool, is_rate: bool) -> Optional[float]:
+    """rate()/increase()/delta() with Prometheus' extrapolation to the window edges"""
+    count = len(values)
+    if count < 2:
+        return None
+    first_t, last_t = timestamps[0], timestamps[-1]
+    result = values[-1] - values[0]
+    if is_counter:
+        previous = values[0]
+        for value in values:
+            if value < previous:
+                result += previous
+            previous = value
+
+    sampled = last_t - first_t
+    if sampled <= 0:
+        return None
+    to_start = first_t - range_start
+    to_end = range_end - last_t
+    average = sampled / (count - 1)
+    if is_counter and result > 0 and values[0] >= 0:
+        to_zero = sampled * (values[0] / result)
+        if to_zero < to_start:
+            to_start = to_zero
+
+    threshold = average * 1.1
+    interval = sampled
+    interval += to_start if to_start < threshold else average / 2
+    interval += to_end if to_end < threshold else average / 2
+    result *= interval / sampled
+    if is_rate:
+        result /= range_end - range_start
+    return result
+
+
+def _linear_regression(timestamps, values, intercept_time: float) -> Tuple[float, float]:
+    n = len(values)
+    sum_x = sum_y = sum_xy = sum_x2 = 0.0
+    for t, v in zip(timestamps, values):
+        x = t - intercept_time
+        sum_x += x
+        sum_y += v
+        sum_xy += x * v
+        sum_x2 += x * x
+    cov = sum_xy - sum_x * sum_y / n
+    var = sum_x2 - sum_x * sum_x / n
+    slope = cov / var if var else math.nan
+    return slope, sum_y / n - slope * sum_x / n
+
+
+def _stdvar(values) -> float:
+    mean = sum(values) / len(values)
+    return sum((v - mean) ** 2 for v in values) / len(values)
+
+
+def _quantile(q: float, values: List[float]) -> float:
+    if not values:
+        return math.nan
+    if q < 0:
+        return -math.inf
+    if q > 1:
+        return math.inf
+    ordered = sorted(values)
+    rank = q * (len(ordered) - 1)
+    lower = int(math.floor(rank))
+    upper = min(lower + 1, len(ordered) - 1)
+    weight = rank - lower
+    return ordered[lower] * (1 - weight) + ordered[upper] * weight
+
+
+def bucket_quantile(q: float, buckets: List[Tuple[float, float]]) -> float:
+    """histogram_quantile() over (upper bound, cumulative count) pairs"""
+    if q < 0:
+        return -math.inf
+    if q > 1:
+        return math.inf
+    buckets = sorted(buckets)
+    if not buckets or buckets[-1][0] != math.inf or len(buckets) < 2:
+        return math.nan
+    # Cumulative counts must not decrease; scrape races can make them do so
+    fixed, highest = [], 0.0
+    for bound, count in buckets:
+        highest = max(highest, count)
+        fixed.append((bound, highest))
+    observations = fixed[-1][1]
+    if observations == 0:
+        return math.nan
+    rank = q * observations
+    index = bisect_left([count for _, count in fixed], rank)
+    if index >= len(fixed) - 1:
+        return fixed[-2][0]
+    if index == 0 and fixed[0][0] <= 0:
+        return fixed[0][0]
+    start, end, count = 0.0, fixed[index][0], fixed[index][1]
+    if index > 0:
+        start = fixed[index - 1][0]
+        count -= fixed[index - 1][1]
+        rank -= fixed[index - 1][1]
+    return start + (end - start) * (rank / count) if count else start
+
+
+def _matcher_test(matcher: promql.Matcher) -> Callable[[str], bool]:
+    if matcher.op == '=':
+        return lambda value: value == matcher.value
+    if matcher.op == '!=':
+        return lambda value: value != matcher.value
+    pattern = re.compile(f"(?:{matcher.value})")
+    if matcher.op == '=~':
+        return lambda value: pattern.fullmatch(value) is not None
+    return lambda value: pattern.fullmatch(value) is None
+
+
+class Evaluator:
+    """Compiles PromQL ASTs into closures evaluated at a timestamp"""
+
+    RANGE_AGGREGATES = {
+        'avg_over_time': lambda v: sum(v) / len(v),
+        'min_over_time': min,
+        'max_over_time': max,
+        'sum_over_time': sum,
+        'count_over_time': len,
+        'last_over_time': lambda v: v[-1],
+        'present_over_time': lambda v: 1.0,
+        'stddev_over_time': lambda v: math.sqrt(_stdvar(v)),
+        'stdvar_over_time': _stdvar,
+    }
+
+    def __init__(self, store: SeriesStore, lookback: float = LOOKBACK_SECONDS):
+        self.store = store
+        self.lookback = lookback
+
+    def compile(self, node: promql.Node) -> Tuple[str, Callable[[float], object]]:
+        """
+        Compile an expression.
+
+        Returns:
+            (result type, function of the evaluation timestamp); the type is
+            'scalar', 'vector', 'matrix' or 'string'
+
+        Raises:
+            PromQLError: For constructs the replay evaluator does not support
+        """
+        if isinstance(node, promql.Paren):
+            return self.compile(node.expr)
+        if isinstance(node, promql.NumberLiteral):
+            value = node.value
+            return 'scalar', lambda t: value
+        if isinstance(node, promql.StringLiteral):
+            value = node.value
+            return 'string', lambda t: value
+        if isinstance(node, promql.VectorSelector):
+            return self._selector(node)
+        if isinstance(node, promql.Unary):
+            kind, fn = self.compile(node.expr)
+            if node.op == '+':
+                return kind, fn
+            if kind == 'scalar':
+                return kind, lambda t: -fn(t)
+            return kind, lambda t: {drop_name(k): -v for k, v in fn(t).items()}
+        if isinstance(node, promql.Aggregate):
+            return self._aggregate(node)
+        if isinstance(node, promql.BinaryExpr):
+            return self._binary(node)
+        if isinstance(node, promql.Call):
+            return self._call(node)
+        raise promql.PromQLError(f"{type(node).__name__} is not supported by the replay evaluator")
+
+    # -- selectors ---------------------------------------------------------
+
+    def _selector(self, node: promql.VectorSelector):
+        tests = [(m.label, _matcher_test(m)) for m in node.matchers]
+        name = node.name
+        store = self.store
+        cache = {'version': -1, 'series': []}
+        offset = node.offset or 0.0
+
+        def matching() -> List[Series]:
+            if cache['version'] != store.version:
+                selected = []
+                for series in store.candidates(name):
+                    labels = dict(series.labels)
+                    if all(test(labels.get(label, '')) for label, test in tests):
+                        selected.append(series)
+                cache['series'] = selected
+                cache['version'] = store.version
+            return cache['series']
+
+        if node.range is None:
+            lookback = self.lookback
+
+            def instant(t: float) -> Vector:
+                t -= offset
+                result = {}
+                for series in matching():
+                    index = bisect_right(series.timestamps, t) - 1
+                    if index >= 0 and series.timestamps[index] > t - lookback:
+                        value = series.values[index]
+                        if value == value:
+                            result[series.labels] = value
+                return result
+            return 'vector', instant
+
+        window = node.range
+
+        def ranged(t: float):
+            t -= offset
+            result = []
+            for series in matching():
+                timestamps = series.timestamps
+                lo = bisect_right(timestamps, t - window)
+                hi = bisect_right(timestamps, t)
+                if hi > lo:
+                    ts, vs = timestamps[lo:hi], series.values[lo:hi]
+                    if series.has_stale:
+                        pairs = [(a, b) for a, b in zip(ts, vs) if b == b]
+                        ts, vs = [a for a, _ in pairs], [b for _, b in pairs]
+                    if vs:
+                        result.append((series.labels, ts, vs))
+            return result
+        return 'matrix', ranged
+
+    # -- aggregation -------------------------------------------------------
+
+    def _aggregate(self, node: promql.Aggregate):
+        kind, fn = self.compile(node.expr)
+        if kind != 'vector':
+            raise promql.PromQLError(f"{node.op}() expects an instant vector")
+        labels = set(node.grouping or [])
+        without = node.without
+        param_fn = self.compile(node.param)[1] if node.param is not None else None
+        op = node.op
+
+        def group_key(key: Labels) -> Labels:
+            if without:
+                return tuple(p for p in key if p[0] not in labels and p[0] != '__name__')
+            return tuple(p for p in key if p[0] in labels)
+
+        if op in ('topk', 'bottomk'):
+            def select(t: float) -> Vector:
+                k = int(param_fn(t))
+                groups: Dict[Labels, List[Tuple[float, Labels]]] = {}
+                for key, value in fn(t).items():
+                    groups.setdefault(group_key(key), []).append((value, key))
+                result = {}
+                for members in groups.values():
+                    members.sort(key=lambda item: item[0], reverse=op == 'topk')
+                    for value, key in members[:max(k, 0)]:
+                        result[key] = value
+                return result
+            return 'vector', select
+
+        if op == 'count_values':
+            raise promql.PromQLError("count_values() is not supported by the replay evaluator")
+
+        reducers = {
+            'sum': sum,
+            'avg': lambda v: sum(v) / len(v),
+            'min': min,
+            'max': max,
+            'count': len,
+            'group': lambda v: 1.0,
+            'stddev': lambda v: math.sqrt(_stdvar(v)),
+            'stdvar': _stdvar,
+        }
+
+        def aggregate(t: float) -> Vector:
+            groups: Dict[Labels, List[float]] = {}
+            for key, value in fn(t).items():
+                groups.setdefault(group_key(key), []).append(value)
+            if op == 'quantile':
+                q = param_fn(t)
+                return {key: _quantile(q, values) for key, values in groups.items()}
+            reduce = reducers[op]
+            return {key: float(reduce(values)) for key, values in groups.items()}
+        return 'vector', aggregate
+
+    # -- binary operators --------------------------------------------------
+
+    def _binary(self, node: promql.BinaryExpr):
+        lkind, lfn = self.compile(node.lhs)
+        rkind, rfn = self.compile(node.rhs)
+        op = node.op
+        keep_bool = node.return_bool
+
+        if op in ('and', 'or', 'unless'):
+            return 'vector', self._set_operation(node, lfn, rfn)
+
+        if op in COMPARISON:
+            compare = COMPARISON[op]
+        else:
+            compute = ARITHMETIC[op]
+
+        if lkind == 'scalar' and rkind == 'scalar':
+            if op in COMPARISON:
+                if not keep_bool:
+                    raise promql.PromQLError("Comparisons between scalars must use bool")
+                return 'scalar', lambda t: float(compare(lfn(t), rfn(t)))
+            return 'scalar', lambda t: compute(lfn(t), rfn(t))
+
+        if lkind == 'scalar' or rkind == 'scalar':
+            vector_left = lkind == 'vector'
+            vfn, sfn = (lfn, rfn) if vector_left else (rfn, lfn)
+
+            def with_scalar(t: float) -> Vector:
+                scalar = sfn(t)
+                result = {}
+                for key, value in vfn(t).items():
+                    a, b = (value, scalar) if vector_left else (scalar, value)
+                    if op in COMPARISON:
+                        matched = compare(a, b)
+                        if keep_bool:
+                            result[drop_name(key)] = float(matched)
+                        elif matched:
+                            result[key] = value
+                    else:
+                        result[drop_name(key)] = compute(a, b)
+                return result
+            return 'vector', with_scalar
+
+        matching = node.matching or promql.VectorMatching()
+        signature = self._signature(matching)
+        card = matching.card
+        include = set(matching.include)
+        drops_name = op not in COMPARISON or keep_bool
+
+        def result_labels(key: Labels, other: Labels) -> Labels:
+            labels = dict(key)
+            if drops_name:
+                labels.pop('__name__', None)
+            if card is None:
+                if matching.on:
+                    labels = {k: v for k, v in labels.items() if k in matching.labels}
+                else:
+                    for label in matching.labels:
+                        labels.pop(label, None)
+            else:
+                other_labels = dict(other)
+                for label in include:
+                    if label in other_labels:
+                        labels[label] = other_labels[label]
+                    else:
+                        labels.pop(label, None)
+            return labels_key(labels)
+
+        def vector_vector(t: float) -> Vector:
+            lhs, rhs = lfn(t), rfn(t)
+            many, one, swapped = (rhs, lhs, True) if card == 'group_right' else (lhs, rhs, False)
+            index: Dict[Labels, Tuple[Labels, float]] = {}
+            for key, value in one.items():
+                index[signature(key)] = (key, value)
+            result = {}
+            for key, value in many.items():
+                found = index.get(signature(key))
+                if found is None:
+                    continue
+                other_key, other = found
+                a, b = (other, value) if swapped else (value, other)
+                labels = result_labels(key, other_key)
+                if op in COMPARISON:
+                    matched = compare(a, b)
+                    if keep_bool:
+                        result[labels] = float(matched)
+                    elif matched:
+                        result[labels] = a
+                else:
+                    result[labels] = compute(a, b)
+            return result
+        return 'vector', vector_vector
+
+    @staticmethod
+    def _signature(matching: promql.VectorMatching) -> Callable[[Labels], Labels]:
+        labels = set(matching.labels)
+        if matching.on:
+            return lambda key: tuple(p for p in key if p[0] in labels)
+        return lambda key: tuple(p for p in key if p[0] not in labels and p[0] != '__name__')
+
+    def _set_operation(self, node: promql.BinaryExpr, lfn, rfn):
+        signature = self._signature(node.matching or promql.VectorMatching())
+        op = node.op
+
+        def evaluate(t: float) -> Vector:
+            lhs, rhs = lfn(t), rfn(t)
+            right = {signature(key) for key in rhs}
+            if op == 'and':
+                return {k: v for k, v in lhs.items() if signature(k) in right}
+            if op == 'unless':
+                return {k: v for k, v in lhs.items() if signature(k) not in right}
+            left = {signature(key) for key in lhs}
+            result = dict(lhs)
+            for key, value in rhs.items():
+                if signature(key) not in left:
+                    result[key] = value
+            return result
+        return evaluate
+
+    # -- functions ---------------------------------------------------------
+
+    def _call(self, node: promql.Call):
+        func = node.func
+        compiled = [self.compile(arg) for arg in node.args]
+        fns = [fn for _, fn in compiled]
+
+        if func == 'time':
+            return 'scalar', lambda t: t
+        if func == 'vector':
+            return 'vector', lambda t: {(): float(fns[0](t))}
+        if func == 'scalar':
+            def scalar(t: float) -> float:
+                values = list(fns[0](t).values())
+                return values[0] if len(values) == 1 else math.nan
+            return 'scalar', scalar
+        if func in MATH_FUNCTIONS:
+            apply = MATH_FUNCTIONS[func]
+            return 'vector', lambda t: {drop_name(k): float(apply(v)) for k, v in fns[0](t).items()}
+        if func in ('clamp_min', 'clamp_max', 'clamp'):
+            def clamp(t: float) -> Vector:
+                bounds = [fn(t) for fn in fns[1:]]
+                low = bounds[0] if func in ('clamp_min', 'clamp') else -math.inf
+                high = bounds[-1] if func in ('clamp_max', 'clamp') else math.inf
+                return {drop_name(k): min(max(v, low), high) for k, v in fns[0](t).items()}
+            return 'vector', clamp
+        if func == 'round':
+            def rounded(t: float) -> Vector:
+                to = fns[1](t) if len(fns) > 1 else 1.0
+                return {drop_name(k): math.floor(v / to + 0.5) * to for k, v in fns[0](t).items()}
+            return 'vector', rounded
+        if func in ('sort', 'sort_desc'):
+            return 'vector', fns[0]
+        if func == 'absent':
+            selector = promql.strip_parens(node.args[0])
+            fixed = {}
+            if isinstance(selector, promql.VectorSelector):
+                fixed = {m.label: m.value for m in selector.matchers if m.op == '='}
+            absent_labels = labels_key(fixed)
+            return 'vector', lambda t: {} if fns[0](t) else {absent_labels: 1.0}
+        if func == 'histogram_quantile':
+            return 'vector', self._histogram_quantile(fns[0], fns[1])
+        if func in promql.RANGE_FUNCTIONS or func in self.RANGE_AGGREGATES:
+            return 'vector', self._range_function(node, compiled)
+        raise promql.PromQLError(f"{func}() is not supported by the replay evaluator")
+
+    @staticmethod
+    def _histogram_quantile(qfn, vfn):
+        def evaluate(t: float) -> Vector:
+            q = qfn(t)
+            groups: Dict[Labels, List[Tuple[float, float]]] = {}
+            for key, value in vfn(t).items():
+                labels = dict(key)
+                le = labels.pop('le', None)
+                if le is None:
+                    continue
+                labels.pop('__name__', None)
+                try:
+                    bound = float(le)
+                except ValueError:
+                    continue
+                groups.setdefault(labels_key(labels), []).append((bound, value))
+            return {key: bucket_quantile(q, buckets) for key, buckets in groups.items()}
+        return evaluate
+
+    def _range_function(self, node: promql.Call, compiled):
+        func = node.func
+        matrix_index = 1 if func == 'quantile_over_time' else 0
+        kind, mfn = compiled[matrix_index]
+        if kind != 'matrix':
+            raise promql.PromQLError(f"{func}() expects a range vector")
+        selector = promql.strip_parens(node.args[matrix_index])
+        window = selector.range
+        offset = selector.offset or 0.0
+        extra = [fn for i, (_, fn) in enumerate(compiled) if i != matrix_index]
+
+        if func in self.RANGE_AGGREGATES:
+            reduce = self.RANGE_AGGREGATES[func]
+            return lambda t: {drop_name(k): float(reduce(vs)) for k, ts, vs in mfn(t)}
+
+        def evaluate(t: float) -> Vector:
+            end = t - offset
+            start = end - window
+            result = {}
+            for key, ts, vs in mfn(t):
+                value = None
+                if func in ('rate', 'increase', 'delta'):
+                    value = extrapolated_rate(ts, vs, start, end, func != 'delta', func == 'rate')
+                elif func in ('irate', 'idelta'):
+                    if len(vs) >= 2:
+                        change = vs[-1] - vs[-2]
+                        if func == 'irate':
+                            if vs[-1] < vs[-2]:
+                                change = vs[-1]
+                            elapsed = ts[-1] - ts[-2]
+                            change = change / elapsed if elapsed else None
+                        value = change
+                elif func == 'changes':
+                    value = float(sum(1 for a, b in zip(vs, vs[1:]) if a != b))
+                elif func == 'resets':
+                    value = float(sum(1 for a, b in zip(vs, vs[1:]) if b < a))
+                elif func in ('deriv', 'predict_linear'):
+                    if len(vs) >= 2:
+                        slope, intercept = _linear_regression(ts, vs, t)
+                        value = slope if func == 'deriv' else intercept + slope * extra[0](t)
+                elif func == 'quantile_over_time':
+                    value = _quantile(extra[0](t), list(vs))
+                else:
+                    raise promql.PromQLError(f"{func}() is not supported by the replay evaluator")
+                if value is not None:
+                    result[drop_name(key)] = value
+            return result
+        return evaluate
+
+
+# ============================================================================
+# Rule replay
+# ============================================================================
+
+class CompiledRule:
+    """A recording or alerting rule ready to evaluate"""
+
+    def __init__(self, rule: Dict, evaluator: Evaluator):
+        self.record = rule.get('record')
+        self.alert = rule.get('alert')
+        self.name = self.record or self.alert
+        self.expr = str(rule['expr']).strip()
+        self.labels = {k: str(v) for k, v in (rule.get('labels') or {}).items()}
+        self.hold = promql.parse_duration(str(rule['for'])) if rule.get('for') else 0.0
+        self.keep_firing = promql.parse_duration(str(rule['keep_firing_for'])) if rule.get('keep_firing_for') else 0.0
+        kind, self.fn = evaluator.compile(promql.parse(self.expr))
+        if kind == 'scalar':
+            scalar_fn = self.fn
+            self.fn = lambda t: {(): scalar_fn(t)}
+        elif kind != 'vector':
+            raise promql.PromQLError(f"{self.name}: expression must return a vector or scalar")
+
+
+class RuleGroupReplay:
+    """A rule group with its evaluation interval"""
+
+    def __init__(self, name: str, interval: float, rules: List[CompiledRule]):
+        self.name = name
+        self.interval = interval
+        self.rules = rules
+
+
+class AlertEvent:
+    """One activation of an alert for a label set"""
+
+    def __init__(self, alert: str, labels: Labels, pending_at: float):
+        self.alert = alert
+        self.labels = labels
+        self.pending_at = pending_at
+        self.firing_at: Optional[float] = None
+        self.ended_at: Optional[float] = None
+        self.last_true = pending_at
+        self.value = math.nan
+
+    def state_at(self, t: float) -> str:
+        if t < self.pending_at or (self.ended_at is not None and t >= self.ended_at):
+            return 'inactive'
+        if self.firing_at is not None and t >= self.firing_at:
+            return 'firing'
+        return 'pending'
+
+    def to_dict(self, origin: float) -> Dict:
+        def relative(value):
+            return None if value is None else value - origin
+        return {
+            'alert': self.alert,
+            'labels': dict(self.labels),
+            'pending_at': relative(self.pending_at),
+            'firing_at': relative(self.firing_at),
+            'ended_at': relative(self.ended_at),
+        }
+
+
+def load_rule_groups(paths: List[Path], evaluator: Evaluator, default_interval: float,
+                     only: Optional[set] = None) -> List[RuleGroupReplay]:
+    """
+    Compile rule files; recording rule files are listed first so alerts see fresh data.
+
+    Args:
+        paths: Rule files or directories of *.yml files
+        evaluator: Evaluator bound to the series store
+        default_interval: Interval for groups without one (global evaluation_interval)
+        only: Alert names to keep (recording rules are always kept)
+    """
+    files = []
+    for path in paths:
+        files.extend(sorted(path.glob('*.yml')) if path.is_dir() else [path])
+
+    groups = []
+    for path in files:
+        document = yaml_lite.load_file(path) or {}
+        for group in document.get('groups', []):
+            interval = promql.parse_duration(str(group['interval'])) if group.get('interval') else default_interval
+            rules = [CompiledRule(rule, evaluator) for rule in group.get('rules', [])
+                     if 'record' in rule or only is None or rule.get('alert') in only]
+            if rules:
+                groups.append(RuleGroupReplay(group['name'], interval, rules))
+    groups.sort(key=lambda g: 0 if all(r.record for r in g.rules) else 1)
+    return groups
+
+
+class AlertReplay:
+    """Steps rule groups through time the way the Prometheus rule manager does"""
+
+    def __init__(self, store: SeriesStore, groups: List[RuleGroupReplay]):
+        self.store = store
+        self.groups = groups
+        self.events: List[AlertEvent] = []
+        self.evaluations = 0
+        self._active: Dict[Tuple[str, Labels], AlertEvent] = {}
+        self._recorded: Dict[str, set] = {}
+
+    def _record(self, rule: CompiledRule, t: float):
+        output = rule.fn(t)
+        previous = self._recorded.get(rule.name, set())
+        current = set()
+        for key, value in output.items():
+            labels = dict(key)
+            labels.update(rule.labels)
+            labels['__name__'] = rule.record
+            full = labels_key(labels)
+            current.add(full)
+            self.store.append(full, t, value)
+        for stale in previous - current:
+            self.store.append(stale, t, STALE)
+        self._recorded[rule.name] = current
+
+    def _alert(self, rule: CompiledRule, t: float):
+        output = rule.fn(t)
+        seen = set()
+        for key, value in output.items():
+            labels = dict(drop_name(key))
+            labels.update(rule.labels)
+            identity = (rule.alert, labels_key(labels))
+            seen.add(identity)
+            event = self._active.get(identity)
+            if event is None:
+                event = AlertEvent(rule.alert, identity[1], t)
+                self._active[identity] = event
+                self.events.append(event)
+            event.last_true = t
+            event.value = value
+            if event.firing_at is None and t - event.pending_at >= rule.hold:
+                event.firing_at = t
+
+        for identity in [i for i in self._active if i[0] == rule.alert and i not in seen]:
+            event = self._active[identity]
+            if event.firing_at is not None and rule.keep_firing and t - event.last_true < rule.keep_firing:
+                continue
+            event.ended_at = t
+            del self._active[identity]
+
+    def run(self, start: float, end: float, offsets: Optional[List[float]] = None):
+        """
+        Evaluate every group at its interval from start to end inclusive.
+
+        offsets delays each group's first evaluation, like the per-group
+        phase Prometheus derives from a hash of the group.
+        """
+        offsets = offsets or [0.0] * len(self.groups)
+        schedule = [(start + offsets[index], index) for index in range(len(self.groups))]
+        heapq.heapify(schedule)
+        while schedule:
+            t, index = heapq.heappop(schedule)
+            group = self.groups[index]
+            for rule in group.rules:
+                if rule.record:
+                    self._record(rule, t)
+                else:
+                    self._alert(rule, t)
+                self.evaluations += 1
+            if t + group.interval <= end:
+                heapq.heappush(schedule, (t + group.interval, index))
+
+
+# ============================================================================
+# Reporting
+# ============================================================================
+
+def format_offset(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return '-'
+    seconds = int(round(seconds))
+    return f"+{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def print_timeline(events: List[AlertEvent], origin: float, absolute: bool):
+    print(f"\n{Colors.HEADER}{Colors.BOLD}Alert timeline{Colors.END}")
+    if not events:
+        print(f"  {Colors.GREEN}✓ No alert became active{Colors.END}")
+        return
+    print(f"  {'Alert':<28} {'Pending':>10} {'Firing':>10} {'Ended':>10}  Labels")
+    for event in sorted(events, key=lambda e: (e.pending_at, e.alert)):
+        color = Colors.RED if event.firing_at is not None else Colors.YELLOW
+        times = [event.pending_at, event.firing_at, event.ended_at]
+        cells = [format_offset(None if value is None else value - origin) for value in times]
+        print(f"  {color}{event.alert:<28}{Colors.END} {cells[0]:>10} {cells[1]:>10} {cells[2]:>10}  "
+              f"{format_labels(event.labels)}")
+        if absolute:
+            stamps = [time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(v)) if v is not None else '-' for v in times]
+            print(f"  {'':<28} UTC {' / '.join(stamps)}")
+
+
+def check_expectations(expectations: List[Dict], events: List[AlertEvent], origin: float) -> List[str]:
+    """
+    Compare alert states at given offsets with the scenario's expect list.
+
+    Each entry holds alert, at (duration from the start), state (inactive,
+    pending or firing) and optionally a labels subset.
+
+    Returns:
+        Failure messages, empty when every expectation holds
+    """
+    failures = []
+    for expected in expectations:
+        at = origin + promql.parse_duration(str(expected['at']))
+        wanted = expected.get('state', 'firing')
+        subset = {k: str(v) for k, v in (expected.get('labels') or {}).items()}
+        states = [event.state_at(at) for event in events
+                  if event.alert == expected['alert'] and subset.items() <= dict(event.labels).items()]
+        states = [state for state in states if state != 'inactive'] or ['inactive']
+        actual = 'firing' if 'firing' in states else states[0]
+        if actual != wanted:
+            name = expected['alert'] + (format_labels(labels_key(subset)) if subset else '')
+            failures.append(f"{name} at {expected['at']}: expected {wanted}, got {actual}")
+    return failures
+
+
+def main():
+    """Main entry point for the alert replay tool"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Replay recording and alerting rules offline and report pending/firing times",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python alert_replay.py --scenario incident.yml
+  python alert_replay.py --data export.json --alert HighLatency
+  python alert_replay.py --benchmark --hours 6 --services 20
+
+A scenario file uses promtool's series notation:
+  interval: 15s
+  input_series:
+    - series: 'http_requests_total{service="api", job="app", status="500"}'
+      values: '0+5x960'
+  expect:
+    - {alert: HighHTTPErrorRate, at: 30m, state: firing}
+
+--data accepts /api/v1/query_range JSON. The exit code is 1 when an
+expectation fails, so scenarios can gate threshold changes in CI.
+        """
+    )
+
+    parser.add_argument("--scenario", action="append", default=[], help="Synthetic scenario YAML (repeatable)")
+    parser.add_argument("--data", action="append", default=[], help="query_range JSON export (repeatable)")
+    parser.add_argument("--rules", action="append", default=[],
+                        help="Rule file or directory (default: prometheus/recording-rules and alerts)")
+    parser.add_argument("--alert", action="append", default=[], help="Only replay these alerts (repeatable)")
+    parser.add_argument("--evaluation-interval", default="15s", help="Interval for groups without one")
+    parser.add_argument("--warmup", default="5m",
+                        help="Data to skip before the first evaluation so rate() windows are full")
+    parser.add_argument("--benchmark", action="store_true", help="Replay generated data and report speed")
+    parser.add_argument("--hours", type=float, default=4.0, help="Generated data span for --benchmark")
+    parser.add_argument("--services", type=int, default=10, help="Generated services for --benchmark")
+    parser.add_argument("-o", "--output", help="Write the alert events as JSON")
+
+    args = parser.parse_args()
+
+    if not (args.scenario or args.data or args.benchmark):
+        parser.error("one of --scenario, --data or --benchmark is required")
+
+    store = SeriesStore()
+    expectations = []
+    started = time.time()
+    try:
+        for path in args.scenario:
+            document = load_scenario(store, Path(path))
+            expectations.extend(document.get('expect') or [])
+        for path in args.data:
+            load_export(store, Path(path))
+        if args.benchmark:
+            incident = generate_synthetic(store, args.services, args.hours)
+            print(f"{Colors.CYAN}ℹ Generated {args.services} service(s) over {args.hours:g}h; "
+                  f"incident {format_offset(incident[0])}-{format_offset(incident[1])}{Colors.END}")
+    except (OSError, ValueError, KeyError) as e:
+        print(f"{Colors.RED}✗ Failed to load data: {e}{Colors.END}")
+        sys.exit(1)
+    load_seconds = time.time() - started
+    print(f"{Colors.GREEN}✓ Loaded {len(store.series):,} series / {store.samples:,} samples "
+          f"in {load_seconds:.2f}s{Colors.END}")
+
+    evaluator = Evaluator(store)
+    rule_paths = [Path(p) for p in args.rules] or [PROMETHEUS_DIR / 'recording-rules', PROMETHEUS_DIR / 'alerts']
+    try:
+        groups = load_rule_groups([p for p in rule_paths if p.exists()], evaluator,
+                                  promql.parse_duration(args.evaluation_interval), set(args.alert) or None)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"{Colors.RED}✗ Failed to load rules: {e}{Colors.END}")
+        sys.exit(1)
+    rule_count = sum(len(g.rules) for g in groups)
+    print(f"{Colors.GREEN}✓ Compiled {rule_count} rule(s) in {len(groups)} group(s){Colors.END}")
+
+    try:
+        start, end = store.time_range()
+    except ValueError as e:
+        print(f"{Colors.RED}✗ {e}{Colors.END}")
+        sys.exit(1)
+
+    replay = AlertReplay(store, groups)
+    started = time.time()
+    replay.run(min(start + promql.parse_duration(args.warmup), end), end)
+    elapsed = time.time() - started
+    span = end - start
+    print(f"{Colors.GREEN}✓ Replayed {span / 3600:.2f}h ({replay.evaluations:,} rule evaluations) in "
+          f"{elapsed:.2f}s - {span / max(elapsed, 1e-9):,.0f}x real time{Colors.END}")
+
+    print_timeline(replay.events, start, absolute=start > 0)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump([event.to_dict(start) for event in replay.events], f, indent=2)
+        print(f"\n{Colors.GREEN}✓ Events written to {args.output}{Colors.END}")
+
+    failures = check_expectations(expectations, replay.events, start)
+    if expectations:
+        print(f"\n{Colors.HEADER}{Colors.BOLD}Expectations{Colors.END}")
+        for failure in failures:
+            print(f"  {Colors.RED}✗ {failure}{Colors.END}")
+        print(f"  {len(expectations) - len(failures)}/{len(expectations)} passed")
+        if failures:
+            sys.exit(1)
+
+    print(f"\n{Colors.GREEN}{Colors.BOLD}🎉 Alert replay completed successfully!{Colors.END}\n")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
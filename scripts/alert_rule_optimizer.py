@@ -0,0 +1,644 @@
+"""
+Alert Rule Cost Analyzer and Recording-Rule Generator
+Parses the alerting rules, flags expensive constructs (long range windows,
+regex matchers, quantiles over wide groupings), moves shared and expensive
+sub-expressions into recording rules and rewrites the alerts to use them
+"""
+
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import promql
+import yaml_lite
+from prom_cardinality import PrometheusClient
+
+
+class Colors:
+    """ANSI color codes for terminal output"""
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    END = '\033[0m'
+    BOLD = '\033[1m'
+
+
+PROMETHEUS_DIR = Path(__file__).parent.parent / 'prometheus'
+
+# Aggregations whose output can be recorded and reused as-is
+RECORDABLE_AGGREGATORS = {'sum', 'avg', 'min', 'max', 'count'}
+
+# Range functions over counters whose _total suffix is dropped in record names
+COUNTER_FUNCTIONS = {'rate', 'irate', 'increase'}
+
+GENERATED_HEADER = """# Recording rules generated by scripts/alert_rule_optimizer.py
+#
+# Shared and expensive sub-expressions of prometheus/alerts/*.yml are evaluated
+# once here and the alerts read the recorded series. Rules are named
+# level:metric:operations and ordered so dependencies are evaluated first.
+# Re-run the optimizer after changing alerts instead of editing by hand.
+
+"""
+
+
+class AlertRule:
+    """An alerting rule and its parsed expression"""
+
+    def __init__(self, path: Path, group: str, interval: Optional[str], rule: Dict):
+        self.path = path
+        self.group = group
+        self.interval = interval
+        self.name = rule['alert']
+        self.expr_text = str(rule['expr']).strip()
+        self.expr = promql.parse(self.expr_text)
+        self.rewritten = self.expr
+
+
+class RecordingRule:
+    """A recording rule, either already on disk or planned by the optimizer"""
+
+    def __init__(self, name: str, body: promql.Node, group: str, interval: Optional[str], existing: bool):
+        self.name = name
+        self.body = body
+        self.group = group
+        self.interval = interval
+        self.existing = existing
+
+    def dependencies(self, names) -> List[str]:
+        return [s.name for s in promql.selectors(self.body) if s.name in names]
+
+
+# ============================================================================
+# Static analysis
+# ============================================================================
+
+def find_expensive(node: promql.Node, long_range: float) -> List[str]:
+    """
+    Describe the expensive constructs in an expression.
+
+    Args:
+        node: Expression to inspect
+        long_range: Range window in seconds from which a window counts as long
+
+    Returns:
+        Human-readable findings, empty when nothing stands out
+    """
+    findings = []
+    for current in promql.walk(node):
+        if isinstance(current, promql.VectorSelector):
+            if current.range is not None and current.range >= long_range:
+                findings.append(f"long range window {promql.format_expr(current)}")
+            for matcher in current.matchers:
+                if matcher.is_regex:
+                    findings.append(f"regex matcher {matcher}")
+        elif isinstance(current, promql.Subquery):
+            findings.append(f"subquery [{promql.format_duration(current.range)}:]")
+        elif isinstance(current, promql.Call) and current.func == 'histogram_quantile' and len(current.args) == 2:
+            inner = promql.strip_parens(current.args[1])
+            if isinstance(inner, promql.Aggregate):
+                labels = [label for label in (inner.grouping or []) if label != 'le']
+                if inner.without:
+                    findings.append("histogram_quantile over an aggregation using without()")
+                elif len(labels) >= 2:
+                    findings.append(f"histogram_quantile over wide by ({', '.join(inner.grouping)})")
+    return findings
+
+
+def range_call(node: promql.Node) -> Optional[promql.Call]:
+    """The rate()-style call an aggregation is applied to, if that is all it wraps"""
+    node = promql.strip_parens(node)
+    if not isinstance(node, promql.Aggregate) or node.op not in RECORDABLE_AGGREGATORS or node.param is not None:
+        return None
+    inner = promql.strip_parens(node.expr)
+    if (isinstance(inner, promql.Call) and inner.func in promql.RANGE_FUNCTIONS and inner.args
+            and isinstance(inner.args[-1], promql.VectorSelector) and inner.args[-1].range is not None):
+        return inner
+    return None
+
+
+def candidate_kind(node: promql.Node) -> Optional[str]:
+    """
+    Classify a sub-expression that is worth recording.
+
+    Returns:
+        'aggregate' for sum(rate(x[5m])) by (...), 'quantile' for
+        histogram_quantile over such an aggregation, 'ratio' for the division
+        of two aggregations with the same grouping, otherwise None
+    """
+    if isinstance(node, promql.Aggregate):
+        return 'aggregate' if range_call(node) else None
+    if isinstance(node, promql.Call) and node.func == 'histogram_quantile' and len(node.args) == 2:
+        if isinstance(node.args[0], promql.NumberLiteral) and range_call(node.args[1]):
+            return 'quantile'
+        return None
+    if isinstance(node, promql.BinaryExpr) and node.op == '/' and node.matching is None:
+        lhs, rhs = promql.strip_parens(node.lhs), promql.strip_parens(node.rhs)
+        if range_call(lhs) and range_call(rhs):
+            if sorted(lhs.grouping or []) == sorted(rhs.grouping or []) and lhs.without == rhs.without:
+                return 'ratio'
+    return None
+
+
+def _name_part(text: str) -> str:
+    return re.sub(r'_+', '_', re.sub(r'[^a-zA-Z0-9_]', '_', text)).strip('_')
+
+
+def metric_part(selector: promql.VectorSelector, func: str) -> str:
+    """Metric segment of a record name: base metric plus a summary of its matchers"""
+    name = selector.name or 'series'
+    if func in COUNTER_FUNCTIONS and name.endswith('_total'):
+        name = name[:-len('_total')]
+    if name.endswith('_bucket'):
+        name = name[:-len('_bucket')]
+    for matcher in sorted(selector.matchers, key=lambda m: m.label):
+        if matcher.value == '':
+            part = f"with_{matcher.label}" if matcher.op.startswith('!') else f"without_{matcher.label}"
+        else:
+            value = matcher.value
+            if matcher.is_regex:
+                value = value.replace('.', 'x').replace('|', '_or_')
+            part = _name_part(value)
+            if matcher.op.startswith('!'):
+                part = f"not_{part}"
+        name += f"_{part}"
+    return name
+
+
+def record_name(node: promql.Node, kind: str) -> str:
+    """
+    Name a recording rule after the level:metric:operations convention.
+
+    Args:
+        node: Sub-expression being recorded
+        kind: Result of candidate_kind()
+
+    Returns:
+        Record name such as service:http_requests_5xx:ratio_rate5m
+    """
+    if kind == 'quantile':
+        aggregate = promql.strip_parens(node.args[1])
+    elif kind == 'ratio':
+        aggregate = promql.strip_parens(node.lhs)
+    else:
+        aggregate = promql.strip_parens(node)
+
+    call = range_call(aggregate)
+    labels = [label for label in (aggregate.grouping or []) if label != 'le']
+    level = '_'.join(labels) if labels and not aggregate.without else 'all'
+    operation = f"{call.func}{promql.format_duration(call.args[-1].range)}"
+    if kind == 'quantile':
+        quantile = promql.format_number(node.args[0]).lstrip('0').lstrip('.') or '0'
+        operation = f"p{quantile}_{operation}"
+    elif kind == 'ratio':
+        operation = f"ratio_{operation}"
+    elif aggregate.op != 'sum':
+        operation = f"{aggregate.op}_{operation}"
+    return f"{level}:{metric_part(call.args[-1], call.func)}:{operation}"
+
+
+def expand(node: promql.Node, records: Dict[str, promql.Node]) -> promql.Node:
+    """Inline recorded series back into their defining expressions"""
+    def mapping(current):
+        if (isinstance(current, promql.VectorSelector) and current.name in records
+                and not current.matchers and current.range is None and not current.offset):
+            return promql.Paren(expand(records[current.name], records))
+        return None
+    return promql.replace(node, mapping)
+
+
+# ============================================================================
+# Planning
+# ============================================================================
+
+class RecordingPlanner:
+    """Chooses sub-expressions to record and rewrites alerts to use them"""
+
+    def __init__(self, alerts: List[AlertRule], existing: List[RecordingRule], long_range: float):
+        self.alerts = alerts
+        self.long_range = long_range
+        self.records: Dict[str, RecordingRule] = {rule.name: rule for rule in existing}
+        bodies = {rule.name: rule.body for rule in existing}
+        self.by_canonical: Dict[str, str] = {
+            promql.canonical(expand(rule.body, bodies)): rule.name for rule in existing
+        }
+
+    def _substitute(self, canonical_text: str, name: str):
+        """Replace every occurrence of a sub-expression with its recorded series"""
+        def mapping(current):
+            if (not isinstance(current, (promql.NumberLiteral, promql.VectorSelector))
+                    and promql.canonical(current) == canonical_text):
+                return promql.VectorSelector(name, [])
+            return None
+
+        for alert in self.alerts:
+            alert.rewritten = promql.replace(alert.rewritten, mapping)
+        for rule in self.records.values():
+            if rule.name != name:
+                rule.body = promql.replace(rule.body, mapping)
+
+    def _occurrences(self, canonical_text: str) -> Tuple[List[AlertRule], List[RecordingRule]]:
+        def contains(node):
+            return any(promql.canonical(n) == canonical_text for n in promql.walk(node)
+                       if not isinstance(n, (promql.NumberLiteral, promql.VectorSelector)))
+        alerts = [alert for alert in self.alerts if contains(alert.rewritten)]
+        rules = [rule for rule in self.records.values() if contains(rule.body)]
+        return alerts, rules
+
+    def plan(self) -> List[RecordingRule]:
+        """
+        Select recordings, largest sub-expressions first.
+
+        A sub-expression is recorded when it already has a recording rule, when
+        it is used by two or more alerts or recording rules, or when an alert
+        uses it and it contains an expensive construct.
+
+        Returns:
+            Newly planned recording rules
+        """
+        for canonical_text, name in sorted(self.by_canonical.items(), key=lambda item: -len(item[0])):
+            self._substitute(canonical_text, name)
+
+        candidates: Dict[str, Tuple[promql.Node, str]] = {}
+        for alert in self.alerts:
+            for node in promql.walk(alert.rewritten):
+                kind = candidate_kind(node)
+                if kind:
+                    candidates.setdefault(promql.canonical(node), (node, kind))
+
+        planned = []
+        for canonical_text, (node, kind) in sorted(candidates.items(), key=lambda item: -len(item[0])):
+            alerts, rules = self._occurrences(canonical_text)
+            uses = len(alerts) + len(rules)
+            if uses == 0:
+                continue
+            expensive = bool(alerts) and bool(find_expensive(node, self.long_range))
+            if uses < 2 and not expensive:
+                continue
+
+            name = record_name(node, kind)
+            suffix = 2
+            while name in self.records:
+                name = f"{record_name(node, kind)}_{suffix}"
+                suffix += 1
+            owner = alerts[0] if alerts else None
+            group = owner.group if owner else rules[0].group
+            interval = owner.interval if owner else rules[0].interval
+            rule = RecordingRule(name, promql.strip_parens(node), group, interval, existing=False)
+            self.records[name] = rule
+            self.by_canonical[canonical_text] = name
+            self._substitute(canonical_text, name)
+            planned.append(rule)
+        return planned
+
+    def ordered_groups(self) -> List[Tuple[str, Optional[str], List[RecordingRule]]]:
+        """Recording rules grouped by alert group, dependencies first within each group"""
+        groups: Dict[str, List[RecordingRule]] = {alert.group: [] for alert in self.alerts}
+        for rule in self.records.values():
+            groups.setdefault(rule.group, []).append(rule)
+
+        result = []
+        for group, rules in groups.items():
+            if not rules:
+                continue
+            names = {rule.name for rule in rules}
+            ordered, seen = [], set()
+
+            def visit(rule):
+                if rule.name in seen:
+                    return
+                seen.add(rule.name)
+                for dependency in rule.dependencies(names):
+                    visit(self.records[dependency])
+                ordered.append(rule)
+
+            for rule in rules:
+                visit(rule)
+            result.append((group, rules[0].interval, ordered))
+        return result
+
+
+# ============================================================================
+# Files
+# ============================================================================
+
+def load_alerts(alerts_dir: Path) -> List[AlertRule]:
+    """Parse every alerting rule in a rules directory"""
+    alerts = []
+    for path in sorted(alerts_dir.glob('*.yml')):
+        document = yaml_lite.load_file(path) or {}
+        for group in document.get('groups', []):
+            for rule in group.get('rules', []):
+                if 'alert' in rule:
+                    alerts.append(AlertRule(path, group['name'], group.get('interval'), rule))
+    return alerts
+
+
+def load_recordings(path: Path) -> List[RecordingRule]:
+    """Recording rules from a previously generated file"""
+    if not path.exists():
+        return []
+    rules = []
+    document = yaml_lite.load_file(path) or {}
+    for group in document.get('groups', []):
+        name = group['name']
+        if name.endswith('-recording'):
+            name = name[:-len('-recording')]
+        for rule in group.get('rules', []):
+            if 'record' in rule:
+                rules.append(RecordingRule(rule['record'], promql.parse(str(rule['expr'])), name,
+                                           group.get('interval'), existing=True))
+    return rules
+
+
+def render_recordings(groups: List[Tuple[str, Optional[str], List[RecordingRule]]]) -> str:
+    """Render recording rule groups as a Prometheus rule file"""
+    document = {'groups': []}
+    for group, interval, rules in groups:
+        entry = {'name': f"{group}-recording"}
+        if interval:
+            entry['interval'] = interval
+        entry['rules'] = [{'record': rule.name, 'expr': promql.format_expr(rule.body)} for rule in rules]
+        document['groups'].append(entry)
+    return GENERATED_HEADER + yaml_lite.dump(document)
+
+
+def rewrite_alert_file(text: str, rewrites: Dict[str, str]) -> str:
+    """
+    Replace the expr of the given alerts in place, keeping comments and layout.
+
+    Args:
+        text: Rule file contents
+        rewrites: Alert name -> new expression
+
+    Returns:
+        Updated file contents
+    """
+    lines = text.split('\n')
+    output = []
+    current_alert = None
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        alert_match = re.match(r'^\s*-\s*alert:\s*["\']?([^"\'\s#]+)', line)
+        if alert_match:
+            current_alert = alert_match.group(1)
+        expr_match = re.match(r'^(\s*)expr:\s*(.*)$', line)
+        if expr_match and current_alert in rewrites:
+            indent = len(expr_match.group(1))
+            end = i
+            if expr_match.group(2).strip()[:1] in ('|', '>'):
+                j = i + 1
+                while j < len(lines):
+                    if lines[j].strip():
+                        if len(lines[j]) - len(lines[j].lstrip(' ')) <= indent:
+                            break
+                        end = j
+                    j += 1
+            output.append(' ' * indent + 'expr: |')
+            output.append(' ' * (indent + 2) + rewrites[current_alert])
+            current_alert = None
+            i = end + 1
+            continue
+        output.append(line)
+        i += 1
+    return '\n'.join(output)
+
+
+# ============================================================================
+# Cost model
+# ============================================================================
+
+class CostModel:
+    """Estimates samples read per evaluation, with live series counts when available"""
+
+    def __init__(self, scrape_interval: float, client: Optional[PrometheusClient] = None):
+        self.scrape_interval = scrape_interval
+        self.client = client
+        self.series: Dict[str, Optional[int]] = {}
+
+    def series_count(self, selector: promql.VectorSelector, records: Dict[str, promql.Node]) -> int:
+        """Series a selector matches; 1 when Prometheus is not consulted"""
+        instant = promql.VectorSelector(selector.name, selector.matchers)
+        key = promql.format_expr(instant)
+        if key not in self.series:
+            self.series[key] = None
+            if self.client is not None:
+                queries = [f"count({key})"]
+                if selector.name in records:
+                    queries.append(f"count({promql.format_expr(expand(instant, records))})")
+                for query in queries:
+                    try:
+                        result = self.client.get('/api/v1/query', {'query': query})['result']
+                    except RuntimeError:
+                        continue
+                    if result:
+                        self.series[key] = int(float(result[0]['value'][1]))
+                        break
+                else:
+                    self.series[key] = 0
+        count = self.series[key]
+        return 1 if count is None else count
+
+    def samples(self, node: promql.Node, records: Dict[str, promql.Node]) -> int:
+        """Samples read to evaluate an expression once"""
+        total = 0
+        for selector in promql.selectors(node):
+            points = 1
+            if selector.range is not None:
+                points = max(1, int(selector.range / self.scrape_interval))
+            total += self.series_count(selector, records) * points
+        return total
+
+
+def fetch_rule_timings(client: PrometheusClient) -> Tuple[Dict[str, Dict], List[Dict]]:
+    """
+    Read evaluation timings from /api/v1/rules.
+
+    Returns:
+        (rule name -> rule entry, group entries)
+    """
+    data = client.get('/api/v1/rules')
+    rules = {}
+    for group in data.get('groups', []):
+        for rule in group.get('rules', []):
+            rules.setdefault(rule['name'], rule)
+    return rules, data.get('groups', [])
+
+
+# ============================================================================
+# Report
+# ============================================================================
+
+def print_report(alerts: List[AlertRule], planned: List[RecordingRule], planner: RecordingPlanner,
+                 cost: CostModel, timings: Optional[Dict[str, Dict]], groups: List[Dict], long_range: float):
+    """Print findings, the recording plan and per-rule costs"""
+    records = {name: rule.body for name, rule in planner.records.items()}
+    unit = "samples" if cost.client is not None else "samples/series"
+
+    print(f"\n{Colors.HEADER}{Colors.BOLD}Expensive constructs{Colors.END}")
+    flagged = 0
+    for alert in alerts:
+        for finding in find_expensive(alert.expr, long_range):
+            print(f"  {Colors.YELLOW}⚠{Colors.END} {alert.name:<30} {finding}")
+            flagged += 1
+    if not flagged:
+        print(f"  {Colors.GREEN}✓ Nothing flagged{Colors.END}")
+
+    print(f"\n{Colors.HEADER}{Colors.BOLD}Recording rules{Colors.END}")
+    if not planned:
+        print(f"  {Colors.GREEN}✓ No new recording rules needed{Colors.END}")
+    for rule in planned:
+        users = [a.name for a in alerts if rule.name in {s.name for s in promql.selectors(a.rewritten)}]
+        print(f"  {Colors.GREEN}+{Colors.END} {rule.name}")
+        print(f"      {promql.format_expr(rule.body)}")
+        if users:
+            print(f"      used by {', '.join(users)}")
+
+    print(f"\n{Colors.HEADER}{Colors.BOLD}Per-rule cost ({unit} per evaluation){Colors.END}")
+    header = f"  {'Rule':<46} {'Before':>10} {'After':>10}"
+    if timings is not None:
+        header += f" {'Eval ms':>9} {'Health':>8}"
+    print(header)
+    before_total = after_total = 0
+    rows = []
+    for alert in alerts:
+        before = cost.samples(alert.expr, {})
+        after = cost.samples(alert.rewritten, records)
+        before_total += before
+        after_total += after
+        rows.append((alert.name, before, after))
+    planned_names = {rule.name for rule in planned}
+    # Rules already on disk cost the same before and after (the alerts'
+    # "before" already reads their series), so only new rules are compared
+    for rule in planned:
+        after = cost.samples(rule.body, records)
+        after_total += after
+        rows.append((rule.name, None, after))
+
+    def eval_ms(name):
+        entry = (timings or {}).get(name)
+        return entry.get('evaluationTime', 0) * 1000 if entry else -1
+
+    if timings:
+        rows.sort(key=lambda row: -eval_ms(row[0]))
+    for name, before, after in rows:
+        line = f"  {name[:46]:<46} {'-' if before is None else f'{before:,}':>10} {after:>10,}"
+        if timings is not None:
+            entry = timings.get(name)
+            if entry:
+                health = entry.get('health', '?')
+                color = Colors.GREEN if health == 'ok' else Colors.RED
+                line += f" {eval_ms(name):>9.2f} {color}{health:>8}{Colors.END}"
+            else:
+                line += f" {'-':>9} {'new' if name in planned_names else '-':>8}"
+        print(line)
+
+    saved = before_total - after_total
+    pct = abs(saved) / before_total * 100 if before_total else 0
+    if saved > 0:
+        change = f"{Colors.GREEN}{pct:.0f}% fewer{Colors.END}"
+    elif saved < 0:
+        change = f"{Colors.YELLOW}{pct:.0f}% more{Colors.END}"
+    else:
+        change = "no change"
+    print(f"\n  Total per cycle: {before_total:,} -> {after_total:,} {unit} ({change})")
+
+    if groups:
+        print(f"\n{Colors.HEADER}{Colors.BOLD}Rule groups (live){Colors.END}")
+        for group in groups:
+            interval = group.get('interval') or 0
+            spent = group.get('evaluationTime', 0)
+            share = spent / interval * 100 if interval else 0
+            color = Colors.RED if share > 50 else Colors.YELLOW if share > 10 else Colors.GREEN
+            print(f"  {group.get('name', '?'):<32} {spent * 1000:>9.2f} ms / {interval:g}s "
+                  f"{color}({share:.1f}% of interval){Colors.END}")
+
+
+def main():
+    """Main entry point for the alert rule optimizer"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Analyze alert rule cost and generate recording rules for shared sub-expressions",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python alert_rule_optimizer.py
+  python alert_rule_optimizer.py --apply
+  python alert_rule_optimizer.py --offline --long-range 30m
+
+Without --apply only the plan and cost report are printed. With --apply the
+recording rules are written and alert expressions are rewritten in place
+(comments and layout are kept); reload Prometheus afterwards.
+        """
+    )
+
+    parser.add_argument("--prometheus-url", default="http://localhost:9090",
+                        help="Prometheus base URL for series counts and rule timings")
+    parser.add_argument("--offline", action="store_true", help="Do not contact Prometheus")
+    parser.add_argument("--alerts-dir", default=str(PROMETHEUS_DIR / 'alerts'), help="Alert rule files")
+    parser.add_argument("--output", default=str(PROMETHEUS_DIR / 'recording-rules' / 'app-recording-rules.yml'),
+                        help="Generated recording rule file")
+    parser.add_argument("--long-range", default="10m", help="Range window considered long")
+    parser.add_argument("--scrape-interval", default="15s", help="Scrape interval used for sample estimates")
+    parser.add_argument("--apply", action="store_true", help="Write recording rules and rewrite alerts")
+
+    args = parser.parse_args()
+
+    try:
+        long_range = promql.parse_duration(args.long_range)
+        scrape_interval = promql.parse_duration(args.scrape_interval)
+    except promql.PromQLError as e:
+        parser.error(str(e))
+
+    alerts_dir = Path(args.alerts_dir)
+    output = Path(args.output)
+    try:
+        alerts = load_alerts(alerts_dir)
+        existing = load_recordings(output)
+    except (OSError, promql.PromQLError, ValueError) as e:
+        print(f"{Colors.RED}✗ Failed to load rules: {e}{Colors.END}")
+        sys.exit(1)
+    print(f"{Colors.GREEN}✓ Parsed {len(alerts)} alert(s) from {alerts_dir} and "
+          f"{len(existing)} existing recording rule(s){Colors.END}")
+
+    client = None
+    timings, groups = None, []
+    if not args.offline:
+        client = PrometheusClient(args.prometheus_url, timeout=10)
+        try:
+            timings, groups = fetch_rule_timings(client)
+            print(f"{Colors.GREEN}✓ Read evaluation timings for {len(timings)} rule(s) "
+                  f"from {args.prometheus_url}{Colors.END}")
+        except RuntimeError as e:
+            print(f"{Colors.YELLOW}⚠ Prometheus unavailable ({e}); using the static cost model only{Colors.END}")
+            client = None
+
+    planner = RecordingPlanner(alerts, existing, long_range)
+    planned = planner.plan()
+    print_report(alerts, planned, planner, CostModel(scrape_interval, client), timings, groups, long_range)
+
+    changed = [alert for alert in alerts
+               if promql.canonical(alert.rewritten) != promql.canonical(alert.expr)]
+    if args.apply:
+        if planner.records:
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.write_text(render_recordings(planner.ordered_groups()), encoding='utf-8')
+            print(f"\n{Colors.GREEN}✓ Wrote {len(planner.records)} recording rule(s) to {output}{Colors.END}")
+        for path in sorted({alert.path for alert in changed}):
+            rewrites = {alert.name: promql.format_expr(alert.rewritten) for alert in changed if alert.path == path}
+            path.write_text(rewrite_alert_file(path.read_text(encoding='utf-8'), rewrites), encoding='utf-8')
+            print(f"{Colors.GREEN}✓ Rewrote {len(rewrites)} alert(s) in {path}{Colors.END}")
+    elif changed:
+        print(f"\n{Colors.CYAN}ℹ {len(changed)} alert(s) would be rewritten; pass --apply to write changes{Colors.END}")
+
+    print(f"\n{Colors.GREEN}{Colors.BOLD}🎉 Alert rule analysis completed successfully!{Colors.END}\n")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
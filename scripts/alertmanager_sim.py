@@ -0,0 +1,853 @@
+"""
+Alertmanager Routing Simulator
+Replays a recorded or synthetic alert stream through the route tree, grouping
+timers, inhibit rules and notification deduplication of alertmanager/config.yml
+and reports notifications per receiver, group fan-out, inhibition effectiveness
+and peak notification rate
+"""
+
+import gc
+import heapq
+import json
+import math
+import random
+import re
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import promql
+import yaml_lite
+from alert_replay import PROMETHEUS_DIR, Labels, labels_key
+
+
+class Colors:
+    """ANSI color codes for terminal output"""
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    END = '\033[0m'
+    BOLD = '\033[1m'
+
+
+ALERTMANAGER_CONFIG = Path(__file__).parent.parent / 'alertmanager' / 'config.yml'
+
+# Alertmanager's defaults for the root route
+DEFAULT_TIMERS = {'group_wait': 30.0, 'group_interval': 300.0, 'repeat_interval': 14400.0}
+
+# Integrations that send resolved notifications unless told otherwise
+RESOLVED_BY_DEFAULT = {'webhook_configs', 'pagerduty_configs', 'opsgenie_configs', 'victorops_configs',
+                       'pushover_configs', 'sns_configs', 'telegram_configs', 'discord_configs',
+                       'webex_configs', 'msteams_configs'}
+
+_MATCHER = re.compile(r'^\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*(=~|!~|!=|=)\s*(.*?)\s*$')
+
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+class Matcher:
+    """label op value, with regexes anchored like Alertmanager's"""
+
+    __slots__ = ('name', 'op', 'value', '_regex')
+
+    def __init__(self, name: str, op: str, value: str):
+        self.name = name
+        self.op = op
+        self.value = value
+        self._regex = re.compile(f"^(?:{value})$") if op in ('=~', '!~') else None
+
+    def matches(self, labels: Dict[str, str]) -> bool:
+        value = labels.get(self.name, '')
+        if self.op == '=':
+            return value == self.value
+        if self.op == '!=':
+            return value != self.value
+        found = self._regex.match(value) is not None
+        return found if self.op == '=~' else not found
+
+    def __repr__(self):
+        return f'{self.name}{self.op}"{self.value}"'
+
+
+def parse_matcher(text: str) -> Matcher:
+    """Parse a matchers: entry such as severity="critical" or team=~"db|infra" """
+    found = _MATCHER.match(str(text))
+    if not found:
+        raise ValueError(f"Invalid matcher: {text}")
+    name, op, value = found.groups()
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        value = value[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+    return Matcher(name, op, value)
+
+
+def load_matchers(config: Dict, prefix: str = '') -> List[Matcher]:
+    """Matchers from the legacy match/match_re maps and the matchers list"""
+    matchers = [Matcher(str(k), '=', str(v)) for k, v in (config.get(prefix + 'match') or {}).items()]
+    matchers += [Matcher(str(k), '=~', str(v)) for k, v in (config.get(prefix + 'match_re') or {}).items()]
+    matchers += [parse_matcher(m) for m in config.get(prefix + 'matchers') or []]
+    return matchers
+
+
+def _duration(value, default: float) -> float:
+    return promql.parse_duration(str(value)) if value is not None else default
+
+
+class Route:
+    """A node of the route tree with inherited receiver, grouping and timers"""
+
+    def __init__(self, config: Dict, parent: Optional['Route'] = None, path: str = 'root'):
+        inherited = parent.__dict__ if parent else dict(DEFAULT_TIMERS, receiver=None, group_by=[])
+        self.path = path
+        self.receiver = config.get('receiver') or inherited['receiver']
+        group_by = config.get('group_by')
+        self.group_by = [str(name) for name in group_by] if group_by is not None else inherited['group_by']
+        self.group_all = '...' in self.group_by
+        self.group_wait = _duration(config.get('group_wait'), inherited['group_wait'])
+        self.group_interval = _duration(config.get('group_interval'), inherited['group_interval'])
+        self.repeat_interval = _duration(config.get('repeat_interval'), inherited['repeat_interval'])
+        self.continue_ = bool(config.get('continue', False))
+        self.matchers = load_matchers(config) if parent else []
+        self.routes = [Route(child, self, f"{path}/{index}") for index, child in enumerate(config.get('routes') or [])]
+
+    def match(self, labels: Dict[str, str]) -> List['Route']:
+        """Routes that handle the alert: deepest matches, following continue"""
+        if not all(m.matches(labels) for m in self.matchers):
+            return []
+        found = []
+        for child in self.routes:
+            matched = child.match(labels)
+            found.extend(matched)
+            if matched and not child.continue_:
+                break
+        return found or [self]
+
+    def group_key(self, labels: Dict[str, str]) -> Labels:
+        if self.group_all:
+            return labels_key(labels)
+        return tuple((name, labels.get(name, '')) for name in self.group_by)
+
+    def walk(self):
+        yield self
+        for child in self.routes:
+            yield from child.walk()
+
+
+class InhibitRule:
+    """Source matchers, target matchers and the labels that must be equal"""
+
+    def __init__(self, config: Dict, index: int):
+        self.index = index
+        self.source = load_matchers(config, 'source_')
+        self.target = load_matchers(config, 'target_')
+        self.equal = [str(name) for name in config.get('equal') or []]
+
+    def key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(labels.get(name, '') for name in self.equal)
+
+    def describe(self) -> str:
+        source = ', '.join(map(repr, self.source)) or '*'
+        target = ', '.join(map(repr, self.target)) or '*'
+        return f"{source} ⇒ {target} equal [{', '.join(self.equal)}]"
+
+
+def receiver_send_resolved(receivers: List[Dict]) -> Dict[str, Optional[bool]]:
+    """Whether each receiver sends resolved notifications (None: no integrations)"""
+    result = {}
+    for receiver in receivers:
+        integrations = [(kind, entry) for kind, entries in receiver.items() if kind.endswith('_configs')
+                        for entry in entries or []]
+        if not integrations:
+            result[receiver['name']] = None
+            continue
+        result[receiver['name']] = any(entry.get('send_resolved', kind in RESOLVED_BY_DEFAULT)
+                                       for kind, entry in integrations)
+    return result
+
+
+# ============================================================================
+# Alert streams
+# ============================================================================
+
+class AlertStream:
+    """
+    Firing intervals of alerts, with label sets interned.
+
+    Each episode is (label set index, start, end); end is inf for alerts
+    still firing when the recording stopped.
+    """
+
+    def __init__(self):
+        self.labelsets: List[Labels] = []
+        self._index: Dict[Labels, int] = {}
+        self.ids = array('l')
+        self.starts = array('d')
+        self.ends = array('d')
+
+    def add(self, labels: Labels, start: float, end: float):
+        fp = self._index.get(labels)
+        if fp is None:
+            fp = self._index[labels] = len(self.labelsets)
+            self.labelsets.append(labels)
+        self.ids.append(fp)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def merge_overlaps(self) -> int:
+        """Join overlapping episodes of the same alert, as Alertmanager would; returns episodes merged"""
+        order = sorted(range(len(self.ids)), key=lambda i: (self.ids[i], self.starts[i]))
+        ids, starts, ends = array('l'), array('d'), array('d')
+        for i in order:
+            if ids and ids[-1] == self.ids[i] and self.starts[i] <= ends[-1]:
+                ends[-1] = max(ends[-1], self.ends[i])
+                continue
+            ids.append(self.ids[i])
+            starts.append(self.starts[i])
+            ends.append(self.ends[i])
+        merged = len(self.ids) - len(ids)
+        self.ids, self.starts, self.ends = ids, starts, ends
+        return merged
+
+
+def load_replay_events(stream: AlertStream, path: Path):
+    """Alert events written by alert_replay.py --output"""
+    with open(path, 'r', encoding='utf-8') as f:
+        events = json.load(f)
+    for event in events:
+        if event.get('firing_at') is None:
+            continue
+        labels = dict(event['labels'], alertname=event['alert'])
+        end = event['ended_at'] if event.get('ended_at') is not None else math.inf
+        stream.add(labels_key(labels), float(event['firing_at']), float(end))
+
+
+def load_alerts_export(stream: AlertStream, path: Path):
+    """
+    A query_range export of ALERTS{alertstate="firing"}.
+
+    Consecutive samples closer than 1.5 steps belong to one episode; the
+    step is the smallest gap seen in the file.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        payload = json.load(f)
+    if isinstance(payload, dict):
+        payload = payload.get('data', payload).get('result', [])
+    gaps = [float(b[0]) - float(a[0]) for entry in payload
+            for a, b in zip(entry.get('values', []), entry.get('values', [])[1:])]
+    step = min(gaps) if gaps else 60.0
+    for entry in payload:
+        labels = {k: v for k, v in entry['metric'].items() if k not in ('__name__', 'alertstate')}
+        key = labels_key(labels)
+        times = [float(t) for t, _ in entry.get('values', [])]
+        start = previous = None
+        for t in times:
+            if start is None:
+                start = t
+            elif t - previous > 1.5 * step:
+                stream.add(key, start, previous + step)
+                start = t
+            previous = t
+        if start is not None:
+            stream.add(key, start, previous + step)
+
+
+def load_rule_labels(rules_dir: Path) -> Dict[str, Tuple[str, Dict[str, str]]]:
+    """alertname -> (rule group, static labels) from the Prometheus alert rules"""
+    rules = {}
+    for path in sorted(rules_dir.glob('*.yml')):
+        for group in (yaml_lite.load_file(path) or {}).get('groups', []):
+            for rule in group.get('rules', []):
+                if 'alert' in rule:
+                    labels = {k: str(v) for k, v in (rule.get('labels') or {}).items()}
+                    rules[rule['alert']] = (group['name'], labels)
+    return rules
+
+
+def generate_synthetic(stream: AlertStream, alerts: int, hours: float, seed: int = 42,
+                       storm_share: float = 0.8):
+    """
+    Fill the stream with node-failure storms plus background noise.
+
+    A storm takes one to three nodes down: NodeNotReady, InstanceDown for
+    every target on the node, ServiceDown for application targets and
+    PodNotReady/PodCrashLooping for every pod scheduled there. Background
+    alerts pick any rule with labels that fit its rule group.
+    """
+    rng = random.Random(seed)
+    rules = load_rule_labels(PROMETHEUS_DIR / 'alerts')
+    span = hours * 3600.0
+    nodes = max(50, alerts // 500)
+    namespaces = ['default', 'payments', 'orders', 'catalog', 'monitoring', 'ingress']
+    services = ['user-service', 'order-service', 'product-service', 'payment-service', 'search-service']
+
+    def labels_for(alert: str, node: int, slot: int) -> Labels:
+        family, static = rules.get(alert, ('infrastructure', {'severity': 'warning'}))
+        labels = dict(static, alertname=alert)
+        if family == 'kubernetes':
+            labels['node'] = f"node-{node:04d}"
+            if alert != 'NodeNotReady':
+                labels['namespace'] = namespaces[slot % len(namespaces)]
+                labels['pod'] = f"{services[slot % len(services)]}-{node:04d}-{slot:02d}"
+        elif family in ('application', 'logs'):
+            labels['service'] = services[slot % len(services)]
+            labels['job'] = 'app-metrics'
+            labels['instance'] = f"node-{node:04d}:{3000 + slot % 10}"
+        else:
+            labels['job'] = 'node-exporter' if family == 'infrastructure' else family
+            labels['instance'] = f"node-{node:04d}:{9100 + slot % 10}"
+        return labels_key(labels)
+
+    produced = 0
+    storm_target = int(alerts * storm_share)
+    while produced < storm_target:
+        start = rng.uniform(0, span)
+        duration = rng.lognormvariate(math.log(900), 0.6)
+        for node in rng.sample(range(nodes), rng.choice((1, 1, 1, 2, 3))):
+            members = [('NodeNotReady', 0)]
+            members += [('InstanceDown', slot) for slot in range(10)]
+            members += [('ServiceDown', slot) for slot in range(4)]
+            for slot in range(rng.randint(15, 40)):
+                members.append(('PodNotReady', slot))
+                if rng.random() < 0.5:
+                    members.append(('PodCrashLooping', slot))
+            for alert, slot in members:
+                # Rule for: holds and scrape phases spread the first firing
+                begin = start + rng.uniform(0, 120)
+                stream.add(labels_for(alert, node, slot), begin, begin + duration * rng.uniform(0.8, 1.2))
+            produced += len(members)
+
+    names = sorted(rules) or ['InstanceDown']
+    while produced < alerts:
+        start = rng.uniform(0, span)
+        stream.add(labels_for(rng.choice(names), rng.randrange(nodes), rng.randrange(40)),
+                   start, start + rng.lognormvariate(math.log(600), 1.0))
+        produced += 1
+
+
+# ============================================================================
+# Simulation
+# ============================================================================
+
+class Group:
+    """An aggregation group: the alerts of one route sharing the group_by labels"""
+
+    __slots__ = ('route', 'key', 'anchor', 'firing', 'resolved', 'last_flush', 'scheduled', 'alerts')
+
+    def __init__(self, route: Route, key: Labels, created: float):
+        self.route = route
+        self.key = key
+        self.anchor = created + route.group_wait
+        self.firing = set()
+        self.resolved = set()
+        self.last_flush: Optional[float] = None
+        self.scheduled: Optional[float] = None
+        self.alerts = 0
+
+    def next_tick(self, t: float) -> float:
+        """First flush at or after t: group_wait after creation, then every group_interval"""
+        if t <= self.anchor:
+            tick = self.anchor
+        else:
+            tick = self.anchor + math.ceil((t - self.anchor) / self.route.group_interval) * self.route.group_interval
+        if self.last_flush is not None and tick <= self.last_flush:
+            tick = self.last_flush + self.route.group_interval
+        return tick
+
+
+class NotificationLog:
+    """What was last sent for a group, as Alertmanager's nflog keeps it"""
+
+    __slots__ = ('firing', 'resolved', 'at')
+
+    def __init__(self, firing: frozenset, resolved: frozenset, at: float):
+        self.firing = firing
+        self.resolved = resolved
+        self.at = at
+
+
+def needs_update(entry: Optional[NotificationLog], firing: set, resolved: set, now: float,
+                 repeat: float, send_resolved: bool) -> bool:
+    """Alertmanager's DedupStage decision"""
+    if entry is None:
+        return bool(firing)
+    if not firing <= entry.firing:
+        return True
+    if not firing:
+        return bool(entry.firing)
+    if send_resolved and not resolved <= entry.resolved:
+        return True
+    return entry.at <= now - repeat
+
+
+class ReceiverStats:
+    """Counters for one receiver"""
+
+    def __init__(self, name: str, send_resolved: Optional[bool]):
+        self.name = name
+        self.send_resolved = send_resolved
+        self.notifications = 0
+        self.alerts_sent = 0
+        self.largest = 0
+        self.uninhibited = 0
+        self.groups = 0
+        self.peak_groups = 0
+        self.live_groups = 0
+        self.times = array('d')
+
+
+class RoutingSimulator:
+    """
+    Event-driven Alertmanager model.
+
+    Alerts arrive at the start of each episode and resolve at its end.
+    Groups flush on their group_wait/group_interval grid, but only ticks
+    with something to decide are simulated. Every flush is judged twice:
+    with the inhibit rules applied and without them, which measures how
+    many notifications inhibition saves.
+    """
+
+    def __init__(self, config: Dict):
+        self.root = Route(config.get('route') or {})
+        self.send_resolved = receiver_send_resolved(config.get('receivers') or [])
+        self.rules = [InhibitRule(rule, i) for i, rule in enumerate(config.get('inhibit_rules') or [])]
+        self.receivers: Dict[str, ReceiverStats] = {}
+        for route in self.root.walk():
+            name = route.receiver or '(none)'
+            if name not in self.receivers:
+                self.receivers[name] = ReceiverStats(name, self.send_resolved.get(name))
+        self.groups: Dict[Tuple[str, Labels], Group] = {}
+        self.log: Dict[Tuple[str, Labels], NotificationLog] = {}
+        self.shadow_log: Dict[Tuple[str, Labels], NotificationLog] = {}
+        self.route_groups: Dict[str, int] = {}
+        self.events = 0
+        self.flushes = 0
+        self.routed = 0
+        self._flushes: List[Tuple[float, int, Group]] = []
+        self._seq = 0
+        # Per label set: [(route, group key)], source and target (rule, key) pairs
+        self._plans: Dict[int, list] = {}
+        self._sources: Dict[int, list] = {}
+        self._targets: Dict[int, list] = {}
+        # Inhibition state: firing sources and firing targets per (rule, key)
+        self._active_sources: Dict[Tuple[int, Tuple], set] = {}
+        self._active_targets: Dict[Tuple[int, Tuple], set] = {}
+        self._mute_count: Dict[int, int] = {}
+        self.muted: set = set()
+        self.rule_sources = [0] * len(self.rules)
+        self.rule_targets = [0] * len(self.rules)
+        self.rule_inhibitions = [0] * len(self.rules)
+        self.rule_suppressed = [0] * len(self.rules)
+        self._groups_of: Dict[int, list] = {}
+
+    # -- alert intake ---------------------------------------------------------
+
+    def _prepare(self, fp: int, labels: Labels):
+        labelmap = dict(labels)
+        routes = self.root.match(labelmap)
+        self._plans[fp] = [(route, route.group_key(labelmap)) for route in routes]
+        self._sources[fp] = [(rule.index, rule.key(labelmap)) for rule in self.rules
+                             if all(m.matches(labelmap) for m in rule.source)]
+        self._targets[fp] = [(rule.index, rule.key(labelmap)) for rule in self.rules
+                             if all(m.matches(labelmap) for m in rule.target)]
+
+    def _schedule(self, group: Group, t: float):
+        scheduled = group.scheduled
+        if scheduled is not None and scheduled < t + group.route.group_interval:
+            return  # already due on the next tick
+        tick = group.next_tick(t)
+        if group.scheduled is None or tick < group.scheduled:
+            group.scheduled = tick
+            self._seq += 1
+            heapq.heappush(self._flushes, (tick, self._seq, group))
+
+    def _set_muted(self, fp: int, delta: int, rule: int, t: float):
+        count = self._mute_count.get(fp, 0) + delta
+        self._mute_count[fp] = count
+        if count > 0 and fp not in self.muted:
+            self.muted.add(fp)
+            self.rule_inhibitions[rule] += 1
+        elif count == 0 and fp in self.muted:
+            self.muted.discard(fp)
+        for group in self._groups_of.get(fp, ()):
+            self._schedule(group, t)
+
+    def _effective(self, sources: set, fp: int) -> int:
+        """Sources that can inhibit fp (an alert never inhibits itself)"""
+        return len(sources) - (fp in sources)
+
+    def _source_change(self, fp: int, firing: bool, t: float):
+        for rule, key in self._sources[fp]:
+            sources = self._active_sources.setdefault((rule, key), set())
+            targets = self._active_targets.get((rule, key), ())
+            before = {target: self._effective(sources, target) > 0 for target in targets} if len(sources) <= 2 else None
+            if firing:
+                sources.add(fp)
+                self.rule_sources[rule] += 1
+            else:
+                sources.discard(fp)
+            if before is None:
+                continue
+            for target, was in before.items():
+                now = self._effective(sources, target) > 0
+                if now != was:
+                    self._set_muted(target, 1 if now else -1, rule, t)
+
+    def _target_change(self, fp: int, firing: bool, t: float):
+        for rule, key in self._targets[fp]:
+            targets = self._active_targets.setdefault((rule, key), set())
+            sources = self._active_sources.get((rule, key), ())
+            inhibited = self._effective(sources, fp) > 0 if sources else False
+            if firing:
+                targets.add(fp)
+                self.rule_targets[rule] += 1
+                if inhibited:
+                    self._set_muted(fp, 1, rule, t)
+            else:
+                targets.discard(fp)
+                if inhibited:
+                    self._set_muted(fp, -1, rule, t)
+
+    def fire(self, fp: int, labels: Labels, t: float):
+        if fp not in self._plans:
+            self._prepare(fp, labels)
+        self.events += 1
+        groups = []
+        for route, key in self._plans[fp]:
+            group_id = (route.path, key)
+            group = self.groups.get(group_id)
+            if group is None:
+                group = self.groups[group_id] = Group(route, key, t)
+                stats = self.receivers[route.receiver or '(none)']
+                stats.groups += 1
+                stats.live_groups += 1
+                stats.peak_groups = max(stats.peak_groups, stats.live_groups)
+                self.route_groups[route.path] = self.route_groups.get(route.path, 0) + 1
+            group.firing.add(fp)
+            group.resolved.discard(fp)
+            group.alerts += 1
+            groups.append(group)
+            self._schedule(group, t)
+        self.routed += len(groups)
+        self._groups_of[fp] = groups
+        if self._sources[fp]:
+            self._source_change(fp, True, t)
+        if self._targets[fp]:
+            self._target_change(fp, True, t)
+
+    def resolve(self, fp: int, t: float):
+        self.events += 1
+        for group in self._groups_of.pop(fp, ()):
+            group.firing.discard(fp)
+            group.resolved.add(fp)
+            self._schedule(group, t)
+        if self._sources[fp]:
+            self._source_change(fp, False, t)
+        if self._targets[fp]:
+            self._target_change(fp, False, t)
+
+    # -- flushing -------------------------------------------------------------
+
+    def flush(self, group: Group, t: float):
+        group.scheduled = None
+        group.last_flush = t
+        self.flushes += 1
+        route = group.route
+        group_id = (route.path, group.key)
+        stats = self.receivers[route.receiver or '(none)']
+        send_resolved = bool(stats.send_resolved)
+
+        firing = group.firing - self.muted if self.muted else group.firing
+        entry = self.log.get(group_id)
+        shadow = self.shadow_log.get(group_id)
+        # Without muted alerts both decisions are the same; share the log entry
+        shared = entry is shadow and len(firing) == len(group.firing)
+        if (firing or group.resolved) and needs_update(entry, firing, group.resolved, t,
+                                                       route.repeat_interval, send_resolved):
+            resolved = frozenset(group.resolved)
+            entry = self.log[group_id] = NotificationLog(frozenset(firing), resolved, t)
+            # Integrations drop resolved alerts unless send_resolved is set
+            size = len(firing) + (len(resolved) if send_resolved else 0)
+            if size:
+                stats.notifications += 1
+                stats.alerts_sent += size
+                stats.largest = max(stats.largest, size)
+                stats.times.append(t)
+                if len(firing) < len(group.firing):
+                    for fp in group.firing - firing:
+                        self.rule_suppressed[self._inhibiting_rule(fp)] += 1
+            if shared:
+                shadow = self.shadow_log[group_id] = entry
+                if size:
+                    stats.uninhibited += 1
+
+        if not shared and (group.firing or group.resolved) and needs_update(
+                shadow, group.firing, group.resolved, t, route.repeat_interval, send_resolved):
+            shadow = self.shadow_log[group_id] = NotificationLog(frozenset(group.firing),
+                                                                 frozenset(group.resolved), t)
+            if group.firing or send_resolved:
+                stats.uninhibited += 1
+
+        group.resolved.clear()
+        if not group.firing:
+            del self.groups[group_id]
+            stats.live_groups -= 1
+            return
+        due = [log.at + route.repeat_interval for log in (entry, shadow) if log is not None]
+        if due:
+            self._schedule(group, min(due))
+
+    def _inhibiting_rule(self, fp: int) -> int:
+        for rule, key in self._targets.get(fp, ()):
+            sources = self._active_sources.get((rule, key))
+            if sources and self._effective(sources, fp) > 0:
+                return rule
+        return 0
+
+    def run(self, stream: AlertStream):
+        """Replay the stream, then flush until one group_interval after the last event"""
+        # The replay creates no reference cycles, but millions of live sets and
+        # tuples make the cyclic collector rescan them over and over
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self._replay(stream)
+        finally:
+            if enabled:
+                gc.enable()
+
+    def _replay(self, stream: AlertStream):
+        count = len(stream)
+        starts, ends, ids, labelsets = stream.starts, stream.ends, stream.ids, stream.labelsets
+        times = starts + ends
+        order = sorted(range(2 * count), key=times.__getitem__)
+        flushes = self._flushes
+        last = 0.0
+        for index in order:
+            t = times[index]
+            if t == math.inf:
+                break
+            last = t
+            while flushes and flushes[0][0] < t:
+                tick, _, group = heapq.heappop(flushes)
+                if group.scheduled == tick:
+                    self.flush(group, tick)
+            if index < count:
+                fp = ids[index]
+                self.fire(fp, labelsets[fp], t)
+            else:
+                self.resolve(ids[index - count], t)
+        until = last + max(route.group_wait + route.group_interval for route in self.root.walk())
+        while flushes and flushes[0][0] <= until:
+            tick, _, group = heapq.heappop(flushes)
+            if group.scheduled == tick:
+                self.flush(group, tick)
+
+
+# ============================================================================
+# Reporting
+# ============================================================================
+
+def peak_rate(times: array, window: float) -> Tuple[int, float]:
+    """Most notifications within any window-long interval, and where it starts"""
+    best, at, lo = 0, 0.0, 0
+    for hi in range(len(times)):
+        while times[hi] - times[lo] >= window:
+            lo += 1
+        if hi - lo + 1 > best:
+            best, at = hi - lo + 1, times[lo]
+    return best, at
+
+
+def build_report(simulator: RoutingSimulator, stream: AlertStream, window: float) -> Dict:
+    receivers = []
+    everything = array('d')
+    for stats in simulator.receivers.values():
+        peak, _ = peak_rate(stats.times, window)
+        everything.extend(stats.times)
+        receivers.append({
+            'receiver': stats.name,
+            'send_resolved': stats.send_resolved,
+            'notifications': stats.notifications,
+            'notifications_without_inhibition': stats.uninhibited,
+            'alerts_sent': stats.alerts_sent,
+            'largest_notification': stats.largest,
+            'groups': stats.groups,
+            'peak_concurrent_groups': stats.peak_groups,
+            'peak_notifications': peak,
+        })
+    everything = array('d', sorted(everything))
+    peak, peak_at = peak_rate(everything, window)
+    origin = min(stream.starts) if len(stream) else 0.0
+    inhibit = [{
+        'rule': rule.describe(),
+        'sources_fired': simulator.rule_sources[rule.index],
+        'targets_fired': simulator.rule_targets[rule.index],
+        'inhibitions': simulator.rule_inhibitions[rule.index],
+        'suppressed_in_notifications': simulator.rule_suppressed[rule.index],
+    } for rule in simulator.rules]
+    return {
+        'alerts': len(stream),
+        'label_sets': len(stream.labelsets),
+        'routed': simulator.routed,
+        'flushes': simulator.flushes,
+        'groups_by_route': simulator.route_groups,
+        'receivers': receivers,
+        'inhibit_rules': inhibit,
+        'peak_window_seconds': window,
+        'peak_notifications': peak,
+        'peak_offset_seconds': peak_at - origin if peak else None,
+    }
+
+
+def print_report(report: Dict):
+    window = promql.format_duration(report['peak_window_seconds'])
+    print(f"\n{Colors.HEADER}{Colors.BOLD}Notifications per receiver{Colors.END}")
+    print(f"  {'Receiver':<20} {'Sent':>9} {'No inhib.':>10} {'Alerts':>11} {'Largest':>8} "
+          f"{'Groups':>8} {'Peak grp':>9} {'Peak/' + window:>10}")
+    for r in report['receivers']:
+        note = '' if r['send_resolved'] is not None else f"  {Colors.YELLOW}(no integrations){Colors.END}"
+        print(f"  {r['receiver']:<20} {r['notifications']:>9,} {r['notifications_without_inhibition']:>10,} "
+              f"{r['alerts_sent']:>11,} {r['largest_notification']:>8,} {r['groups']:>8,} "
+              f"{r['peak_concurrent_groups']:>9,} {r['peak_notifications']:>10,}{note}")
+
+    print(f"\n{Colors.HEADER}{Colors.BOLD}Group fan-out{Colors.END}")
+    routed = report['routed']
+    print(f"  {report['alerts']:,} alert(s) over {report['label_sets']:,} label set(s) → "
+          f"{routed:,} routed ({routed / max(report['alerts'], 1):.2f} route(s) per alert)")
+    for path, groups in sorted(report['groups_by_route'].items()):
+        print(f"  {path:<20} {groups:>9,} group(s)")
+    sent = sum(r['notifications'] for r in report['receivers'])
+    if sent:
+        alerts = sum(r['alerts_sent'] for r in report['receivers'])
+        print(f"  {alerts / sent:.1f} alert(s) per notification on average")
+
+    print(f"\n{Colors.HEADER}{Colors.BOLD}Inhibition{Colors.END}")
+    if not report['inhibit_rules']:
+        print(f"  {Colors.CYAN}ℹ No inhibit rules configured{Colors.END}")
+    for rule in report['inhibit_rules']:
+        color = Colors.GREEN if rule['inhibitions'] else Colors.YELLOW
+        print(f"  {color}{rule['rule']}{Colors.END}")
+        print(f"    sources fired {rule['sources_fired']:,}, targets fired {rule['targets_fired']:,}, "
+              f"inhibited {rule['inhibitions']:,}, alerts kept out of notifications "
+              f"{rule['suppressed_in_notifications']:,}")
+        if rule['sources_fired'] and rule['targets_fired'] and not rule['inhibitions']:
+            print(f"    {Colors.YELLOW}⚠ Sources and targets both fired but never shared the equal "
+                  f"labels{Colors.END}")
+    without = sum(r['notifications_without_inhibition'] for r in report['receivers'])
+    if without:
+        print(f"  Notifications: {sent:,} with inhibition vs {without:,} without "
+              f"({(without - sent) / without * 100:.1f}% saved)")
+
+    print(f"\n{Colors.HEADER}{Colors.BOLD}Peak notification rate{Colors.END}")
+    if report['peak_offset_seconds'] is None:
+        print(f"  {Colors.CYAN}ℹ No notification was sent{Colors.END}")
+        return
+    offset = int(report['peak_offset_seconds'])
+    print(f"  {report['peak_notifications']:,} notification(s) within {window}, starting "
+          f"{offset // 3600:02d}:{offset % 3600 // 60:02d}:{offset % 60:02d} into the stream")
+
+
+def main():
+    """Main entry point for the Alertmanager routing simulator"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Replay alert streams through the Alertmanager routing, grouping and inhibition config",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python alertmanager_sim.py --synthetic --alerts 50000 --hours 6
+  python alertmanager_sim.py --events replay-events.json
+  python alertmanager_sim.py --export alerts.json --config candidate.yml
+  python alertmanager_sim.py --benchmark
+
+--events reads alert_replay.py --output files; --export reads a query_range
+response for ALERTS{alertstate="firing"} (e.g. from the Prometheus API).
+The benchmark replays one million synthetic alerts.
+        """
+    )
+
+    parser.add_argument("--config", default=str(ALERTMANAGER_CONFIG), help="Alertmanager configuration")
+    parser.add_argument("--events", action="append", default=[], help="alert_replay.py event JSON (repeatable)")
+    parser.add_argument("--export", action="append", default=[],
+                        help="query_range JSON of ALERTS{alertstate=\"firing\"} (repeatable)")
+    parser.add_argument("--synthetic", action="store_true", help="Generate node-failure storms and noise")
+    parser.add_argument("--benchmark", action="store_true", help="Replay 1M synthetic alerts and report speed")
+    parser.add_argument("--alerts", type=int, help="Synthetic alerts (default 100000, 1000000 for --benchmark)")
+    parser.add_argument("--hours", type=float, default=24.0, help="Synthetic stream span")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for synthetic streams")
+    parser.add_argument("--peak-window", default="1m", help="Window for the peak notification rate")
+    parser.add_argument("-o", "--output", help="Write the report as JSON")
+
+    args = parser.parse_args()
+
+    if not (args.events or args.export or args.synthetic or args.benchmark):
+        parser.error("one of --events, --export, --synthetic or --benchmark is required")
+
+    print(f"{Colors.HEADER}{Colors.BOLD}Alertmanager Routing Simulator{Colors.END}")
+    try:
+        config = yaml_lite.load_file(Path(args.config)) or {}
+        simulator = RoutingSimulator(config)
+    except (OSError, ValueError, KeyError, re.error) as e:
+        print(f"{Colors.RED}✗ Failed to load {args.config}: {e}{Colors.END}")
+        sys.exit(1)
+    routes = sum(1 for _ in simulator.root.walk())
+    print(f"{Colors.GREEN}✓ Loaded {routes} route(s), {len(simulator.receivers)} receiver(s), "
+          f"{len(simulator.rules)} inhibit rule(s){Colors.END}")
+
+    stream = AlertStream()
+    started = time.time()
+    try:
+        for path in args.events:
+            load_replay_events(stream, Path(path))
+        for path in args.export:
+            load_alerts_export(stream, Path(path))
+        if args.synthetic or args.benchmark:
+            count = args.alerts or (1_000_000 if args.benchmark else 100_000)
+            generate_synthetic(stream, count, args.hours, args.seed)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"{Colors.RED}✗ Failed to load alerts: {e}{Colors.END}")
+        sys.exit(1)
+    merged = stream.merge_overlaps()
+    print(f"{Colors.GREEN}✓ Loaded {len(stream):,} alert(s) over {len(stream.labelsets):,} label set(s) "
+          f"in {time.time() - started:.2f}s ({merged:,} overlapping episode(s) merged){Colors.END}")
+    if not len(stream):
+        print(f"{Colors.YELLOW}⚠ Nothing to replay{Colors.END}")
+        sys.exit(1)
+
+    started = time.time()
+    try:
+        simulator.run(stream)
+    except KeyboardInterrupt:
+        print(f"\n{Colors.YELLOW}⚠ Stopped{Colors.END}")
+        sys.exit(130)
+    elapsed = time.time() - started
+    finite = [t for t in stream.ends if t != math.inf]
+    span = (max(finite) if finite else max(stream.starts)) - min(stream.starts)
+    print(f"{Colors.GREEN}✓ Replayed {len(stream):,} alert(s) ({simulator.events:,} events, "
+          f"{simulator.flushes:,} flushes) in {elapsed:.2f}s - {len(stream) / max(elapsed, 1e-9):,.0f} alerts/s, "
+          f"{span / max(elapsed, 1e-9):,.0f}x real time{Colors.END}")
+
+    report = build_report(simulator, stream, promql.parse_duration(args.peak_window))
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n{Colors.GREEN}✓ Report written to {args.output}{Colors.END}")
+
+    print(f"\n{Colors.GREEN}{Colors.BOLD}🎉 Routing simulation completed successfully!{Colors.END}\n")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
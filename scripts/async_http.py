@@ -0,0 +1,253 @@
+"""
+Minimal asyncio HTTP/1.1 Server and Client
+Keep-alive server and pooled client built on asyncio streams, shared by the proxy
+and receiver tools in this folder so they stay dependency-free
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+REASONS = {
+    200: 'OK', 202: 'Accepted', 204: 'No Content', 304: 'Not Modified',
+    400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 429: 'Too Many Requests',
+    500: 'Internal Server Error', 502: 'Bad Gateway', 503: 'Service Unavailable',
+    504: 'Gateway Timeout',
+}
+
+MAX_BODY = 64 * 1024 * 1024
+
+
+class Request:
+    """An incoming HTTP request"""
+
+    __slots__ = ('method', 'target', 'path', 'query', 'headers', 'body')
+
+    def __init__(self, method: str, target: str, headers: Dict[str, str], body: bytes):
+        self.method = method
+        self.target = target
+        parsed = urlparse(target)
+        self.path = parsed.path
+        self.query = parse_qs(parsed.query)
+        self.headers = headers
+        self.body = body
+
+    def arg(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """Return the first value of a query or form parameter"""
+        values = self.query.get(name)
+        return values[0] if values else default
+
+
+class Response:
+    """An outgoing HTTP response"""
+
+    __slots__ = ('status', 'headers', 'body')
+
+    def __init__(self, status: int = 200, body: bytes = b'', headers: Optional[Dict[str, str]] = None,
+                 content_type: Optional[str] = None):
+        self.status = status
+        self.body = body
+        self.headers = dict(headers or {})
+        if content_type:
+            self.headers['Content-Type'] = content_type
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> Optional[Tuple[str, Dict[str, str]]]:
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        return None
+    lines = head.decode('latin-1').split('\r\n')
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    return lines[0], headers
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: Dict[str, str]) -> bytes:
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        parts = []
+        total = 0
+        while True:
+            size_line = await reader.readuntil(b'\r\n')
+            size = int(size_line.split(b';')[0].strip(), 16)
+            if size == 0:
+                await reader.readuntil(b'\r\n')
+                break
+            total += size
+            if total > MAX_BODY:
+                raise ValueError("Body too large")
+            parts.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        return b''.join(parts)
+
+    length = int(headers.get('content-length') or 0)
+    if length > MAX_BODY:
+        raise ValueError("Body too large")
+    return await reader.readexactly(length) if length else b''
+
+
+Handler = Callable[[Request], Awaitable[Response]]
+
+
+class HTTPServer:
+    """Keep-alive HTTP/1.1 server dispatching every request to one async handler"""
+
+    def __init__(self, handler: Handler, host: str = '0.0.0.0', port: int = 8080):
+        """
+        Initialize the server.
+
+        Args:
+            handler: Coroutine turning a Request into a Response
+            host: Listen address
+            port: Listen port (0 picks a free port)
+        """
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def start(self):
+        """Start listening; the bound port is stored in self.port"""
+        self._server = await asyncio.start_server(self._serve, self.host, self.port, limit=MAX_BODY)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """Start (if needed) and serve until cancelled"""
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Stop accepting connections"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                parsed = await _read_headers(reader)
+                if parsed is None:
+                    break
+                request_line, headers = parsed
+                try:
+                    method, target, version = request_line.split(' ', 2)
+                    body = await _read_body(reader, headers)
+                except (ValueError, asyncio.IncompleteReadError):
+                    await self._write(writer, Response(400, b'bad request'), keep_alive=False)
+                    break
+
+                try:
+                    response = await self.handler(Request(method, target, headers, body))
+                except Exception as e:  # keep serving on handler bugs
+                    response = Response(500, str(e).encode('utf-8'), content_type='text/plain')
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                await self._write(writer, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass  # loop shutdown with an idle keep-alive connection
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _write(writer: asyncio.StreamWriter, response: Response, keep_alive: bool):
+        reason = REASONS.get(response.status, 'Unknown')
+        head = [f"HTTP/1.1 {response.status} {reason}"]
+        response.headers.setdefault('Content-Length', str(len(response.body)))
+        response.headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+        for name, value in response.headers.items():
+            head.append(f"{name}: {value}")
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + response.body)
+        await writer.drain()
+
+
+class HTTPClient:
+    """Pooled keep-alive HTTP/1.1 client for a single upstream"""
+
+    def __init__(self, base_url: str, max_connections: int = 8, timeout: float = 30.0):
+        """
+        Initialize the client.
+
+        Args:
+            base_url: Upstream base URL (http only)
+            max_connections: Maximum concurrent connections
+            timeout: Per-request timeout in seconds
+        """
+        parsed = urlparse(base_url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 80
+        self.base_path = parsed.path.rstrip('/')
+        self.timeout = timeout
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self.max_connections = max_connections
+        self._slots = None  # created lazily inside the running loop
+
+    async def request(self, method: str, path: str, body: bytes = b'',
+                      headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Send a request and read the full response.
+
+        Args:
+            method: HTTP method
+            path: Path (appended to the base path) including query string
+            body: Request body
+            headers: Extra request headers
+
+        Returns:
+            Tuple of (status, lower-cased headers, body)
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_connections)
+        async with self._slots:
+            return await asyncio.wait_for(self._request(method, path, body, headers or {}), self.timeout)
+
+    async def _request(self, method, path, body, headers):
+        for attempt in range(2):
+            reused = bool(self._idle)
+            if reused:
+                reader, writer = self._idle.pop()
+            else:
+                reader, writer = await asyncio.open_connection(self.host, self.port, limit=MAX_BODY)
+
+            head = [f"{method} {self.base_path}{path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                    f"Content-Length: {len(body)}"]
+            for name, value in headers.items():
+                head.append(f"{name}: {value}")
+
+            try:
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+                await writer.drain()
+                parsed = await _read_headers(reader)
+                if parsed is None:
+                    raise ConnectionError("Connection closed by upstream")
+                status_line, response_headers = parsed
+                response_body = await _read_body(reader, response_headers)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if reused and attempt == 0:
+                    continue  # stale pooled connection; retry once on a fresh one
+                raise
+
+            if response_headers.get('connection', '').lower() == 'close':
+                writer.close()
+            else:
+                self._idle.append((reader, writer))
+            return int(status_line.split(' ')[1]), response_headers, response_body
+
+        raise ConnectionError("Upstream request failed")
+
+    async def close(self):
+        """Close pooled connections"""
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
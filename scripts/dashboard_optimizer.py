@@ -0,0 +1,763 @@
+"""
+Grafana Dashboard Query Linter and Rewriter
+Scores the Prometheus queries of every dashboard panel (series touched, step,
+points per refresh and refresh rate), flags fixed rate windows, missing
+maxDataPoints and fast auto-refresh, rewrites queries onto existing recording
+rules and writes patched dashboards with a before/after load estimate
+"""
+
+import copy
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import promql
+from alert_rule_optimizer import PROMETHEUS_DIR, CostModel, RecordingRule, expand, load_recordings
+from prom_cardinality import PrometheusClient
+
+
+class Colors:
+    """ANSI color codes for terminal output"""
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    END = '\033[0m'
+    BOLD = '\033[1m'
+
+
+GRAFANA_DIR = Path(__file__).parent.parent / 'grafana'
+
+# Functions whose window should follow $__rate_interval rather than a literal
+RATE_FUNCTIONS = {'rate', 'irate', 'increase'}
+
+# Datasources whose targets are not PromQL
+NON_PROMETHEUS = ('loki', 'elasticsearch', 'jaeger', 'tempo', 'influx', 'mysql', 'postgres')
+
+# Aggregations that keep the grouping labels of every input series, so a
+# matcher on one of those labels can move from the input to the output
+FILTERABLE_AGGREGATORS = {'sum', 'avg', 'min', 'max', 'count', 'group', 'stddev', 'stdvar'}
+
+# Grafana's rangeutil.roundInterval: (upper bound, rounded interval) in seconds
+ROUND_INTERVALS = [
+    (0.015, 0.01), (0.035, 0.02), (0.075, 0.05), (0.15, 0.1), (0.35, 0.2), (0.75, 0.5),
+    (1.5, 1), (3.5, 2), (7.5, 5), (12.5, 10), (17.5, 15), (25, 20), (45, 30),
+    (90, 60), (210, 120), (450, 300), (750, 600), (1050, 900), (1500, 1200), (2700, 1800),
+    (5400, 3600), (9000, 7200), (16200, 10800), (24300, 21600), (64800, 43200),
+    (604800, 86400), (1814400, 604800), (3628800, 2592000),
+]
+
+VARIABLE_RE = re.compile(r'\$\{(\w+)(?::[^}]*)?\}|\$(\w+)|\[\[(\w+)(?::[^\]]*)?\]\]')
+
+# Placeholders substituted for template variables so expressions parse; chosen
+# so format_expr renders them verbatim (durations are not whole minutes)
+DURATION_PLACEHOLDER = 99900001
+NUMBER_PLACEHOLDER = 88800001
+
+
+def round_interval(seconds: float) -> float:
+    """Round a raw interval the way Grafana does before using it as step"""
+    for bound, rounded in ROUND_INTERVALS:
+        if seconds < bound:
+            return rounded
+    return 31536000
+
+
+def parse_interval(text, variables: Dict[str, float]) -> Optional[float]:
+    """A panel or target interval such as 30s, >1m or $var, in seconds"""
+    if not text:
+        return None
+    text = str(text).strip().lstrip('>')
+    match = VARIABLE_RE.fullmatch(text)
+    if match:
+        return variables.get(next(g for g in match.groups() if g))
+    try:
+        return promql.parse_duration(text)
+    except promql.PromQLError:
+        return None
+
+
+def relative_seconds(text) -> Optional[float]:
+    """Seconds before now for Grafana time expressions such as now-6h or now-7d/d"""
+    text = str(text).strip()
+    if text.startswith('now'):
+        text = text[3:].split('/')[0]
+        if not text:
+            return 0.0
+        if text.startswith('-'):
+            try:
+                return promql.parse_duration(text[1:])
+            except promql.PromQLError:
+                return None
+    return None
+
+
+# ============================================================================
+# Queries
+# ============================================================================
+
+class PanelQuery:
+    """A target expression with template variables swapped for parseable placeholders"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens: Dict[str, str] = {}       # placeholder text -> variable as written
+        self.durations: Dict[float, str] = {}  # placeholder seconds -> variable name
+        self.node = promql.parse(self._protect(text))
+
+    def _protect(self, text: str) -> str:
+        output = []
+        quote = None
+        i = 0
+        while i < len(text):
+            char = text[i]
+            if quote:
+                output.append(char)
+                if char == '\\':
+                    output.append(text[i + 1:i + 2])
+                    i += 1
+                elif char == quote:
+                    quote = None
+                i += 1
+                continue
+            if char in '"\'`':
+                quote = char
+            match = VARIABLE_RE.match(text, i) if char in '$[' else None
+            if match and (char == '$' or text[i + 1:i + 2] == '['):
+                name = next(g for g in match.groups() if g)
+                before = ''.join(output).rstrip()
+                output.append(self._placeholder(match.group(0), name,
+                                                before.endswith(('[', ':')) or before.endswith('offset')))
+                i = match.end()
+                continue
+            output.append(char)
+            i += 1
+        return ''.join(output)
+
+    def _placeholder(self, written: str, name: str, duration: bool) -> str:
+        if duration:
+            seconds = float(self.duration_placeholder(name))
+            token = promql.format_duration(seconds)
+        else:
+            token = str(NUMBER_PLACEHOLDER + len(self.tokens))
+        self.tokens[token] = written
+        return token
+
+    def duration_placeholder(self, name: str, written: Optional[str] = None) -> float:
+        """Placeholder seconds standing for a duration variable, allocated on first use"""
+        for seconds, existing in self.durations.items():
+            if existing == name:
+                return seconds
+        seconds = float(DURATION_PLACEHOLDER + len(self.durations))
+        if seconds % 60 == 0:
+            raise promql.PromQLError("Too many template variables in one expression")
+        self.durations[seconds] = name
+        if written is not None:
+            self.tokens[promql.format_duration(seconds)] = written
+        return seconds
+
+    def render(self, node: promql.Node) -> str:
+        """PromQL text with the template variables put back"""
+        text = promql.format_expr(node)
+        for token in sorted(self.tokens, key=lambda t: (not t.endswith('s'), -len(t))):
+            text = text.replace(token, self.tokens[token])
+        return text
+
+    def concrete(self, node: promql.Node, values: Dict[str, float]) -> promql.Node:
+        """
+        The expression as Prometheus would run it, for cost estimates.
+
+        Duration variables take their value for this panel and matchers on
+        multi-value variables match any value (the "All" selection).
+        """
+        def resolve(current):
+            if isinstance(current, promql.VectorSelector):
+                matchers = []
+                for matcher in current.matchers:
+                    if VARIABLE_RE.search(matcher.value):
+                        if matcher.op in ('!=', '!~'):
+                            continue
+                        matcher = promql.Matcher(matcher.label, '=~', '.+')
+                    matchers.append(matcher)
+                window = current.range
+                if window in self.durations:
+                    window = values.get(self.durations[window], values['__interval'])
+                return promql.VectorSelector(current.name, matchers, window, current.offset)
+            return None
+        return promql.replace(node, resolve)
+
+
+# ============================================================================
+# Recording rules
+# ============================================================================
+
+def output_labels(node: promql.Node) -> Optional[Set[str]]:
+    """
+    Labels a matcher may be moved across: the expression's output labels, or
+    None when every input label is kept.
+    """
+    node = promql.strip_parens(node)
+    if isinstance(node, promql.VectorSelector):
+        return None
+    if isinstance(node, promql.Aggregate):
+        if node.op not in FILTERABLE_AGGREGATORS or node.without:
+            return set()
+        return set(node.grouping or [])
+    if isinstance(node, promql.Call):
+        if node.func == 'histogram_quantile' and len(node.args) == 2:
+            inner = output_labels(node.args[1])
+            return None if inner is None else inner - {'le'}
+        if node.func in ('label_replace', 'label_join', 'absent', 'absent_over_time', 'vector', 'scalar'):
+            return set()
+        vectors = [arg for arg in node.args if not isinstance(arg, (promql.NumberLiteral, promql.StringLiteral))]
+        return output_labels(vectors[0]) if vectors else set()
+    if isinstance(node, promql.BinaryExpr):
+        if node.matching is not None and node.matching.card:
+            return set()
+        sides = [output_labels(side) for side in (node.lhs, node.rhs)
+                 if not isinstance(promql.strip_parens(side), promql.NumberLiteral)]
+        labels = None
+        for side in sides:
+            labels = side if labels is None else labels if side is None else labels & side
+        return labels
+    if isinstance(node, promql.Unary):
+        return output_labels(node.expr)
+    return set()
+
+
+def _matching_key(matching: Optional[promql.VectorMatching]):
+    if matching is None:
+        return None
+    return matching.on, sorted(matching.labels), matching.card, sorted(matching.include)
+
+
+def _unify(query: promql.Node, rule: promql.Node, movable: Optional[Set[str]],
+           variable_ranges: Dict[float, str], state: Dict) -> bool:
+    """
+    Whether a query sub-expression computes the rule body, possibly narrowed.
+
+    Extra matchers on movable labels are allowed when every selector carries
+    the same ones; they are collected in state['extra'] and re-applied to the
+    recorded series. A range given by a template variable matches the rule's
+    window, which is noted in state['window'].
+    """
+    query = promql.strip_parens(query)
+    rule = promql.strip_parens(rule)
+    if type(query) is not type(rule):
+        return False
+
+    if isinstance(query, promql.VectorSelector):
+        if query.name != rule.name or query.offset != rule.offset or (query.range is None) != (rule.range is None):
+            return False
+        if query.range != rule.range:
+            if query.range not in variable_ranges:
+                return False
+            state['window'] = (variable_ranges[query.range], rule.range)
+        required = {(m.label, m.op, m.value) for m in rule.matchers}
+        present = [(m.label, m.op, m.value) for m in query.matchers]
+        if not required.issubset(present):
+            return False
+        extra = sorted(m for m in present if m not in required)
+        if any(label == '__name__' or (movable is not None and label not in movable) for label, _, _ in extra):
+            return False
+        if state.setdefault('extra', extra) != extra:
+            return False
+        return True
+
+    if isinstance(query, promql.NumberLiteral):
+        return query.value == rule.value
+    if isinstance(query, promql.StringLiteral):
+        return query.value == rule.value
+    if isinstance(query, promql.Aggregate):
+        if (query.op, query.without, sorted(query.grouping or [])) != (rule.op, rule.without, sorted(rule.grouping or [])):
+            return False
+        if (query.param is None) != (rule.param is None):
+            return False
+        if query.param is not None and not _unify(query.param, rule.param, movable, variable_ranges, state):
+            return False
+        return _unify(query.expr, rule.expr, movable, variable_ranges, state)
+    if isinstance(query, promql.Call):
+        return (query.func == rule.func and len(query.args) == len(rule.args)
+                and all(_unify(q, r, movable, variable_ranges, state) for q, r in zip(query.args, rule.args)))
+    if isinstance(query, promql.BinaryExpr):
+        if (query.op, query.return_bool, _matching_key(query.matching)) != \
+                (rule.op, rule.return_bool, _matching_key(rule.matching)):
+            return False
+        return (_unify(query.lhs, rule.lhs, movable, variable_ranges, state)
+                and _unify(query.rhs, rule.rhs, movable, variable_ranges, state))
+    if isinstance(query, promql.Unary):
+        return query.op == rule.op and _unify(query.expr, rule.expr, movable, variable_ranges, state)
+    if isinstance(query, promql.Subquery):
+        return ((query.range, query.step, query.offset) == (rule.range, rule.step, rule.offset)
+                and _unify(query.expr, rule.expr, movable, variable_ranges, state))
+    return False
+
+
+class RecordingIndex:
+    """Existing recording rules, matched structurally against dashboard sub-expressions"""
+
+    def __init__(self, rules: List[RecordingRule]):
+        bodies = {rule.name: rule.body for rule in rules}
+        self.records = bodies
+        self.rules = []
+        for rule in rules:
+            body = promql.strip_parens(expand(rule.body, bodies))
+            self.rules.append((rule.name, body, output_labels(body)))
+        # Prefer the rule covering the most of the query
+        self.rules.sort(key=lambda entry: -sum(1 for _ in promql.walk(entry[1])))
+        # Range windows each recorded series was computed over
+        self.windows = {name: {s.range for s in promql.selectors(body) if s.range is not None}
+                        for name, body, _ in self.rules}
+
+    def _windows(self, node: promql.Node) -> Set[float]:
+        """Range windows an expression reads, taking recorded series at their recorded window"""
+        windows = set()
+        for selector in promql.selectors(node):
+            if selector.range is not None:
+                windows.add(selector.range)
+            else:
+                windows |= self.windows.get(selector.name, set())
+        return windows
+
+    def rewrite(self, node: promql.Node, variable_ranges: Dict[float, str]) -> Tuple[promql.Node, List[str]]:
+        """
+        Replace the largest sub-expressions that have a recording rule.
+
+        Operands of a binary expression are only replaced together: when one
+        side uses a recorded series, the other must not read raw ranges and
+        both must cover the same window, so a ratio never divides rates taken
+        over different windows.
+
+        Returns:
+            (rewritten expression, one note per substitution)
+        """
+        def substitute(current: promql.Node, notes: List[str]) -> promql.Node:
+            def mapping(node):
+                if isinstance(node, (promql.NumberLiteral, promql.StringLiteral, promql.VectorSelector)):
+                    return None
+                for name, body, movable in self.rules:
+                    state: Dict = {}
+                    if _unify(node, body, movable, variable_ranges, state):
+                        matchers = [promql.Matcher(*m) for m in state.get('extra', [])]
+                        note = f"uses recording rule {name}"
+                        if 'window' in state:
+                            variable, window = state['window']
+                            note += f" (recorded [{promql.format_duration(window)}] window instead of ${variable})"
+                        notes.append(note)
+                        return promql.VectorSelector(name, matchers)
+                if isinstance(node, promql.BinaryExpr):
+                    return operands(node, notes)
+                return None
+
+            return promql.replace(current, mapping)
+
+        def operands(node: promql.BinaryExpr, notes: List[str]) -> promql.Node:
+            sides, found = [], []
+            for side in (node.lhs, node.rhs):
+                side_notes: List[str] = []
+                sides.append(substitute(side, side_notes))
+                found.extend(side_notes)
+            if found:
+                raw = any(s.range is not None for side in sides for s in promql.selectors(side))
+                windows = [w for w in (self._windows(side) for side in sides) if w]
+                if raw or any(w != windows[0] for w in windows) or any(len(w) > 1 for w in windows):
+                    return node
+            notes.extend(found)
+            return promql.BinaryExpr(node.op, sides[0], sides[1], node.return_bool, node.matching)
+
+        notes: List[str] = []
+        return substitute(node, notes), notes
+
+
+# ============================================================================
+# Linting
+# ============================================================================
+
+class PanelReport:
+    """Cost and findings for one panel"""
+
+    def __init__(self, title: str):
+        self.title = title
+        self.series = 0
+        self.step = 0.0
+        self.points = 0
+        self.step_after = 0.0
+        self.points_after = 0
+        self.before = 0
+        self.after = 0
+        self.findings: List[str] = []
+        self.fixes: List[str] = []
+
+
+class DashboardReport:
+    """Panels, dashboard-level findings and load estimates for one dashboard"""
+
+    def __init__(self, path: Path, title: str):
+        self.path = path
+        self.title = title
+        self.refresh: Optional[float] = None
+        self.refresh_after: Optional[float] = None
+        self.findings: List[str] = []
+        self.fixes: List[str] = []
+        self.panels: List[PanelReport] = []
+        self.patched: Optional[Dict] = None
+
+    @property
+    def before(self) -> int:
+        return sum(panel.before for panel in self.panels)
+
+    @property
+    def after(self) -> int:
+        return sum(panel.after for panel in self.panels)
+
+    def rate(self, after: bool) -> Optional[float]:
+        """Samples per second one open viewer costs through auto-refresh"""
+        refresh = self.refresh_after if after else self.refresh
+        if not refresh:
+            return None
+        return (self.after if after else self.before) / refresh
+
+
+def iter_panels(dashboard: Dict):
+    """Every panel, including those nested in collapsed rows and old-style rows"""
+    for panel in dashboard.get('panels', []):
+        yield panel
+        for child in panel.get('panels', []):
+            yield child
+    for row in dashboard.get('rows', []):
+        for panel in row.get('panels', []):
+            yield panel
+
+
+def is_prometheus(panel: Dict, target: Dict) -> bool:
+    if 'expr' not in target or target.get('hide'):
+        return False
+    for datasource in (target.get('datasource'), panel.get('datasource')):
+        if isinstance(datasource, dict) and datasource.get('type'):
+            return datasource['type'] == 'prometheus'
+        if isinstance(datasource, str) and datasource:
+            return not any(kind in datasource.lower() for kind in NON_PROMETHEUS)
+    return True
+
+
+class DashboardLinter:
+    """Scores panel queries and produces patched dashboards"""
+
+    def __init__(self, index: RecordingIndex, cost: CostModel, min_refresh: float = 30.0,
+                 max_data_points: int = 500, max_fixed_window: float = 300.0, max_series: int = 100,
+                 screen_width: int = 1920):
+        """
+        Initialize the linter.
+
+        Args:
+            index: Existing recording rules
+            cost: Samples-per-evaluation model (live series counts when it has a client)
+            min_refresh: Shortest acceptable auto-refresh in seconds
+            max_data_points: maxDataPoints set on panels that have none
+            max_fixed_window: Literal rate windows up to this long are replaced by $__rate_interval
+            max_series: Raw (unaggregated) series per query before it is flagged
+            screen_width: Dashboard width in pixels, which Grafana uses as the default maxDataPoints
+        """
+        self.index = index
+        self.cost = cost
+        self.min_refresh = min_refresh
+        self.max_data_points = max_data_points
+        self.max_fixed_window = max_fixed_window
+        self.max_series = max_series
+        self.screen_width = screen_width
+
+    def step(self, range_seconds: float, max_data_points: int, min_interval: float, factor: int) -> float:
+        """Grafana's query step for a panel"""
+        step = max(round_interval(range_seconds / max(max_data_points, 1)), min_interval) * max(factor, 1)
+        return max(step, range_seconds / 11000)
+
+    def lint(self, path: Path, document: Dict) -> DashboardReport:
+        """Analyze one dashboard file; the report carries the patched document"""
+        patched = copy.deepcopy(document)
+        dashboard = patched.get('dashboard', patched)
+        original = document.get('dashboard', document)
+        report = DashboardReport(path, original.get('title') or path.stem)
+        scrape = self.cost.scrape_interval
+
+        time_range = original.get('time') or {}
+        start, end = relative_seconds(time_range.get('from', 'now-6h')), relative_seconds(time_range.get('to', 'now'))
+        range_seconds = (start - end) if start is not None and end is not None and start > end else 6 * 3600
+
+        report.refresh = report.refresh_after = parse_interval(original.get('refresh'), {})
+        if report.refresh and report.refresh < self.min_refresh:
+            report.refresh_after = self.min_refresh
+            report.findings.append(f"auto-refresh every {original['refresh']} re-runs every query "
+                                   f"{3600 / report.refresh:,.0f} times an hour per viewer")
+            dashboard['refresh'] = promql.format_duration(self.min_refresh)
+            report.fixes.append(f"refresh {original['refresh']} -> {dashboard['refresh']}")
+        intervals = (dashboard.get('timepicker') or {}).get('refresh_intervals')
+        if intervals:
+            kept = [value for value in intervals if (parse_interval(value, {}) or 0) >= self.min_refresh]
+            if kept and kept != intervals:
+                dashboard['timepicker']['refresh_intervals'] = kept
+                report.fixes.append(f"refresh picker limited to {', '.join(kept)}")
+
+        variables = {'__range': range_seconds, '__range_s': range_seconds}
+        for variable in (original.get('templating') or {}).get('list', []):
+            current = (variable.get('current') or {}).get('value')
+            if isinstance(current, list):
+                current = current[0] if current else None
+            value = parse_interval(current, {}) if variable.get('type') in ('interval', 'custom', 'constant') else None
+            if value:
+                variables[variable.get('name', '')] = value
+
+        for panel, patched_panel in zip(iter_panels(original), iter_panels(dashboard)):
+            targets = [(t, pt) for t, pt in zip(panel.get('targets') or [], patched_panel.get('targets') or [])
+                       if is_prometheus(panel, t)]
+            if targets:
+                report.panels.append(self._lint_panel(panel, patched_panel, targets, range_seconds,
+                                                      variables, scrape))
+
+        if report.fixes or any(panel.fixes for panel in report.panels):
+            report.patched = patched
+        return report
+
+    def _lint_panel(self, panel: Dict, patched_panel: Dict, targets: List[Tuple[Dict, Dict]],
+                    range_seconds: float, variables: Dict[str, float], scrape: float) -> PanelReport:
+        result = PanelReport(panel.get('title') or f"panel {panel.get('id', '?')}")
+        width = (panel.get('gridPos') or {}).get('w', 12)
+        max_data_points = panel.get('maxDataPoints') or int(width / 24 * self.screen_width)
+        max_data_points_after = max_data_points
+        if not panel.get('maxDataPoints'):
+            max_data_points_after = min(max_data_points, self.max_data_points)
+            result.findings.append(f"no maxDataPoints: Grafana asks for one point per pixel "
+                                   f"(~{max_data_points:,})")
+            if max_data_points_after < max_data_points:
+                patched_panel['maxDataPoints'] = max_data_points_after
+                result.fixes.append(f"maxDataPoints {max_data_points_after}")
+
+        panel_interval = parse_interval(panel.get('interval'), variables)
+        for target, patched_target in targets:
+            min_interval = parse_interval(target.get('interval'), variables) or panel_interval or scrape
+            factor = int(target.get('intervalFactor') or 1)
+            step = self.step(range_seconds, max_data_points, min_interval, factor)
+            step_after = self.step(range_seconds, max_data_points_after, min_interval, factor)
+            result.step, result.step_after = max(result.step, step), max(result.step_after, step_after)
+            points, points_after = int(range_seconds / step) + 1, int(range_seconds / step_after) + 1
+            result.points += points
+            result.points_after += points_after
+
+            ref = target.get('refId', '?')
+            try:
+                query = PanelQuery(str(target['expr']))
+            except promql.PromQLError as e:
+                result.findings.append(f"{ref}: not analyzed ({e})")
+                continue
+
+            values = dict(variables, __interval=step, __interval_ms=step * 1000,
+                          __rate_interval=max(step + scrape, 4 * scrape))
+            values_after = dict(values, __interval=step_after, __interval_ms=step_after * 1000,
+                                __rate_interval=max(step_after + scrape, 4 * scrape))
+            concrete = query.concrete(query.node, values)
+            series = sum(self.cost.series_count(s, {}) for s in promql.selectors(concrete))
+            result.series += series
+            result.before += self.cost.samples(concrete, {}) * points
+
+            if self.cost.client is not None and series > self.max_series \
+                    and not isinstance(promql.strip_parens(query.node), promql.Aggregate):
+                result.findings.append(f"{ref}: returns up to {series:,} raw series; aggregate it or "
+                                       f"add a recording rule")
+
+            # Exact recording-rule matches first, then again once fixed windows became $__rate_interval
+            node, notes = self.index.rewrite(query.node, query.durations)
+            node = self._fix_windows(query, node, result, ref, scrape)
+            node, more = self.index.rewrite(node, query.durations)
+            for note in notes + more:
+                result.fixes.append(f"{ref}: {note}")
+            if node is not query.node:
+                rewritten = query.render(node)
+                if rewritten != query.render(query.node):
+                    patched_target['expr'] = rewritten
+            result.after += self.cost.samples(query.concrete(node, values_after), self.index.records) * points_after
+        return result
+
+    def _fix_windows(self, query: PanelQuery, node: promql.Node, result: PanelReport, ref: str,
+                     scrape: float) -> promql.Node:
+        """Flag literal rate windows and swap short ones for $__rate_interval"""
+        fixed = []
+
+        def mapping(current):
+            if isinstance(current, promql.Call) and current.func in RATE_FUNCTIONS and current.args:
+                selector = promql.strip_parens(current.args[0])
+                if isinstance(selector, promql.VectorSelector) and selector.range is not None \
+                        and selector.range not in query.durations:
+                    window = promql.format_duration(selector.range)
+                    problem = f"{current.func}(...[{window}]) uses a fixed window"
+                    if selector.range < 4 * scrape:
+                        problem += f" shorter than 4 scrape intervals ({promql.format_duration(4 * scrape)})"
+                    result.findings.append(f"{ref}: {problem}")
+                    if selector.range <= self.max_fixed_window:
+                        fixed.append(window)
+                        placeholder = query.duration_placeholder('__rate_interval', '$__rate_interval')
+                        return promql.Call(current.func, [promql.VectorSelector(
+                            selector.name, selector.matchers, placeholder, selector.offset)] + current.args[1:])
+            return None
+
+        node = promql.replace(node, mapping)
+        if fixed:
+            result.fixes.append(f"{ref}: [{', '.join(sorted(set(fixed)))}] -> [$__rate_interval]")
+        return node
+
+
+# ============================================================================
+# Report
+# ============================================================================
+
+def format_samples(value: float) -> str:
+    for unit, size in (('G', 1e9), ('M', 1e6), ('k', 1e3)):
+        if value >= size:
+            return f"{value / size:.1f}{unit}"
+    return f"{value:.0f}"
+
+
+def print_report(reports: List[DashboardReport], unit: str):
+    """Per-panel costs, findings and fixes, then totals"""
+    for report in reports:
+        refresh = promql.format_duration(report.refresh) if report.refresh else 'off'
+        print(f"\n{Colors.HEADER}{Colors.BOLD}{report.title}{Colors.END} ({report.path.name}, refresh {refresh})")
+        for finding in report.findings:
+            print(f"  {Colors.YELLOW}⚠{Colors.END} {finding}")
+        for fix in report.fixes:
+            print(f"  {Colors.GREEN}→{Colors.END} {fix}")
+        print(f"  {'Panel':<34} {'Series':>8} {'Step':>6} {'Points':>8} {'Before':>9} {'After':>9}")
+        for panel in report.panels:
+            series = f"{panel.series:,}" if unit == 'samples' else '-'
+            print(f"  {panel.title[:34]:<34} {series:>8} {promql.format_duration(panel.step):>6} "
+                  f"{panel.points:>8,} {format_samples(panel.before):>9} {format_samples(panel.after):>9}")
+            for finding in panel.findings:
+                print(f"      {Colors.YELLOW}⚠{Colors.END} {finding}")
+            for fix in panel.fixes:
+                print(f"      {Colors.GREEN}→{Colors.END} {fix}")
+
+    before = sum(report.before for report in reports)
+    after = sum(report.after for report in reports)
+    rate_before = sum(report.rate(False) or 0 for report in reports)
+    rate_after = sum(report.rate(True) or 0 for report in reports)
+    print(f"\n{Colors.HEADER}{Colors.BOLD}Load estimate{Colors.END}")
+    pct = (before - after) / before * 100 if before else 0
+    print(f"  Per full load of every dashboard: {format_samples(before)} -> {format_samples(after)} {unit} "
+          f"({Colors.GREEN if after < before else Colors.YELLOW}{pct:.0f}% fewer{Colors.END})")
+    if rate_before:
+        pct = (rate_before - rate_after) / rate_before * 100
+        print(f"  Auto-refresh, per open viewer:    {format_samples(rate_before)}/s -> "
+              f"{format_samples(rate_after)}/s {unit} ({Colors.GREEN}{pct:.0f}% fewer{Colors.END})")
+
+
+def load_dashboards(paths: List[Path]) -> List[Tuple[Path, Path, Dict]]:
+    """(root, file, document) for every dashboard JSON under the given files or directories"""
+    found = []
+    for root in paths:
+        files = [root] if root.is_file() else sorted(root.rglob('*.json'))
+        for path in files:
+            with open(path, encoding='utf-8') as f:
+                document = json.load(f)
+            if isinstance(document, dict) and isinstance(document.get('dashboard', document), dict) \
+                    and ('panels' in document.get('dashboard', document) or 'rows' in document.get('dashboard', document)):
+                found.append((root if root.is_dir() else root.parent, path, document))
+    return found
+
+
+def main():
+    """Main entry point for the dashboard optimizer"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Lint Grafana dashboards' Prometheus queries and rewrite them onto recording rules",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python dashboard_optimizer.py
+  python dashboard_optimizer.py ../grafana/dashboards/applications --offline
+  python dashboard_optimizer.py --output /tmp/optimized-dashboards
+  python dashboard_optimizer.py --apply --min-refresh 1m
+
+Without --apply or --output only the report is printed. Costs are samples read
+per dashboard load (Prometheus series counts via count(); with --offline,
+samples per series). Recording rules come from the file generated by
+alert_rule_optimizer.py.
+        """
+    )
+
+    parser.add_argument("paths", nargs='*', type=Path, default=[GRAFANA_DIR / 'dashboards'],
+                        help="Dashboard JSON files or directories (default: grafana/dashboards)")
+    parser.add_argument("--prometheus-url", default="http://localhost:9090", help="Prometheus base URL")
+    parser.add_argument("--offline", action="store_true", help="Do not contact Prometheus")
+    parser.add_argument("--recording-rules", type=Path,
+                        default=PROMETHEUS_DIR / 'recording-rules' / 'app-recording-rules.yml',
+                        help="Recording rule file to rewrite queries onto")
+    parser.add_argument("--scrape-interval", default="15s", help="Scrape interval (default: 15s)")
+    parser.add_argument("--min-refresh", default="30s", help="Shortest allowed auto-refresh (default: 30s)")
+    parser.add_argument("--max-data-points", type=int, default=500, help="maxDataPoints for panels without one")
+    parser.add_argument("--max-fixed-window", default="5m",
+                        help="Rate windows up to this are replaced by $__rate_interval (default: 5m)")
+    parser.add_argument("--max-series", type=int, default=100, help="Raw series per query before flagging")
+    parser.add_argument("--screen-width", type=int, default=1920, help="Dashboard width in pixels")
+    parser.add_argument("--output", type=Path, help="Write patched dashboards to this directory")
+    parser.add_argument("--apply", action="store_true", help="Patch dashboards in place")
+
+    args = parser.parse_args()
+
+    try:
+        scrape_interval = promql.parse_duration(args.scrape_interval)
+        min_refresh = promql.parse_duration(args.min_refresh)
+        max_fixed_window = promql.parse_duration(args.max_fixed_window)
+    except promql.PromQLError as e:
+        parser.error(str(e))
+
+    missing = [str(path) for path in args.paths if not path.exists()]
+    if missing:
+        print(f"{Colors.YELLOW}⚠ Not found: {', '.join(missing)}{Colors.END}")
+    try:
+        dashboards = load_dashboards([path for path in args.paths if path.exists()])
+        rules = load_recordings(args.recording_rules)
+    except (OSError, ValueError) as e:
+        print(f"{Colors.RED}✗ Failed to load inputs: {e}{Colors.END}")
+        sys.exit(1)
+    if not dashboards:
+        print(f"{Colors.YELLOW}⚠ No dashboards found{Colors.END}")
+        sys.exit(0)
+    print(f"{Colors.GREEN}✓ Loaded {len(dashboards)} dashboard(s) and {len(rules)} recording rule(s){Colors.END}")
+
+    client = None
+    if not args.offline:
+        client = PrometheusClient(args.prometheus_url, timeout=10)
+        try:
+            client.get('/api/v1/status/buildinfo')
+        except RuntimeError as e:
+            print(f"{Colors.YELLOW}⚠ Prometheus unavailable ({e}); estimating per series{Colors.END}")
+            client = None
+
+    linter = DashboardLinter(RecordingIndex(rules), CostModel(scrape_interval, client), min_refresh=min_refresh,
+                             max_data_points=args.max_data_points, max_fixed_window=max_fixed_window,
+                             max_series=args.max_series, screen_width=args.screen_width)
+    reports = [linter.lint(path, document) for _, path, document in dashboards]
+    print_report(reports, 'samples' if client is not None else 'samples/series')
+
+    patched = [(root, report) for (root, _, _), report in zip(dashboards, reports) if report.patched is not None]
+    if args.apply or args.output:
+        for root, report in patched:
+            target = report.path if args.apply else args.output / report.path.relative_to(root)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(json.dumps(report.patched, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+            print(f"{Colors.GREEN}✓ Wrote {target}{Colors.END}")
+        if not patched:
+            print(f"\n{Colors.GREEN}✓ Nothing to patch{Colors.END}")
+    elif patched:
+        print(f"\n{Colors.CYAN}ℹ {len(patched)} dashboard(s) would be patched; "
+              f"pass --output DIR or --apply to write them{Colors.END}")
+
+    print(f"\n{Colors.GREEN}{Colors.BOLD}🎉 Dashboard analysis completed successfully!{Colors.END}\n")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,852 @@
+"""
+Elasticsearch Bulk Backfill Importer
+Streams historical log files (plain or gzip) straight into Elasticsearch's _bulk API,
+applying the same field normalization as elk/logstash/pipeline/logstash.conf
+"""
+
+import gzip
+import hashlib
+import http.client
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+class Colors:
+    """ANSI color codes for terminal output"""
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    END = '\033[0m'
+    BOLD = '\033[1m'
+
+
+# Mirrors the "Tag logs containing exception stack traces" filter
+EXCEPTION_PATTERN = re.compile(r'Exception|Error|Traceback')
+
+# Timestamp formats accepted by the logstash date filters
+TIMESTAMP_FORMATS = ('%Y-%m-%d %H:%M:%S,%f', '%Y-%m-%d %H:%M:%S')
+
+ERROR_LEVELS = ('error', 'fatal', 'critical')
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """
+    Parse a timestamp the way the logstash date filter does.
+
+    Args:
+        value: ISO8601 or 'yyyy-MM-dd HH:mm:ss[,SSS]' string
+
+    Returns:
+        Timezone-aware datetime, or None if the value cannot be parsed
+    """
+    if not isinstance(value, str) or not value:
+        return None
+
+    text = value.strip()
+    if text.endswith('Z'):
+        text = text[:-1] + '+00:00'
+
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        parsed = None
+        for fmt in TIMESTAMP_FORMATS:
+            try:
+                parsed = datetime.strptime(text, fmt)
+                break
+            except ValueError:
+                continue
+        if parsed is None:
+            return None
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def add_tag(event: Dict, tag: str):
+    """Append a tag to the event, creating the tags list if needed"""
+    tags = event.get('tags')
+    if not isinstance(tags, list):
+        tags = [tags] if tags else []
+        event['tags'] = tags
+    if tag not in tags:
+        tags.append(tag)
+
+
+def normalize_event(event: Dict) -> Dict:
+    """
+    Apply the logstash.conf filter chain to a single event.
+
+    Grok, GeoIP and user-agent enrichment need Logstash plugins and are not
+    reproduced; everything else follows the pipeline in the same order.
+
+    Args:
+        event: Raw event dictionary (modified in place)
+
+    Returns:
+        The normalized event
+    """
+    tags = event.get('tags') or []
+
+    # JSON parsing of app / http payloads
+    if event.get('type') == 'app' or 'http' in tags:
+        message = event.get('message')
+        if isinstance(message, str) and message.startswith('{'):
+            try:
+                parsed = json.loads(message)
+            except ValueError:
+                parsed = None
+            if isinstance(parsed, dict):
+                renames = (
+                    ('level', 'log_level'),
+                    ('timestamp', 'log_timestamp'),
+                    ('logger', 'logger_name'),
+                    ('message', 'log_message'),
+                )
+                for source, target in renames:
+                    if source in parsed:
+                        event[target] = parsed[source]
+
+    # HTTP status code categories
+    if event.get('response') not in (None, ''):
+        try:
+            response = int(event['response'])
+        except (TypeError, ValueError):
+            response = None
+        if response is not None:
+            if response >= 500:
+                add_tag(event, 'error_5xx')
+            elif response >= 400:
+                add_tag(event, 'error_4xx')
+            elif response >= 300:
+                add_tag(event, 'redirect_3xx')
+            elif response >= 200:
+                add_tag(event, 'success_2xx')
+
+    # Kubernetes metadata
+    kubernetes = event.get('kubernetes')
+    if isinstance(kubernetes, dict):
+        event['k8s_namespace'] = kubernetes.get('namespace')
+        event['k8s_pod'] = (kubernetes.get('pod') or {}).get('name')
+        event['k8s_container'] = (kubernetes.get('container') or {}).get('name')
+        event['k8s_node'] = (kubernetes.get('node') or {}).get('name')
+
+        message = event.get('message')
+        if isinstance(message, str) and message.startswith('{') and message.endswith('}'):
+            try:
+                event['container_log'] = json.loads(message)
+            except ValueError:
+                pass
+
+    # Date parsing - later matches win, as in the pipeline
+    for field in ('log_timestamp', 'timestamp'):
+        parsed_time = parse_timestamp(event.get(field))
+        if parsed_time is not None:
+            event['@timestamp'] = parsed_time.isoformat()
+
+    # Field mutations
+    event.pop('@version', None)
+    event.pop('host', None)
+
+    if not event.get('environment'):
+        event['environment'] = 'unknown'
+
+    if isinstance(event.get('log_level'), str):
+        event['log_level'] = event['log_level'].lower()
+
+    if event.get('response_time') not in (None, ''):
+        try:
+            event['response_time'] = float(event['response_time'])
+        except (TypeError, ValueError):
+            pass
+
+    if event.get('bytes') not in (None, ''):
+        try:
+            event['bytes'] = int(float(event['bytes']))
+        except (TypeError, ValueError):
+            pass
+
+    # Error detection
+    if event.get('log_level') in ERROR_LEVELS:
+        add_tag(event, 'error')
+
+    message = event.get('message')
+    if isinstance(message, str) and EXCEPTION_PATTERN.search(message):
+        add_tag(event, 'exception')
+
+    return event
+
+
+def target_indices(event: Dict, prefix: str = "logs") -> List[str]:
+    """
+    Determine every index an event is written to, mirroring the output block.
+
+    Args:
+        event: Normalized event
+        prefix: Index prefix (logs by default)
+
+    Returns:
+        List of index names
+    """
+    stamp = parse_timestamp(event.get('@timestamp'))
+    if stamp is None:
+        stamp = datetime.now(timezone.utc)
+        event['@timestamp'] = stamp.isoformat()
+    day = stamp.strftime('%Y.%m.%d')
+
+    indices = [f"{prefix}-{day}"]
+    tags = event.get('tags') or []
+    if 'error' in tags or 'exception' in tags:
+        indices.append(f"{prefix}-errors-{day}")
+    if event.get('kubernetes'):
+        indices.append(f"{prefix}-kubernetes-{day}")
+    return indices
+
+
+class Chunk:
+    """A contiguous run of source lines encoded as one _bulk request body"""
+
+    __slots__ = ('seq', 'first_line', 'last_line', 'end_offset', 'actions', 'body_size')
+
+    def __init__(self, seq: int, first_line: int):
+        self.seq = seq
+        self.first_line = first_line
+        self.last_line = first_line
+        self.end_offset = 0
+        self.actions = []  # list of (action_line, source_line) byte pairs
+        self.body_size = 0
+
+    def body(self, actions: Optional[List[Tuple[bytes, bytes]]] = None) -> bytes:
+        """Render the NDJSON body for the given (or all) actions"""
+        parts = []
+        for action, source in (self.actions if actions is None else actions):
+            parts.append(action)
+            parts.append(source)
+        return b''.join(parts)
+
+
+class Checkpoint:
+    """
+    Resume state for a single input file.
+
+    Chunks finish out of order when several workers run, so the checkpoint
+    only advances over a contiguous prefix of completed chunks.
+    """
+
+    def __init__(self, path: Optional[Path], source: Path):
+        self.path = path
+        self.source = source
+        self.line = 0
+        self.offset = 0
+        self._pending = {}
+        self._next_seq = 0
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+
+    def load(self) -> bool:
+        """
+        Load a previous checkpoint if it matches the current source file.
+
+        Returns:
+            True if a usable checkpoint was found
+        """
+        if self.path is None or not self.path.exists():
+            return False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        entry = state.get(str(self.source.resolve()))
+        if not entry or entry.get('size') != self.source.stat().st_size:
+            return False
+
+        self.line = int(entry.get('line', 0))
+        self.offset = int(entry.get('offset', 0))
+        return self.line > 0
+
+    def complete(self, chunk: Chunk):
+        """Record a finished chunk and advance the contiguous watermark"""
+        with self._lock:
+            self._pending[chunk.seq] = chunk
+            advanced = False
+            while self._next_seq in self._pending:
+                done = self._pending.pop(self._next_seq)
+                self.line = done.last_line
+                self.offset = done.end_offset
+                self._next_seq += 1
+                advanced = True
+            if advanced and time.monotonic() - self._last_save > 1.0:
+                self._save_locked()
+
+    def save(self):
+        """Persist the checkpoint immediately"""
+        with self._lock:
+            self._save_locked()
+
+    def _save_locked(self):
+        if self.path is None:
+            return
+
+        state = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = {}
+
+        state[str(self.source.resolve())] = {
+            'size': self.source.stat().st_size,
+            'line': self.line,
+            'offset': self.offset,
+            'updated': datetime.now(timezone.utc).isoformat(),
+        }
+
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self._last_save = time.monotonic()
+
+
+class ChunkSizer:
+    """
+    Adaptive bulk request sizing (additive increase, multiplicative decrease).
+
+    Grows the chunk while Elasticsearch answers quickly and halves it whenever
+    a request is throttled with 429 rejections or exceeds the latency target.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, target_latency: float):
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.step = max(minimum, initial // 4)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, rejected: bool):
+        """Adjust the target chunk size from one bulk response"""
+        with self._lock:
+            if rejected or latency > self.target_latency:
+                self.size = max(self.minimum, self.size // 2)
+            else:
+                self.size = min(self.maximum, self.size + self.step)
+
+    def current(self) -> int:
+        """Return the current target chunk size in bytes"""
+        with self._lock:
+            return self.size
+
+
+class BulkImporter:
+    """
+    Streams log files into Elasticsearch through the _bulk API.
+
+    Features:
+    - Plain and gzip input with constant memory (bounded work queue)
+    - Same normalization as logstash.conf
+    - Concurrent keep-alive workers
+    - Adaptive chunk sizing with 429 backpressure
+    - Deterministic document IDs and resumable checkpoints
+    """
+
+    def __init__(
+        self,
+        es_url: str = "http://localhost:9200",
+        workers: int = 4,
+        index_prefix: str = "logs",
+        event_type: Optional[str] = None,
+        chunk_bytes: int = 2 * 1024 * 1024,
+        max_chunk_bytes: int = 16 * 1024 * 1024,
+        target_latency: float = 2.0,
+        max_retries: int = 8,
+        checkpoint_file: Optional[Path] = None,
+        timeout: float = 60.0,
+    ):
+        """
+        Initialize the importer.
+
+        Args:
+            es_url: Elasticsearch base URL
+            workers: Number of concurrent bulk workers
+            index_prefix: Prefix for daily indices (logs → logs-YYYY.MM.dd)
+            event_type: Value for the 'type' field when the line does not set one
+            chunk_bytes: Initial bulk request size in bytes
+            max_chunk_bytes: Upper bound for adaptive chunk sizing
+            target_latency: Bulk latency (seconds) above which chunks shrink
+            max_retries: Retries per chunk for rejected or failed requests
+            checkpoint_file: JSON file used to resume interrupted imports
+            timeout: Socket timeout for bulk requests
+        """
+        parsed = urlparse(es_url)
+        self.es_scheme = parsed.scheme or 'http'
+        self.es_host = parsed.hostname or 'localhost'
+        self.es_port = parsed.port or (443 if self.es_scheme == 'https' else 9200)
+        self.es_path = parsed.path.rstrip('/')
+        self.workers = max(1, workers)
+        self.index_prefix = index_prefix
+        self.event_type = event_type
+        self.max_retries = max_retries
+        self.checkpoint_file = checkpoint_file
+        self.timeout = timeout
+        self.sizer = ChunkSizer(chunk_bytes, 64 * 1024, max_chunk_bytes, target_latency)
+
+        self.stats = {
+            'lines': 0,
+            'documents': 0,
+            'indexed': 0,
+            'failed': 0,
+            'rejected_429': 0,
+            'requests': 0,
+            'bytes': 0,
+        }
+        self._stats_lock = threading.Lock()
+        self._errors = []
+        self._stop = threading.Event()
+        self._undelivered = threading.Event()
+
+    def print_header(self, message: str):
+        """Print a formatted header message"""
+        print(f"\n{Colors.HEADER}{Colors.BOLD}{'=' * 70}{Colors.END}")
+        print(f"{Colors.HEADER}{Colors.BOLD}{message.center(70)}{Colors.END}")
+        print(f"{Colors.HEADER}{Colors.BOLD}{'=' * 70}{Colors.END}\n")
+
+    def print_success(self, message: str):
+        """Print a success message"""
+        print(f"{Colors.GREEN}✓ {message}{Colors.END}")
+
+    def print_error(self, message: str):
+        """Print an error message"""
+        print(f"{Colors.RED}✗ {message}{Colors.END}")
+
+    def print_warning(self, message: str):
+        """Print a warning message"""
+        print(f"{Colors.YELLOW}⚠ {message}{Colors.END}")
+
+    def print_info(self, message: str):
+        """Print an info message"""
+        print(f"{Colors.CYAN}ℹ {message}{Colors.END}")
+
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for key, value in deltas.items():
+                self.stats[key] += value
+
+    def open_source(self, path: Path):
+        """
+        Open a log file for binary line iteration.
+
+        Args:
+            path: Plain or gzip-compressed log file
+
+        Returns:
+            Binary file object
+        """
+        with open(path, 'rb') as probe:
+            magic = probe.read(2)
+        if magic == b'\x1f\x8b':
+            return gzip.open(path, 'rb')
+        return open(path, 'rb')
+
+    def parse_line(self, raw: bytes) -> Optional[Dict]:
+        """
+        Turn one input line into an event dictionary.
+
+        JSON lines are used as-is; anything else becomes {"message": line}.
+
+        Args:
+            raw: Raw line bytes
+
+        Returns:
+            Event dictionary or None for blank lines
+        """
+        text = raw.decode('utf-8', errors='replace').rstrip('\r\n')
+        if not text.strip():
+            return None
+
+        event = None
+        if text.startswith('{'):
+            try:
+                event = json.loads(text)
+            except ValueError:
+                event = None
+        if not isinstance(event, dict):
+            event = {'message': text}
+
+        if self.event_type and 'type' not in event:
+            event['type'] = self.event_type
+        return event
+
+    def iter_chunks(self, path: Path, checkpoint: Checkpoint) -> Iterator[Chunk]:
+        """
+        Read, normalize and encode a file into bulk chunks.
+
+        Args:
+            path: Source log file
+            checkpoint: Resume position (lines before it are skipped)
+
+        Yields:
+            Chunks sized by the adaptive sizer
+        """
+        source_key = str(path.resolve()).encode('utf-8')
+        seq = 0
+        line_no = checkpoint.line
+
+        with self.open_source(path) as f:
+            is_plain = not isinstance(f, gzip.GzipFile)
+            if checkpoint.line:
+                if is_plain and checkpoint.offset:
+                    f.seek(checkpoint.offset)
+                else:
+                    # Gzip streams cannot seek; decompress and discard
+                    for _ in range(checkpoint.line):
+                        if not f.readline():
+                            break
+
+            chunk = Chunk(seq, line_no + 1)
+            limit = self.sizer.current()
+
+            for raw in f:
+                if self._stop.is_set():
+                    return
+
+                line_no += 1
+                self._count(lines=1)
+                event = self.parse_line(raw)
+
+                if event is not None:
+                    normalize_event(event)
+                    encoded = json.dumps(event, separators=(',', ':'), default=str).encode('utf-8') + b'\n'
+                    doc_id = hashlib.sha1(source_key + b':' + str(line_no).encode()).hexdigest()[:20]
+
+                    for index in target_indices(event, self.index_prefix):
+                        action = json.dumps(
+                            {'index': {'_index': index, '_id': doc_id}},
+                            separators=(',', ':')
+                        ).encode('utf-8') + b'\n'
+                        chunk.actions.append((action, encoded))
+                        chunk.body_size += len(action) + len(encoded)
+
+                chunk.last_line = line_no
+
+                if chunk.body_size >= limit:
+                    chunk.end_offset = f.tell() if is_plain else 0
+                    yield chunk
+                    seq += 1
+                    chunk = Chunk(seq, line_no + 1)
+                    limit = self.sizer.current()
+
+            if line_no >= chunk.first_line:
+                chunk.end_offset = f.tell() if is_plain else 0
+                yield chunk
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self.es_scheme == 'https':
+            return http.client.HTTPSConnection(self.es_host, self.es_port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.es_host, self.es_port, timeout=self.timeout)
+
+    def send_chunk(self, conn: http.client.HTTPConnection,
+                   chunk: Chunk) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        Send a chunk, retrying only the items Elasticsearch rejected.
+
+        Items refused with 429 or a 5xx status are retried; any other item
+        error is permanent and counted as failed without holding the chunk.
+
+        Args:
+            conn: Keep-alive connection owned by the calling worker
+            chunk: Chunk to index
+
+        Returns:
+            (the possibly reconnected connection, False if retryable failures ran out of retries)
+        """
+        pending = chunk.actions
+        backoff = 0.5
+
+        for attempt in range(self.max_retries + 1):
+            if not pending:
+                break
+
+            body = chunk.body(pending)
+            started = time.monotonic()
+            try:
+                conn.request(
+                    'POST',
+                    f"{self.es_path}/_bulk",
+                    body=body,
+                    headers={'Content-Type': 'application/x-ndjson'}
+                )
+                response = conn.getresponse()
+                payload = response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                conn = self._connect()
+                if len(self._errors) < 20:
+                    self._errors.append(str(e))
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+
+            latency = time.monotonic() - started
+            self._count(requests=1, bytes=len(body))
+
+            if status == 429:
+                self._count(rejected_429=len(pending))
+                self.sizer.record(latency, rejected=True)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+
+            if status >= 400:
+                if len(self._errors) < 20:
+                    self._errors.append(f"HTTP {status}: {payload[:200]!r}")
+                self.sizer.record(latency, rejected=False)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+
+            result = json.loads(payload)
+            retry = []
+            indexed = 0
+            failed = 0
+            throttled = 0
+
+            if result.get('errors'):
+                for item, action in zip(result.get('items', []), pending):
+                    outcome = next(iter(item.values()))
+                    item_status = outcome.get('status', 500)
+                    if item_status == 429 or item_status >= 500:
+                        throttled += item_status == 429
+                        retry.append(action)
+                    elif item_status >= 300:
+                        failed += 1
+                        if len(self._errors) < 20:
+                            self._errors.append(json.dumps(outcome.get('error', outcome))[:300])
+                    else:
+                        indexed += 1
+            else:
+                indexed = len(pending)
+
+            self._count(indexed=indexed, failed=failed, rejected_429=throttled)
+            self.sizer.record(latency, rejected=bool(retry))
+            pending = retry
+
+            if retry:
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+        if pending:
+            self._count(failed=len(pending))
+
+        self._count(documents=len(chunk.actions))
+        return conn, not pending
+
+    def _worker(self, work: "queue.Queue", checkpoint: Checkpoint):
+        conn = self._connect()
+        try:
+            while True:
+                chunk = work.get()
+                if chunk is None:
+                    break
+                if not self._stop.is_set():
+                    conn, delivered = self.send_chunk(conn, chunk)
+                    if delivered:
+                        checkpoint.complete(chunk)
+                    else:
+                        # Keep the checkpoint before this chunk so --resume retries it
+                        self._undelivered.set()
+                        self._stop.set()
+        finally:
+            conn.close()
+
+    def _print_progress(self, started: float):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        with self._stats_lock:
+            indexed = self.stats['indexed']
+            lines = self.stats['lines']
+            rejected = self.stats['rejected_429']
+        print(
+            f"\r{Colors.CYAN}Lines: {lines:,}  Indexed: {indexed:,}  "
+            f"Rate: {indexed / elapsed:,.0f} docs/s  "
+            f"Chunk: {self.sizer.current() // 1024} KB  429s: {rejected:,}{Colors.END}",
+            end='', flush=True
+        )
+
+    def import_file(self, path: Path) -> bool:
+        """
+        Import a single file.
+
+        Args:
+            path: Plain or gzip log file
+
+        Returns:
+            True if every document was indexed, False otherwise
+        """
+        checkpoint = Checkpoint(self.checkpoint_file, path)
+        if checkpoint.load():
+            self.print_info(f"Resuming {path.name} after line {checkpoint.line:,}")
+
+        # Bounded queue keeps memory at ~(2 × workers) chunks regardless of file size
+        work = queue.Queue(maxsize=self.workers * 2)
+        threads = [
+            threading.Thread(target=self._worker, args=(work, checkpoint), daemon=True)
+            for _ in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        failed_before = self.stats['failed']
+        started = time.monotonic()
+        last_report = 0.0
+
+        try:
+            for chunk in self.iter_chunks(path, checkpoint):
+                while True:
+                    if time.monotonic() - last_report > 1.0:
+                        self._print_progress(started)
+                        last_report = time.monotonic()
+                    try:
+                        work.put(chunk, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+        except KeyboardInterrupt:
+            self._stop.set()
+            raise
+        finally:
+            for _ in threads:
+                work.put(None)
+            for thread in threads:
+                thread.join()
+            checkpoint.save()
+            self._print_progress(started)
+            print()
+
+        return self.stats['failed'] == failed_before
+
+    def run(self, files: List[Path]) -> bool:
+        """
+        Import all files in order.
+
+        Args:
+            files: Input log files
+
+        Returns:
+            True if all files were imported without failures
+        """
+        self.print_header("ELASTICSEARCH BULK BACKFILL")
+        self.print_info(f"Target: {self.es_scheme}://{self.es_host}:{self.es_port}{self.es_path}")
+        self.print_info(f"Workers: {self.workers}, initial chunk: {self.sizer.current() // 1024} KB")
+
+        started = time.monotonic()
+        ok = True
+
+        for path in files:
+            if not path.exists():
+                self.print_error(f"File not found: {path}")
+                ok = False
+                continue
+
+            self.print_info(f"Importing {path} ({path.stat().st_size / 1024 / 1024:.1f} MB on disk)")
+            try:
+                if self.import_file(path):
+                    self.print_success(f"{path.name} imported")
+                elif self._undelivered.is_set():
+                    self.print_error(f"{path.name}: a chunk was not fully indexed after {self.max_retries} "
+                                     f"retries; stopping with the checkpoint before it")
+                    ok = False
+                    break
+                else:
+                    self.print_warning(f"{path.name} imported with failures")
+                    ok = False
+            except KeyboardInterrupt:
+                print()
+                self.print_warning("Interrupted - progress saved to checkpoint")
+                return False
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.print_header("IMPORT SUMMARY")
+        print(f"  Lines read:        {self.stats['lines']:,}")
+        print(f"  Documents indexed: {self.stats['indexed']:,}")
+        print(f"  Failed:            {self.stats['failed']:,}")
+        print(f"  429 rejections:    {self.stats['rejected_429']:,}")
+        print(f"  Bulk requests:     {self.stats['requests']:,}")
+        print(f"  Throughput:        {self.stats['indexed'] / elapsed:,.0f} docs/s, "
+              f"{self.stats['bytes'] / elapsed / 1024 / 1024:.1f} MB/s")
+
+        if self._errors:
+            self.print_warning("Sample errors:")
+            for error in self._errors[:5]:
+                print(f"  - {error}")
+
+        return ok
+
+
+def main():
+    """Main entry point for the bulk importer"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Backfill historical logs into Elasticsearch, bypassing Logstash",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python es_bulk_import.py app.log                          # Import one file
+  python es_bulk_import.py logs/*.gz --workers 8            # Many gzip files, 8 workers
+  python es_bulk_import.py app.log --type app               # Parse JSON payloads like type=app
+  python es_bulk_import.py app.log --checkpoint import.ckpt # Resumable import
+        """
+    )
+
+    parser.add_argument("files", nargs='+', type=Path, help="Plain or gzip log files")
+    parser.add_argument("--es-url", default="http://localhost:9200", help="Elasticsearch URL")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent bulk workers (default: 4)")
+    parser.add_argument("--index-prefix", default="logs", help="Daily index prefix (default: logs)")
+    parser.add_argument("--type", dest="event_type", default=None,
+                        help="Set 'type' on events that do not have one (e.g. app)")
+    parser.add_argument("--chunk-mb", type=float, default=2.0, help="Initial bulk size in MB (default: 2)")
+    parser.add_argument("--max-chunk-mb", type=float, default=16.0, help="Maximum bulk size in MB (default: 16)")
+    parser.add_argument("--target-latency", type=float, default=2.0,
+                        help="Shrink chunks when a bulk request takes longer (seconds)")
+    parser.add_argument("--checkpoint", type=Path, default=None, help="Checkpoint file for resuming")
+
+    args = parser.parse_args()
+
+    importer = BulkImporter(
+        es_url=args.es_url,
+        workers=args.workers,
+        index_prefix=args.index_prefix,
+        event_type=args.event_type,
+        chunk_bytes=int(args.chunk_mb * 1024 * 1024),
+        max_chunk_bytes=int(args.max_chunk_mb * 1024 * 1024),
+        target_latency=args.target_latency,
+        checkpoint_file=args.checkpoint,
+    )
+
+    if importer.run(args.files):
+        print(f"\n{Colors.GREEN}{Colors.BOLD}🎉 Backfill completed successfully!{Colors.END}\n")
+        sys.exit(0)
+    else:
+        print(f"\n{Colors.RED}{Colors.BOLD}❌ Backfill finished with errors{Colors.END}\n")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,468 @@
+"""
+Elasticsearch Streaming Log Exporter
+Streams query results from the logs-* indices to NDJSON or CSV using a point-in-time,
+search_after pagination and sliced parallelism across CPU cores
+"""
+
+import csv
+import http.client
+import json
+import multiprocessing
+import io
+import os
+import queue
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+
+class Colors:
+    """ANSI color codes for terminal output"""
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    END = '\033[0m'
+    BOLD = '\033[1m'
+
+
+# Columns used for CSV output when no --fields projection is given
+DEFAULT_CSV_FIELDS = ['@timestamp', 'type', 'environment', 'log_level', 'message', 'tags']
+
+
+class ElasticsearchClient:
+    """Minimal keep-alive JSON client for the Elasticsearch REST API"""
+
+    def __init__(self, es_url: str, timeout: float = 120.0):
+        """
+        Initialize the client.
+
+        Args:
+            es_url: Elasticsearch base URL
+            timeout: Socket timeout in seconds
+        """
+        parsed = urlparse(es_url)
+        self.scheme = parsed.scheme or 'http'
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or (443 if self.scheme == 'https' else 9200)
+        self.base_path = parsed.path.rstrip('/')
+        self.timeout = timeout
+        self._conn = None
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self._conn is None:
+            if self.scheme == 'https':
+                self._conn = http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+            else:
+                self._conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return self._conn
+
+    def request(self, method: str, path: str, body: Optional[Dict] = None, retries: int = 3) -> Dict:
+        """
+        Send a JSON request and decode the JSON response.
+
+        Args:
+            method: HTTP method
+            path: Request path (appended to the base path)
+            body: JSON body
+            retries: Retries on connection errors and 429/503 responses
+
+        Returns:
+            Decoded response body
+
+        Raises:
+            RuntimeError: If Elasticsearch keeps returning an error
+        """
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Content-Type': 'application/json'} if payload else {}
+        backoff = 0.5
+
+        for attempt in range(retries + 1):
+            try:
+                conn = self._connection()
+                conn.request(method, self.base_path + path, body=payload, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                self.close()
+                if attempt == retries:
+                    raise RuntimeError(f"{method} {path} failed: {e}")
+                time.sleep(backoff)
+                backoff *= 2
+                continue
+
+            if response.status in (429, 503) and attempt < retries:
+                time.sleep(backoff)
+                backoff *= 2
+                continue
+            if response.status >= 400:
+                raise RuntimeError(f"{method} {path} returned {response.status}: {data[:300]!r}")
+            return json.loads(data) if data else {}
+
+        raise RuntimeError(f"{method} {path} failed after {retries} retries")
+
+    def close(self):
+        """Close the underlying connection"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def build_query(query_string: Optional[str], time_from: Optional[str], time_to: Optional[str]) -> Dict:
+    """
+    Build the Elasticsearch query for the export window.
+
+    Args:
+        query_string: Lucene query string (Kibana search bar syntax)
+        time_from: Lower bound for @timestamp (date math allowed, e.g. now-24h)
+        time_to: Upper bound for @timestamp
+
+    Returns:
+        Query DSL dictionary
+    """
+    filters = []
+    if query_string:
+        filters.append({'query_string': {'query': query_string}})
+    if time_from or time_to:
+        bounds = {}
+        if time_from:
+            bounds['gte'] = time_from
+        if time_to:
+            bounds['lte'] = time_to
+        filters.append({'range': {'@timestamp': bounds}})
+
+    if not filters:
+        return {'match_all': {}}
+    return {'bool': {'filter': filters}}
+
+
+def get_field(document: Dict, path: str):
+    """Resolve a dotted field path, falling back to a literal dotted key"""
+    if path in document:
+        return document[path]
+    value = document
+    for part in path.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def csv_value(value) -> str:
+    """Flatten a field value into a single CSV cell"""
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return ';'.join(csv_value(item) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value, separators=(',', ':'))
+    return str(value)
+
+
+# Pages travel from the slice processes to the single writer through this queue
+# (set in each worker by init_worker)
+_pages = None
+
+
+def init_worker(pages):
+    """Pool initializer: keep the shared page queue in the worker process"""
+    global _pages
+    _pages = pages
+
+
+def export_slice(job: Dict) -> Dict:
+    """
+    Export one PIT slice, handing each encoded page to the writer as it arrives.
+
+    Runs in a worker process; memory is bounded by one page of hits, and the
+    bounded page queue makes the slice wait whenever the writer falls behind.
+
+    Args:
+        job: Slice description (see LogExporter.export)
+
+    Returns:
+        Dictionary with slice id and document count
+    """
+    client = ElasticsearchClient(job['es_url'])
+    fields = job['fields']
+    slice_id = job['slice_id']
+    count = 0
+
+    body = {
+        'size': job['page_size'],
+        'query': job['query'],
+        'pit': {'id': job['pit_id'], 'keep_alive': job['keep_alive']},
+        'sort': [{'@timestamp': 'asc'}, {'_shard_doc': 'asc'}],
+        'track_total_hits': False,
+    }
+    if job['slices'] > 1:
+        body['slice'] = {'id': slice_id, 'max': job['slices']}
+    if fields:
+        body['_source'] = fields
+
+    columns = fields or DEFAULT_CSV_FIELDS
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if job['format'] == 'csv' else None
+
+    try:
+        while True:
+            result = client.request('POST', '/_search', body)
+            hits = result.get('hits', {}).get('hits', [])
+            if not hits:
+                break
+
+            # PIT ids may change between pages; always carry the latest one
+            if result.get('pit_id'):
+                body['pit']['id'] = result['pit_id']
+
+            for hit in hits:
+                source = hit.get('_source', {})
+                if writer is not None:
+                    writer.writerow([csv_value(get_field(source, column)) for column in columns])
+                else:
+                    buffer.write(json.dumps(source, separators=(',', ':'), ensure_ascii=False))
+                    buffer.write('\n')
+
+            _pages.put((len(hits), buffer.getvalue()))
+            buffer.seek(0)
+            buffer.truncate()
+            count += len(hits)
+
+            body['search_after'] = hits[-1]['sort']
+            if job['limit'] and count >= job['limit']:
+                break
+    finally:
+        client.close()
+    return {'slice_id': slice_id, 'count': count}
+
+
+class LogExporter:
+    """
+    Streams large log windows out of Elasticsearch.
+
+    Features:
+    - Point-in-time snapshot for a consistent view across pages
+    - search_after pagination (no deep-paging or 10k result window limits)
+    - Sliced parallelism with one process per slice
+    - Incremental NDJSON/CSV output: pages are written as slices deliver them,
+      through a bounded queue to a single writer (constant memory, no part files)
+    - Field projection and live throughput readout
+    """
+
+    def __init__(self, es_url: str = "http://localhost:9200", index: str = "logs-*",
+                 slices: Optional[int] = None, page_size: int = 5000, keep_alive: str = "5m"):
+        """
+        Initialize the exporter.
+
+        Args:
+            es_url: Elasticsearch base URL
+            index: Index pattern to export from
+            slices: Number of parallel slices (defaults to CPU count)
+            page_size: Hits per search_after page
+            keep_alive: Point-in-time keep-alive between pages
+        """
+        self.es_url = es_url
+        self.index = index
+        self.slices = max(1, slices or os.cpu_count() or 1)
+        self.page_size = page_size
+        self.keep_alive = keep_alive
+        self.client = ElasticsearchClient(es_url)
+
+    def print_header(self, message: str):
+        """Print a formatted header message"""
+        print(f"\n{Colors.HEADER}{Colors.BOLD}{'=' * 70}{Colors.END}", file=sys.stderr)
+        print(f"{Colors.HEADER}{Colors.BOLD}{message.center(70)}{Colors.END}", file=sys.stderr)
+        print(f"{Colors.HEADER}{Colors.BOLD}{'=' * 70}{Colors.END}\n", file=sys.stderr)
+
+    def print_success(self, message: str):
+        """Print a success message"""
+        print(f"{Colors.GREEN}✓ {message}{Colors.END}", file=sys.stderr)
+
+    def print_error(self, message: str):
+        """Print an error message"""
+        print(f"{Colors.RED}✗ {message}{Colors.END}", file=sys.stderr)
+
+    def print_info(self, message: str):
+        """Print an info message"""
+        print(f"{Colors.CYAN}ℹ {message}{Colors.END}", file=sys.stderr)
+
+    def open_pit(self) -> str:
+        """Open a point-in-time over the index pattern and return its id"""
+        result = self.client.request('POST', f"/{self.index}/_pit?keep_alive={self.keep_alive}")
+        return result['id']
+
+    def close_pit(self, pit_id: str):
+        """Release the point-in-time"""
+        try:
+            self.client.request('DELETE', '/_pit', {'id': pit_id}, retries=0)
+        except RuntimeError:
+            pass
+
+    def export(self, output_path: Optional[Path], file_format: str = "ndjson",
+               fields: Optional[List[str]] = None, query_string: Optional[str] = None,
+               time_from: Optional[str] = None, time_to: Optional[str] = None,
+               limit: int = 0) -> bool:
+        """
+        Run the export.
+
+        Args:
+            output_path: Output file (stdout when None)
+            file_format: 'ndjson' or 'csv'
+            fields: Field projection (dotted paths)
+            query_string: Lucene query string
+            time_from: @timestamp lower bound
+            time_to: @timestamp upper bound
+            limit: Approximate per-slice document cap (0 = unlimited)
+
+        Returns:
+            True if the export completed, False otherwise
+        """
+        self.print_header("ELASTICSEARCH LOG EXPORT")
+        self.print_info(f"Index: {self.index}, slices: {self.slices}, page size: {self.page_size}")
+
+        try:
+            pit_id = self.open_pit()
+        except RuntimeError as e:
+            self.print_error(f"Could not open point-in-time: {e}")
+            return False
+
+        query = build_query(query_string, time_from, time_to)
+        # A couple of pages per slice in flight keeps every slice busy without
+        # letting memory grow when the output (a pipe, gzip, a slow disk) lags
+        pages = multiprocessing.Queue(maxsize=self.slices * 2)
+
+        jobs = [{
+            'es_url': self.es_url,
+            'pit_id': pit_id,
+            'keep_alive': self.keep_alive,
+            'query': query,
+            'fields': fields,
+            'format': file_format,
+            'page_size': self.page_size,
+            'slices': self.slices,
+            'slice_id': slice_id,
+            'limit': limit,
+        } for slice_id in range(self.slices)]
+
+        started = time.monotonic()
+        exported = 0
+        ok = True
+        out = None
+
+        try:
+            out = sys.stdout if output_path is None else open(output_path, 'w', encoding='utf-8', newline='')
+            if file_format == 'csv':
+                csv.writer(out).writerow(fields or DEFAULT_CSV_FIELDS)
+
+            with multiprocessing.Pool(processes=self.slices, initializer=init_worker, initargs=(pages,)) as pool:
+                pending = pool.map_async(export_slice, jobs)
+                last_report = 0.0
+
+                # Single writer: pages are written in arrival order, interleaved across slices.
+                # Slices may finish before their last pages leave the queue's feeder thread,
+                # so the loop runs until the written count matches what the slices reported.
+                expected = None
+                while expected is None or exported < expected:
+                    if expected is None and pending.ready():
+                        expected = sum(result['count'] for result in pending.get())
+                        continue
+                    try:
+                        count, text = pages.get(timeout=0.5)
+                    except queue.Empty:
+                        continue
+                    out.write(text)
+                    exported += count
+                    if time.monotonic() - last_report > 0.5:
+                        last_report = time.monotonic()
+                        elapsed = max(last_report - started, 1e-6)
+                        print(f"\r{Colors.CYAN}Exported: {exported:,} docs  "
+                              f"Rate: {exported / elapsed:,.0f} docs/s{Colors.END}",
+                              end='', flush=True, file=sys.stderr)
+
+            out.flush()
+            print(file=sys.stderr)
+
+        except BrokenPipeError:
+            # The reader went away (e.g. `| head`); silence the final stdout flush
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            print(file=sys.stderr)
+            self.print_error(f"Output closed by the reader after {exported:,} documents")
+            ok = False
+        except RuntimeError as e:
+            print(file=sys.stderr)
+            self.print_error(f"Export failed after {exported:,} documents (output is incomplete): {e}")
+            ok = False
+        except KeyboardInterrupt:
+            print(file=sys.stderr)
+            self.print_error("Export cancelled by user")
+            ok = False
+        finally:
+            if out is not None and out is not sys.stdout:
+                out.close()
+            self.close_pit(pit_id)
+            self.client.close()
+
+        if ok:
+            elapsed = max(time.monotonic() - started, 1e-6)
+            destination = output_path or 'stdout'
+            self.print_success(f"Exported {exported:,} documents to {destination} "
+                               f"in {elapsed:.1f}s ({exported / elapsed:,.0f} docs/s)")
+        return ok
+
+
+def main():
+    """Main entry point for the log exporter"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Stream logs out of Elasticsearch using point-in-time + search_after",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python es_export.py -o incident.ndjson --from now-24h
+  python es_export.py -o errors.csv --format csv --query 'tags:error' \\
+      --fields @timestamp,k8s_pod,log_level,message
+  python es_export.py --from 2026-01-01 --to 2026-01-02 --slices 8 | gzip > day.ndjson.gz
+        """
+    )
+
+    parser.add_argument("-o", "--output", type=Path, default=None, help="Output file (default: stdout)")
+    parser.add_argument("--format", choices=['ndjson', 'csv'], default='ndjson', help="Output format")
+    parser.add_argument("--es-url", default="http://localhost:9200", help="Elasticsearch URL")
+    parser.add_argument("--index", default="logs-*", help="Index pattern (default: logs-*)")
+    parser.add_argument("--query", default=None, help="Lucene query string, as typed in Kibana")
+    parser.add_argument("--from", dest="time_from", default=None, help="@timestamp lower bound (e.g. now-7d)")
+    parser.add_argument("--to", dest="time_to", default=None, help="@timestamp upper bound")
+    parser.add_argument("--fields", default=None, help="Comma-separated field projection")
+    parser.add_argument("--slices", type=int, default=None, help="Parallel slices (default: CPU count)")
+    parser.add_argument("--page-size", type=int, default=5000, help="Hits per page (default: 5000)")
+    parser.add_argument("--limit", type=int, default=0, help="Approximate per-slice document cap")
+
+    args = parser.parse_args()
+    fields = [field.strip() for field in args.fields.split(',')] if args.fields else None
+
+    exporter = LogExporter(
+        es_url=args.es_url,
+        index=args.index,
+        slices=args.slices,
+        page_size=args.page_size,
+    )
+
+    ok = exporter.export(
+        args.output,
+        file_format=args.format,
+        fields=fields,
+        query_string=args.query,
+        time_from=args.time_from,
+        time_to=args.time_to,
+        limit=args.limit,
+    )
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
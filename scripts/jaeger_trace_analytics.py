@@ -0,0 +1,695 @@
+"""
+Jaeger Bulk Trace Analytics
+Bulk-fetches traces from the Jaeger query API with concurrent windowed requests,
+computes each trace's critical path and builds mergeable per-service and
+per-operation latency sketches
+"""
+
+import gzip
+import hashlib
+import http.client
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode, urlparse
+
+
+class Colors:
+    """ANSI color codes for terminal output"""
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    END = '\033[0m'
+    BOLD = '\033[1m'
+
+
+# Windows ending closer to "now" than this may still receive spans and are not cached
+SETTLE_SECONDS = 300
+
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+
+def parse_duration(text: str) -> int:
+    """
+    Parse a duration such as 90s, 15m, 24h or 7d into seconds.
+
+    Args:
+        text: Duration string
+
+    Returns:
+        Duration in seconds
+
+    Raises:
+        ValueError: If the string is not a duration
+    """
+    match = re.fullmatch(r'(\d+)([smhdw])', text.strip())
+    if not match:
+        raise ValueError(f"Invalid duration: {text}")
+    return int(match.group(1)) * DURATION_UNITS[match.group(2)]
+
+
+class LogSketch:
+    """
+    Mergeable latency sketch with logarithmic buckets (DDSketch-style).
+
+    Every value lands in bucket ceil(log_gamma(v)), so any quantile is accurate
+    to within the configured relative error and two sketches merge by adding
+    bucket counts.
+    """
+
+    __slots__ = ('accuracy', 'gamma', 'log_gamma', 'buckets', 'zeros', 'count', 'total', 'min', 'max')
+
+    def __init__(self, accuracy: float = 0.01):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def add(self, value: float, count: int = 1):
+        """Record a value (any unit; callers use milliseconds)"""
+        self.count += count
+        self.total += value * count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= 0:
+            self.zeros += count
+            return
+        index = math.ceil(math.log(value) / self.log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def merge(self, other: 'LogSketch'):
+        """Add another sketch's counts into this one"""
+        if other.accuracy != self.accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile (0..1)"""
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'accuracy': self.accuracy,
+            'buckets': {str(k): v for k, v in self.buckets.items()},
+            'zeros': self.zeros,
+            'count': self.count,
+            'total': self.total,
+            'min': self.min if self.count else 0.0,
+            'max': self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LogSketch':
+        sketch = cls(data['accuracy'])
+        sketch.buckets = {int(k): v for k, v in data['buckets'].items()}
+        sketch.zeros = data['zeros']
+        sketch.count = data['count']
+        sketch.total = data['total']
+        sketch.min = data['min'] if sketch.count else float('inf')
+        sketch.max = data['max']
+        return sketch
+
+
+class JaegerSource:
+    """
+    Jaeger query API client with per-thread keep-alive connections.
+
+    With record_dir set, every response is also written there; with
+    fixture_dir set, responses are read from a recorded directory instead of
+    the network, so runs are reproducible offline.
+    """
+
+    def __init__(self, jaeger_url: str, timeout: float = 60.0, record_dir: Optional[Path] = None,
+                 fixture_dir: Optional[Path] = None):
+        """
+        Initialize the source.
+
+        Args:
+            jaeger_url: Jaeger query base URL (including QUERY_BASE_PATH)
+            timeout: Socket timeout in seconds
+            record_dir: Directory to record responses into
+            fixture_dir: Directory of recorded responses to replay
+        """
+        parsed = urlparse(jaeger_url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 16686
+        self.base_path = parsed.path.rstrip('/')
+        self.timeout = timeout
+        self.record_dir = record_dir
+        self.fixture_dir = fixture_dir
+        self.requests = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        if record_dir:
+            record_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def fixture_name(path: str, params: Dict) -> str:
+        """File name a request is recorded under"""
+        key = path + '?' + urlencode(sorted(params.items()))
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()[:20] + '.json'
+
+    def get(self, path: str, params: Optional[Dict] = None, retries: int = 3) -> Dict:
+        """
+        GET a JSON document from the query API.
+
+        Args:
+            path: API path (e.g. /api/traces)
+            params: Query parameters
+            retries: Retries on connection errors and 5xx responses
+
+        Returns:
+            Decoded response
+
+        Raises:
+            RuntimeError: If the request keeps failing or no fixture exists
+        """
+        params = params or {}
+        name = self.fixture_name(path, params)
+        with self._lock:
+            self.requests += 1
+
+        if self.fixture_dir:
+            fixture = self.fixture_dir / name
+            if not fixture.exists():
+                raise RuntimeError(f"No recorded fixture for {path} {params}")
+            with open(fixture, encoding='utf-8') as f:
+                return json.load(f)['response']
+
+        target = self.base_path + path + ('?' + urlencode(params) if params else '')
+        backoff = 0.5
+        for attempt in range(retries + 1):
+            conn = getattr(self._local, 'conn', None)
+            if conn is None:
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+                self._local.conn = conn
+            try:
+                conn.request('GET', target)
+                response = conn.getresponse()
+                body = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                self._local.conn = None
+                if attempt == retries:
+                    raise RuntimeError(f"GET {path} failed: {e}")
+                time.sleep(backoff)
+                backoff *= 2
+                continue
+
+            if response.status >= 500 and attempt < retries:
+                time.sleep(backoff)
+                backoff *= 2
+                continue
+            if response.status != 200:
+                raise RuntimeError(f"GET {path} returned {response.status}: {body[:200]!r}")
+
+            data = json.loads(body.decode('utf-8'))
+            if self.record_dir:
+                with open(self.record_dir / name, 'w', encoding='utf-8') as f:
+                    json.dump({'path': path, 'params': params, 'response': data}, f)
+            return data
+
+        raise RuntimeError(f"GET {path} failed")
+
+
+class TraceCache:
+    """On-disk cache of settled (service, window) pages so reruns are incremental"""
+
+    def __init__(self, cache_dir: Optional[Path]):
+        self.cache_dir = cache_dir
+        if cache_dir:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, service: str, start: int, end: int) -> Path:
+        safe = re.sub(r'[^A-Za-z0-9_.-]', '_', service)
+        return self.cache_dir / safe / f"{start}-{end}.json.gz"
+
+    def load(self, service: str, start: int, end: int) -> Optional[Dict]:
+        """Return a cached page ({'traces': [...]} or {'split': True}) or None"""
+        if not self.cache_dir:
+            return None
+        path = self._path(service, start, end)
+        if not path.exists():
+            return None
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return json.load(f)
+
+    def store(self, service: str, start: int, end: int, page: Dict):
+        """Atomically write a page"""
+        if not self.cache_dir:
+            return
+        path = self._path(service, start, end)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        with gzip.open(tmp, 'wt', encoding='utf-8', compresslevel=3) as f:
+            json.dump(page, f, separators=(',', ':'))
+        os.replace(tmp, path)
+
+
+class TraceFetcher:
+    """
+    Fetch every trace for a set of services over a time range.
+
+    The range is cut into aligned windows fetched concurrently; a window that
+    returns the full page limit is split in half until pages come back short,
+    which stands in for pagination (the query API has no cursor).
+    """
+
+    def __init__(self, source: JaegerSource, cache: TraceCache, limit: int = 500,
+                 workers: int = 8, min_window: int = 10):
+        """
+        Initialize the fetcher.
+
+        Args:
+            source: Jaeger API source
+            cache: Page cache
+            limit: Traces requested per window
+            workers: Concurrent requests
+            min_window: Smallest window in seconds before accepting a full page
+        """
+        self.source = source
+        self.cache = cache
+        self.limit = limit
+        self.workers = workers
+        self.min_window = min_window
+        self.cached_pages = 0
+        self.fetched_pages = 0
+        self.truncated_pages = 0
+
+    def services(self) -> List[str]:
+        """List services known to Jaeger"""
+        return sorted(self.source.get('/api/services').get('data') or [])
+
+    def _fetch(self, service: str, start: int, end: int, now: float) -> Tuple[str, int, int, Dict, bool]:
+        page = self.cache.load(service, start, end)
+        if page is not None:
+            return service, start, end, page, True
+
+        params = {
+            'service': service,
+            'start': start * 1000000,
+            'end': end * 1000000,
+            'limit': self.limit,
+        }
+        traces = self.source.get('/api/traces', params).get('data') or []
+        if len(traces) >= self.limit and end - start > self.min_window:
+            page = {'split': True}
+        else:
+            page = {'traces': traces, 'truncated': len(traces) >= self.limit}
+        if end <= now - SETTLE_SECONDS:
+            self.cache.store(service, start, end, page)
+        return service, start, end, page, False
+
+    def fetch(self, services: Iterable[str], start: int, end: int, window: int) -> Iterable[Dict]:
+        """
+        Yield every distinct trace as pages arrive.
+
+        Args:
+            services: Services to query
+            start: Range start (epoch seconds)
+            end: Range end (epoch seconds)
+            window: Aligned window size in seconds
+
+        Yields:
+            Jaeger-format traces, each trace once
+        """
+        now = time.time()
+        seen = set()
+        first = start - start % window
+        jobs = [(service, max(ws, start), min(ws + window, end))
+                for service in services
+                for ws in range(first, end, window)]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = {pool.submit(self._fetch, *job, now) for job in jobs}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    service, ws, we, page, cached = future.result()
+                    if cached:
+                        self.cached_pages += 1
+                    else:
+                        self.fetched_pages += 1
+
+                    if page.get('split'):
+                        middle = (ws + we) // 2
+                        pending.add(pool.submit(self._fetch, service, ws, middle, now))
+                        pending.add(pool.submit(self._fetch, service, middle, we, now))
+                        continue
+                    if page.get('truncated'):
+                        self.truncated_pages += 1
+
+                    for trace in page.get('traces', []):
+                        trace_id = trace.get('traceID')
+                        if trace_id in seen:
+                            continue
+                        seen.add(trace_id)
+                        yield trace
+
+
+def critical_path(trace: Dict) -> Tuple[Optional[Dict], Dict[str, float]]:
+    """
+    Compute the critical path of a Jaeger-format trace.
+
+    Walking back from the end of each span, time is attributed to the child
+    that finished last before the cursor; gaps where no child was running are
+    the span's own time. Only CHILD_OF references form the tree.
+
+    Args:
+        trace: Jaeger-format trace
+
+    Returns:
+        Tuple of (root span, {span ID: critical-path microseconds})
+    """
+    spans = {span['spanID']: span for span in trace.get('spans', [])}
+    children: Dict[str, List[Dict]] = {}
+    roots = []
+    for span in spans.values():
+        parent = None
+        for ref in span.get('references') or []:
+            if ref.get('refType') == 'CHILD_OF' and ref.get('spanID') in spans:
+                parent = ref['spanID']
+                break
+        if parent is None:
+            roots.append(span)
+        else:
+            children.setdefault(parent, []).append(span)
+
+    if not roots:
+        return None, {}
+    root = max(roots, key=lambda s: (s.get('duration', 0), -s.get('startTime', 0)))
+
+    contribution: Dict[str, float] = {}
+    stack = [(root, root['startTime'] + root.get('duration', 0))]
+    while stack:
+        span, bound = stack.pop()
+        span_start = span['startTime']
+        cursor = min(span_start + span.get('duration', 0), bound)
+        own = 0
+        kids = sorted(children.get(span['spanID'], ()),
+                      key=lambda s: s['startTime'] + s.get('duration', 0), reverse=True)
+        for child in kids:
+            child_start = child['startTime']
+            if child_start >= cursor:
+                continue
+            child_end = min(child_start + child.get('duration', 0), cursor)
+            own += cursor - child_end
+            if child_end > child_start:
+                stack.append((child, child_end))
+            cursor = max(child_start, span_start)
+            if cursor <= span_start:
+                break
+        own += max(0, cursor - span_start)
+        contribution[span['spanID']] = contribution.get(span['spanID'], 0) + own
+
+    return root, contribution
+
+
+class TraceAnalytics:
+    """Streaming aggregation of span latencies and critical-path attribution"""
+
+    def __init__(self, accuracy: float = 0.01, root_operation: Optional[str] = None):
+        """
+        Initialize the aggregator.
+
+        Args:
+            accuracy: Relative accuracy of the sketches
+            root_operation: Only analyse traces whose root span has this operation
+        """
+        self.accuracy = accuracy
+        self.root_operation = root_operation
+        self.traces = 0
+        self.skipped = 0
+        # key -> {'duration': sketch of span ms, 'critical': sketch of per-trace critical ms}
+        self.services: Dict[str, Dict[str, LogSketch]] = {}
+        self.operations: Dict[str, Dict[str, LogSketch]] = {}
+        self.trace_durations = LogSketch(accuracy)
+
+    def _sketches(self, table: Dict, key: str) -> Dict[str, LogSketch]:
+        entry = table.get(key)
+        if entry is None:
+            entry = {'duration': LogSketch(self.accuracy), 'critical': LogSketch(self.accuracy)}
+            table[key] = entry
+        return entry
+
+    def add_trace(self, trace: Dict):
+        """Fold one trace into the aggregates"""
+        root, contribution = critical_path(trace)
+        if root is None or (self.root_operation and root.get('operationName') != self.root_operation):
+            self.skipped += 1
+            return
+
+        self.traces += 1
+        self.trace_durations.add(root.get('duration', 0) / 1000.0)
+        processes = trace.get('processes', {})
+        service_critical: Dict[str, float] = {}
+        operation_critical: Dict[str, float] = {}
+
+        for span in trace.get('spans', []):
+            service = processes.get(span.get('processID'), {}).get('serviceName', 'unknown')
+            operation = f"{service} {span.get('operationName', '')}"
+            duration_ms = span.get('duration', 0) / 1000.0
+            self._sketches(self.services, service)['duration'].add(duration_ms)
+            self._sketches(self.operations, operation)['duration'].add(duration_ms)
+            critical = contribution.get(span['spanID'], 0)
+            if critical:
+                service_critical[service] = service_critical.get(service, 0) + critical
+                operation_critical[operation] = operation_critical.get(operation, 0) + critical
+
+        for service, micros in service_critical.items():
+            self._sketches(self.services, service)['critical'].add(micros / 1000.0)
+        for operation, micros in operation_critical.items():
+            self._sketches(self.operations, operation)['critical'].add(micros / 1000.0)
+
+    def merge(self, other: 'TraceAnalytics'):
+        """Merge another aggregate (e.g. from a different run or range)"""
+        self.traces += other.traces
+        self.skipped += other.skipped
+        self.trace_durations.merge(other.trace_durations)
+        for mine, theirs in ((self.services, other.services), (self.operations, other.operations)):
+            for key, sketches in theirs.items():
+                target = self._sketches(mine, key)
+                target['duration'].merge(sketches['duration'])
+                target['critical'].merge(sketches['critical'])
+
+    def to_dict(self) -> Dict:
+        def table(entries):
+            return {key: {name: sketch.to_dict() for name, sketch in value.items()}
+                    for key, value in entries.items()}
+        return {
+            'accuracy': self.accuracy,
+            'root_operation': self.root_operation,
+            'traces': self.traces,
+            'skipped': self.skipped,
+            'trace_durations': self.trace_durations.to_dict(),
+            'services': table(self.services),
+            'operations': table(self.operations),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TraceAnalytics':
+        analytics = cls(data['accuracy'], data.get('root_operation'))
+        analytics.traces = data['traces']
+        analytics.skipped = data['skipped']
+        analytics.trace_durations = LogSketch.from_dict(data['trace_durations'])
+        for name in ('services', 'operations'):
+            target = getattr(analytics, name)
+            for key, value in data[name].items():
+                target[key] = {kind: LogSketch.from_dict(sketch) for kind, sketch in value.items()}
+        return analytics
+
+
+def print_report(analytics: TraceAnalytics, top: int = 15):
+    """Print critical-path attribution and latency tables"""
+    total_critical = sum(s['critical'].total for s in analytics.services.values()) or 1.0
+    durations = analytics.trace_durations
+    scope = f" for root operation '{analytics.root_operation}'" if analytics.root_operation else ""
+
+    print(f"\n{Colors.BOLD}{Colors.HEADER}Critical path by service{scope}{Colors.END}")
+    print(f"  Traces analysed: {analytics.traces:,}   "
+          f"trace p50/p95/p99: {durations.quantile(0.5):.1f} / {durations.quantile(0.95):.1f} / "
+          f"{durations.quantile(0.99):.1f} ms\n")
+    print(f"  {'Service':28} {'CP share':>9} {'CP/trace':>10} {'CP p95':>9} "
+          f"{'Spans':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    ranked = sorted(analytics.services.items(), key=lambda item: item[1]['critical'].total, reverse=True)
+    for service, sketches in ranked:
+        critical, duration = sketches['critical'], sketches['duration']
+        per_trace = critical.total / analytics.traces if analytics.traces else 0.0
+        print(f"  {service[:28]:28} {critical.total / total_critical:>8.1%} {per_trace:>10.2f} "
+              f"{critical.quantile(0.95):>9.2f} {duration.count:>9,} {duration.quantile(0.5):>9.2f} "
+              f"{duration.quantile(0.95):>9.2f} {duration.quantile(0.99):>9.2f}")
+
+    print(f"\n{Colors.BOLD}{Colors.HEADER}Top {top} operations on the critical path{Colors.END}\n")
+    print(f"  {'Service / operation':50} {'CP share':>9} {'CP p95':>9} {'Spans':>9} {'p95 ms':>9}")
+    ranked = sorted(analytics.operations.items(), key=lambda item: item[1]['critical'].total, reverse=True)
+    for operation, sketches in ranked[:top]:
+        critical, duration = sketches['critical'], sketches['duration']
+        print(f"  {operation[:50]:50} {critical.total / total_critical:>8.1%} {critical.quantile(0.95):>9.2f} "
+              f"{duration.count:>9,} {duration.quantile(0.95):>9.2f}")
+    print()
+
+
+def main():
+    """Main entry point for trace analytics"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Critical-path and latency analytics over traces stored in Jaeger",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python jaeger_trace_analytics.py --lookback 7d --operation "POST /api/orders/checkout"
+  python jaeger_trace_analytics.py --service order-service --lookback 24h -o day.json
+  python jaeger_trace_analytics.py --merge mon.json tue.json wed.json
+  python jaeger_trace_analytics.py --lookback 1h --record fixtures/jaeger
+  python jaeger_trace_analytics.py --fixtures fixtures/jaeger
+
+Settled windows are cached under --cache-dir, so rerunning over a longer range
+only fetches what is new. --record/--fixtures capture and replay the exact API
+responses for offline, reproducible runs.
+        """
+    )
+
+    parser.add_argument("--jaeger-url", default="http://localhost:16686/jaeger", help="Jaeger query base URL")
+    parser.add_argument("--service", action="append", help="Service to fetch (repeatable; default: all)")
+    parser.add_argument("--operation", help="Only analyse traces whose root span is this operation")
+    parser.add_argument("--lookback", default="24h", help="Range to analyse, e.g. 1h, 24h, 7d (default: 24h)")
+    parser.add_argument("--end", type=int, help="Range end as epoch seconds (default: now)")
+    parser.add_argument("--window", default="1h", help="Aligned fetch window (default: 1h)")
+    parser.add_argument("--limit", type=int, default=500, help="Traces per request (default: 500)")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent requests (default: 8)")
+    parser.add_argument("--cache-dir", default=".cache/jaeger-traces", help="Page cache ('' disables)")
+    parser.add_argument("--accuracy", type=float, default=0.01, help="Sketch relative accuracy (default: 0.01)")
+    parser.add_argument("--top", type=int, default=15, help="Operations to list (default: 15)")
+    parser.add_argument("-o", "--output", help="Write mergeable sketches as JSON")
+    parser.add_argument("--merge", nargs='+', metavar="FILE", help="Merge JSON outputs instead of fetching")
+    parser.add_argument("--record", help="Record API responses into this directory")
+    parser.add_argument("--fixtures", help="Replay recorded API responses from this directory")
+
+    args = parser.parse_args()
+
+    if args.merge:
+        analytics = None
+        for path in args.merge:
+            with open(path, encoding='utf-8') as f:
+                part = TraceAnalytics.from_dict(json.load(f))
+            if analytics is None:
+                analytics = part
+            else:
+                analytics.merge(part)
+        print_report(analytics, args.top)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(analytics.to_dict(), f)
+        sys.exit(0)
+
+    record_dir = Path(args.record) if args.record else None
+    fixture_dir = Path(args.fixtures) if args.fixtures else None
+    end = args.end
+    lookback = args.lookback
+    if fixture_dir:
+        # Replays must issue exactly the recorded requests
+        with open(fixture_dir / 'manifest.json', encoding='utf-8') as f:
+            manifest = json.load(f)
+        end = manifest['end']
+        lookback = manifest['lookback']
+        args.window = manifest['window']
+        args.limit = manifest['limit']
+        args.service = args.service or manifest.get('services')
+    end = end or int(time.time())
+
+    try:
+        start = end - parse_duration(lookback)
+        window = parse_duration(args.window)
+    except ValueError as e:
+        print(f"{Colors.RED}✗ {e}{Colors.END}")
+        sys.exit(1)
+
+    source = JaegerSource(args.jaeger_url, record_dir=record_dir, fixture_dir=fixture_dir)
+    cache = TraceCache(Path(args.cache_dir) if args.cache_dir and not fixture_dir else None)
+    fetcher = TraceFetcher(source, cache, limit=args.limit, workers=args.workers)
+    analytics = TraceAnalytics(args.accuracy, args.operation)
+
+    try:
+        services = args.service or fetcher.services()
+    except RuntimeError as e:
+        print(f"{Colors.RED}✗ Could not list services: {e}{Colors.END}")
+        sys.exit(1)
+
+    if record_dir:
+        with open(record_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+            json.dump({'end': end, 'lookback': lookback, 'window': args.window,
+                       'limit': args.limit, 'services': services}, f, indent=2)
+
+    print(f"{Colors.CYAN}ℹ Fetching {len(services)} service(s) over {lookback} "
+          f"in {args.window} windows with {args.workers} workers{Colors.END}")
+    started = time.time()
+    try:
+        for trace in fetcher.fetch(services, start, end, window):
+            analytics.add_trace(trace)
+            if analytics.traces % 1000 == 0 and analytics.traces:
+                print(f"\r{Colors.CYAN}  Traces: {analytics.traces:,}{Colors.END}",
+                      end='', file=sys.stderr, flush=True)
+    except RuntimeError as e:
+        print(f"\n{Colors.RED}✗ {e}{Colors.END}")
+        sys.exit(1)
+    elapsed = time.time() - started
+
+    print(f"\n{Colors.GREEN}✓ {analytics.traces:,} traces in {elapsed:.1f}s "
+          f"({fetcher.fetched_pages} pages fetched, {fetcher.cached_pages} from cache, "
+          f"{source.requests} API calls){Colors.END}")
+    if fetcher.truncated_pages:
+        print(f"{Colors.YELLOW}⚠ {fetcher.truncated_pages} window(s) still hit --limit at the minimum "
+              f"window size; raise --limit for complete results{Colors.END}")
+
+    print_report(analytics, args.top)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(analytics.to_dict(), f)
+        print(f"{Colors.GREEN}✓ Sketches written to {args.output}{Colors.END}")
+
+    print(f"\n{Colors.GREEN}{Colors.BOLD}🎉 Trace analytics completed successfully!{Colors.END}\n")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+"""
+Log-to-Metrics Aggregator
+Consumes the json_lines copy of the processed Logstash stream and maintains
+event counters and response-time histograms by service, level and tag for
+Prometheus to scrape
+"""
+
+import asyncio
+import json
+import sys
+import time
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from async_http import HTTPServer, Request, Response
+from prom_metrics import CONTENT_TYPE, Registry
+
+
+class Colors:
+    """ANSI color codes for terminal output"""
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    END = '\033[0m'
+    BOLD = '\033[1m'
+
+
+# Tags added by elk/logstash/pipeline/logstash.conf that are worth a series each
+TRACKED_TAGS = ('error', 'exception', 'error_5xx', 'error_4xx', 'redirect_3xx', 'success_2xx', 'web_access')
+
+# Fields consulted in order to name the emitting service
+SERVICE_FIELDS = ('service', 'app', 'k8s_container', 'type')
+
+RESPONSE_TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+OVERFLOW = '__overflow__'
+
+
+class LogMetricsAggregator:
+    """
+    Turns processed log events into Prometheus series.
+
+    Label values come from open-ended fields, so services beyond max_services
+    and levels outside the usual set are folded into bounded values.
+    """
+
+    LEVELS = {'trace', 'debug', 'info', 'notice', 'warn', 'warning', 'error', 'fatal', 'critical', 'unknown'}
+
+    def __init__(self, tags: Sequence[str] = TRACKED_TAGS, service_fields: Sequence[str] = SERVICE_FIELDS,
+                 response_time_scale: float = 0.001, max_services: int = 100):
+        """
+        Initialize the aggregator.
+
+        Args:
+            tags: Tags that get their own series
+            service_fields: Event fields tried in order for the service label
+            response_time_scale: Multiplier turning response_time into seconds
+            max_services: Distinct service label values before overflow
+        """
+        self.tags = frozenset(tags)
+        self.service_fields = tuple(service_fields)
+        self.response_time_scale = response_time_scale
+        self.max_services = max_services
+        self.services = set()
+        self._partial = b''
+
+        self.registry = Registry()
+        self.m_events = self.registry.counter(
+            'log_events_total', 'Processed log events', ['service', 'level'])
+        self.m_tagged = self.registry.counter(
+            'log_events_tagged_total', 'Processed log events carrying a tracked tag', ['service', 'level', 'tag'])
+        self.m_response_time = self.registry.histogram(
+            'log_response_time_seconds', 'response_time field of access logs', ['service'],
+            RESPONSE_TIME_BUCKETS)
+        self.m_parse_errors = self.registry.counter(
+            'log_metrics_parse_errors_total', 'Lines that were not valid JSON objects')
+        self.m_overflow = self.registry.counter(
+            'log_metrics_label_overflow_total', 'Events whose service was folded into the overflow value')
+        self.m_last_event = self.registry.gauge(
+            'log_metrics_last_event_timestamp_seconds', 'Unix time the last event was received')
+        self.m_connected = self.registry.gauge(
+            'log_metrics_input_connected', 'Whether the Logstash stream is connected')
+
+    def _service(self, event: Dict) -> str:
+        for field in self.service_fields:
+            value = event.get(field)
+            if isinstance(value, str) and value:
+                break
+        else:
+            value = 'unknown'
+
+        if value not in self.services:
+            if len(self.services) >= self.max_services:
+                self.m_overflow.inc()
+                return OVERFLOW
+            self.services.add(value)
+        return value
+
+    def add_event(self, event: Dict):
+        """Fold one decoded event into the metrics"""
+        service = self._service(event)
+        level = event.get('log_level') or event.get('level') or 'unknown'
+        if level not in self.LEVELS:
+            level = str(level).lower()
+            if level not in self.LEVELS:
+                level = 'other'
+
+        self.m_events.inc(service, level)
+
+        tags = event.get('tags')
+        if tags:
+            if isinstance(tags, str):
+                tags = (tags,)
+            for tag in tags:
+                if tag in self.tags:
+                    self.m_tagged.inc(service, level, tag)
+
+        response_time = event.get('response_time')
+        if response_time is not None:
+            try:
+                self.m_response_time.observe(float(response_time) * self.response_time_scale, service)
+            except (TypeError, ValueError):
+                pass
+
+    def feed(self, data: bytes) -> int:
+        """
+        Consume a chunk of a json_lines stream.
+
+        Args:
+            data: Raw bytes; a trailing partial line is kept for the next call
+
+        Returns:
+            Number of events processed
+        """
+        lines = (self._partial + data).split(b'\n')
+        self._partial = lines.pop()
+        processed = 0
+        loads = json.loads
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                event = loads(line)
+            except ValueError:
+                self.m_parse_errors.inc()
+                continue
+            if not isinstance(event, dict):
+                self.m_parse_errors.inc()
+                continue
+            self.add_event(event)
+            processed += 1
+        if processed:
+            self.m_last_event.set(time.time())
+        return processed
+
+    def flush(self) -> int:
+        """Process a final line that had no trailing newline"""
+        if not self._partial:
+            return 0
+        return self.feed(b'\n')
+
+
+class LogMetricsService:
+    """
+    Wires a Logstash json_lines stream into the aggregator and serves /metrics.
+
+    In connect mode it dials Logstash's tcp output (mode => server) and
+    reconnects with backoff; in listen mode Logstash's tcp output (mode =>
+    client) dials in instead.
+    """
+
+    def __init__(self, aggregator: LogMetricsAggregator, host: str = '0.0.0.0', port: int = 9466,
+                 connect: Optional[Tuple[str, int]] = None, listen: Optional[Tuple[str, int]] = None):
+        """
+        Initialize the service.
+
+        Args:
+            aggregator: Configured LogMetricsAggregator
+            host: /metrics listen address
+            port: /metrics listen port
+            connect: (host, port) of a Logstash tcp output in server mode
+            listen: (host, port) to accept Logstash tcp output connections on
+        """
+        self.aggregator = aggregator
+        self.server = HTTPServer(self.handle, host, port)
+        self.connect = connect
+        self.listen = listen
+        self._stream_server = None
+        self._tasks = []
+
+    async def handle(self, request: Request) -> Response:
+        """Route one HTTP request"""
+        if request.path == '/metrics' and request.method == 'GET':
+            return Response(200, self.aggregator.registry.render(), content_type=CONTENT_TYPE)
+        return Response(404, b'not found', content_type='text/plain')
+
+    async def _consume(self, reader: asyncio.StreamReader):
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                break
+            self.aggregator.feed(chunk)
+        self.aggregator.flush()
+
+    async def _connect_loop(self):
+        backoff = 1.0
+        host, port = self.connect
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(host, port)
+            except OSError:
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+            backoff = 1.0
+            self.aggregator.m_connected.set(1)
+            try:
+                await self._consume(reader)
+            except (ConnectionError, OSError):
+                pass
+            finally:
+                self.aggregator.m_connected.set(0)
+                writer.close()
+
+    async def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.aggregator.m_connected.inc()
+        try:
+            await self._consume(reader)
+        except (ConnectionError, OSError, asyncio.CancelledError):
+            pass
+        finally:
+            self.aggregator.m_connected.inc(amount=-1)
+            writer.close()
+
+    async def start(self):
+        """Start /metrics and the stream input"""
+        await self.server.start()
+        if self.connect:
+            self._tasks.append(asyncio.ensure_future(self._connect_loop()))
+        if self.listen:
+            self._stream_server = await asyncio.start_server(self._accept, *self.listen)
+
+    async def stop(self):
+        """Stop inputs and /metrics"""
+        for task in self._tasks:
+            task.cancel()
+        if self._stream_server is not None:
+            self._stream_server.close()
+            await self._stream_server.wait_closed()
+        await self.server.close()
+
+
+def parse_address(text: str, default_host: str) -> Tuple[str, int]:
+    """Parse host:port or a bare port"""
+    host, _, port = text.rpartition(':')
+    return (host or default_host, int(port))
+
+
+def synthetic_lines(count: int) -> Iterable[bytes]:
+    """
+    Generate events shaped like logstash.conf output.
+
+    Args:
+        count: Number of events
+
+    Yields:
+        json_lines records
+    """
+    services = ['user-service', 'order-service', 'product-service', 'nginx']
+    for i in range(count):
+        service = services[i % len(services)]
+        status = 500 if i % 53 == 0 else 404 if i % 29 == 0 else 200
+        tags = ['http']
+        if status >= 500:
+            tags.append('error_5xx')
+        elif status >= 400:
+            tags.append('error_4xx')
+        else:
+            tags.append('success_2xx')
+        level = 'error' if status >= 500 else 'info'
+        if level == 'error':
+            tags.append('error')
+        event = {
+            '@timestamp': '2024-01-01T00:00:00.000Z',
+            'service': service,
+            'log_level': level,
+            'response': status,
+            'response_time': float(i % 900 + 3),
+            'message': f"GET /api/{service} {status}",
+            'environment': 'production',
+            'tags': tags,
+        }
+        yield (json.dumps(event) + '\n').encode('utf-8')
+
+
+def run_benchmark(events: int):
+    """Measure events/s through the aggregator"""
+    print(f"{Colors.CYAN}ℹ Generating {events:,} events...{Colors.END}")
+    data = b''.join(synthetic_lines(events))
+    aggregator = LogMetricsAggregator()
+    started = time.perf_counter()
+    for offset in range(0, len(data), 65536):
+        aggregator.feed(data[offset:offset + 65536])
+    aggregator.flush()
+    elapsed = time.perf_counter() - started
+    series = len(aggregator.m_events.values) + len(aggregator.m_tagged.values)
+    print(f"{Colors.GREEN}✓ {events / elapsed:,.0f} events/s "
+          f"({len(data) / elapsed / 1024 / 1024:.1f} MiB/s, {series} counter series){Colors.END}")
+
+
+def main():
+    """Main entry point for the log metrics aggregator"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Turn the processed Logstash stream into Prometheus metrics",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python log_metrics.py --connect localhost:5171
+  python log_metrics.py --listen 5170 --port 9466
+  python log_metrics.py --file processed.ndjson
+  python log_metrics.py --benchmark --events 500000
+
+logstash.conf publishes a json_lines copy of every processed event on port 5171
+(tcp output in server mode, so events are dropped rather than queued while no
+aggregator is connected). Prometheus scrapes /metrics through the 'log-metrics'
+job; the LogDerived* rules in prometheus/alerts/app-alerts.yml alert on it.
+        """
+    )
+
+    parser.add_argument("--connect", help="Read from a Logstash tcp output in server mode (host:port)")
+    parser.add_argument("--listen", help="Accept Logstash tcp output connections on [host:]port")
+    parser.add_argument("--file", help="Aggregate a json_lines file ('-' for stdin), print metrics and exit")
+    parser.add_argument("--host", default="0.0.0.0", help="/metrics listen address")
+    parser.add_argument("--port", type=int, default=9466, help="/metrics listen port (default: 9466)")
+    parser.add_argument("--tags", default=','.join(TRACKED_TAGS), help="Comma-separated tags to track")
+    parser.add_argument("--service-fields", default=','.join(SERVICE_FIELDS),
+                        help="Comma-separated fields tried for the service label")
+    parser.add_argument("--response-time-unit", choices=['ms', 's'], default='ms',
+                        help="Unit of the response_time field (default: ms)")
+    parser.add_argument("--max-services", type=int, default=100, help="Service label values before overflow")
+    parser.add_argument("--benchmark", action="store_true", help="Run the events/s benchmark and exit")
+    parser.add_argument("--events", type=int, default=300000, help="Benchmark events")
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.events)
+        return
+
+    aggregator = LogMetricsAggregator(
+        tags=[t.strip() for t in args.tags.split(',') if t.strip()],
+        service_fields=[f.strip() for f in args.service_fields.split(',') if f.strip()],
+        response_time_scale=0.001 if args.response_time_unit == 'ms' else 1.0,
+        max_services=args.max_services,
+    )
+
+    if args.file:
+        stream = sys.stdin.buffer if args.file == '-' else open(args.file, 'rb')
+        try:
+            while True:
+                chunk = stream.read(1 << 20)
+                if not chunk:
+                    break
+                aggregator.feed(chunk)
+            aggregator.flush()
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+        sys.stdout.write(aggregator.registry.render().decode('utf-8'))
+        return
+
+    if not args.connect and not args.listen:
+        parser.error("one of --connect, --listen, --file or --benchmark is required")
+
+    service = LogMetricsService(
+        aggregator, args.host, args.port,
+        connect=parse_address(args.connect, 'localhost') if args.connect else None,
+        listen=parse_address(args.listen, '0.0.0.0') if args.listen else None,
+    )
+
+    async def serve():
+        await service.start()
+        source = f"connected to {args.connect}" if args.connect else f"listening on {args.listen}"
+        print(f"{Colors.GREEN}✓ Log metrics on {args.host}:{service.server.port}/metrics, "
+              f"stream {source}{Colors.END}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await service.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print(f"\n{Colors.YELLOW}⚠ Stopped{Colors.END}")
+
+
+if __name__ == "__main__":
+    main()
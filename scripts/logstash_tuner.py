@@ -0,0 +1,511 @@
+"""
+Logstash Ingest Feedback Tuner
+Searches for the pipeline.batch.size / pipeline.workers combination that maximizes
+Elasticsearch indexing throughput without write thread-pool rejections
+"""
+
+import http.client
+import json
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+class Colors:
+    """ANSI color codes for terminal output"""
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    END = '\033[0m'
+    BOLD = '\033[1m'
+
+
+BATCH_SIZES = [125, 250, 500, 1000, 2000, 4000, 8000]
+WORKER_COUNTS = [1, 2, 3, 4, 6, 8, 12, 16]
+
+
+def http_get_json(base_url: str, path: str, timeout: float = 10.0) -> Dict:
+    """
+    GET a JSON document.
+
+    Args:
+        base_url: Service base URL
+        path: Request path
+        timeout: Socket timeout in seconds
+
+    Returns:
+        Decoded JSON body
+    """
+    parsed = urlparse(base_url)
+    conn = http.client.HTTPConnection(parsed.hostname or 'localhost', parsed.port or 80, timeout=timeout)
+    try:
+        conn.request('GET', parsed.path.rstrip('/') + path)
+        response = conn.getresponse()
+        data = response.read()
+        if response.status >= 400:
+            raise RuntimeError(f"GET {path} returned {response.status}")
+        return json.loads(data)
+    finally:
+        conn.close()
+
+
+class LiveBackend:
+    """
+    Drives the real stack.
+
+    Settings are applied through a compose override file that sets the
+    Logstash pipeline environment, followed by a recreate of the logstash
+    service; stats come from Elasticsearch and the Logstash monitoring API.
+    """
+
+    def __init__(self, project_root: Path, es_url: str, logstash_url: str):
+        """
+        Initialize the backend.
+
+        Args:
+            project_root: Directory containing docker-compose.yml
+            es_url: Elasticsearch base URL
+            logstash_url: Logstash monitoring API base URL (port 9600)
+        """
+        self.project_root = project_root
+        self.es_url = es_url
+        self.logstash_url = logstash_url
+        self.override_file = project_root / "docker-compose.logstash-tuning.yml"
+
+    def apply(self, batch_size: int, workers: int) -> bool:
+        """Recreate Logstash with the given pipeline settings"""
+        self.override_file.write_text(
+            "# Generated by scripts/logstash_tuner.py - safe to delete\n"
+            "services:\n"
+            "  logstash:\n"
+            "    environment:\n"
+            "      - \"LS_JAVA_OPTS=-Xmx512m -Xms512m\"\n"
+            "      - xpack.monitoring.enabled=false\n"
+            f"      - pipeline.workers={workers}\n"
+            f"      - pipeline.batch.size={batch_size}\n",
+            encoding='utf-8'
+        )
+        result = subprocess.run(
+            ["docker", "compose", "-f", "docker-compose.yml", "-f", self.override_file.name,
+             "up", "-d", "--no-deps", "logstash"],
+            cwd=self.project_root, capture_output=True, text=True, check=False
+        )
+        if result.returncode != 0:
+            return False
+
+        # Wait for the monitoring API to report the pipeline again
+        deadline = time.time() + 180
+        while time.time() < deadline:
+            try:
+                stats = http_get_json(self.logstash_url, "/_node/stats/pipelines")
+                if stats.get('pipelines'):
+                    return True
+            except (OSError, RuntimeError, ValueError):
+                pass
+            time.sleep(3)
+        return False
+
+    def es_node_stats(self) -> Dict:
+        """Return Elasticsearch _nodes/stats for thread pools and indexing"""
+        return http_get_json(self.es_url, "/_nodes/stats/thread_pool,indices")
+
+    def logstash_stats(self) -> Dict:
+        """Return Logstash _node/stats/pipelines"""
+        return http_get_json(self.logstash_url, "/_node/stats/pipelines")
+
+    def now(self) -> float:
+        """Current time in seconds"""
+        return time.monotonic()
+
+    def sleep(self, seconds: float):
+        """Wait for the sample window to elapse"""
+        time.sleep(seconds)
+
+    def cleanup(self):
+        """Remove the override file; the recommended config is applied by hand"""
+        if self.override_file.exists():
+            self.override_file.unlink()
+
+
+class SimulatedBackend:
+    """
+    Synthetic Elasticsearch + Logstash model for offline runs and tests.
+
+    Produces _nodes/stats and _node/stats payloads with the same shape as the
+    real APIs. Throughput follows a simple capacity model: Logstash workers
+    amortize per-batch overhead, Elasticsearch bulk efficiency peaks at a
+    moderate bulk size, and the write queue rejects once in-flight bulk
+    requests exceed its capacity.
+    """
+
+    def __init__(self, offered_load: float = 40000.0, es_threads: int = 4,
+                 write_queue_size: int = 6, seed: int = 7):
+        """
+        Initialize the model.
+
+        Args:
+            offered_load: Events/s arriving at Logstash inputs
+            es_threads: Elasticsearch write thread-pool size
+            write_queue_size: Write queue capacity in bulk requests
+            seed: Random seed for measurement noise
+        """
+        self.offered_load = offered_load
+        self.es_threads = es_threads
+        self.write_queue_size = write_queue_size
+        self.random = random.Random(seed)
+        self.clock = 0.0
+        self.batch_size = 125
+        self.workers = 2
+        self.counters = {
+            'index_total': 0.0, 'rejected': 0.0, 'refresh_ms': 0.0, 'merge_ms': 0.0,
+            'events_in': 0.0, 'events_out': 0.0, 'duration_ms': 0.0,
+        }
+        self.queue = 0
+
+    def apply(self, batch_size: int, workers: int) -> bool:
+        """Switch the simulated pipeline settings"""
+        self.batch_size = batch_size
+        self.workers = workers
+        self.clock += 20.0  # restart cost
+        return True
+
+    def _rates(self) -> Tuple[float, float, int]:
+        """Return (indexed docs/s, rejected requests/s, write queue depth)"""
+        batch = self.batch_size
+        # Per-worker filter throughput with a fixed per-batch overhead
+        logstash_capacity = self.workers * 9000.0 * batch / (batch + 150.0)
+        # Bulk efficiency rises with batch size, then degrades on very large bulks
+        es_efficiency = batch / (batch + 300.0) * (1.0 / (1.0 + batch / 12000.0))
+        es_capacity = self.es_threads * 7000.0 * es_efficiency
+
+        in_flight = self.workers
+        queue_depth = max(0, in_flight - self.es_threads)
+        rejected = 0.0
+        if queue_depth > self.write_queue_size:
+            overflow = queue_depth - self.write_queue_size
+            rejected = overflow / in_flight * min(logstash_capacity, self.offered_load) / batch
+            queue_depth = self.write_queue_size
+
+        indexed = min(self.offered_load, logstash_capacity, es_capacity)
+        if rejected:
+            indexed *= 0.8  # retries steal capacity from useful work
+        return indexed, rejected, queue_depth
+
+    def sleep(self, seconds: float):
+        """Advance the simulated clock and accumulate counters"""
+        indexed, rejected, queue_depth = self._rates()
+        noise = 1.0 + self.random.uniform(-0.02, 0.02)
+        docs = indexed * seconds * noise
+
+        self.counters['index_total'] += docs
+        self.counters['rejected'] += rejected * seconds
+        self.counters['refresh_ms'] += seconds * 1000.0 * 0.05
+        self.counters['merge_ms'] += docs / 1000.0 * (4.0 + 2000.0 / self.batch_size)
+        self.counters['events_in'] += docs
+        self.counters['events_out'] += docs
+        self.counters['duration_ms'] += docs * 0.02
+        self.queue = queue_depth
+        self.clock += seconds
+
+    def now(self) -> float:
+        """Current simulated time in seconds"""
+        return self.clock
+
+    def es_node_stats(self) -> Dict:
+        """Return a _nodes/stats-shaped payload"""
+        return {'nodes': {'sim-node': {
+            'thread_pool': {'write': {
+                'threads': self.es_threads, 'queue': self.queue,
+                'active': min(self.workers, self.es_threads),
+                'rejected': int(self.counters['rejected']),
+            }},
+            'indices': {
+                'indexing': {'index_total': int(self.counters['index_total'])},
+                'refresh': {'total_time_in_millis': int(self.counters['refresh_ms'])},
+                'merges': {'total_time_in_millis': int(self.counters['merge_ms'])},
+            },
+        }}}
+
+    def logstash_stats(self) -> Dict:
+        """Return a _node/stats/pipelines-shaped payload"""
+        return {'pipelines': {'main': {'events': {
+            'in': int(self.counters['events_in']),
+            'out': int(self.counters['events_out']),
+            'duration_in_millis': int(self.counters['duration_ms']),
+        }}}}
+
+    def cleanup(self):
+        """Nothing to clean up"""
+
+
+def snapshot(backend) -> Dict:
+    """
+    Collect the counters needed for one measurement window.
+
+    Args:
+        backend: LiveBackend or SimulatedBackend
+
+    Returns:
+        Flat dictionary of cumulative counters and gauges
+    """
+    es = backend.es_node_stats()
+    ls = backend.logstash_stats()
+
+    totals = {'index_total': 0, 'rejected': 0, 'queue': 0, 'refresh_ms': 0, 'merge_ms': 0}
+    for node in es.get('nodes', {}).values():
+        write_pool = node.get('thread_pool', {}).get('write', {})
+        indices = node.get('indices', {})
+        totals['index_total'] += indices.get('indexing', {}).get('index_total', 0)
+        totals['rejected'] += write_pool.get('rejected', 0)
+        totals['queue'] += write_pool.get('queue', 0)
+        totals['refresh_ms'] += indices.get('refresh', {}).get('total_time_in_millis', 0)
+        totals['merge_ms'] += indices.get('merges', {}).get('total_time_in_millis', 0)
+
+    events_out = 0
+    for pipeline in ls.get('pipelines', {}).values():
+        events_out += pipeline.get('events', {}).get('out', 0)
+    totals['events_out'] = events_out
+    totals['time'] = backend.now()
+    return totals
+
+
+class IngestTuner:
+    """
+    Feedback tuner for Logstash pipeline settings.
+
+    Features:
+    - Samples ES write thread-pool queue/rejections, indexing rate, refresh and merge time
+    - Samples Logstash pipeline throughput
+    - Hill-climbs over batch size and worker count, rejecting settings that cause rejections
+    - Emits a recommended config with the full measured curve
+    """
+
+    def __init__(self, backend, window: float = 60.0, warmup: float = 15.0, min_gain: float = 0.03):
+        """
+        Initialize the tuner.
+
+        Args:
+            backend: LiveBackend or SimulatedBackend
+            window: Measurement window per setting in seconds
+            warmup: Seconds to discard after applying a setting
+            min_gain: Relative throughput gain required to keep climbing
+        """
+        self.backend = backend
+        self.window = window
+        self.warmup = warmup
+        self.min_gain = min_gain
+        self.curve = {}
+
+    def print_header(self, message: str):
+        """Print a formatted header message"""
+        print(f"\n{Colors.HEADER}{Colors.BOLD}{'=' * 70}{Colors.END}")
+        print(f"{Colors.HEADER}{Colors.BOLD}{message.center(70)}{Colors.END}")
+        print(f"{Colors.HEADER}{Colors.BOLD}{'=' * 70}{Colors.END}\n")
+
+    def print_success(self, message: str):
+        """Print a success message"""
+        print(f"{Colors.GREEN}✓ {message}{Colors.END}")
+
+    def print_error(self, message: str):
+        """Print an error message"""
+        print(f"{Colors.RED}✗ {message}{Colors.END}")
+
+    def print_warning(self, message: str):
+        """Print a warning message"""
+        print(f"{Colors.YELLOW}⚠ {message}{Colors.END}")
+
+    def print_info(self, message: str):
+        """Print an info message"""
+        print(f"{Colors.CYAN}ℹ {message}{Colors.END}")
+
+    def measure(self, batch_size: int, workers: int) -> Optional[Dict]:
+        """
+        Apply a setting and measure it over one window.
+
+        Args:
+            batch_size: pipeline.batch.size
+            workers: pipeline.workers
+
+        Returns:
+            Measurement dictionary, or None if the setting could not be applied
+        """
+        key = (batch_size, workers)
+        if key in self.curve:
+            return self.curve[key]
+
+        if not self.backend.apply(batch_size, workers):
+            self.print_warning(f"Could not apply batch={batch_size} workers={workers}")
+            return None
+
+        self.backend.sleep(self.warmup)
+        before = snapshot(self.backend)
+        self.backend.sleep(self.window)
+        after = snapshot(self.backend)
+
+        elapsed = max(after['time'] - before['time'], 1e-6)
+        point = {
+            'batch_size': batch_size,
+            'workers': workers,
+            'indexed_per_s': (after['index_total'] - before['index_total']) / elapsed,
+            'logstash_out_per_s': (after['events_out'] - before['events_out']) / elapsed,
+            'rejections': after['rejected'] - before['rejected'],
+            'write_queue': after['queue'],
+            'refresh_ms_per_s': (after['refresh_ms'] - before['refresh_ms']) / elapsed,
+            'merge_ms_per_s': (after['merge_ms'] - before['merge_ms']) / elapsed,
+        }
+        self.curve[key] = point
+
+        status = f"{Colors.RED}rejected{Colors.END}" if point['rejections'] else f"{Colors.GREEN}ok{Colors.END}"
+        print(f"  batch={batch_size:<5} workers={workers:<3} → "
+              f"{point['indexed_per_s']:>10,.0f} docs/s  queue={point['write_queue']:<3} "
+              f"rejections={point['rejections']:<5} merge={point['merge_ms_per_s']:.0f}ms/s  {status}")
+        return point
+
+    @staticmethod
+    def score(point: Optional[Dict]) -> float:
+        """Throughput score; settings with rejections are infeasible"""
+        if point is None or point['rejections'] > 0:
+            return -1.0
+        return point['indexed_per_s']
+
+    def neighbours(self, batch_size: int, workers: int) -> List[Tuple[int, int]]:
+        """Adjacent grid points in both dimensions"""
+        result = []
+        b = BATCH_SIZES.index(batch_size)
+        w = WORKER_COUNTS.index(workers)
+        for db, dw in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            nb, nw = b + db, w + dw
+            if 0 <= nb < len(BATCH_SIZES) and 0 <= nw < len(WORKER_COUNTS):
+                result.append((BATCH_SIZES[nb], WORKER_COUNTS[nw]))
+        return result
+
+    def tune(self, start_batch: int = 125, start_workers: int = 2, max_steps: int = 20) -> Optional[Dict]:
+        """
+        Hill-climb from the starting setting to a local throughput maximum.
+
+        Args:
+            start_batch: Initial pipeline.batch.size (snapped to the grid)
+            start_workers: Initial pipeline.workers (snapped to the grid)
+            max_steps: Maximum number of climbing steps
+
+        Returns:
+            Best feasible measurement, or None if nothing was feasible
+        """
+        self.print_header("LOGSTASH INGEST TUNING")
+        current = (
+            min(BATCH_SIZES, key=lambda b: abs(b - start_batch)),
+            min(WORKER_COUNTS, key=lambda w: abs(w - start_workers)),
+        )
+        self.print_info(f"Window: {self.window:.0f}s (+{self.warmup:.0f}s warmup) per setting")
+        best = self.measure(*current)
+
+        for _ in range(max_steps):
+            candidates = [self.measure(*n) for n in self.neighbours(*current)]
+            top = max(candidates, key=self.score, default=None)
+            if top is None or self.score(top) <= self.score(best) * (1.0 + self.min_gain):
+                break
+            best = top
+            current = (top['batch_size'], top['workers'])
+
+        # min_gain only decides when to stop climbing; report the best point measured on the way
+        feasible = [p for p in self.curve.values() if self.score(p) >= 0]
+        return max(feasible, key=self.score) if feasible else None
+
+    def report(self, best: Optional[Dict], output: Optional[Path] = None):
+        """
+        Print the recommendation and optionally write it with the curve as JSON.
+
+        Args:
+            best: Winning measurement
+            output: Optional JSON report path
+        """
+        self.print_header("MEASURED CURVE")
+        print(f"  {'batch':>6} {'workers':>8} {'docs/s':>12} {'rejections':>11} {'merge ms/s':>11}")
+        for (batch, workers), point in sorted(self.curve.items()):
+            marker = '  ◀ best' if best is not None and point is best else ''
+            print(f"  {batch:>6} {workers:>8} {point['indexed_per_s']:>12,.0f} "
+                  f"{point['rejections']:>11} {point['merge_ms_per_s']:>11.0f}{marker}")
+
+        if best is None:
+            self.print_error("No setting ran without write rejections")
+            return
+
+        self.print_header("RECOMMENDED CONFIG")
+        print(f"{Colors.CYAN}elk/logstash/config/logstash.yml:{Colors.END}")
+        print(f"  pipeline.workers: {best['workers']}")
+        print(f"  pipeline.batch.size: {best['batch_size']}")
+        print(f"\n{Colors.CYAN}docker-compose.yml (logstash.environment):{Colors.END}")
+        print(f"  - pipeline.workers={best['workers']}")
+        print(f"  - pipeline.batch.size={best['batch_size']}")
+        self.print_success(f"Expected throughput: {best['indexed_per_s']:,.0f} docs/s")
+
+        if output:
+            report = {
+                'recommended': {'pipeline.workers': best['workers'], 'pipeline.batch.size': best['batch_size']},
+                'expected_docs_per_s': best['indexed_per_s'],
+                'curve': sorted(self.curve.values(), key=lambda p: (p['batch_size'], p['workers'])),
+            }
+            output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+            self.print_success(f"Report written to {output}")
+
+
+def main():
+    """Main entry point for the ingest tuner"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Tune Logstash batch size and workers from Elasticsearch ingest feedback",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python logstash_tuner.py --simulate                 # Offline run against the model
+  python logstash_tuner.py --window 120 -o tune.json  # Tune the running stack
+        """
+    )
+
+    parser.add_argument("--simulate", action="store_true", help="Use the simulated backend")
+    parser.add_argument("--es-url", default="http://localhost:9200", help="Elasticsearch URL")
+    parser.add_argument("--logstash-url", default="http://localhost:9600", help="Logstash monitoring API URL")
+    parser.add_argument("--window", type=float, default=60.0, help="Seconds measured per setting")
+    parser.add_argument("--warmup", type=float, default=15.0, help="Seconds discarded after each change")
+    parser.add_argument("--start-batch", type=int, default=125, help="Starting pipeline.batch.size")
+    parser.add_argument("--start-workers", type=int, default=2, help="Starting pipeline.workers")
+    parser.add_argument("--offered-load", type=float, default=40000.0, help="Simulated events/s")
+    parser.add_argument("-o", "--output", type=Path, default=None, help="Write the report as JSON")
+
+    args = parser.parse_args()
+
+    if args.simulate:
+        backend = SimulatedBackend(offered_load=args.offered_load)
+    else:
+        project_root = Path(__file__).parent.parent
+        backend = LiveBackend(project_root, args.es_url, args.logstash_url)
+
+    tuner = IngestTuner(backend, window=args.window, warmup=args.warmup)
+
+    try:
+        best = tuner.tune(args.start_batch, args.start_workers)
+    except KeyboardInterrupt:
+        print()
+        tuner.print_warning("Tuning cancelled - reporting what was measured")
+        best = max((p for p in tuner.curve.values() if tuner.score(p) >= 0),
+                   key=tuner.score, default=None)
+    except (OSError, RuntimeError, ValueError) as e:
+        tuner.print_error(f"Sampling failed: {e}")
+        backend.cleanup()
+        sys.exit(1)
+
+    backend.cleanup()
+    tuner.report(best, args.output)
+    sys.exit(0 if best else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+"""
+OTLP Trace Codec
+Minimal decoder/encoder for OTLP/HTTP trace export requests (protobuf and JSON)
+shared by the trace tooling in this folder. Only the span fields the tools need are
+decoded; each span keeps its original encoding so it can be forwarded unchanged.
+"""
+
+import json
+import struct
+from typing import Dict, List, Optional, Tuple
+
+
+# OTLP span status codes
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# OTLP span kinds
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+KIND_PRODUCER = 4
+KIND_CONSUMER = 5
+
+CONTENT_TYPE_PROTOBUF = 'application/x-protobuf'
+CONTENT_TYPE_JSON = 'application/json'
+
+
+class Resource:
+    """Resource (plus scope) a span was reported under"""
+
+    __slots__ = ('raw', 'scope', 'key', 'service_name')
+
+    def __init__(self, raw, scope, key, service_name: str):
+        self.raw = raw
+        self.scope = scope
+        self.key = key
+        self.service_name = service_name
+
+
+class Span:
+    """A decoded span with a reference to its original encoding"""
+
+    __slots__ = ('trace_id', 'span_id', 'parent_span_id', 'name', 'kind',
+                 'start_ns', 'end_ns', 'status_code', 'resource', 'raw', 'encoding')
+
+    def __init__(self, trace_id: bytes, span_id: bytes, parent_span_id: bytes, name: str,
+                 kind: int, start_ns: int, end_ns: int, status_code: int,
+                 resource: Resource, raw, encoding: str):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = start_ns
+        self.end_ns = end_ns
+        self.status_code = status_code
+        self.resource = resource
+        self.raw = raw
+        self.encoding = encoding
+
+    @property
+    def duration_ns(self) -> int:
+        """Span duration in nanoseconds"""
+        return max(0, self.end_ns - self.start_ns)
+
+    @property
+    def service_name(self) -> str:
+        """service.name of the reporting resource"""
+        return self.resource.service_name
+
+    def encoded_size(self) -> int:
+        """Approximate memory footprint of the raw span in bytes"""
+        if self.encoding == 'protobuf':
+            return len(self.raw) + 200
+        return 600
+
+
+# ============================================================================
+# Protobuf wire format
+# ============================================================================
+
+def _read_varint(buf: bytes, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _iter_fields(buf: bytes):
+    """Yield (field_number, wire_type, value) for every field in a message"""
+    pos = 0
+    end = len(buf)
+    while pos < end:
+        key, pos = _read_varint(buf, pos)
+        field, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, pos = _read_varint(buf, pos)
+        elif wire_type == 2:
+            length, pos = _read_varint(buf, pos)
+            value = buf[pos:pos + length]
+            pos += length
+        elif wire_type == 1:
+            value = struct.unpack_from('<Q', buf, pos)[0]
+            pos += 8
+        elif wire_type == 5:
+            value = struct.unpack_from('<I', buf, pos)[0]
+            pos += 4
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire_type}")
+        yield field, wire_type, value
+
+
+def _write_varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _len_field(field: int, payload: bytes) -> bytes:
+    return _write_varint((field << 3) | 2) + _write_varint(len(payload)) + payload
+
+
+def _proto_service_name(resource: bytes) -> str:
+    for field, _, value in _iter_fields(resource):
+        if field != 1:
+            continue
+        key = None
+        string_value = None
+        for kv_field, _, kv_value in _iter_fields(value):
+            if kv_field == 1:
+                key = kv_value.decode('utf-8', errors='replace')
+            elif kv_field == 2:
+                for any_field, _, any_value in _iter_fields(kv_value):
+                    if any_field == 1:
+                        string_value = any_value.decode('utf-8', errors='replace')
+        if key == 'service.name' and string_value is not None:
+            return string_value
+    return 'unknown_service'
+
+
+def _decode_proto_span(raw: bytes, resource: Resource) -> Span:
+    trace_id = span_id = parent = b''
+    name = ''
+    kind = 0
+    start = end = 0
+    status_code = STATUS_UNSET
+
+    for field, _, value in _iter_fields(raw):
+        if field == 1:
+            trace_id = value
+        elif field == 2:
+            span_id = value
+        elif field == 4:
+            parent = value
+        elif field == 5:
+            name = value.decode('utf-8', errors='replace')
+        elif field == 6:
+            kind = value
+        elif field == 7:
+            start = value
+        elif field == 8:
+            end = value
+        elif field == 15:
+            for status_field, _, status_value in _iter_fields(value):
+                if status_field == 3:
+                    status_code = status_value
+
+    return Span(trace_id, span_id, parent, name, kind, start, end, status_code,
+                resource, raw, 'protobuf')
+
+
+def decode_protobuf(body: bytes) -> List[Span]:
+    """
+    Decode an ExportTraceServiceRequest in protobuf encoding.
+
+    Args:
+        body: Request body
+
+    Returns:
+        List of spans
+    """
+    spans = []
+    for field, _, resource_spans in _iter_fields(body):
+        if field != 1:
+            continue
+
+        resource_raw = b''
+        scope_spans_list = []
+        for rs_field, _, rs_value in _iter_fields(resource_spans):
+            if rs_field == 1:
+                resource_raw = rs_value
+            elif rs_field == 2:
+                scope_spans_list.append(rs_value)
+
+        service_name = _proto_service_name(resource_raw)
+        for scope_spans in scope_spans_list:
+            scope_raw = b''
+            raw_spans = []
+            for ss_field, _, ss_value in _iter_fields(scope_spans):
+                if ss_field == 1:
+                    scope_raw = ss_value
+                elif ss_field == 2:
+                    raw_spans.append(ss_value)
+
+            resource = Resource(resource_raw, scope_raw, (resource_raw, scope_raw), service_name)
+            for raw in raw_spans:
+                spans.append(_decode_proto_span(raw, resource))
+    return spans
+
+
+def encode_protobuf(spans: List[Span]) -> bytes:
+    """
+    Encode protobuf-origin spans as one ExportTraceServiceRequest.
+
+    Args:
+        spans: Spans decoded from protobuf requests
+
+    Returns:
+        Request body
+    """
+    groups = {}
+    for span in spans:
+        groups.setdefault(span.resource.key, []).append(span)
+
+    out = []
+    for (resource_raw, scope_raw), group in groups.items():
+        scope_spans = b''.join([_len_field(1, scope_raw)] + [_len_field(2, s.raw) for s in group])
+        resource_spans = _len_field(1, resource_raw) + _len_field(2, scope_spans)
+        out.append(_len_field(1, resource_spans))
+    return b''.join(out)
+
+
+def build_proto_span(trace_id: bytes, span_id: bytes, parent_span_id: bytes, name: str,
+                     kind: int, start_ns: int, end_ns: int, status_code: int = STATUS_UNSET,
+                     attributes: Optional[Dict[str, str]] = None) -> bytes:
+    """
+    Encode a span message (used by load generators and benchmarks).
+
+    Args:
+        trace_id: 16-byte trace id
+        span_id: 8-byte span id
+        parent_span_id: 8-byte parent id or b''
+        name: Operation name
+        kind: Span kind
+        start_ns: Start time (unix nanoseconds)
+        end_ns: End time (unix nanoseconds)
+        status_code: Status code
+        attributes: Optional string attributes
+
+    Returns:
+        Encoded Span message
+    """
+    parts = [_len_field(1, trace_id), _len_field(2, span_id)]
+    if parent_span_id:
+        parts.append(_len_field(4, parent_span_id))
+    parts.append(_len_field(5, name.encode('utf-8')))
+    parts.append(_write_varint(6 << 3) + _write_varint(kind))
+    parts.append(_write_varint((7 << 3) | 1) + struct.pack('<Q', start_ns))
+    parts.append(_write_varint((8 << 3) | 1) + struct.pack('<Q', end_ns))
+    for key, value in (attributes or {}).items():
+        any_value = _len_field(1, str(value).encode('utf-8'))
+        parts.append(_len_field(9, _len_field(1, key.encode('utf-8')) + _len_field(2, any_value)))
+    if status_code:
+        parts.append(_len_field(15, _write_varint(3 << 3) + _write_varint(status_code)))
+    return b''.join(parts)
+
+
+def build_proto_request(service_name: str, raw_spans: List[bytes]) -> bytes:
+    """
+    Wrap encoded spans from one service into an ExportTraceServiceRequest.
+
+    Args:
+        service_name: Resource service.name
+        raw_spans: Encoded Span messages
+
+    Returns:
+        Request body
+    """
+    any_value = _len_field(1, service_name.encode('utf-8'))
+    resource = _len_field(1, _len_field(1, b'service.name') + _len_field(2, any_value))
+    scope_spans = b''.join(_len_field(2, raw) for raw in raw_spans)
+    resource_spans = _len_field(1, resource) + _len_field(2, scope_spans)
+    return _len_field(1, resource_spans)
+
+
+# ============================================================================
+# OTLP/JSON
+# ============================================================================
+
+def _json_id(value) -> bytes:
+    if not value:
+        return b''
+    try:
+        return bytes.fromhex(value)
+    except (TypeError, ValueError):
+        import base64
+        return base64.b64decode(value)
+
+
+def _json_service_name(resource: Dict) -> str:
+    for attribute in resource.get('attributes', []):
+        if attribute.get('key') == 'service.name':
+            return attribute.get('value', {}).get('stringValue', 'unknown_service')
+    return 'unknown_service'
+
+
+def decode_json(body: bytes) -> List[Span]:
+    """
+    Decode an ExportTraceServiceRequest in OTLP/JSON encoding.
+
+    Args:
+        body: Request body
+
+    Returns:
+        List of spans
+
+    Raises:
+        ValueError: If the body is not a JSON object
+    """
+    request = json.loads(body)
+    if not isinstance(request, dict):
+        raise ValueError(f"Malformed JSON body: expected an object, got {type(request).__name__}")
+    spans = []
+
+    for resource_spans in request.get('resourceSpans', []):
+        resource_raw = resource_spans.get('resource', {})
+        service_name = _json_service_name(resource_raw)
+        resource_key = json.dumps(resource_raw, sort_keys=True)
+
+        scope_list = resource_spans.get('scopeSpans') or resource_spans.get('instrumentationLibrarySpans', [])
+        for scope_spans in scope_list:
+            scope_raw = scope_spans.get('scope', {})
+            resource = Resource(resource_raw, scope_raw,
+                                (resource_key, json.dumps(scope_raw, sort_keys=True)), service_name)
+
+            for raw in scope_spans.get('spans', []):
+                spans.append(Span(
+                    _json_id(raw.get('traceId')),
+                    _json_id(raw.get('spanId')),
+                    _json_id(raw.get('parentSpanId')),
+                    raw.get('name', ''),
+                    int(raw.get('kind', 0)),
+                    int(raw.get('startTimeUnixNano', 0)),
+                    int(raw.get('endTimeUnixNano', 0)),
+                    int(raw.get('status', {}).get('code', STATUS_UNSET)),
+                    resource, raw, 'json',
+                ))
+    return spans
+
+
+def encode_json(spans: List[Span]) -> bytes:
+    """
+    Encode JSON-origin spans as one OTLP/JSON request.
+
+    Args:
+        spans: Spans decoded from JSON requests
+
+    Returns:
+        Request body
+    """
+    groups = {}
+    for span in spans:
+        groups.setdefault(span.resource.key, (span.resource, []))[1].append(span.raw)
+
+    resource_spans = [
+        {'resource': resource.raw, 'scopeSpans': [{'scope': resource.scope, 'spans': raw_spans}]}
+        for resource, raw_spans in groups.values()
+    ]
+    return json.dumps({'resourceSpans': resource_spans}, separators=(',', ':')).encode('utf-8')
+
+
+# ============================================================================
+# Dispatch helpers
+# ============================================================================
+
+def decode_request(body: bytes, content_type: str) -> List[Span]:
+    """
+    Decode an OTLP/HTTP trace export body based on its content type.
+
+    Args:
+        body: Request body
+        content_type: Content-Type header value
+
+    Returns:
+        List of spans
+
+    Raises:
+        ValueError: If the body cannot be decoded
+    """
+    if 'json' in (content_type or ''):
+        try:
+            return decode_json(body)
+        except (AttributeError, TypeError) as e:
+            # Valid JSON whose nested fields have the wrong shape
+            raise ValueError(f"Malformed JSON body: {e}")
+    try:
+        return decode_protobuf(body)
+    except (IndexError, struct.error) as e:
+        raise ValueError(f"Malformed protobuf body: {e}")
+    except (AttributeError, TypeError) as e:
+        # A field sent with an unexpected wire type (e.g. a varint where a string belongs)
+        raise ValueError(f"Malformed protobuf body: wrong wire type ({e})")
+
+
+def encode_batches(spans: List[Span]) -> List[Tuple[bytes, str, int]]:
+    """
+    Encode spans into request bodies, one per original encoding.
+
+    Args:
+        spans: Spans of any origin
+
+    Returns:
+        List of (body, content_type, span count) tuples
+    """
+    proto_spans = [span for span in spans if span.encoding == 'protobuf']
+    json_spans = [span for span in spans if span.encoding == 'json']
+    batches = []
+    if proto_spans:
+        batches.append((encode_protobuf(proto_spans), CONTENT_TYPE_PROTOBUF, len(proto_spans)))
+    if json_spans:
+        batches.append((encode_json(json_spans), CONTENT_TYPE_JSON, len(json_spans)))
+    return batches
@@ -0,0 +1,733 @@
+"""
+Prometheus Cardinality and Scrape-Cost Analyzer
+Combines TSDB head statistics, target scrape timings and a streaming parse of
+every target's exposition to find the metrics and labels that dominate head
+memory, then suggests metric_relabel_configs per job with projected savings
+"""
+
+import http.client
+import json
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlencode, urlparse
+
+
+class Colors:
+    """ANSI color codes for terminal output"""
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    END = '\033[0m'
+    BOLD = '\033[1m'
+
+
+# Rough head cost of one series when Prometheus' own RSS is unavailable
+DEFAULT_BYTES_PER_SERIES = 4096
+
+# Distinct values remembered per label before counting stops being exact
+MAX_TRACKED_VALUES = 10000
+
+LABEL_RE = re.compile(r'\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*"((?:[^"\\]|\\.)*)"\s*,?')
+
+IDENTIFIER_RE = re.compile(r'[a-zA-Z_:][a-zA-Z0-9_:]*')
+
+HISTOGRAM_SUFFIXES = ('_bucket', '_sum', '_count')
+SUMMARY_SUFFIXES = ('_sum', '_count')
+
+
+def parse_exposition(lines: Iterable[bytes]) -> Iterable[Tuple[str, str, List[Tuple[str, str]]]]:
+    """
+    Stream-parse the Prometheus text exposition format.
+
+    Only what cardinality analysis needs is extracted: the family a sample
+    belongs to (histogram and summary children are folded into their family
+    using the TYPE lines), the sample name and its labels. Values are skipped.
+
+    Args:
+        lines: Raw lines, e.g. an HTTP response iterated line by line
+
+    Yields:
+        Tuples of (family, sample name, [(label, value), ...])
+    """
+    types: Dict[str, str] = {}
+    findall = LABEL_RE.findall
+    for raw in lines:
+        line = raw.decode('utf-8', 'replace').strip() if isinstance(raw, bytes) else raw.strip()
+        if not line:
+            continue
+        if line[0] == '#':
+            parts = line.split(None, 3)
+            if len(parts) >= 4 and parts[1] == 'TYPE':
+                types[parts[2]] = parts[3].strip()
+            continue
+
+        brace = line.find('{')
+        space = line.find(' ')
+        if brace == -1 or (space != -1 and space < brace):
+            name = line[:space] if space != -1 else line
+            labels = []
+        else:
+            name = line[:brace]
+            labels = findall(line, brace + 1, line.rfind('}'))
+
+        family = name
+        if name not in types:
+            for suffix in HISTOGRAM_SUFFIXES:
+                if name.endswith(suffix):
+                    base = name[:-len(suffix)]
+                    kind = types.get(base)
+                    if kind == 'histogram' or (kind == 'summary' and suffix in SUMMARY_SUFFIXES):
+                        family = base
+                    break
+        yield family, name, labels
+
+
+class TargetProfile:
+    """Series statistics for one scraped exposition"""
+
+    def __init__(self, job: str, url: str):
+        self.job = job
+        self.url = url
+        self.samples = 0
+        self.bytes = 0
+        self.error: Optional[str] = None
+        self.scrape_duration = 0.0
+        self.scrape_interval = 0.0
+        # family -> sample count
+        self.families: Dict[str, int] = {}
+        # family -> sample name -> count (to separate _bucket from _sum/_count)
+        self.children: Dict[str, Dict[str, int]] = {}
+        # label -> set of values
+        self.label_values: Dict[str, Set[str]] = {}
+        # family -> label -> set of values
+        self.family_labels: Dict[str, Dict[str, Set[str]]] = {}
+        # Labels Prometheus attaches after relabel_configs (pod, app, version...)
+        # and the service-discovery labels they were copied from
+        self.target_labels: Dict[str, str] = {}
+        self.discovered_labels: Dict[str, str] = {}
+
+    def add(self, family: str, name: str, labels: List[Tuple[str, str]]):
+        """Record one sample"""
+        self.samples += 1
+        self.families[family] = self.families.get(family, 0) + 1
+        if name != family:
+            children = self.children.setdefault(family, {})
+            children[name] = children.get(name, 0) + 1
+
+        per_family = self.family_labels.get(family)
+        if per_family is None:
+            per_family = self.family_labels[family] = {}
+        for label, value in labels:
+            values = per_family.get(label)
+            if values is None:
+                values = per_family[label] = set()
+            if len(values) < MAX_TRACKED_VALUES:
+                values.add(value)
+            overall = self.label_values.get(label)
+            if overall is None:
+                overall = self.label_values[label] = set()
+            if len(overall) < MAX_TRACKED_VALUES:
+                overall.add(value)
+
+
+class PrometheusClient:
+    """Small keep-alive client for the Prometheus HTTP API"""
+
+    def __init__(self, prometheus_url: str, timeout: float = 30.0):
+        parsed = urlparse(prometheus_url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 9090
+        self.base_path = parsed.path.rstrip('/')
+        self.timeout = timeout
+        self._conn = None
+
+    def get(self, path: str, params: Optional[Dict] = None) -> Dict:
+        """
+        GET an API endpoint and return its data field.
+
+        Raises:
+            RuntimeError: If the request fails or the API reports an error
+        """
+        target = self.base_path + path + ('?' + urlencode(params) if params else '')
+        for attempt in range(2):
+            if self._conn is None:
+                self._conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self._conn.request('GET', target)
+                response = self._conn.getresponse()
+                body = response.read()
+                break
+            except (OSError, http.client.HTTPException) as e:
+                self._conn.close()
+                self._conn = None
+                if attempt:
+                    raise RuntimeError(f"GET {path} failed: {e}")
+        try:
+            payload = json.loads(body.decode('utf-8'))
+        except ValueError:
+            raise RuntimeError(f"GET {path} returned {response.status} with a non-JSON body")
+        if payload.get('status') != 'success':
+            raise RuntimeError(f"GET {path}: {payload.get('error', response.status)}")
+        return payload['data']
+
+
+def scrape_target(job: str, url: str, timeout: float = 30.0) -> TargetProfile:
+    """
+    Fetch a target's exposition and profile it while streaming.
+
+    Args:
+        job: Job name
+        url: Scrape URL
+        timeout: Socket timeout in seconds
+
+    Returns:
+        TargetProfile (with error set if the scrape failed)
+    """
+    profile = TargetProfile(job, url)
+    parsed = urlparse(url)
+    conn_class = http.client.HTTPSConnection if parsed.scheme == 'https' else http.client.HTTPConnection
+    conn = conn_class(parsed.hostname, parsed.port or (443 if parsed.scheme == 'https' else 80), timeout=timeout)
+    path = parsed.path or '/metrics'
+    if parsed.query:
+        path += '?' + parsed.query
+    try:
+        conn.request('GET', path, headers={'Accept': 'text/plain;version=0.0.4'})
+        response = conn.getresponse()
+        if response.status != 200:
+            profile.error = f"HTTP {response.status}"
+            return profile
+
+        def counted(stream):
+            for line in stream:
+                profile.bytes += len(line)
+                yield line
+
+        for family, name, labels in parse_exposition(counted(response)):
+            profile.add(family, name, labels)
+    except (OSError, http.client.HTTPException) as e:
+        profile.error = str(e) or e.__class__.__name__
+    finally:
+        conn.close()
+    return profile
+
+
+def rule_references(groups: List[Dict]) -> Set[str]:
+    """Collect every identifier used in rule expressions"""
+    names = set()
+    for group in groups:
+        for rule in group.get('rules', []):
+            names.update(IDENTIFIER_RE.findall(rule.get('query', '')))
+    return names
+
+
+class JobReport:
+    """Aggregated profile and relabel suggestions for one job"""
+
+    def __init__(self, job: str):
+        self.job = job
+        self.targets: List[TargetProfile] = []
+        self.families: Dict[str, int] = {}
+        self.children: Dict[str, Dict[str, int]] = {}
+        self.family_label_values: Dict[str, Dict[str, int]] = {}
+        # target label -> distinct values across the job's targets
+        self.target_label_values: Dict[str, Set[str]] = {}
+        # target label -> __meta_* label it was copied from
+        self.target_label_origins: Dict[str, str] = {}
+        self.suggestions: List[Dict] = []
+        self.saved_series = 0
+
+    def add(self, profile: TargetProfile):
+        self.targets.append(profile)
+        for family, count in profile.families.items():
+            self.families[family] = self.families.get(family, 0) + count
+        for family, children in profile.children.items():
+            merged = self.children.setdefault(family, {})
+            for name, count in children.items():
+                merged[name] = merged.get(name, 0) + count
+        for family, labels in profile.family_labels.items():
+            merged = self.family_label_values.setdefault(family, {})
+            for label, values in labels.items():
+                merged[label] = max(merged.get(label, 0), len(values))
+        for label, value in profile.target_labels.items():
+            if label in ('job', 'instance') or label.startswith('__'):
+                continue
+            self.target_label_values.setdefault(label, set()).add(value)
+            if label not in self.target_label_origins:
+                for meta, meta_value in profile.discovered_labels.items():
+                    if meta.startswith('__meta_') and meta_value == value:
+                        self.target_label_origins[label] = meta
+                        break
+
+    @property
+    def series(self) -> int:
+        return sum(self.families.values())
+
+
+class CardinalityAnalyzer:
+    """Pulls TSDB, target and rule data and derives relabel suggestions"""
+
+    def __init__(self, client: PrometheusClient, min_series: int = 500, workers: int = 8,
+                 host_map: Optional[Dict[str, str]] = None):
+        """
+        Initialize the analyzer.
+
+        Args:
+            client: Prometheus API client
+            min_series: Smallest per-job metric series count worth a suggestion
+            workers: Concurrent target scrapes
+            host_map: Replace host:port in scrape URLs (container names are not
+                resolvable from the host)
+        """
+        self.client = client
+        self.min_series = min_series
+        self.workers = workers
+        self.host_map = host_map or {}
+        self.tsdb: Dict = {}
+        self.referenced: Set[str] = set()
+        self.bytes_per_series = DEFAULT_BYTES_PER_SERIES
+        self.jobs: Dict[str, JobReport] = {}
+
+    def _rewrite(self, url: str) -> str:
+        parsed = urlparse(url)
+        replacement = self.host_map.get(parsed.netloc)
+        return url.replace(parsed.netloc, replacement, 1) if replacement else url
+
+    def collect(self):
+        """Fetch TSDB status, rules, self-memory and profile every active target"""
+        self.tsdb = self.client.get('/api/v1/status/tsdb')
+        try:
+            self.referenced = rule_references(self.client.get('/api/v1/rules').get('groups', []))
+        except RuntimeError:
+            self.referenced = set()
+
+        head_series = self.tsdb.get('headStats', {}).get('numSeries', 0)
+        try:
+            result = self.client.get('/api/v1/query', {'query': 'process_resident_memory_bytes{job="prometheus"}'})
+            rss = float(result['result'][0]['value'][1]) if result.get('result') else 0.0
+            if rss and head_series:
+                self.bytes_per_series = rss / head_series
+        except (RuntimeError, KeyError, IndexError, ValueError):
+            pass
+
+        targets = self.client.get('/api/v1/targets', {'state': 'active'}).get('activeTargets', [])
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = []
+            for target in targets:
+                job = target.get('labels', {}).get('job') or target.get('scrapePool', 'unknown')
+                futures.append((target, pool.submit(scrape_target, job, self._rewrite(target['scrapeUrl']))))
+            for target, future in futures:
+                profile = future.result()
+                profile.scrape_duration = float(target.get('lastScrapeDuration') or 0.0)
+                interval = target.get('scrapeInterval') or ''
+                profile.scrape_interval = parse_duration(interval) if interval else 0.0
+                profile.target_labels = target.get('labels') or {}
+                profile.discovered_labels = target.get('discoveredLabels') or {}
+                report = self.jobs.get(profile.job)
+                if report is None:
+                    report = self.jobs[profile.job] = JobReport(profile.job)
+                report.add(profile)
+
+    def suggest(self):
+        """Build metric_relabel_configs suggestions for every job"""
+        label_memory = self.tsdb.get('memoryInBytesByLabelName', [])
+        label_bytes = {item['name']: item['value'] for item in label_memory}
+        label_values = {item['name']: item['value'] for item in self.tsdb.get('labelValueCountByLabelName', [])}
+
+        for report in self.jobs.values():
+            drops = []
+            bucket_drops = []
+            for family, count in sorted(report.families.items(), key=lambda item: -item[1]):
+                if count < self.min_series:
+                    break
+                buckets = report.children.get(family, {}).get(family + '_bucket', 0)
+                if family in self.referenced or any(name in self.referenced
+                                                    for name in report.children.get(family, {})):
+                    # Used by rules: can only shed histogram buckets when no rule reads them
+                    if buckets and (family + '_bucket') not in self.referenced and buckets >= self.min_series:
+                        bucket_drops.append((family, buckets))
+                    continue
+                drops.append((family, count))
+
+            if drops:
+                names = [family for family, _ in drops]
+                regex = '|'.join(re.escape(name) + ('(_bucket|_sum|_count)?' if name in report.children else '')
+                                 for name in names)
+                saved = sum(count for _, count in drops)
+                report.suggestions.append({
+                    'reason': f"{len(drops)} metric(s) with ≥{self.min_series} series not used by any rule",
+                    'series': saved,
+                    'config': {'source_labels': ['__name__'], 'regex': regex, 'action': 'drop'},
+                })
+                report.saved_series += saved
+
+            if bucket_drops:
+                regex = '|'.join(re.escape(family) + '_bucket' for family, _ in bucket_drops)
+                saved = sum(count for _, count in bucket_drops)
+                report.suggestions.append({
+                    'reason': "histogram buckets not read by histogram_quantile in any rule (_sum/_count kept)",
+                    'series': saved,
+                    'config': {'source_labels': ['__name__'], 'regex': regex, 'action': 'drop'},
+                })
+                report.saved_series += saved
+
+            # Labels copied onto every series of a target: constant within one
+            # target (so dropping never collides while instance remains) yet
+            # high-cardinality across the TSDB, which costs memory and churn.
+            # Most come from relabel_configs (pod name, version, app) and are
+            # target labels, which never appear in the exposition itself.
+            constant = None
+            for profile in report.targets:
+                if profile.error:
+                    continue
+                labels = {label for label, values in profile.label_values.items() if len(values) == 1}
+                constant = labels if constant is None else constant & labels
+            candidates = []
+            for label in sorted((constant or set()) | set(report.target_label_values)):
+                if label in ('instance', 'job', '__name__') or label in self.referenced:
+                    continue
+                values = report.target_label_values.get(label, ())
+                # A distinct value on every target only repeats what instance identifies
+                per_target = len(report.targets) > 1 and len(values) == len(report.targets)
+                if label_values.get(label, 0) >= 50 or per_target:
+                    candidates.append(label)
+            if candidates:
+                saved_bytes = sum(label_bytes.get(label, 0) for label in candidates)
+                origins = [f"{label} ← {report.target_label_origins[label]}" for label in candidates
+                           if label in report.target_label_origins]
+                origin = f"; or stop copying {', '.join(origins)} in relabel_configs" if origins else ''
+                report.suggestions.append({
+                    'reason': f"per-target labels {', '.join(candidates)} with high cardinality (memory and churn, "
+                              f"~{saved_bytes / 1024 / 1024:.1f} MiB label data{origin})",
+                    'series': 0,
+                    'config': {'regex': '|'.join(candidates), 'action': 'labeldrop'},
+                })
+
+    def print_report(self, top: int = 10):
+        """Print TSDB, scrape-cost and suggestion tables"""
+        head = self.tsdb.get('headStats', {})
+        print(f"\n{Colors.BOLD}{Colors.HEADER}Head: {head.get('numSeries', 0):,} series, "
+              f"{head.get('chunkCount', 0):,} chunks, ~{self.bytes_per_series:,.0f} bytes/series{Colors.END}\n")
+
+        print(f"  {'Top metrics by series':50} {'Series':>10}")
+        for item in self.tsdb.get('seriesCountByMetricName', [])[:top]:
+            print(f"  {item['name'][:50]:50} {item['value']:>10,}")
+        print(f"\n  {'Top labels by memory':30} {'Bytes':>12} {'Values':>10}")
+        values = {item['name']: item['value'] for item in self.tsdb.get('labelValueCountByLabelName', [])}
+        for item in self.tsdb.get('memoryInBytesByLabelName', [])[:top]:
+            print(f"  {item['name'][:30]:30} {item['value']:>12,} {values.get(item['name'], 0):>10,}")
+
+        print(f"\n{Colors.BOLD}{Colors.HEADER}Scrape cost per job{Colors.END}\n")
+        print(f"  {'Job':24} {'Targets':>8} {'Down':>5} {'Samples':>10} {'KiB':>9} "
+              f"{'Max dur':>10} {'Interval':>9} {'Dur/Int':>8}")
+        for job, report in sorted(self.jobs.items(), key=lambda item: -item[1].series):
+            failed = sum(1 for t in report.targets if t.error)
+            size = sum(t.bytes for t in report.targets) / 1024
+            duration = max((t.scrape_duration for t in report.targets), default=0.0)
+            interval = max((t.scrape_interval for t in report.targets), default=0.0)
+            ratio = duration / interval if interval else 0.0
+            color = Colors.RED if ratio > 0.5 else Colors.YELLOW if ratio > 0.2 else ''
+            end = Colors.END if color else ''
+            print(f"  {job[:24]:24} {len(report.targets):>8} {failed:>5} {report.series:>10,} {size:>9,.0f} "
+                  f"{duration:>9.3f}s {interval:>8.0f}s {color}{ratio:>7.1%}{end}")
+            for family, count in sorted(report.families.items(), key=lambda item: -item[1])[:3]:
+                labels = report.family_label_values.get(family, {})
+                widest = max(labels.items(), key=lambda item: item[1], default=('', 0))
+                detail = f" (widest label: {widest[0]}={widest[1]})" if widest[0] else ''
+                print(f"      {family[:45]:45} {count:>8,}{detail}")
+            if report.target_label_values:
+                added = ', '.join(
+                    f"{label}={len(values)}" + (f" ({report.target_label_origins[label]})"
+                                                if label in report.target_label_origins else '')
+                    for label, values in sorted(report.target_label_values.items()))
+                print(f"      target labels on every series: {added}")
+
+        total_saved = 0
+        print(f"\n{Colors.BOLD}{Colors.HEADER}Suggested metric_relabel_configs{Colors.END}")
+        for job, report in sorted(self.jobs.items()):
+            if not report.suggestions:
+                continue
+            mib = report.saved_series * self.bytes_per_series / 1024 / 1024
+            total_saved += report.saved_series
+            print(f"\n  {Colors.BOLD}{job}{Colors.END}: -{report.saved_series:,} series (≈ {mib:,.1f} MiB)")
+            for suggestion in report.suggestions:
+                print(f"    • {suggestion['reason']}")
+        if not total_saved and not any(r.suggestions for r in self.jobs.values()):
+            print(f"\n  {Colors.GREEN}✓ Nothing worth dropping above {self.min_series} series{Colors.END}")
+        else:
+            mib = total_saved * self.bytes_per_series / 1024 / 1024
+            print(f"\n  Projected head reduction: {total_saved:,} series ≈ {mib:,.1f} MiB")
+        print()
+
+    def render_yaml(self) -> str:
+        """Render the suggestions as prometheus.yml snippets"""
+        lines = ["# Suggested metric_relabel_configs - generated by scripts/prom_cardinality.py",
+                 "# Paste each block under the matching job in prometheus/prometheus.yml", ""]
+        for job, report in sorted(self.jobs.items()):
+            if not report.suggestions:
+                continue
+            mib = report.saved_series * self.bytes_per_series / 1024 / 1024
+            lines.append(f"# job: {job} (-{report.saved_series:,} series, ~{mib:,.1f} MiB)")
+            lines.append(f"- job_name: '{job}'")
+            lines.append("  metric_relabel_configs:")
+            for suggestion in report.suggestions:
+                config = suggestion['config']
+                lines.append(f"    # {suggestion['reason']}")
+                first = True
+                for key in ('source_labels', 'regex', 'action'):
+                    if key not in config:
+                        continue
+                    value = config[key]
+                    if key == 'source_labels':
+                        rendered = '[' + ', '.join(value) + ']'
+                    elif key == 'regex':
+                        rendered = "'" + value.replace("'", "''") + "'"
+                    else:
+                        rendered = value
+                    lines.append(f"    {'- ' if first else '  '}{key}: {rendered}")
+                    first = False
+            lines.append("")
+        return '\n'.join(lines)
+
+
+def parse_duration(text: str) -> float:
+    """Parse a Prometheus duration such as 15s, 1m or 1h30m into seconds"""
+    units = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800, 'y': 31536000}
+    total = 0.0
+    for amount, unit in re.findall(r'(\d+(?:\.\d+)?)(ms|s|m|h|d|w|y)', text):
+        total += float(amount) * units[unit]
+    return total
+
+
+# ============================================================================
+# Fixture servers
+# ============================================================================
+
+def fixture_exposition(index: int) -> bytes:
+    """
+    Exposition of one fixture pod: a histogram read only through _count by the
+    rules, an unused high-cardinality gauge and a small referenced counter
+    """
+    lines = ['# TYPE http_request_duration_seconds histogram']
+    for path in range(40):
+        for le in ('0.005', '0.01', '0.05', '0.1', '0.5', '1', '5', '+Inf'):
+            lines.append(f'http_request_duration_seconds_bucket{{path="/api/{path}",le="{le}"}} {path}')
+        lines.append(f'http_request_duration_seconds_sum{{path="/api/{path}"}} 1.5')
+        lines.append(f'http_request_duration_seconds_count{{path="/api/{path}"}} {path}')
+    lines.append('# TYPE app_cache_entries gauge')
+    for key in range(300):
+        lines.append(f'app_cache_entries{{key="tenant-{key}",shard="{key % 4}"}} {index}')
+    lines.append('# TYPE http_requests_total counter')
+    for method in ('GET', 'POST'):
+        for status in ('200', '500'):
+            lines.append(f'http_requests_total{{method="{method}",status="{status}"}} 7')
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def start_fixtures(pods: int):
+    """
+    Serve a fake Prometheus API and the expositions of its pods on localhost.
+
+    The targets look like the kubernetes-pods job in prometheus.yml: pod, app
+    and version are target labels added by relabel_configs from __meta_*
+    discovery labels, so they appear in /api/v1/targets but never in the
+    expositions.
+
+    Returns:
+        (server, base URL); call server.shutdown() when done
+    """
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    state = {}
+
+    def api_data(path: str):
+        base = state['url']
+        if path == '/api/v1/status/tsdb':
+            series = pods * (40 * 10 + 300 + 4)
+            return {
+                'headStats': {'numSeries': series, 'chunkCount': series * 2},
+                'seriesCountByMetricName': [
+                    {'name': 'http_request_duration_seconds_bucket', 'value': pods * 320},
+                    {'name': 'app_cache_entries', 'value': pods * 300},
+                ],
+                'labelValueCountByLabelName': [
+                    {'name': 'key', 'value': 300}, {'name': 'path', 'value': 40},
+                    {'name': 'pod', 'value': pods}, {'name': 'version', 'value': 2},
+                ],
+                'memoryInBytesByLabelName': [
+                    {'name': 'pod', 'value': series * 24}, {'name': 'version', 'value': series * 8},
+                    {'name': 'app', 'value': series * 6}, {'name': 'key', 'value': 300 * 40},
+                ],
+            }
+        if path == '/api/v1/rules':
+            return {'groups': [{'name': 'app', 'rules': [
+                {'query': 'sum by (job) (rate(http_requests_total{status="500"}[5m]))'},
+                {'query': 'sum by (job) (rate(http_request_duration_seconds_count[5m]))'},
+            ]}]}
+        if path == '/api/v1/query':
+            return {'resultType': 'vector', 'result': [{'metric': {}, 'value': [0, str(pods * 704 * 3000)]}]}
+        if path == '/api/v1/targets':
+            targets = []
+            for index in range(pods):
+                pod = f"api-7d9f{index:02d}-x{index * 7 % 10}k"
+                version = f"v1.{4 + index % 2}.0"
+                targets.append({
+                    'scrapePool': 'kubernetes-pods',
+                    'scrapeUrl': f"{base}/metrics/{index}",
+                    'labels': {'job': 'kubernetes-pods', 'instance': f"10.0.0.{index}:8080",
+                               'namespace': 'default', 'app': 'api', 'pod': pod, 'version': version},
+                    'discoveredLabels': {'__address__': f"10.0.0.{index}:8080",
+                                         '__meta_kubernetes_namespace': 'default',
+                                         '__meta_kubernetes_pod_name': pod,
+                                         '__meta_kubernetes_pod_label_app': 'api',
+                                         '__meta_kubernetes_pod_label_version': version},
+                    'lastScrapeDuration': 0.02 + index * 0.001,
+                    'scrapeInterval': '15s',
+                })
+            return {'activeTargets': targets}
+        return None
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            path = self.path.split('?', 1)[0]
+            if path.startswith('/metrics/'):
+                body, content_type = fixture_exposition(int(path.rsplit('/', 1)[1])), 'text/plain; version=0.0.4'
+            else:
+                data = api_data(path)
+                if data is None:
+                    self.send_error(404)
+                    return
+                body, content_type = json.dumps({'status': 'success', 'data': data}).encode('utf-8'), \
+                    'application/json'
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    state['url'] = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state['url']
+
+
+def run_fixtures(pods: int, min_series: int) -> bool:
+    """Analyze the fixture servers and check the expected suggestions"""
+    server, url = start_fixtures(pods)
+    try:
+        analyzer = CardinalityAnalyzer(PrometheusClient(url), min_series)
+        analyzer.collect()
+        analyzer.suggest()
+        analyzer.print_report()
+    finally:
+        server.shutdown()
+
+    configs = [suggestion['config'] for report in analyzer.jobs.values() for suggestion in report.suggestions]
+    drops = ' '.join(config['regex'] for config in configs if config['action'] == 'drop')
+    labeldrops = {label for config in configs if config['action'] == 'labeldrop'
+                  for label in config['regex'].split('|')}
+    checks = [
+        ("unused high-cardinality metric dropped", 'app_cache_entries' in drops),
+        ("unread histogram buckets dropped", 'http_request_duration_seconds_bucket' in drops),
+        ("metrics used by rules kept",
+         'http_requests_total' not in drops and 'http_request_duration_seconds(' not in drops),
+        ("relabel-added pod label dropped (absent from the exposition)", 'pod' in labeldrops),
+        ("low-cardinality target labels kept", not labeldrops & {'app', 'namespace', 'version'}),
+        ("pod label traced to __meta_kubernetes_pod_name",
+         analyzer.jobs['kubernetes-pods'].target_label_origins.get('pod') == '__meta_kubernetes_pod_name'),
+    ]
+    for description, passed in checks:
+        color, mark = (Colors.GREEN, '✓') if passed else (Colors.RED, '✗')
+        print(f"{color}{mark} {description}{Colors.END}")
+    return all(passed for _, passed in checks)
+
+
+def main():
+    """Main entry point for the cardinality analyzer"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Find the series that dominate Prometheus head memory and suggest relabel rules",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python prom_cardinality.py
+  python prom_cardinality.py --map node-exporter:9100=localhost:9100 --map localhost:9090=localhost:9090
+  python prom_cardinality.py --min-series 2000 -o relabel-suggestions.yml
+  python prom_cardinality.py --fixtures    # Self-check against local fixture servers
+
+Scrape URLs use the names Prometheus sees inside Docker; use --map to reach
+them from the host. Metrics referenced by any loaded rule are never dropped.
+        """
+    )
+
+    parser.add_argument("--prometheus-url", default="http://localhost:9090", help="Prometheus base URL")
+    parser.add_argument("--min-series", type=int, default=500, help="Per-job series before a metric is flagged")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent target scrapes")
+    parser.add_argument("--map", action="append", default=[], metavar="FROM=TO",
+                        help="Rewrite a scrape host:port (repeatable)")
+    parser.add_argument("--top", type=int, default=10, help="Rows in the TSDB tables")
+    parser.add_argument("-o", "--output", help="Write suggested metric_relabel_configs to this YAML file")
+    parser.add_argument("--fixtures", action="store_true",
+                        help="Run against local fixture servers (fake API + pod expositions) and check the result")
+    parser.add_argument("--pods", type=int, default=12, help="Fixture pods")
+
+    args = parser.parse_args()
+
+    if args.fixtures:
+        print(f"{Colors.HEADER}{Colors.BOLD}Cardinality Analyzer Fixture Check{Colors.END}")
+        if not run_fixtures(args.pods, args.min_series):
+            sys.exit(1)
+        print(f"\n{Colors.GREEN}{Colors.BOLD}🎉 Fixture check completed successfully!{Colors.END}\n")
+        sys.exit(0)
+
+    host_map = {}
+    for item in args.map:
+        source, _, target = item.partition('=')
+        if not target:
+            parser.error(f"--map expects FROM=TO, got {item}")
+        host_map[source] = target
+
+    analyzer = CardinalityAnalyzer(PrometheusClient(args.prometheus_url), args.min_series,
+                                   args.workers, host_map)
+    print(f"{Colors.CYAN}ℹ Profiling {args.prometheus_url}...{Colors.END}")
+    started = time.time()
+    try:
+        analyzer.collect()
+    except RuntimeError as e:
+        print(f"{Colors.RED}✗ {e}{Colors.END}")
+        sys.exit(1)
+
+    samples = sum(t.samples for r in analyzer.jobs.values() for t in r.targets)
+    failed = [t for r in analyzer.jobs.values() for t in r.targets if t.error]
+    elapsed = time.time() - started
+    print(f"{Colors.GREEN}✓ Parsed {samples:,} samples from "
+          f"{sum(len(r.targets) for r in analyzer.jobs.values()) - len(failed)} target(s) in {elapsed:.1f}s{Colors.END}")
+    for target in failed:
+        print(f"{Colors.YELLOW}⚠ {target.job}: {target.url} - {target.error}{Colors.END}")
+
+    analyzer.suggest()
+    analyzer.print_report(args.top)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(analyzer.render_yaml())
+        print(f"{Colors.GREEN}✓ Suggestions written to {args.output}{Colors.END}")
+
+    print(f"\n{Colors.GREEN}{Colors.BOLD}🎉 Cardinality analysis completed successfully!{Colors.END}\n")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
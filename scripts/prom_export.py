@@ -0,0 +1,679 @@
+"""
+Prometheus Range Exporter
+Exports long, high-resolution ranges through /api/v1/query_range by splitting the
+time range and series set into chunks, fetching them concurrently with retries and
+streaming samples into columnar .npy files or CSV without buffering the result
+"""
+
+import ast
+import asyncio
+import csv
+import json
+import random
+import re
+import struct
+import sys
+import time
+import zlib
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import promql
+from async_http import HTTPClient
+from query_frontend import format_seconds, parse_step, parse_time
+
+
+class Colors:
+    """ANSI color codes for terminal output"""
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    END = '\033[0m'
+    BOLD = '\033[1m'
+
+
+# Prometheus rejects range queries returning more points per series than this
+DEFAULT_MAX_POINTS = 11000
+
+# Statuses worth retrying as-is; anything else fails the chunk (or splits it, below)
+RETRYABLE_STATUS = {429, 502, 503, 504}
+
+# Error messages that mean the chunk is too big rather than the server being unhealthy
+SPLIT_ERRORS = ('exceeded maximum resolution', 'too many samples', 'query timed out')
+
+# Aggregations and functions whose result changes when the input series set is split
+UNSPLITTABLE_FUNCTIONS = {'absent', 'absent_over_time', 'scalar', 'vector', 'label_replace', 'label_join',
+                          'sort', 'sort_desc'}
+
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+# The header is padded to a fixed size so the final shape can be patched in place
+NPY_HEADER_BYTES = 128
+NPY_TYPES = {'q': '<i8', 'd': '<f8', 'I': '<u4'}
+
+
+def parse_timestamp(value: str, now_ms: int) -> int:
+    """now, now-<duration>, unix seconds or RFC3339 to milliseconds"""
+    if value == 'now':
+        return now_ms
+    if value.startswith('now-'):
+        return now_ms - int(promql.parse_duration(value[4:]) * 1000)
+    return parse_time(value)
+
+
+def regex_escape(value: str) -> str:
+    """Escape a label value for an RE2 alternation"""
+    return re.sub(r'([\\.+*?()|\[\]{}^$])', r'\\\1', value)
+
+
+# ============================================================================
+# Chunk planning
+# ============================================================================
+
+def label_survives(node: promql.Node, label: str) -> bool:
+    """
+    Whether every output series of the expression keeps the given label.
+
+    Only then can the query be evaluated per label value and the results
+    concatenated: an aggregation across the label, or a function that builds
+    new series, would give different answers on each subset.
+    """
+    node = promql.strip_parens(node)
+    if isinstance(node, (promql.NumberLiteral, promql.StringLiteral, promql.VectorSelector)):
+        return True
+    if isinstance(node, promql.Aggregate):
+        if node.without:
+            kept = label not in (node.grouping or [])
+        else:
+            kept = label in (node.grouping or [])
+        return kept and label_survives(node.expr, label)
+    if isinstance(node, promql.Call):
+        return node.func not in UNSPLITTABLE_FUNCTIONS and all(label_survives(arg, label) for arg in node.args)
+    if isinstance(node, promql.BinaryExpr):
+        matching = node.matching
+        if matching is not None and (matching.on != (label in matching.labels) or matching.card):
+            return False
+        return label_survives(node.lhs, label) and label_survives(node.rhs, label)
+    if isinstance(node, (promql.Unary, promql.Subquery)):
+        return label_survives(node.expr, label)
+    return False
+
+
+def shard_query(node: promql.Node, label: str, values: List[str]) -> str:
+    """The query restricted to series whose label is one of the values"""
+    if len(values) == 1:
+        matcher = promql.Matcher(label, '=', values[0])
+    else:
+        matcher = promql.Matcher(label, '=~', '|'.join(regex_escape(value) for value in values))
+
+    def restrict(child):
+        if isinstance(child, promql.VectorSelector):
+            return promql.VectorSelector(child.name, child.matchers + [matcher], child.range, child.offset)
+        return None
+
+    return promql.format_expr(promql.replace(node, restrict))
+
+
+def time_chunks(start_ms: int, end_ms: int, step_ms: int, points: int) -> List[Tuple[int, int]]:
+    """Split [start, end] into step-aligned ranges of at most `points` evaluations"""
+    chunks = []
+    span = step_ms * points
+    lo = start_ms
+    while lo <= end_ms:
+        chunks.append((lo, min(end_ms, lo + span - step_ms)))
+        lo += span
+    return chunks
+
+
+class Chunk:
+    """One query_range call: a query over a step-aligned time window"""
+
+    __slots__ = ('query', 'start', 'end', 'shard')
+
+    def __init__(self, query: str, start: int, end: int, shard: str = ''):
+        self.query = query
+        self.start = start
+        self.end = end
+        self.shard = shard
+
+    def split(self, step_ms: int) -> Optional[Tuple['Chunk', 'Chunk']]:
+        """Halve the time window, or None if it is a single evaluation"""
+        steps = (self.end - self.start) // step_ms
+        if steps < 1:
+            return None
+        middle = self.start + (steps + 1) // 2 * step_ms
+        return (Chunk(self.query, self.start, middle - step_ms, self.shard),
+                Chunk(self.query, middle, self.end, self.shard))
+
+    def __str__(self) -> str:
+        where = f" [{self.shard}]" if self.shard else ''
+        return f"{format_seconds(self.start)}..{format_seconds(self.end)}{where}"
+
+
+class SplitRequired(RuntimeError):
+    """Prometheus refused a chunk as too large"""
+
+
+# ============================================================================
+# Output
+# ============================================================================
+
+class NpyColumn:
+    """Append-only one-dimensional .npy file written without NumPy"""
+
+    def __init__(self, path: Path, typecode: str):
+        self.path = path
+        self.typecode = typecode
+        self.count = 0
+        self._file = open(path, 'wb')
+        self._file.write(self._header(0))
+
+    def _header(self, count: int) -> bytes:
+        text = f"{{'descr': '{NPY_TYPES[self.typecode]}', 'fortran_order': False, 'shape': ({count},), }}"
+        padding = NPY_HEADER_BYTES - len(NPY_MAGIC) - 2 - len(text) - 1
+        return NPY_MAGIC + struct.pack('<H', NPY_HEADER_BYTES - len(NPY_MAGIC) - 2) + \
+            (text + ' ' * padding + '\n').encode('latin-1')
+
+    def write(self, values: array):
+        if sys.byteorder == 'big':
+            values = array(values.typecode, values)
+            values.byteswap()
+        values.tofile(self._file)
+        self.count += len(values)
+
+    def close(self):
+        """Patch the final length into the header"""
+        self._file.seek(0)
+        self._file.write(self._header(self.count))
+        self._file.close()
+
+
+def read_npy(path: Path) -> array:
+    """
+    Load a one-dimensional .npy file of a type written by NpyColumn.
+
+    Raises:
+        ValueError: If the file is not such an array
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(NPY_MAGIC)) != NPY_MAGIC:
+            raise ValueError(f"{path} is not a version 1.0 .npy file")
+        length, = struct.unpack('<H', f.read(2))
+        header = ast.literal_eval(f.read(length).decode('latin-1'))
+        typecodes = {descr: code for code, descr in NPY_TYPES.items()}
+        if header.get('descr') not in typecodes or len(header.get('shape', ())) != 1:
+            raise ValueError(f"{path} holds an unsupported array: {header}")
+        values = array(typecodes[header['descr']])
+        values.fromfile(f, header['shape'][0])
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+class SeriesTable:
+    """Stable integer ids for label sets, written out as a JSON sidecar"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.metrics: List[Dict[str, str]] = []
+
+    def id(self, metric: Dict[str, str]) -> int:
+        key = json.dumps(metric, sort_keys=True)
+        series_id = self.ids.get(key)
+        if series_id is None:
+            series_id = self.ids[key] = len(self.metrics)
+            self.metrics.append(metric)
+        return series_id
+
+    def save(self, path: Path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump([{'id': i, 'metric': metric} for i, metric in enumerate(self.metrics)], f, indent=1)
+
+
+class NpyWriter:
+    """
+    Columnar output directory.
+
+    series.npy (uint32), timestamp.npy (int64 milliseconds) and value.npy
+    (float64) are parallel columns, one row per sample; series.json maps
+    series ids to label sets. Load with numpy.load on each column.
+    """
+
+    def __init__(self, directory: Path):
+        directory.mkdir(parents=True, exist_ok=True)
+        self.directory = directory
+        self.series = SeriesTable()
+        self.columns = {
+            'series': NpyColumn(directory / 'series.npy', 'I'),
+            'timestamp': NpyColumn(directory / 'timestamp.npy', 'q'),
+            'value': NpyColumn(directory / 'value.npy', 'd'),
+        }
+
+    def write(self, metric: Dict[str, str], values: List[List]):
+        series_id = self.series.id(metric)
+        self.columns['series'].write(array('I', [series_id]) * len(values))
+        self.columns['timestamp'].write(array('q', [int(round(float(t) * 1000)) for t, _ in values]))
+        self.columns['value'].write(array('d', [float(v) for _, v in values]))
+
+    def close(self) -> int:
+        """Finish the files and return the bytes written"""
+        for column in self.columns.values():
+            column.close()
+        self.series.save(self.directory / 'series.json')
+        return sum(column.path.stat().st_size for column in self.columns.values())
+
+
+class CSVWriter:
+    """series,timestamp,value rows with a <name>.series.json sidecar for labels"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.series = SeriesTable()
+        self._file = open(path, 'w', encoding='utf-8', newline='')
+        self._csv = csv.writer(self._file)
+        self._csv.writerow(['series', 'timestamp', 'value'])
+
+    def write(self, metric: Dict[str, str], values: List[List]):
+        series_id = self.series.id(metric)
+        self._csv.writerows([series_id, t, v] for t, v in values)
+
+    def close(self) -> int:
+        self._file.close()
+        self.series.save(self.path.with_suffix('.series.json'))
+        return self.path.stat().st_size
+
+
+# ============================================================================
+# Exporter
+# ============================================================================
+
+class RangeExporter:
+    """Fetches chunks with a bounded pool and streams them to a writer"""
+
+    def __init__(self, prometheus_url: str = "http://localhost:9090", concurrency: int = 8,
+                 retries: int = 4, backoff: float = 0.5, timeout: float = 120.0,
+                 max_points: int = DEFAULT_MAX_POINTS, progress: bool = True):
+        """
+        Initialize the exporter.
+
+        Args:
+            prometheus_url: Prometheus base URL
+            concurrency: Chunks in flight at once
+            retries: Retries per chunk for transient failures
+            backoff: Initial retry delay in seconds, doubled per attempt
+            timeout: Per-request timeout in seconds
+            max_points: Evaluations per series per chunk
+            progress: Print a live progress line to stderr
+        """
+        self.prometheus_url = prometheus_url
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.max_points = max_points
+        self.progress = progress
+        self.client: Optional[HTTPClient] = None
+        self.stats = {'chunks': 0, 'done': 0, 'splits': 0, 'retries': 0, 'samples': 0, 'series': 0,
+                      'bytes_in': 0, 'largest_response': 0}
+
+    def print_info(self, message: str):
+        print(f"{Colors.BLUE}ℹ {message}{Colors.END}", file=sys.stderr)
+
+    def print_warning(self, message: str):
+        print(f"{Colors.YELLOW}⚠ {message}{Colors.END}", file=sys.stderr)
+
+    async def label_values(self, node: promql.Node, label: str, start_ms: int, end_ms: int) -> List[str]:
+        """Values of the label across the series the query reads, over the export range"""
+        params = [('start', format_seconds(start_ms)), ('end', format_seconds(end_ms))]
+        for selector in promql.selectors(node):
+            params.append(('match[]', promql.format_expr(
+                promql.VectorSelector(selector.name, selector.matchers))))
+        body = await self.call('GET', f"/api/v1/label/{label}/values?{urlencode(params)}",
+                               what=f"listing {label} values")
+        return sorted(json.loads(body.decode('utf-8'))['data'])
+
+    async def call(self, method: str, path: str, body: bytes = b'', headers: Optional[Dict[str, str]] = None,
+                   what: str = 'request') -> bytes:
+        """
+        Call the API, retrying transient failures with jittered exponential backoff.
+
+        Raises:
+            SplitRequired: If Prometheus says the request is too large, or it keeps timing out
+            RuntimeError: On a permanent error or when retries run out
+        """
+        error = ''
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.stats['retries'] += 1
+                delay = min(self.backoff * 2 ** (attempt - 1), 30.0)
+                await asyncio.sleep(delay * (0.5 + random.random() / 2))
+            try:
+                status, _, response = await self.client.request(method, path, body, headers)
+            except asyncio.TimeoutError:
+                error = f"timed out after {self.timeout:.0f}s"
+                continue
+            except OSError as e:
+                error = str(e) or type(e).__name__
+                continue
+
+            if status == 200:
+                return response
+            try:
+                error = json.loads(response.decode('utf-8')).get('error', '')
+            except ValueError:
+                error = response[:200].decode('utf-8', errors='replace')
+            if any(marker in error for marker in SPLIT_ERRORS):
+                raise SplitRequired(error)
+            if status not in RETRYABLE_STATUS:
+                raise RuntimeError(f"{what} failed with {status}: {error}")
+
+        if error.startswith('timed out'):
+            raise SplitRequired(error)
+        raise RuntimeError(f"{what} failed after {self.retries + 1} attempts: {error}")
+
+    async def fetch(self, chunk: Chunk, step_ms: int) -> bytes:
+        """Run one chunk's range query"""
+        form = urlencode({'query': chunk.query, 'start': format_seconds(chunk.start),
+                          'end': format_seconds(chunk.end), 'step': format_seconds(step_ms)}).encode('utf-8')
+        return await self.call('POST', '/api/v1/query_range', form,
+                               {'Content-Type': 'application/x-www-form-urlencoded'}, what=f"chunk {chunk}")
+
+    async def _worker(self, queue: 'asyncio.Queue', writer, step_ms: int):
+        while True:
+            chunk = await queue.get()
+            try:
+                try:
+                    body = await self.fetch(chunk, step_ms)
+                except SplitRequired as e:
+                    halves = chunk.split(step_ms)
+                    if halves is None:
+                        raise RuntimeError(f"chunk {chunk} cannot be split further: {e}")
+                    self.stats['splits'] += 1
+                    self.stats['chunks'] += 1
+                    for half in halves:
+                        queue.put_nowait(half)
+                    continue
+
+                self.stats['bytes_in'] += len(body)
+                self.stats['largest_response'] = max(self.stats['largest_response'], len(body))
+                result = json.loads(body.decode('utf-8'))['data']['result']
+                del body
+                for item in result:
+                    values = item.get('values', [])
+                    writer.write(item['metric'], values)
+                    self.stats['samples'] += len(values)
+                self.stats['done'] += 1
+            finally:
+                queue.task_done()
+
+    def _print_progress(self, started: float):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        stats = self.stats
+        print(f"\r{Colors.CYAN}Chunks: {stats['done']:,}/{stats['chunks']:,}  "
+              f"Samples: {stats['samples']:,}  Rate: {stats['samples'] / elapsed:,.0f} samples/s  "
+              f"Retries: {stats['retries']:,}  Splits: {stats['splits']:,}{Colors.END}",
+              end='', flush=True, file=sys.stderr)
+
+    async def export(self, query: str, start_ms: int, end_ms: int, step_ms: int, writer,
+                     split_by: Optional[str] = None, series_per_chunk: int = 50,
+                     chunk_ms: Optional[int] = None) -> Dict:
+        """
+        Export a range query into a writer.
+
+        Args:
+            query: PromQL expression
+            start_ms: Range start in milliseconds
+            end_ms: Range end in milliseconds
+            step_ms: Resolution in milliseconds
+            writer: NpyWriter or CSVWriter
+            split_by: Label to split the series set on (values discovered up front)
+            series_per_chunk: Label values per series shard
+            chunk_ms: Time span per chunk (capped by max_points)
+
+        Returns:
+            Statistics: chunks, splits, retries, samples, series, bytes, elapsed
+
+        Raises:
+            RuntimeError: If a chunk fails permanently
+            promql.PromQLError: If split_by is given and the query cannot be parsed
+        """
+        started = time.monotonic()
+        points = self.max_points
+        if chunk_ms:
+            points = max(1, min(points, chunk_ms // step_ms))
+        end_ms = start_ms + (end_ms - start_ms) // step_ms * step_ms
+        self.client = HTTPClient(self.prometheus_url, max_connections=self.concurrency, timeout=self.timeout)
+
+        try:
+            shards = [(query, '')]
+            if split_by:
+                node = promql.parse(query)
+                if not label_survives(node, split_by):
+                    raise RuntimeError(f"Results of this query are not separable by '{split_by}': "
+                                       f"it aggregates or matches across that label")
+                values = await self.label_values(node, split_by, start_ms, end_ms)
+                if not values:
+                    self.print_warning(f"No series carry the '{split_by}' label in this range")
+                shards = []
+                for i in range(0, len(values), series_per_chunk):
+                    batch = values[i:i + series_per_chunk]
+                    shards.append((shard_query(node, split_by, batch),
+                                   f"{split_by}: {len(batch)} value{'s' if len(batch) != 1 else ''} from {batch[0]}"))
+
+            queue: asyncio.Queue = asyncio.Queue()
+            for lo, hi in time_chunks(start_ms, end_ms, step_ms, points):
+                for shard_text, shard in shards:
+                    queue.put_nowait(Chunk(shard_text, lo, hi, shard))
+            self.stats['chunks'] = queue.qsize()
+            if self.progress:
+                self.print_info(f"{self.stats['chunks']:,} chunks ({len(shards):,} series shard(s), "
+                                f"≤{points:,} points per series each), {self.concurrency} in flight")
+
+            workers = [asyncio.ensure_future(self._worker(queue, writer, step_ms))
+                       for _ in range(self.concurrency)]
+            joined = asyncio.ensure_future(queue.join())
+            try:
+                while not joined.done():
+                    await asyncio.wait([joined] + workers, timeout=0.5, return_when=asyncio.FIRST_COMPLETED)
+                    failed = [w for w in workers if w.done()]
+                    if failed:
+                        failed[0].result()  # a worker only stops by raising
+                    if self.progress:
+                        self._print_progress(started)
+            finally:
+                joined.cancel()
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                if self.progress:
+                    print(file=sys.stderr)
+        finally:
+            await self.client.close()
+
+        self.stats['series'] = len(writer.series.metrics)
+        self.stats['elapsed'] = time.monotonic() - started
+        return dict(self.stats)
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+def digest(directory: Path) -> Tuple[int, int]:
+    """Order-independent checksum and row count of an NpyWriter directory"""
+    with open(directory / 'series.json', encoding='utf-8') as f:
+        labels = [json.dumps(entry['metric'], sort_keys=True) for entry in json.load(f)]
+    series, timestamps, values = (read_npy(directory / f"{name}.npy") for name in ('series', 'timestamp', 'value'))
+    total = 0
+    for series_id, ts, value in zip(series, timestamps, values):
+        total += zlib.crc32(f"{labels[series_id]}|{ts}|{value!r}".encode('utf-8'))
+    return total & 0xFFFFFFFFFFFFFFFF, len(values)
+
+
+async def run_benchmark(series: int, days: float, step: str, concurrency: int, series_per_chunk: int,
+                        error_rate: float, work_dir: Path) -> bool:
+    """
+    Export the same range serially and in parallel from a fake Prometheus.
+
+    The fake runs in a child process, enforces the 11,000-point limit and
+    fails a share of requests with 503 so retries are exercised. Both exports
+    must produce the same samples.
+
+    Returns:
+        True when the outputs matched
+    """
+    import multiprocessing
+    from query_frontend import serve_fake
+
+    now = float(int(time.time()) // 3600 * 3600)
+    clock_value = multiprocessing.Value('d', now)
+    points_value = multiprocessing.Value('q', 0)
+    ready = multiprocessing.Queue()
+    child = multiprocessing.Process(target=serve_fake, args=(series, clock_value, points_value, ready),
+                                    kwargs={'per_point': 2e-5, 'max_points': DEFAULT_MAX_POINTS,
+                                            'error_rate': error_rate},
+                                    daemon=True)
+    child.start()
+    url = f"http://127.0.0.1:{ready.get(timeout=30)}"
+
+    query = 'rate(node_network_receive_bytes_total{device="eth0"}[5m])'
+    end_ms = int(now * 1000)
+    start_ms = end_ms - int(days * 86400 * 1000)
+    step_ms = parse_step(step)
+
+    runs = {}
+    try:
+        for name, workers, split_by in (('serial', 1, None), ('parallel', concurrency, 'instance')):
+            exporter = RangeExporter(url, concurrency=workers, backoff=0.05, progress=False)
+            writer = NpyWriter(work_dir / name)
+            try:
+                stats = await exporter.export(query, start_ms, end_ms, step_ms, writer, split_by=split_by,
+                                              series_per_chunk=series_per_chunk)
+            finally:
+                stats_bytes = writer.close()
+            stats['bytes'] = stats_bytes
+            stats['digest'] = digest(work_dir / name)
+            runs[name] = stats
+    finally:
+        child.terminate()
+
+    print(f"\n{Colors.HEADER}{Colors.BOLD}Export of {series} series x {days:g} days at {step} "
+          f"({runs['serial']['samples']:,} samples){Colors.END}")
+    for name, stats in runs.items():
+        print(f"  {name:9} {stats['elapsed']:7.2f}s  {stats['samples'] / stats['elapsed']:>12,.0f} samples/s  "
+              f"{stats['chunks']:>4} chunks  {stats['retries']:>3} retries  "
+              f"largest response {stats['largest_response'] / 1024 / 1024:.1f} MiB")
+    speedup = runs['serial']['elapsed'] / max(runs['parallel']['elapsed'], 1e-6)
+    print(f"  Speedup: {speedup:.1f}x; output {runs['parallel']['bytes'] / 1024 / 1024:.1f} MiB "
+          f"({runs['parallel']['bytes'] / max(runs['parallel']['samples'], 1):.0f} bytes/sample)")
+
+    if runs['serial']['digest'] != runs['parallel']['digest']:
+        print(f"{Colors.RED}✗ Serial and parallel exports differ{Colors.END}")
+        return False
+    print(f"{Colors.GREEN}✓ Serial and parallel exports contain identical samples{Colors.END}")
+    return True
+
+
+def main():
+    """Main entry point for the range exporter"""
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(
+        description="Export long Prometheus ranges in parallel chunks to .npy columns or CSV",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python prom_export.py 'rate(node_cpu_seconds_total{mode="idle"}[5m])' \\
+      --start now-30d --step 15s -o cpu-30d/
+  python prom_export.py 'sum by (instance) (rate(http_requests_total[5m]))' \\
+      --start 2026-01-01T00:00:00Z --end 2026-02-01T00:00:00Z --step 30s \\
+      --split-by instance --series-per-chunk 20 -o requests.csv
+  python prom_export.py --benchmark --series 20 --days 7 --concurrency 16
+
+The npy format writes series.npy, timestamp.npy (ms) and value.npy as parallel
+columns plus series.json with the label sets:
+  series, ts, value = (np.load(f"cpu-30d/{c}.npy") for c in ("series", "timestamp", "value"))
+        """
+    )
+
+    parser.add_argument("query", nargs='?', help="PromQL expression to export")
+    parser.add_argument("-o", "--output", type=Path, help="Output directory (npy) or file (csv)")
+    parser.add_argument("--format", choices=['npy', 'csv'], default=None,
+                        help="Output format (default: csv for *.csv, otherwise npy)")
+    parser.add_argument("--prometheus-url", default="http://localhost:9090", help="Prometheus URL")
+    parser.add_argument("--start", default="now-1d", help="Range start: now-30d, unix seconds or RFC3339")
+    parser.add_argument("--end", default="now", help="Range end (default: now)")
+    parser.add_argument("--step", default="15s", help="Resolution (default: 15s)")
+    parser.add_argument("--chunk", default=None, help="Time span per chunk (default: as large as the limit allows)")
+    parser.add_argument("--max-points", type=int, default=DEFAULT_MAX_POINTS,
+                        help=f"Points per series per request (default: {DEFAULT_MAX_POINTS})")
+    parser.add_argument("--split-by", default=None, help="Label to split the series set on, e.g. instance")
+    parser.add_argument("--series-per-chunk", type=int, default=50, help="Label values per series shard")
+    parser.add_argument("--concurrency", type=int, default=8, help="Chunks in flight (default: 8)")
+    parser.add_argument("--retries", type=int, default=4, help="Retries per chunk (default: 4)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument("--benchmark", action="store_true", help="Compare serial and parallel exports on a fake")
+    parser.add_argument("--series", type=int, default=10, help="Benchmark series")
+    parser.add_argument("--days", type=float, default=30, help="Benchmark range in days")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Benchmark share of failed requests")
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        with tempfile.TemporaryDirectory(prefix='prom-export-') as work_dir:
+            ok = asyncio.run(run_benchmark(args.series, args.days, args.step, args.concurrency,
+                                           max(1, args.series // args.concurrency), args.error_rate,
+                                           Path(work_dir)))
+        if ok:
+            print(f"\n{Colors.GREEN}🎉 Benchmark completed successfully!{Colors.END}")
+        sys.exit(0 if ok else 1)
+
+    if not args.query or not args.output:
+        parser.error("a query and -o/--output are required (or use --benchmark)")
+
+    try:
+        now_ms = int(time.time() * 1000)
+        start_ms = parse_timestamp(args.start, now_ms)
+        end_ms = parse_timestamp(args.end, now_ms)
+        step_ms = parse_step(args.step)
+        chunk_ms = parse_step(args.chunk) if args.chunk else None
+    except ValueError as e:
+        parser.error(str(e))
+    if step_ms <= 0 or end_ms < start_ms:
+        parser.error("--step must be positive and --end must not precede --start")
+
+    file_format = args.format or ('csv' if args.output.suffix == '.csv' else 'npy')
+    writer = CSVWriter(args.output) if file_format == 'csv' else NpyWriter(args.output)
+    exporter = RangeExporter(args.prometheus_url, concurrency=args.concurrency, retries=args.retries,
+                             timeout=args.timeout, max_points=args.max_points)
+
+    ok = True
+    try:
+        stats = asyncio.run(exporter.export(args.query, start_ms, end_ms, step_ms, writer,
+                                            split_by=args.split_by, series_per_chunk=args.series_per_chunk,
+                                            chunk_ms=chunk_ms))
+    except (RuntimeError, promql.PromQLError) as e:
+        print(f"{Colors.RED}✗ Export failed: {e}{Colors.END}", file=sys.stderr)
+        ok = False
+    except KeyboardInterrupt:
+        print(f"\n{Colors.RED}✗ Export cancelled by user{Colors.END}", file=sys.stderr)
+        ok = False
+    finally:
+        written = writer.close()
+
+    if ok:
+        elapsed = max(stats['elapsed'], 1e-6)
+        print(f"{Colors.GREEN}✓ Exported {stats['samples']:,} samples of {stats['series']:,} series to "
+              f"{args.output} in {elapsed:.1f}s ({stats['samples'] / elapsed:,.0f} samples/s, "
+              f"{written / 1024 / 1024:.1f} MiB; {stats['retries']} retries, {stats['splits']} splits){Colors.END}")
+        print(f"\n{Colors.GREEN}🎉 Export completed successfully!{Colors.END}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
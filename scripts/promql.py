@@ -0,0 +1,618 @@
+"""
+PromQL Parser
+Parses PromQL expressions into a small AST that can be walked, rewritten and
+formatted back to text, shared by the rule and dashboard tools in this folder
+"""
+
+import re
+from typing import Iterable, List, Optional, Tuple
+
+
+AGGREGATORS = {'sum', 'min', 'max', 'avg', 'group', 'stddev', 'stdvar', 'count',
+               'count_values', 'bottomk', 'topk', 'quantile'}
+
+# Aggregators taking a parameter before the vector
+PARAMETER_AGGREGATORS = {'count_values', 'bottomk', 'topk', 'quantile'}
+
+# Functions whose argument is a range vector over raw samples
+RANGE_FUNCTIONS = {'rate', 'irate', 'increase', 'delta', 'idelta', 'deriv', 'predict_linear', 'changes',
+                   'resets', 'avg_over_time', 'min_over_time', 'max_over_time', 'sum_over_time',
+                   'count_over_time', 'quantile_over_time', 'stddev_over_time', 'stdvar_over_time',
+                   'last_over_time', 'present_over_time', 'absent_over_time', 'holt_winters'}
+
+COMPARISON_OPS = {'==', '!=', '>', '<', '>=', '<='}
+
+# Binary operator precedence, lowest first
+PRECEDENCE = {
+    'or': 1,
+    'and': 2, 'unless': 2,
+    '==': 3, '!=': 3, '>': 3, '<': 3, '>=': 3, '<=': 3,
+    '+': 4, '-': 4,
+    '*': 5, '/': 5, '%': 5, 'atan2': 5,
+    '^': 6,
+}
+
+DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800, 'y': 31536000}
+
+TOKEN_RE = re.compile(r'''
+    (?P<ws>\s+|\#[^\n]*)
+  | (?P<duration>(?:\d+(?:ms|s|m|h|d|w|y))+)(?![A-Za-z0-9_])
+  | (?P<number>0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|`[^`]*`)
+  | (?P<ident>[a-zA-Z_][a-zA-Z0-9_:]*)
+  | (?P<op>=~|!~|!=|==|<=|>=|[-+*/%^<>=(){}\[\],@:])
+''', re.VERBOSE)
+
+
+class PromQLError(ValueError):
+    """Raised for expressions the parser cannot handle"""
+
+
+def parse_duration(text: str) -> float:
+    """
+    Parse a PromQL duration such as 30s, 5m or 1h30m into seconds.
+
+    Raises:
+        PromQLError: If the text is not a duration
+    """
+    parts = re.findall(r'(\d+)(ms|s|m|h|d|w|y)', text)
+    if not parts or ''.join(n + u for n, u in parts) != text:
+        raise PromQLError(f"Invalid duration: {text}")
+    return sum(int(n) * DURATION_UNITS[u] for n, u in parts)
+
+
+def format_duration(seconds: float) -> str:
+    """Render seconds as the shortest PromQL duration"""
+    if seconds < 1:
+        return f"{int(round(seconds * 1000))}ms"
+    seconds = int(seconds)
+    for unit, size in (('w', 604800), ('d', 86400), ('h', 3600), ('m', 60)):
+        if seconds % size == 0:
+            return f"{seconds // size}{unit}"
+    return f"{seconds}s"
+
+
+# ============================================================================
+# AST
+# ============================================================================
+
+class Node:
+    """Base AST node"""
+
+    def children(self) -> List['Node']:
+        return []
+
+    def __str__(self) -> str:
+        return format_expr(self)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({format_expr(self)!r})"
+
+
+class NumberLiteral(Node):
+    def __init__(self, value: float, text: Optional[str] = None):
+        self.value = value
+        self.text = text
+
+
+class StringLiteral(Node):
+    def __init__(self, value: str):
+        self.value = value
+
+
+class Matcher:
+    """A label matcher such as status=~"5.." """
+
+    __slots__ = ('label', 'op', 'value')
+
+    def __init__(self, label: str, op: str, value: str):
+        self.label = label
+        self.op = op
+        self.value = value
+
+    @property
+    def is_regex(self) -> bool:
+        return self.op in ('=~', '!~')
+
+    def __str__(self) -> str:
+        escaped = self.value.replace('\\', '\\\\').replace('"', '\\"')
+        return f'{self.label}{self.op}"{escaped}"'
+
+
+class VectorSelector(Node):
+    """metric{matchers}[range] offset x"""
+
+    def __init__(self, name: Optional[str], matchers: List[Matcher], range_seconds: Optional[float] = None,
+                 offset: Optional[float] = None):
+        self.name = name
+        self.matchers = matchers
+        self.range = range_seconds
+        self.offset = offset
+
+    def label_matchers(self) -> List[Matcher]:
+        """Matchers including the metric name as __name__"""
+        matchers = list(self.matchers)
+        if self.name:
+            matchers.insert(0, Matcher('__name__', '=', self.name))
+        return matchers
+
+
+class Call(Node):
+    def __init__(self, func: str, args: List[Node]):
+        self.func = func
+        self.args = args
+
+    def children(self):
+        return list(self.args)
+
+
+class Aggregate(Node):
+    def __init__(self, op: str, expr: Node, grouping: Optional[List[str]] = None, without: bool = False,
+                 param: Optional[Node] = None):
+        self.op = op
+        self.expr = expr
+        self.grouping = grouping
+        self.without = without
+        self.param = param
+
+    def children(self):
+        return [self.param, self.expr] if self.param is not None else [self.expr]
+
+
+class VectorMatching:
+    """on()/ignoring() and group_left()/group_right() modifiers"""
+
+    __slots__ = ('on', 'labels', 'card', 'include')
+
+    def __init__(self, on: bool = False, labels: Optional[List[str]] = None, card: Optional[str] = None,
+                 include: Optional[List[str]] = None):
+        self.on = on
+        self.labels = labels or []
+        self.card = card
+        self.include = include or []
+
+
+class BinaryExpr(Node):
+    def __init__(self, op: str, lhs: Node, rhs: Node, return_bool: bool = False,
+                 matching: Optional[VectorMatching] = None):
+        self.op = op
+        self.lhs = lhs
+        self.rhs = rhs
+        self.return_bool = return_bool
+        self.matching = matching
+
+    def children(self):
+        return [self.lhs, self.rhs]
+
+
+class Unary(Node):
+    def __init__(self, op: str, expr: Node):
+        self.op = op
+        self.expr = expr
+
+    def children(self):
+        return [self.expr]
+
+
+class Paren(Node):
+    def __init__(self, expr: Node):
+        self.expr = expr
+
+    def children(self):
+        return [self.expr]
+
+
+class Subquery(Node):
+    def __init__(self, expr: Node, range_seconds: float, step: Optional[float] = None,
+                 offset: Optional[float] = None):
+        self.expr = expr
+        self.range = range_seconds
+        self.step = step
+        self.offset = offset
+
+    def children(self):
+        return [self.expr]
+
+
+# ============================================================================
+# Parser
+# ============================================================================
+
+def tokenize(text: str) -> List[Tuple[str, str]]:
+    """Split an expression into (kind, text) tokens"""
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        match = TOKEN_RE.match(text, pos)
+        if not match:
+            raise PromQLError(f"Unexpected character {text[pos]!r} at {pos}")
+        kind = match.lastgroup
+        if kind != 'ws':
+            tokens.append((kind, match.group()))
+        pos = match.end()
+    tokens.append(('eof', ''))
+    return tokens
+
+
+def unquote(text: str) -> str:
+    """Decode a PromQL string literal"""
+    if text[0] == '`':
+        return text[1:-1]
+    body = text[1:-1]
+    return re.sub(r'\\(.)', lambda m: {'n': '\n', 't': '\t'}.get(m.group(1), m.group(1)), body)
+
+
+class Parser:
+    """Recursive-descent PromQL parser"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.pos = 0
+
+    def peek(self, offset: int = 0) -> Tuple[str, str]:
+        return self.tokens[min(self.pos + offset, len(self.tokens) - 1)]
+
+    def next(self) -> Tuple[str, str]:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def expect(self, value: str) -> Tuple[str, str]:
+        token = self.next()
+        if token[1] != value:
+            raise PromQLError(f"Expected {value!r} but found {token[1] or 'end of input'!r} in: {self.text}")
+        return token
+
+    def accept(self, value: str) -> bool:
+        if self.peek()[1] == value and self.peek()[0] in ('op', 'ident'):
+            self.pos += 1
+            return True
+        return False
+
+    def parse(self) -> Node:
+        expr = self.parse_expr(0)
+        if self.peek()[0] != 'eof':
+            raise PromQLError(f"Unexpected {self.peek()[1]!r} in: {self.text}")
+        return expr
+
+    def binary_op(self) -> Optional[str]:
+        kind, value = self.peek()
+        if kind in ('op', 'ident') and value in PRECEDENCE:
+            return value
+        return None
+
+    def parse_expr(self, min_prec: int) -> Node:
+        lhs = self.parse_unary()
+        while True:
+            op = self.binary_op()
+            if op is None or PRECEDENCE[op] < min_prec:
+                return lhs
+            self.next()
+            return_bool = self.accept('bool')
+            matching = self.parse_matching()
+            # ^ is right-associative, everything else left-associative
+            next_prec = PRECEDENCE[op] if op == '^' else PRECEDENCE[op] + 1
+            rhs = self.parse_expr(next_prec)
+            lhs = BinaryExpr(op, lhs, rhs, return_bool, matching)
+
+    def parse_matching(self) -> Optional[VectorMatching]:
+        if self.peek()[1] not in ('on', 'ignoring'):
+            return None
+        matching = VectorMatching(on=self.next()[1] == 'on', labels=self.parse_label_list())
+        if self.peek()[1] in ('group_left', 'group_right'):
+            matching.card = self.next()[1]
+            if self.peek()[1] == '(':
+                matching.include = self.parse_label_list()
+        return matching
+
+    def parse_label_list(self) -> List[str]:
+        self.expect('(')
+        labels = []
+        while not self.accept(')'):
+            kind, value = self.next()
+            if kind != 'ident':
+                raise PromQLError(f"Expected label name, found {value!r} in: {self.text}")
+            labels.append(value)
+            if not self.accept(','):
+                self.expect(')')
+                break
+        return labels
+
+    def parse_unary(self) -> Node:
+        if self.peek()[1] in ('-', '+') and self.peek()[0] == 'op':
+            op = self.next()[1]
+            # Unary binds tighter than binary operators except ^
+            return Unary(op, self.parse_expr(PRECEDENCE['^']))
+        return self.parse_postfix(self.parse_primary())
+
+    def parse_postfix(self, node: Node) -> Node:
+        while True:
+            value = self.peek()[1]
+            if value == '[':
+                self.next()
+                range_seconds = self.parse_duration_token()
+                if self.accept(':'):
+                    step = None if self.peek()[1] == ']' else self.parse_duration_token()
+                    self.expect(']')
+                    node = Subquery(node, range_seconds, step)
+                else:
+                    self.expect(']')
+                    if not isinstance(node, VectorSelector) or node.range is not None:
+                        raise PromQLError(f"Range only allowed on a vector selector in: {self.text}")
+                    node.range = range_seconds
+            elif value == 'offset' and self.peek()[0] == 'ident':
+                self.next()
+                negative = self.accept('-')
+                offset = self.parse_duration_token()
+                if isinstance(node, (VectorSelector, Subquery)):
+                    node.offset = -offset if negative else offset
+                else:
+                    raise PromQLError(f"offset must follow a selector in: {self.text}")
+            elif value == '@':
+                raise PromQLError(f"@ modifier is not supported: {self.text}")
+            else:
+                return node
+
+    def parse_duration_token(self) -> float:
+        kind, value = self.next()
+        if kind != 'duration':
+            raise PromQLError(f"Expected duration, found {value!r} in: {self.text}")
+        return parse_duration(value)
+
+    def parse_primary(self) -> Node:
+        kind, value = self.peek()
+        if value == '(' and kind == 'op':
+            self.next()
+            expr = self.parse_expr(0)
+            self.expect(')')
+            return Paren(expr)
+        if kind == 'number':
+            self.next()
+            return NumberLiteral(float(int(value, 16)) if value.lower().startswith('0x') else float(value), value)
+        if kind == 'duration':
+            raise PromQLError(f"Unexpected duration {value!r} in: {self.text}")
+        if kind == 'string':
+            self.next()
+            return StringLiteral(unquote(value))
+        if value == '{':
+            return self.parse_selector(None)
+        if kind == 'ident':
+            lower = value.lower()
+            if lower in ('inf', 'nan') and self.peek(1)[1] != '(':
+                self.next()
+                return NumberLiteral(float(lower), value)
+            if lower in AGGREGATORS and self.peek(1)[1] in ('(', 'by', 'without'):
+                return self.parse_aggregate()
+            self.next()
+            if self.peek()[1] == '(':
+                return self.parse_call(value)
+            return self.parse_selector(value)
+        raise PromQLError(f"Unexpected {value or 'end of input'!r} in: {self.text}")
+
+    def parse_call(self, func: str) -> Call:
+        self.expect('(')
+        args = []
+        while not self.accept(')'):
+            args.append(self.parse_expr(0))
+            if not self.accept(','):
+                self.expect(')')
+                break
+        return Call(func, args)
+
+    def parse_grouping(self, node: Aggregate):
+        if self.peek()[1] in ('by', 'without'):
+            node.without = self.next()[1] == 'without'
+            node.grouping = self.parse_label_list()
+
+    def parse_aggregate(self) -> Aggregate:
+        op = self.next()[1].lower()
+        node = Aggregate(op, None)
+        self.parse_grouping(node)
+        self.expect('(')
+        if op in PARAMETER_AGGREGATORS:
+            node.param = self.parse_expr(0)
+            self.expect(',')
+        node.expr = self.parse_expr(0)
+        self.expect(')')
+        if node.grouping is None:
+            self.parse_grouping(node)
+        return node
+
+    def parse_selector(self, name: Optional[str]) -> VectorSelector:
+        matchers = []
+        if self.accept('{'):
+            while not self.accept('}'):
+                kind, label = self.next()
+                if kind != 'ident':
+                    raise PromQLError(f"Expected label name, found {label!r} in: {self.text}")
+                op = self.next()[1]
+                if op not in ('=', '!=', '=~', '!~'):
+                    raise PromQLError(f"Expected matcher operator, found {op!r} in: {self.text}")
+                kind, value = self.next()
+                if kind != 'string':
+                    raise PromQLError(f"Expected string, found {value!r} in: {self.text}")
+                matchers.append(Matcher(label, op, unquote(value)))
+                if not self.accept(','):
+                    self.expect('}')
+                    break
+        if name is None:
+            for matcher in matchers:
+                if matcher.label == '__name__' and matcher.op == '=':
+                    name = matcher.value
+            matchers = [m for m in matchers if not (m.label == '__name__' and m.op == '=' and m.value == name)]
+        if name is None and not matchers:
+            raise PromQLError(f"Empty selector in: {self.text}")
+        return VectorSelector(name, matchers)
+
+
+def parse(text: str) -> Node:
+    """
+    Parse a PromQL expression.
+
+    Args:
+        text: Expression text
+
+    Returns:
+        Root AST node
+
+    Raises:
+        PromQLError: If the expression cannot be parsed
+    """
+    return Parser(text).parse()
+
+
+# ============================================================================
+# Formatting and traversal
+# ============================================================================
+
+def format_number(node: NumberLiteral) -> str:
+    if node.text is not None:
+        return node.text
+    value = node.value
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def format_expr(node: Node) -> str:
+    """Render an AST back to PromQL"""
+    if isinstance(node, NumberLiteral):
+        return format_number(node)
+    if isinstance(node, StringLiteral):
+        return '"' + node.value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+    if isinstance(node, VectorSelector):
+        text = node.name or ''
+        if node.matchers or not node.name:
+            text += '{' + ', '.join(str(m) for m in node.matchers) + '}'
+        if node.range is not None:
+            text += f"[{format_duration(node.range)}]"
+        if node.offset:
+            text += f" offset {'-' if node.offset < 0 else ''}{format_duration(abs(node.offset))}"
+        return text
+    if isinstance(node, Call):
+        return f"{node.func}(" + ', '.join(format_expr(arg) for arg in node.args) + ')'
+    if isinstance(node, Aggregate):
+        text = node.op
+        if node.grouping is not None:
+            text += f" {'without' if node.without else 'by'} (" + ', '.join(node.grouping) + ')'
+        inner = format_expr(node.expr)
+        if node.param is not None:
+            inner = format_expr(node.param) + ', ' + inner
+        return f"{text} ({inner})"
+    if isinstance(node, BinaryExpr):
+        op = node.op
+        if node.return_bool:
+            op += ' bool'
+        if node.matching is not None:
+            m = node.matching
+            op += f" {'on' if m.on else 'ignoring'}(" + ', '.join(m.labels) + ')'
+            if m.card:
+                op += f" {m.card}"
+                if m.include:
+                    op += '(' + ', '.join(m.include) + ')'
+        return f"{format_expr(node.lhs)} {op} {format_expr(node.rhs)}"
+    if isinstance(node, Unary):
+        return f"{node.op}{format_expr(node.expr)}"
+    if isinstance(node, Paren):
+        return f"({format_expr(node.expr)})"
+    if isinstance(node, Subquery):
+        step = format_duration(node.step) if node.step else ''
+        text = f"{format_expr(node.expr)}[{format_duration(node.range)}:{step}]"
+        if node.offset:
+            text += f" offset {'-' if node.offset < 0 else ''}{format_duration(abs(node.offset))}"
+        return text
+    raise TypeError(f"Unknown node {node!r}")
+
+
+def walk(node: Node) -> Iterable[Node]:
+    """Yield every node, parents before children"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(reversed(current.children()))
+
+
+def selectors(node: Node) -> List[VectorSelector]:
+    """All vector selectors in an expression"""
+    return [n for n in walk(node) if isinstance(n, VectorSelector)]
+
+
+def strip_parens(node: Node) -> Node:
+    """Remove redundant outer parentheses"""
+    while isinstance(node, Paren):
+        node = node.expr
+    return node
+
+
+def replace(node: Node, mapping) -> Node:
+    """
+    Return a copy of the tree with subtrees substituted.
+
+    Args:
+        node: Root node
+        mapping: Callable returning a replacement node or None to keep walking
+
+    Returns:
+        New root node
+    """
+    replacement = mapping(node)
+    if replacement is not None:
+        return replacement
+    if isinstance(node, Call):
+        return Call(node.func, [replace(arg, mapping) for arg in node.args])
+    if isinstance(node, Aggregate):
+        param = replace(node.param, mapping) if node.param is not None else None
+        return Aggregate(node.op, replace(node.expr, mapping), node.grouping, node.without, param)
+    if isinstance(node, BinaryExpr):
+        return BinaryExpr(node.op, replace(node.lhs, mapping), replace(node.rhs, mapping),
+                          node.return_bool, node.matching)
+    if isinstance(node, Unary):
+        return Unary(node.op, replace(node.expr, mapping))
+    if isinstance(node, Paren):
+        return Paren(replace(node.expr, mapping))
+    if isinstance(node, Subquery):
+        return Subquery(replace(node.expr, mapping), node.range, node.step, node.offset)
+    return node
+
+
+def canonical(node: Node) -> str:
+    """
+    Text form used to recognise identical sub-expressions across rules.
+
+    Parentheses are dropped and every binary expression is bracketed instead,
+    grouping labels and matchers are sorted, so equivalent spellings compare equal.
+    """
+    node = strip_parens(node)
+    if isinstance(node, VectorSelector):
+        ordered = sorted(node.matchers, key=lambda m: (m.label, m.op, m.value))
+        return format_expr(VectorSelector(node.name, ordered, node.range, node.offset))
+    if isinstance(node, Call):
+        return f"{node.func}(" + ', '.join(canonical(arg) for arg in node.args) + ')'
+    if isinstance(node, Aggregate):
+        text = node.op
+        if node.grouping is not None:
+            text += f" {'without' if node.without else 'by'} (" + ', '.join(sorted(node.grouping)) + ')'
+        inner = canonical(node.expr)
+        if node.param is not None:
+            inner = canonical(node.param) + ', ' + inner
+        return f"{text} ({inner})"
+    if isinstance(node, BinaryExpr):
+        op = format_expr(BinaryExpr(node.op, _EMPTY, _EMPTY, node.return_bool, node.matching)).strip()
+        return f"({canonical(node.lhs)} {op} {canonical(node.rhs)})"
+    if isinstance(node, Unary):
+        return f"{node.op}{canonical(node.expr)}"
+    if isinstance(node, Subquery):
+        return format_expr(Subquery(_Text(canonical(node.expr)), node.range, node.step, node.offset))
+    return format_expr(node)
+
+
+class _Text(NumberLiteral):
+    """Pre-rendered text spliced into a formatted expression"""
+
+    def __init__(self, text: str):
+        super().__init__(0.0, text)
+
+
+_EMPTY = _Text('')
@@ -0,0 +1,805 @@
+"""
+Prometheus Query Frontend
+Caching reverse proxy for Grafana's Prometheus datasource: range queries are
+split into step-aligned shards, settled shards are served from an LRU cache
+(memory plus optional disk tier) and only the still-changing tail is fetched
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode
+
+import promql
+from async_http import HTTPClient, HTTPServer, Request, Response
+from prom_metrics import CONTENT_TYPE, Registry
+
+
+class Colors:
+    """ANSI color codes for terminal output"""
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    END = '\033[0m'
+    BOLD = '\033[1m'
+
+
+JSON_TYPE = 'application/json'
+
+# Points per shard; shard boundaries are multiples of step * SHARD_POINTS
+DEFAULT_SHARD_POINTS = 720
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def parse_time(value: str) -> int:
+    """Unix seconds or RFC3339 to milliseconds"""
+    try:
+        return int(round(float(value) * 1000))
+    except ValueError:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        return int(round(parsed.timestamp() * 1000))
+
+
+def parse_step(value: str) -> int:
+    """Seconds or a duration such as 30s to milliseconds"""
+    try:
+        seconds = float(value)
+    except ValueError:
+        seconds = promql.parse_duration(value)
+    return int(round(seconds * 1000))
+
+
+def format_seconds(ms: int) -> str:
+    return f"{ms // 1000}.{ms % 1000:03d}"
+
+
+def query_key(query: str) -> str:
+    """Normalized query text so equivalent spellings share cache entries"""
+    try:
+        return promql.canonical(promql.parse(query))
+    except promql.PromQLError:
+        return ' '.join(query.split())
+
+
+def error_response(status: int, error_type: str, message: str) -> Response:
+    body = json.dumps({'status': 'error', 'errorType': error_type, 'error': message})
+    return Response(status, body.encode('utf-8'), content_type=JSON_TYPE)
+
+
+class UpstreamError(Exception):
+    """A non-success answer from Prometheus, passed back to the caller verbatim"""
+
+    def __init__(self, status: int, body: bytes, content_type: str):
+        super().__init__(f"upstream returned {status}")
+        self.status = status
+        self.body = body
+        self.content_type = content_type
+
+
+# ============================================================================
+# Cache
+# ============================================================================
+
+class ShardCache:
+    """
+    Size-bounded LRU of shard results with an optional disk tier.
+
+    An entry maps series (labels as sorted JSON) to [[ts, "value"], ...] and
+    records the last settled timestamp it covers. Only complete shards are
+    written to disk; memory evictions of those fall back to the disk copy.
+    """
+
+    def __init__(self, max_bytes: int, disk_dir: Optional[str] = None, disk_max_bytes: int = 0,
+                 on_evict: Optional[Callable[[str], None]] = None):
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self.on_evict = on_evict
+        self._memory: 'OrderedDict[str, Tuple[Dict, int]]' = OrderedDict()
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self.disk_bytes = sum(p.stat().st_size for p in self.disk_dir.glob('*.json.gz'))
+
+    def _path(self, key: str) -> Path:
+        return self.disk_dir / (hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json.gz')
+
+    def get(self, key: str) -> Tuple[Optional[Dict], str]:
+        """
+        Look up an entry.
+
+        Returns:
+            (entry or None, tier it came from: 'memory', 'disk' or '')
+        """
+        found = self._memory.get(key)
+        if found is not None:
+            self._memory.move_to_end(key)
+            return found[0], 'memory'
+        if self.disk_dir:
+            path = self._path(key)
+            try:
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                return None, ''
+            os.utime(path)
+            self._remember(key, entry)
+            return entry, 'disk'
+        return None, ''
+
+    def put(self, key: str, entry: Dict, complete: bool):
+        """Store an entry; complete (fully settled) shards also go to disk"""
+        self._remember(key, entry)
+        if complete and self.disk_dir:
+            path = self._path(key)
+            data = gzip.compress(json.dumps(entry, separators=(',', ':')).encode('utf-8'), 1)
+            previous = path.stat().st_size if path.exists() else 0
+            tmp = path.with_suffix('.tmp')
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            self.disk_bytes += len(data) - previous
+            self._trim_disk()
+
+    def _remember(self, key: str, entry: Dict):
+        size = len(json.dumps(entry, separators=(',', ':')))
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self.memory_bytes -= old[1]
+        self._memory[key] = (entry, size)
+        self.memory_bytes += size
+        while self.memory_bytes > self.max_bytes and len(self._memory) > 1:
+            _, (_, evicted) = self._memory.popitem(last=False)
+            self.memory_bytes -= evicted
+            if self.on_evict:
+                self.on_evict('memory')
+
+    def _trim_disk(self):
+        if not self.disk_max_bytes or self.disk_bytes <= self.disk_max_bytes:
+            return
+        files = sorted(self.disk_dir.glob('*.json.gz'), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            if self.disk_bytes <= self.disk_max_bytes * 0.9:
+                break
+            try:
+                size = path.stat().st_size
+                path.unlink()
+            except OSError:
+                continue
+            self.disk_bytes -= size
+            if self.on_evict:
+                self.on_evict('disk')
+
+    @property
+    def entries(self) -> int:
+        return len(self._memory)
+
+
+# ============================================================================
+# Frontend
+# ============================================================================
+
+class QueryFrontend:
+    """
+    Prometheus API proxy with a sharded range-query cache.
+
+    /api/v1/query_range is split into shards of shard_points steps aligned to
+    absolute multiples of the step (plus the query's phase), so successive
+    refreshes of a sliding window hit the same shards. Points older than
+    now - freshness are settled and cached; newer points are always fetched.
+    Every other path is proxied unchanged. GET /metrics serves the frontend's
+    own metrics.
+    """
+
+    def __init__(self, upstream: str, host: str = '0.0.0.0', port: int = 9091,
+                 cache_bytes: int = 256 * 1024 * 1024, disk_dir: Optional[str] = None,
+                 disk_bytes: int = 0, freshness: float = 300.0, shard_points: int = DEFAULT_SHARD_POINTS,
+                 upstream_connections: int = 16, timeout: float = 120.0,
+                 clock: Callable[[], float] = time.time):
+        """
+        Initialize the frontend.
+
+        Args:
+            upstream: Prometheus base URL
+            host: Listen address
+            port: Listen port
+            cache_bytes: Memory tier budget (serialized size)
+            disk_dir: Directory for the disk tier, or None to disable it
+            disk_bytes: Disk tier budget (0 = unbounded)
+            freshness: Seconds before a point is treated as settled
+            shard_points: Steps per shard
+            upstream_connections: Concurrent upstream requests
+            timeout: Upstream request timeout in seconds
+            clock: Time source, replaceable for simulations
+        """
+        self.upstream = HTTPClient(upstream, max_connections=upstream_connections, timeout=timeout)
+        self.server = HTTPServer(self.handle, host, port)
+        self.freshness_ms = int(freshness * 1000)
+        self.shard_points = shard_points
+        self.clock = clock
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+
+        registry = Registry()
+        self.registry = registry
+        self.m_requests = registry.counter(
+            'query_frontend_requests_total', 'Requests received', ['endpoint', 'code'])
+        self.m_duration = registry.histogram(
+            'query_frontend_request_duration_seconds', 'Request latency', ['endpoint'], LATENCY_BUCKETS)
+        self.m_shards = registry.counter(
+            'query_frontend_shards_total', 'Range-query shards by cache outcome (hit, partial, miss)', ['result'])
+        self.m_hit_ratio = registry.gauge(
+            'query_frontend_cache_hit_ratio', 'Share of shards served without an upstream fetch')
+        self.m_upstream = registry.counter(
+            'query_frontend_upstream_requests_total', 'Requests sent to Prometheus', ['code'])
+        self.m_upstream_duration = registry.histogram(
+            'query_frontend_upstream_duration_seconds', 'Upstream request latency', [], LATENCY_BUCKETS)
+        self.m_upstream_points = registry.counter(
+            'query_frontend_upstream_points_total', 'Points requested from Prometheus (series x steps)')
+        self.m_coalesced = registry.counter(
+            'query_frontend_coalesced_total', 'Callers joined to identical in-flight work', ['kind'])
+        self.m_cache_bytes = registry.gauge('query_frontend_cache_bytes', 'Cache size', ['tier'])
+        self.m_cache_entries = registry.gauge('query_frontend_cache_entries', 'Shards held in memory')
+        self.m_evictions = registry.counter('query_frontend_cache_evictions_total', 'Evicted shards', ['tier'])
+        self.m_tier_hits = registry.counter('query_frontend_cache_tier_hits_total', 'Cache lookups served', ['tier'])
+
+        self.cache = ShardCache(cache_bytes, disk_dir, disk_bytes, on_evict=self.m_evictions.inc)
+
+    # -- HTTP --------------------------------------------------------------
+
+    async def handle(self, request: Request) -> Response:
+        """Route one HTTP request"""
+        if request.path == '/metrics' and request.method == 'GET':
+            self._update_gauges()
+            return Response(200, self.registry.render(), content_type=CONTENT_TYPE)
+
+        started = time.perf_counter()
+        endpoint = 'query_range' if request.path.endswith('/api/v1/query_range') else 'proxy'
+        try:
+            if endpoint == 'query_range':
+                response = await self.query_range(request)
+            else:
+                response = await self.proxy(request)
+        except UpstreamError as e:
+            response = Response(e.status, e.body, content_type=e.content_type)
+        except (OSError, asyncio.TimeoutError, ConnectionError) as e:
+            response = error_response(502, 'unavailable', f"upstream unavailable: {e}")
+        self.m_requests.inc(endpoint, str(response.status))
+        self.m_duration.observe(time.perf_counter() - started, endpoint)
+        return response
+
+    async def proxy(self, request: Request) -> Response:
+        """Pass a request through unchanged"""
+        headers = {}
+        if 'content-type' in request.headers:
+            headers['Content-Type'] = request.headers['content-type']
+        status, response_headers, body = await self.upstream.request(
+            request.method, request.target, request.body, headers)
+        return Response(status, body, content_type=response_headers.get('content-type', JSON_TYPE))
+
+    @staticmethod
+    def _params(request: Request) -> Dict[str, str]:
+        params = {name: values[0] for name, values in request.query.items()}
+        if request.method == 'POST' and request.body:
+            form = parse_qs(request.body.decode('utf-8'))
+            params.update({name: values[0] for name, values in form.items()})
+        return params
+
+    # -- range queries -----------------------------------------------------
+
+    async def query_range(self, request: Request) -> Response:
+        """Serve a range query from cached shards plus fresh fetches"""
+        params = self._params(request)
+        try:
+            query = params['query']
+            start = parse_time(params['start'])
+            end = parse_time(params['end'])
+            step = parse_step(params['step'])
+        except (KeyError, ValueError) as e:
+            return error_response(400, 'bad_data', f"invalid range query parameters: {e}")
+        if step <= 0 or end < start:
+            return error_response(400, 'bad_data', "step must be positive and end not before start")
+        extra = {name: value for name, value in params.items() if name == 'timeout'}
+
+        last = start + (end - start) // step * step
+        phase = start % step
+        settled = self.clock() * 1000 - self.freshness_ms
+        key_base = f"{query_key(query)}|{step}|{phase}"
+
+        request_key = ('range', key_base, start, last, tuple(sorted(extra.items())))
+        body = await self._coalesce(request_key, lambda: self._assemble(
+            query, extra, key_base, start, last, step, phase, settled))
+        return Response(200, body, content_type=JSON_TYPE)
+
+    async def _assemble(self, query: str, extra: Dict, key_base: str, start: int, last: int, step: int,
+                        phase: int, settled: float) -> bytes:
+        """Gather every shard of a range query and render the merged matrix"""
+        shard_length = step * self.shard_points
+        tasks = []
+        index = (start - phase) // shard_length
+        while phase + index * shard_length <= last:
+            shard_lo = phase + index * shard_length
+            shard_hi = shard_lo + shard_length - step
+            need_lo, need_hi = max(start, shard_lo), min(last, shard_hi)
+            tasks.append(self._shard(query, extra, f"{key_base}|{index}", shard_lo, shard_hi,
+                                     need_lo, need_hi, step, settled))
+            index += 1
+
+        pieces = await asyncio.gather(*tasks)
+        merged: Dict[str, List] = {}
+        warnings: List[str] = []
+        for series, piece_warnings in pieces:
+            warnings.extend(w for w in piece_warnings if w not in warnings)
+            for labels, values in series.items():
+                merged.setdefault(labels, []).extend(values)
+
+        result = [{'metric': json.loads(labels), 'values': values}
+                  for labels, values in sorted(merged.items()) if values]
+        payload = {'status': 'success', 'data': {'resultType': 'matrix', 'result': result}}
+        if warnings:
+            payload['warnings'] = warnings
+        return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+    async def _shard(self, query: str, extra: Dict, key: str, shard_lo: int, shard_hi: int,
+                     need_lo: int, need_hi: int, step: int, settled: float) -> Tuple[Dict[str, List], List[str]]:
+        """Points of one shard between need_lo and need_hi"""
+        entry, tier = self.cache.get(key)
+        if tier:
+            self.m_tier_hits.inc(tier)
+        covered = entry['covered'] if entry else shard_lo - step
+
+        if covered >= need_hi:
+            self.m_shards.inc('hit')
+            return self._slice(entry['series'], need_lo, need_hi), []
+
+        # Last settled point on this shard's grid
+        settled_point = shard_lo + math.floor((settled - shard_lo) / step) * step
+        settled_hi = min(shard_hi, settled_point)
+        fetch_lo = covered + step
+        fetch_hi = max(need_hi, settled_hi) if fetch_lo <= settled_hi else need_hi
+        if entry is None and fetch_lo < need_lo and settled_hi < need_lo:
+            # Nothing cacheable before the requested points
+            fetch_lo = need_lo
+        self.m_shards.inc('partial' if entry else 'miss')
+
+        fetched, warnings = await self._fetch(query, extra, fetch_lo, fetch_hi, step)
+
+        if settled_hi >= fetch_lo and not warnings:
+            series = {labels: list(values) for labels, values in (entry['series'] if entry else {}).items()}
+            for labels, values in fetched.items():
+                settled_values = [v for v in values if int(round(float(v[0]) * 1000)) <= settled_hi]
+                if settled_values:
+                    series.setdefault(labels, []).extend(settled_values)
+            self.cache.put(key, {'covered': settled_hi, 'series': series}, complete=settled_hi >= shard_hi)
+
+        if entry is None:
+            return self._slice(fetched, need_lo, need_hi), warnings
+        combined = {labels: list(values)
+                    for labels, values in self._slice(entry['series'], need_lo, min(need_hi, covered)).items()}
+        for labels, values in self._slice(fetched, need_lo, need_hi).items():
+            combined.setdefault(labels, []).extend(values)
+        return combined, warnings
+
+    @staticmethod
+    def _slice(series: Dict[str, List], lo: int, hi: int) -> Dict[str, List]:
+        """Points between lo and hi (ms, inclusive) of time-ordered series"""
+        def position(values: List, ms: int) -> int:
+            # First index whose timestamp is >= ms
+            left, right = 0, len(values)
+            while left < right:
+                middle = (left + right) // 2
+                if int(round(float(values[middle][0]) * 1000)) < ms:
+                    left = middle + 1
+                else:
+                    right = middle
+            return left
+
+        result = {}
+        for labels, values in series.items():
+            if not values:
+                continue
+            first, last = int(round(float(values[0][0]) * 1000)), int(round(float(values[-1][0]) * 1000))
+            if lo <= first and last <= hi:
+                result[labels] = values
+                continue
+            picked = values[position(values, lo):position(values, hi + 1)]
+            if picked:
+                result[labels] = picked
+        return result
+
+    async def _coalesce(self, key: Tuple, factory: Callable[[], Awaitable]):
+        """Run factory() once for concurrent callers sharing the same key"""
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.m_coalesced.inc(key[0])
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_event_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            del self._inflight[key]
+        future.set_result(result)
+        return result
+
+    async def _fetch(self, query: str, extra: Dict, lo: int, hi: int, step: int) -> Tuple[Dict[str, List], List]:
+        """Fetch points from Prometheus, joining an identical in-flight fetch"""
+        key = ('fetch', query, lo, hi, step, tuple(sorted(extra.items())))
+        return await self._coalesce(key, lambda: self._fetch_upstream(query, extra, lo, hi, step))
+
+    async def _fetch_upstream(self, query: str, extra: Dict, lo: int, hi: int,
+                              step: int) -> Tuple[Dict[str, List], List]:
+        form = {'query': query, 'start': format_seconds(lo), 'end': format_seconds(hi), 'step': format_seconds(step)}
+        form.update(extra)
+        started = time.perf_counter()
+        status, headers, body = await self.upstream.request(
+            'POST', '/api/v1/query_range', urlencode(form).encode('utf-8'),
+            {'Content-Type': 'application/x-www-form-urlencoded'})
+        self.m_upstream_duration.observe(time.perf_counter() - started)
+        self.m_upstream.inc(str(status))
+        if status != 200:
+            raise UpstreamError(status, body, headers.get('content-type', JSON_TYPE))
+
+        payload = json.loads(body.decode('utf-8'))
+        if payload.get('status') != 'success' or payload['data'].get('resultType') != 'matrix':
+            raise UpstreamError(422, body, JSON_TYPE)
+        series = {}
+        points = 0
+        for item in payload['data']['result']:
+            series[json.dumps(item['metric'], sort_keys=True)] = item['values']
+            points += len(item['values'])
+        self.m_upstream_points.inc(amount=points)
+        return series, payload.get('warnings', [])
+
+    def _update_gauges(self):
+        hits = self.m_shards.get('hit')
+        total = hits + self.m_shards.get('partial') + self.m_shards.get('miss')
+        self.m_hit_ratio.set(hits / total if total else 0.0)
+        self.m_cache_bytes.set(self.cache.memory_bytes, 'memory')
+        self.m_cache_bytes.set(self.cache.disk_bytes, 'disk')
+        self.m_cache_entries.set(self.cache.entries)
+
+    async def start(self):
+        """Start listening"""
+        await self.server.start()
+
+    async def stop(self):
+        """Stop listening and close upstream connections"""
+        await self.server.close()
+        await self.upstream.close()
+
+
+# ============================================================================
+# Fake Prometheus
+# ============================================================================
+
+class FakePrometheus:
+    """
+    Minimal Prometheus HTTP API serving deterministic series.
+
+    Every query returns up to `series` series (narrowed by instance matchers)
+    whose value at t is a function of the series index, the query and t only,
+    so results are identical however the range or series set is split. The
+    cost of a range query is simulated as latency per point; max_points and
+    error_rate reproduce Prometheus' resolution limit and transient 503s.
+    """
+
+    def __init__(self, series: int = 20, latency: float = 0.005, per_point: float = 2e-6,
+                 host: str = '127.0.0.1', port: int = 0, clock: Callable[[], float] = time.time,
+                 on_points: Optional[Callable[[int], None]] = None, max_points: int = 0,
+                 error_rate: float = 0.0):
+        self.series = series
+        self.latency = latency
+        self.per_point = per_point
+        self.clock = clock
+        self.on_points = on_points
+        self.max_points = max_points
+        self.error_rate = error_rate
+        self.server = HTTPServer(self.handle, host, port)
+        self.requests = 0
+        self.points = 0
+        self._values: Dict[Tuple[int, int], str] = {}
+        self._seeds: Dict[str, int] = {}
+        self._random = random.Random(42)
+
+    def value(self, index: int, query: str, ts_ms: int) -> str:
+        seed = self._seeds.get(query)
+        if seed is None:
+            seed = self._seeds[query] = sum(self._unsharded(query).encode('utf-8')) % 97
+        key = (index + seed, ts_ms)
+        value = self._values.get(key)
+        if value is None:
+            if len(self._values) > 2_000_000:
+                self._values.clear()
+            value = self._values[key] = repr(round(100 + 50 * math.sin(ts_ms / 3.6e6 + key[0]), 6))
+        return value
+
+    @staticmethod
+    def _unsharded(query: str) -> str:
+        """Query text without instance matchers"""
+        def strip(node):
+            if isinstance(node, promql.VectorSelector):
+                matchers = [m for m in node.matchers if m.label != 'instance']
+                return promql.VectorSelector(node.name, matchers, node.range, node.offset)
+            return None
+        try:
+            return promql.format_expr(promql.replace(promql.parse(query), strip))
+        except promql.PromQLError:
+            return query
+
+    def matching(self, query: str) -> List[int]:
+        """Indexes of the series selected by the query's instance matchers"""
+        try:
+            matchers = [m for selector in promql.selectors(promql.parse(query))
+                        for m in selector.matchers if m.label == 'instance']
+        except promql.PromQLError:
+            matchers = []
+        indexes = []
+        for index in range(self.series):
+            instance = f"host-{index:03d}"
+            if all(_matches(m, instance) for m in matchers):
+                indexes.append(index)
+        return indexes
+
+    async def handle(self, request: Request) -> Response:
+        params = QueryFrontend._params(request)
+        if self.error_rate and self._random.random() < self.error_rate:
+            await asyncio.sleep(self.latency)
+            return error_response(503, 'unavailable', 'injected failure')
+        if request.path == '/api/v1/query_range':
+            self.requests += 1
+            start, end, step = parse_time(params['start']), parse_time(params['end']), parse_step(params['step'])
+            if self.max_points and (end - start) // step + 1 > self.max_points:
+                return error_response(400, 'bad_data', f"exceeded maximum resolution of {self.max_points:,} "
+                                                       f"points per timeseries. Try decreasing the query "
+                                                       f"resolution (?step=XX)")
+            now_ms = int(self.clock() * 1000)
+            timestamps = [t for t in range(start, end + 1, step) if t <= now_ms]
+            indexes = self.matching(params['query'])
+            result = []
+            for index in indexes:
+                values = [[t / 1000 if t % 1000 else t // 1000, self.value(index, params['query'], t)]
+                          for t in timestamps]
+                result.append({'metric': {'instance': f"host-{index:03d}"}, 'values': values})
+            points = len(timestamps) * len(indexes)
+            self.points += points
+            if self.on_points:
+                self.on_points(points)
+            await asyncio.sleep(self.latency + points * self.per_point)
+            body = {'status': 'success', 'data': {'resultType': 'matrix', 'result': result}}
+            return Response(200, json.dumps(body).encode('utf-8'), content_type=JSON_TYPE)
+        if request.path == '/api/v1/query':
+            body = {'status': 'success', 'data': {'resultType': 'vector', 'result': []}}
+            return Response(200, json.dumps(body).encode('utf-8'), content_type=JSON_TYPE)
+        if request.path == '/api/v1/label/instance/values':
+            selectors = request.query.get('match[]', [])
+            selected = set(range(self.series)) if not selectors else set()
+            for selector in selectors:
+                selected.update(self.matching(selector))
+            body = {'status': 'success', 'data': [f"host-{index:03d}" for index in sorted(selected)]}
+            return Response(200, json.dumps(body).encode('utf-8'), content_type=JSON_TYPE)
+        return error_response(404, 'not_found', request.path)
+
+    async def start(self):
+        await self.server.start()
+
+    async def stop(self):
+        await self.server.close()
+
+
+def _matches(matcher: 'promql.Matcher', value: str) -> bool:
+    if matcher.op == '=':
+        return value == matcher.value
+    if matcher.op == '!=':
+        return value != matcher.value
+    found = re.fullmatch(matcher.value, value) is not None
+    return found if matcher.op == '=~' else not found
+
+
+def serve_fake(series: int, clock_value, points_value, ready, **options):
+    """Child-process entry point running a FakePrometheus on a shared clock"""
+    def count(points: int):
+        with points_value.get_lock():
+            points_value.value += points
+
+    async def serve():
+        fake = FakePrometheus(series, clock=lambda: clock_value.value, on_points=count, **options)
+        await fake.start()
+        ready.put(fake.server.port)
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+async def run_benchmark(panels: int, viewers: int, refreshes: int, refresh_interval: float, window: float,
+                        step: float, series: int, disk_dir: Optional[str]) -> bool:
+    """
+    Simulate Grafana refreshes against a fake Prometheus, direct and via the frontend.
+
+    The fake runs in a child process so its work does not skew the frontend's
+    latency. Every response through the frontend is compared with the direct
+    answer.
+
+    Returns:
+        True when all responses matched
+    """
+    import multiprocessing
+
+    clock_value = multiprocessing.Value('d', 1_700_000_000.0)
+    points_value = multiprocessing.Value('q', 0)
+    ready = multiprocessing.Queue()
+    child = multiprocessing.Process(target=serve_fake, args=(series, clock_value, points_value, ready),
+                                    daemon=True)
+    child.start()
+
+    def clock() -> float:
+        return clock_value.value
+
+    upstream_url = f"http://127.0.0.1:{ready.get(timeout=30)}"
+    frontend = QueryFrontend(upstream_url, '127.0.0.1', 0, disk_dir=disk_dir, clock=clock)
+    await frontend.start()
+    direct = HTTPClient(upstream_url, max_connections=64)
+    proxied = HTTPClient(f"http://127.0.0.1:{frontend.server.port}", max_connections=64)
+
+    queries = [f'sum by (instance) (rate(http_requests_total{{panel="{i}"}}[5m]))' for i in range(panels)]
+    step_ms = int(step * 1000)
+    latencies = {'direct': [], 'frontend': []}
+    mismatches = 0
+
+    async def run(client: HTTPClient, name: str, query: str, start_ms: int, end_ms: int) -> bytes:
+        form = urlencode({'query': query, 'start': format_seconds(start_ms), 'end': format_seconds(end_ms),
+                          'step': format_seconds(step_ms)}).encode('utf-8')
+        started = time.perf_counter()
+        status, _, body = await client.request('POST', '/api/v1/query_range', form,
+                                               {'Content-Type': 'application/x-www-form-urlencoded'})
+        latencies[name].append(time.perf_counter() - started)
+        if status != 200:
+            raise RuntimeError(f"{name} query failed with {status}: {body[:200]!r}")
+        return body
+
+    direct_points = 0
+    for _ in range(refreshes):
+        # Grafana aligns the range to the step
+        end_ms = int(clock() * 1000) // step_ms * step_ms
+        start_ms = end_ms - int(window * 1000) // step_ms * step_ms
+        before = points_value.value
+        expected = await asyncio.gather(*[run(direct, 'direct', q, start_ms, end_ms) for q in queries])
+        direct_points += points_value.value - before
+        answers = await asyncio.gather(*[run(proxied, 'frontend', q, start_ms, end_ms)
+                                         for q in queries for _ in range(viewers)])
+        for i, body in enumerate(answers):
+            want = json.loads(expected[i // viewers])['data']['result']
+            got = json.loads(body)['data']['result']
+            if got != want:
+                mismatches += 1
+        clock_value.value += refresh_interval
+
+    frontend._update_gauges()
+    upstream_points = frontend.m_upstream_points.get()
+    hits = frontend.m_shards.get('hit')
+    shards = hits + frontend.m_shards.get('partial') + frontend.m_shards.get('miss')
+    await proxied.close()
+    await direct.close()
+    await frontend.stop()
+    child.terminate()
+
+    def pct(values, q):
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    requests = refreshes * panels * viewers
+    print(f"\n{Colors.HEADER}{Colors.BOLD}{requests:,} dashboard queries "
+          f"({panels} panels x {viewers} viewers x {refreshes} refreshes){Colors.END}")
+    print(f"  Points computed upstream: direct {direct_points * viewers:,} (all viewers) "
+          f"vs frontend {upstream_points:,.0f}")
+    print(f"  Shard hit ratio:          {hits / shards * 100 if shards else 0:.1f}% of {shards:,.0f} shards; "
+          f"{frontend.m_coalesced.get('range'):,.0f} coalesced requests, "
+          f"{frontend.m_coalesced.get('fetch'):,.0f} coalesced fetches")
+    print(f"  Latency p50/p95 direct:   {pct(latencies['direct'], 0.5):.1f} / {pct(latencies['direct'], 0.95):.1f} ms")
+    print(f"  Latency p50/p95 frontend: {pct(latencies['frontend'], 0.5):.1f} / "
+          f"{pct(latencies['frontend'], 0.95):.1f} ms")
+    print(f"  Cache: {frontend.cache.memory_bytes / 1024:.0f} KiB in memory, "
+          f"{frontend.cache.disk_bytes / 1024:.0f} KiB on disk")
+    if mismatches:
+        print(f"{Colors.RED}✗ {mismatches} response(s) differed from direct Prometheus answers{Colors.END}")
+        return False
+    print(f"{Colors.GREEN}✓ All frontend responses matched direct Prometheus answers{Colors.END}")
+    return True
+
+
+def main():
+    """Main entry point for the query frontend"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Caching, step-aligned query frontend for Grafana's Prometheus datasource",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python query_frontend.py --upstream http://localhost:9090 --port 9091
+  python query_frontend.py --upstream http://localhost:9090 --disk-cache /var/cache/query-frontend
+  python query_frontend.py --benchmark --panels 12 --viewers 5 --refreshes 20
+
+Point the Grafana datasource at the frontend (see the commented "Prometheus
+(cached)" entry in grafana/provisioning/datasources/datasources.yml). Frontend
+metrics are served at /metrics, e.g.:
+  query_frontend_cache_hit_ratio
+  histogram_quantile(0.95, rate(query_frontend_request_duration_seconds_bucket[5m]))
+        """
+    )
+
+    parser.add_argument("--upstream", default="http://localhost:9090", help="Prometheus base URL")
+    parser.add_argument("--host", default="0.0.0.0", help="Listen address")
+    parser.add_argument("--port", type=int, default=9091, help="Listen port (default: 9091)")
+    parser.add_argument("--cache-mb", type=float, default=256, help="Memory cache budget in MiB")
+    parser.add_argument("--disk-cache", help="Directory for the disk cache tier")
+    parser.add_argument("--disk-cache-mb", type=float, default=2048, help="Disk cache budget in MiB")
+    parser.add_argument("--freshness", default="5m", help="Age after which points are cached")
+    parser.add_argument("--shard-points", type=int, default=DEFAULT_SHARD_POINTS, help="Steps per shard")
+    parser.add_argument("--upstream-connections", type=int, default=16, help="Concurrent upstream requests")
+    parser.add_argument("--benchmark", action="store_true", help="Simulate dashboards against a fake Prometheus")
+    parser.add_argument("--panels", type=int, default=10, help="Benchmark panels per refresh")
+    parser.add_argument("--viewers", type=int, default=3, help="Benchmark viewers refreshing together")
+    parser.add_argument("--refreshes", type=int, default=20, help="Benchmark refreshes")
+    parser.add_argument("--refresh-interval", default="30s", help="Benchmark time between refreshes")
+    parser.add_argument("--window", default="24h", help="Benchmark dashboard time range")
+    parser.add_argument("--step", default="60s", help="Benchmark query step")
+    parser.add_argument("--series", type=int, default=20, help="Benchmark series per query")
+
+    args = parser.parse_args()
+
+    try:
+        freshness = promql.parse_duration(args.freshness)
+    except promql.PromQLError as e:
+        parser.error(str(e))
+
+    if args.benchmark:
+        ok = asyncio.run(run_benchmark(
+            args.panels, args.viewers, args.refreshes, promql.parse_duration(args.refresh_interval),
+            promql.parse_duration(args.window), promql.parse_duration(args.step), args.series, args.disk_cache))
+        sys.exit(0 if ok else 1)
+
+    frontend = QueryFrontend(args.upstream, args.host, args.port, int(args.cache_mb * 1024 * 1024),
+                             args.disk_cache, int(args.disk_cache_mb * 1024 * 1024), freshness,
+                             args.shard_points, args.upstream_connections)
+
+    async def serve():
+        await frontend.start()
+        tier = f", disk tier {args.disk_cache}" if args.disk_cache else ""
+        print(f"{Colors.GREEN}✓ Query frontend listening on {args.host}:{frontend.server.port} → "
+              f"{args.upstream}{tier}{Colors.END}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await frontend.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print(f"\n{Colors.YELLOW}⚠ Stopped{Colors.END}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+"""
+Span-to-RED Metrics Bridge
+OTLP/HTTP tap that turns spans into rate/error/duration metrics per service,
+operation and status with bounded label cardinality, exposes them on /metrics
+and optionally forwards the original requests to Jaeger
+"""
+
+import asyncio
+import re
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import otlp
+from async_http import HTTPClient, HTTPServer, Request, Response
+from prom_metrics import CONTENT_TYPE, Registry
+
+
+class Colors:
+    """ANSI color codes for terminal output"""
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    END = '\033[0m'
+    BOLD = '\033[1m'
+
+
+# Latency buckets in seconds, matching what the HighLatency alert quantiles need
+DURATION_BUCKETS = (0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+KIND_NAMES = {
+    otlp.KIND_INTERNAL: 'internal',
+    otlp.KIND_SERVER: 'server',
+    otlp.KIND_CLIENT: 'client',
+    otlp.KIND_PRODUCER: 'producer',
+    otlp.KIND_CONSUMER: 'consumer',
+}
+
+STATUS_NAMES = {otlp.STATUS_UNSET: 'unset', otlp.STATUS_OK: 'ok', otlp.STATUS_ERROR: 'error'}
+
+OVERFLOW = '__overflow__'
+
+# Path segments that carry IDs rather than routes
+ID_PATTERNS = [
+    (re.compile(r'/[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}(?=/|$|\?)'), '/{uuid}'),
+    (re.compile(r'/[0-9a-fA-F]{16,}(?=/|$|\?)'), '/{hex}'),
+    (re.compile(r'/\d+(?=/|$|\?)'), '/{id}'),
+    (re.compile(r'\?.*$'), ''),
+]
+
+
+def normalize_operation(name: str) -> str:
+    """
+    Collapse IDs in span names so /api/users/123 and /api/users/456 share a series.
+
+    Args:
+        name: Raw span name
+
+    Returns:
+        Normalized operation name
+    """
+    for pattern, replacement in ID_PATTERNS:
+        name = pattern.sub(replacement, name)
+    return name
+
+
+class SpanMetricsAggregator:
+    """
+    In-memory RED aggregation with bounded cardinality.
+
+    Each (service, span name, kind, status) key resolves once to a label tuple;
+    after that a span costs one dict lookup, a counter increment and a
+    histogram observation. Operations beyond the per-service cap (and services
+    beyond the service cap) are folded into the __overflow__ label value.
+    """
+
+    def __init__(self, max_services: int = 50, max_operations: int = 200,
+                 kinds: Optional[Set[int]] = None, buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        """
+        Initialize the aggregator.
+
+        Args:
+            max_services: Distinct service label values before overflow
+            max_operations: Distinct operations per service before overflow
+            kinds: Span kinds to aggregate (None = all)
+            buckets: Duration histogram buckets in seconds
+        """
+        self.max_services = max_services
+        self.max_operations = max_operations
+        self.kinds = kinds
+        self.operations: Dict[str, Set[str]] = {}
+        self._labels: Dict[Tuple[str, str, int, int], Optional[Tuple[str, str, str, str]]] = {}
+
+        self.registry = Registry()
+        label_names = ['service', 'operation', 'span_kind', 'status']
+        self.m_calls = self.registry.counter(
+            'traces_spanmetrics_calls_total', 'Spans received', label_names)
+        self.m_duration = self.registry.histogram(
+            'traces_spanmetrics_duration_seconds', 'Span duration', label_names, buckets)
+        self.m_spans = self.registry.counter(
+            'span_metrics_spans_received_total', 'Spans seen by the bridge')
+        self.m_overflow = self.registry.counter(
+            'span_metrics_label_overflow_total', 'New label sets folded into the overflow value', ['dimension'])
+        self.m_series = self.registry.gauge(
+            'span_metrics_active_series', 'Distinct label sets being tracked')
+        self.m_forwarded = self.registry.counter(
+            'span_metrics_forwarded_requests_total', 'Export requests forwarded upstream', ['result'])
+
+    def _resolve(self, key: Tuple[str, str, int, int]) -> Optional[Tuple[str, str, str, str]]:
+        service, name, kind, status = key
+        if self.kinds is not None and kind not in self.kinds:
+            return None
+
+        operations = self.operations.get(service)
+        if operations is None:
+            if len(self.operations) >= self.max_services:
+                self.m_overflow.inc('service')
+                service = OVERFLOW
+                operations = self.operations.setdefault(OVERFLOW, set())
+            else:
+                operations = self.operations[service] = set()
+
+        operation = normalize_operation(name)
+        if operation not in operations:
+            if len(operations) >= self.max_operations:
+                self.m_overflow.inc('operation')
+                operation = OVERFLOW
+            operations.add(operation)
+
+        return (service, operation, KIND_NAMES.get(kind, 'unspecified'), STATUS_NAMES.get(status, 'unset'))
+
+    def add_spans(self, spans: List[otlp.Span]):
+        """Aggregate a batch of decoded spans"""
+        cache = self._labels
+        calls = self.m_calls.inc
+        observe = self.m_duration.observe
+        for span in spans:
+            key = (span.resource.service_name, span.name, span.kind, span.status_code)
+            labels = cache.get(key)
+            if labels is None:
+                if key in cache:
+                    continue
+                labels = self._resolve(key)
+                # Raw names are bounded only by the clients, so cap the lookup cache too
+                if len(cache) > 100000:
+                    cache.clear()
+                cache[key] = labels
+                if labels is None:
+                    continue
+            calls(*labels)
+            observe(max(0, span.end_ns - span.start_ns) / 1e9, *labels)
+        self.m_spans.inc(amount=len(spans))
+
+    def render(self) -> bytes:
+        """Render all metrics in the Prometheus text format"""
+        self.m_series.set(len(self.m_calls.values))
+        return self.registry.render()
+
+
+class SpanMetricsBridge:
+    """
+    OTLP/HTTP endpoint feeding the aggregator.
+
+    POST /v1/traces is aggregated and, when an upstream is configured,
+    forwarded byte-for-byte in the background; GET /metrics serves the series.
+    """
+
+    def __init__(self, aggregator: SpanMetricsAggregator, upstream: Optional[str] = None,
+                 host: str = '0.0.0.0', port: int = 4318, queue_size: int = 1000,
+                 upstream_connections: int = 4):
+        """
+        Initialize the bridge.
+
+        Args:
+            aggregator: Configured SpanMetricsAggregator
+            upstream: Upstream OTLP/HTTP base URL, or None to only aggregate
+            host: Listen address
+            port: Listen port
+            queue_size: Export requests buffered for forwarding before dropping
+            upstream_connections: Concurrent upstream requests
+        """
+        self.aggregator = aggregator
+        self.server = HTTPServer(self.handle, host, port)
+        self.upstream = HTTPClient(upstream, max_connections=upstream_connections) if upstream else None
+        self.queue_size = queue_size
+        self.upstream_connections = upstream_connections
+        self._queue = None
+        self._tasks = []
+
+    async def handle(self, request: Request) -> Response:
+        """Route one HTTP request"""
+        if request.path == '/v1/traces' and request.method == 'POST':
+            content_type = request.headers.get('content-type', otlp.CONTENT_TYPE_PROTOBUF)
+            try:
+                spans = otlp.decode_request(request.body, content_type)
+            except ValueError as e:
+                return Response(400, str(e).encode('utf-8'), content_type='text/plain')
+            self.aggregator.add_spans(spans)
+
+            if self._queue is not None:
+                try:
+                    self._queue.put_nowait((request.body, content_type))
+                except asyncio.QueueFull:
+                    self.aggregator.m_forwarded.inc('dropped')
+
+            if 'json' in content_type:
+                return Response(200, b'{}', content_type=otlp.CONTENT_TYPE_JSON)
+            return Response(200, b'', content_type=otlp.CONTENT_TYPE_PROTOBUF)
+
+        if request.path == '/metrics' and request.method == 'GET':
+            return Response(200, self.aggregator.render(), content_type=CONTENT_TYPE)
+
+        return Response(404, b'not found', content_type='text/plain')
+
+    async def _forward_loop(self):
+        while True:
+            body, content_type = await self._queue.get()
+            try:
+                status, _, _ = await self.upstream.request(
+                    'POST', '/v1/traces', body, {'Content-Type': content_type})
+            except (OSError, asyncio.TimeoutError, ConnectionError):
+                status = 0
+            self.aggregator.m_forwarded.inc('ok' if 200 <= status < 300 else 'error')
+            self._queue.task_done()
+
+    async def start(self):
+        """Start listening and the forwarding workers"""
+        await self.server.start()
+        if self.upstream:
+            self._queue = asyncio.Queue(self.queue_size)
+            self._tasks = [asyncio.ensure_future(self._forward_loop())
+                           for _ in range(self.upstream_connections)]
+
+    async def stop(self):
+        """Drain the forwarding queue and stop"""
+        await self.server.close()
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), 10)
+            except asyncio.TimeoutError:
+                pass
+        for task in self._tasks:
+            task.cancel()
+        if self.upstream:
+            await self.upstream.close()
+
+
+def synthetic_requests(spans: int, spans_per_request: int = 200) -> List[bytes]:
+    """
+    Build protobuf export requests shaped like the stack's services.
+
+    Args:
+        spans: Total spans
+        spans_per_request: Spans per export request
+
+    Returns:
+        List of request bodies
+    """
+    services = ['user-service', 'order-service', 'product-service']
+    routes = ['GET /api/users/{}', 'POST /api/orders', 'GET /api/orders/{}', 'GET /api/products/{}',
+              'GET /health', 'SELECT orders', 'redis GET']
+    now_ns = time.time_ns()
+    requests = []
+    trace_id = b'\x01' * 16
+    for first in range(0, spans, spans_per_request):
+        service = services[(first // spans_per_request) % len(services)]
+        raw = []
+        for i in range(first, min(first + spans_per_request, spans)):
+            route = routes[i % len(routes)].format(i % 5000)
+            status = otlp.STATUS_ERROR if i % 97 == 0 else otlp.STATUS_UNSET
+            kind = otlp.KIND_SERVER if i % 3 else otlp.KIND_CLIENT
+            duration = (i % 400 + 1) * 500_000
+            raw.append(otlp.build_proto_span(trace_id, i.to_bytes(8, 'big'), b'', route, kind,
+                                             now_ns, now_ns + duration, status))
+        requests.append(otlp.build_proto_request(service, raw))
+    return requests
+
+
+async def run_benchmark(spans: int, concurrency: int):
+    """
+    Measure spans/s through the aggregation hot path and through HTTP.
+
+    Args:
+        spans: Number of synthetic spans
+        concurrency: Concurrent HTTP clients for the end-to-end run
+    """
+    print(f"{Colors.CYAN}ℹ Generating {spans:,} spans...{Colors.END}")
+    requests = synthetic_requests(spans)
+    decoded = [otlp.decode_protobuf(body) for body in requests]
+
+    # 1. Aggregation only, spans already decoded
+    aggregator = SpanMetricsAggregator()
+    started = time.perf_counter()
+    for batch in decoded:
+        aggregator.add_spans(batch)
+    elapsed = time.perf_counter() - started
+    series = len(aggregator.m_calls.values)
+    print(f"{Colors.GREEN}✓ Aggregation:     {spans / elapsed:>12,.0f} spans/s ({series} series){Colors.END}")
+
+    # 2. Decode + aggregate
+    aggregator = SpanMetricsAggregator()
+    started = time.perf_counter()
+    for body in requests:
+        aggregator.add_spans(otlp.decode_protobuf(body))
+    elapsed = time.perf_counter() - started
+    print(f"{Colors.GREEN}✓ Decode + agg:    {spans / elapsed:>12,.0f} spans/s{Colors.END}")
+
+    # 3. End to end over HTTP, no upstream
+    aggregator = SpanMetricsAggregator()
+    bridge = SpanMetricsBridge(aggregator, None, '127.0.0.1', 0)
+    await bridge.start()
+    queue = asyncio.Queue()
+    for body in requests:
+        queue.put_nowait(body)
+
+    async def client():
+        http = HTTPClient(f"http://127.0.0.1:{bridge.server.port}", max_connections=1)
+        while not queue.empty():
+            body = queue.get_nowait()
+            await http.request('POST', '/v1/traces', body, {'Content-Type': otlp.CONTENT_TYPE_PROTOBUF})
+        await http.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    scrape = len(aggregator.render())
+    await bridge.stop()
+    print(f"{Colors.GREEN}✓ Via HTTP:        {spans / elapsed:>12,.0f} spans/s "
+          f"(/metrics payload {scrape / 1024:.0f} KiB){Colors.END}")
+
+
+def main():
+    """Main entry point for the span metrics bridge"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Derive RED metrics from OTLP spans and expose them to Prometheus",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python span_metrics.py --port 4318 --upstream http://jaeger:4318
+  python span_metrics.py --port 14318 --upstream http://localhost:4318 --kinds server,consumer
+  python span_metrics.py --port 14318 --upstream http://localhost:24318   # in front of tail_sampler.py
+  python span_metrics.py --benchmark --spans 500000
+
+Point applications' OTLP exporter at the bridge; /metrics is served on the same
+port. The 'span-metrics' job in prometheus/prometheus.yml scrapes a bridge
+running on the host at port 14318 (4318 is taken by Jaeger). Example queries:
+  sum by (service) (rate(traces_spanmetrics_calls_total{span_kind="server"}[5m]))
+  histogram_quantile(0.95, sum by (service, le) (rate(traces_spanmetrics_duration_seconds_bucket[5m])))
+        """
+    )
+
+    parser.add_argument("--host", default="0.0.0.0", help="Listen address")
+    parser.add_argument("--port", type=int, default=4318, help="Listen port (default: 4318)")
+    parser.add_argument("--upstream", default="", help="Forward requests to this OTLP/HTTP URL (default: none)")
+    parser.add_argument("--kinds", default="", help="Comma-separated span kinds to aggregate (default: all)")
+    parser.add_argument("--max-services", type=int, default=50, help="Service label values before overflow")
+    parser.add_argument("--max-operations", type=int, default=200, help="Operations per service before overflow")
+    parser.add_argument("--queue-size", type=int, default=1000, help="Requests buffered for forwarding")
+    parser.add_argument("--benchmark", action="store_true", help="Run the spans/s benchmark and exit")
+    parser.add_argument("--spans", type=int, default=300000, help="Benchmark spans")
+    parser.add_argument("--concurrency", type=int, default=8, help="Benchmark HTTP clients")
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        asyncio.run(run_benchmark(args.spans, args.concurrency))
+        return
+
+    kinds = None
+    if args.kinds:
+        by_name = {name: kind for kind, name in KIND_NAMES.items()}
+        try:
+            kinds = {by_name[name.strip()] for name in args.kinds.split(',') if name.strip()}
+        except KeyError as e:
+            parser.error(f"unknown span kind {e}; choose from {', '.join(by_name)}")
+
+    aggregator = SpanMetricsAggregator(args.max_services, args.max_operations, kinds)
+    bridge = SpanMetricsBridge(aggregator, args.upstream or None, args.host, args.port, args.queue_size)
+
+    async def serve():
+        await bridge.start()
+        target = f" → {args.upstream}" if args.upstream else " (aggregate only)"
+        print(f"{Colors.GREEN}✓ Span metrics bridge listening on {args.host}:{bridge.server.port}"
+              f"{target}{Colors.END}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await bridge.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print(f"\n{Colors.YELLOW}⚠ Stopped{Colors.END}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,563 @@
+"""
+Tail-Based Trace Sampling Proxy for Jaeger
+Asyncio OTLP/HTTP proxy that buffers spans per trace, decides per trace once it
+completes (errors, slow traces, probabilistic baseline) and forwards kept traces
+to Jaeger's OTLP/HTTP receiver in batches
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+import otlp
+from async_http import HTTPClient, HTTPServer, Request, Response
+from prom_metrics import CONTENT_TYPE, Registry
+
+
+class Colors:
+    """ANSI color codes for terminal output"""
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    END = '\033[0m'
+    BOLD = '\033[1m'
+
+
+class TraceEntry:
+    """Spans buffered for one trace"""
+
+    __slots__ = ('spans', 'first_seen', 'last_seen', 'size', 'has_error', 'min_start', 'max_end')
+
+    def __init__(self, now: float):
+        self.spans: List[otlp.Span] = []
+        self.first_seen = now
+        self.last_seen = now
+        self.size = 0
+        self.has_error = False
+        self.min_start = 0
+        self.max_end = 0
+
+    def add(self, span: otlp.Span, now: float) -> int:
+        """Append a span and return its accounted size"""
+        self.spans.append(span)
+        self.last_seen = now
+        size = span.encoded_size()
+        self.size += size
+        if span.status_code == otlp.STATUS_ERROR:
+            self.has_error = True
+        if span.start_ns and (not self.min_start or span.start_ns < self.min_start):
+            self.min_start = span.start_ns
+        if span.end_ns > self.max_end:
+            self.max_end = span.end_ns
+        return size
+
+    @property
+    def duration_s(self) -> float:
+        """Trace duration from earliest start to latest end"""
+        if not self.min_start:
+            return 0.0
+        return max(0, self.max_end - self.min_start) / 1e9
+
+
+class SamplingPolicy:
+    """Keep errors, slow traces and a consistent probabilistic baseline"""
+
+    def __init__(self, latency_threshold: float = 1.0, baseline_rate: float = 0.05):
+        """
+        Initialize the policy.
+
+        Args:
+            latency_threshold: Keep traces at least this long (seconds)
+            baseline_rate: Fraction of remaining traces to keep (0..1)
+        """
+        self.latency_threshold = latency_threshold
+        self.baseline_cutoff = int(baseline_rate * (1 << 64))
+
+    def decide(self, trace_id: bytes, entry: TraceEntry) -> Optional[str]:
+        """
+        Decide a trace.
+
+        Returns:
+            Keep reason ('error', 'latency', 'baseline') or None to drop
+        """
+        if entry.has_error:
+            return 'error'
+        if entry.duration_s >= self.latency_threshold:
+            return 'latency'
+        # Hash-free: trace ids are already random, and using them keeps the
+        # decision consistent across several proxy replicas
+        if int.from_bytes(trace_id[-8:].rjust(8, b'\0'), 'big') < self.baseline_cutoff:
+            return 'baseline'
+        return None
+
+
+class TailSampler:
+    """
+    Bounded, time-windowed per-trace span buffer with tail decisions.
+
+    Features:
+    - Decision once a trace has been idle for decision_wait seconds
+    - Forced decision for traces older than max_trace_age
+    - Memory caps on traces, spans and bytes with oldest-first eviction
+    - Decision cache so late spans follow their trace's decision
+    - Batched forwarding with a bounded outbound queue
+    """
+
+    def __init__(self, policy: SamplingPolicy, decision_wait: float = 5.0, max_trace_age: float = 30.0,
+                 max_traces: int = 50000, max_spans: int = 1000000, max_bytes: int = 256 * 1024 * 1024,
+                 eviction: str = 'decide', decided_cache_size: int = 200000,
+                 max_pending_spans: int = 200000):
+        """
+        Initialize the sampler.
+
+        Args:
+            policy: Sampling policy
+            decision_wait: Idle time after which a trace is considered complete
+            max_trace_age: Maximum buffering time for a single trace
+            max_traces: Cap on buffered traces
+            max_spans: Cap on buffered spans
+            max_bytes: Cap on buffered span bytes
+            eviction: 'decide' (evaluate partial trace) or 'drop' when over a cap
+            decided_cache_size: Remembered decisions for late spans
+            max_pending_spans: Cap on kept spans waiting to be forwarded
+        """
+        self.policy = policy
+        self.decision_wait = decision_wait
+        self.max_trace_age = max_trace_age
+        self.max_traces = max_traces
+        self.max_spans = max_spans
+        self.max_bytes = max_bytes
+        self.eviction = eviction
+        self.decided_cache_size = decided_cache_size
+        self.max_pending_spans = max_pending_spans
+
+        self.traces: "OrderedDict[bytes, TraceEntry]" = OrderedDict()
+        self.decided: "OrderedDict[bytes, bool]" = OrderedDict()
+        self.span_count = 0
+        self.byte_count = 0
+        self.pending: List[otlp.Span] = []
+
+        self.registry = Registry()
+        self.m_received = self.registry.counter('tail_sampler_spans_received_total', 'Spans received')
+        self.m_dropped = self.registry.counter(
+            'tail_sampler_spans_dropped_total', 'Spans dropped, by reason', ['reason'])
+        self.m_decisions = self.registry.counter(
+            'tail_sampler_traces_decided_total', 'Trace decisions, by outcome and reason', ['decision', 'reason'])
+        self.m_evicted = self.registry.counter(
+            'tail_sampler_traces_evicted_total', 'Traces evicted early by memory caps', ['cap'])
+        self.m_forwarded = self.registry.counter('tail_sampler_spans_forwarded_total', 'Spans forwarded upstream')
+        self.m_forward_errors = self.registry.counter(
+            'tail_sampler_forward_errors_total', 'Failed upstream batch requests')
+        self.m_forward_latency = self.registry.histogram(
+            'tail_sampler_forward_duration_seconds', 'Upstream batch request latency')
+        self.m_traces = self.registry.gauge('tail_sampler_buffered_traces', 'Traces currently buffered')
+        self.m_spans = self.registry.gauge('tail_sampler_buffered_spans', 'Spans currently buffered')
+        self.m_bytes = self.registry.gauge('tail_sampler_buffered_bytes', 'Approximate bytes buffered')
+        self.m_pending = self.registry.gauge('tail_sampler_pending_spans', 'Kept spans awaiting forwarding')
+
+    def add_spans(self, spans: List[otlp.Span], now: Optional[float] = None):
+        """
+        Buffer a batch of incoming spans.
+
+        Args:
+            spans: Decoded spans
+            now: Current monotonic time (defaults to time.monotonic())
+        """
+        now = time.monotonic() if now is None else now
+        self.m_received.inc(amount=len(spans))
+        traces = self.traces
+        decided = self.decided
+
+        for span in spans:
+            trace_id = span.trace_id
+            verdict = decided.get(trace_id)
+            if verdict is not None:
+                if verdict:
+                    self._enqueue([span])
+                else:
+                    self.m_dropped.inc('sampled_out')
+                continue
+
+            entry = traces.get(trace_id)
+            if entry is None:
+                entry = TraceEntry(now)
+                traces[trace_id] = entry
+            else:
+                traces.move_to_end(trace_id)
+
+            self.byte_count += entry.add(span, now)
+            self.span_count += 1
+
+            if now - entry.first_seen >= self.max_trace_age:
+                self._decide(trace_id, 'max_age')
+
+        self._enforce_caps()
+
+    def _enforce_caps(self):
+        while self.traces and (len(self.traces) > self.max_traces or self.span_count > self.max_spans
+                               or self.byte_count > self.max_bytes):
+            if len(self.traces) > self.max_traces:
+                cap = 'traces'
+            elif self.span_count > self.max_spans:
+                cap = 'spans'
+            else:
+                cap = 'bytes'
+            trace_id = next(iter(self.traces))
+            self.m_evicted.inc(cap)
+            if self.eviction == 'decide':
+                self._decide(trace_id, 'evicted')
+            else:
+                entry = self._remove(trace_id)
+                self._remember(trace_id, False)
+                self.m_dropped.inc('evicted', amount=len(entry.spans))
+                self.m_decisions.inc('drop', 'evicted')
+
+    def _remove(self, trace_id: bytes) -> TraceEntry:
+        entry = self.traces.pop(trace_id)
+        self.span_count -= len(entry.spans)
+        self.byte_count -= entry.size
+        return entry
+
+    def _remember(self, trace_id: bytes, keep: bool):
+        self.decided[trace_id] = keep
+        if len(self.decided) > self.decided_cache_size:
+            self.decided.popitem(last=False)
+
+    def _decide(self, trace_id: bytes, trigger: str):
+        entry = self._remove(trace_id)
+        reason = self.policy.decide(trace_id, entry)
+        keep = reason is not None
+        self._remember(trace_id, keep)
+
+        if keep:
+            self.m_decisions.inc('keep', reason)
+            self._enqueue(entry.spans)
+        else:
+            self.m_decisions.inc('drop', trigger if trigger != 'idle' else 'sampled_out')
+            self.m_dropped.inc('sampled_out', amount=len(entry.spans))
+
+    def _enqueue(self, spans: List[otlp.Span]):
+        room = self.max_pending_spans - len(self.pending)
+        if room < len(spans):
+            self.m_dropped.inc('forward_queue_full', amount=len(spans) - max(room, 0))
+            spans = spans[:max(room, 0)]
+        self.pending.extend(spans)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """
+        Decide every trace that has been idle for decision_wait seconds.
+
+        The buffer is ordered by last update, so the scan stops at the first
+        trace that is still active.
+
+        Returns:
+            Number of traces decided
+        """
+        now = time.monotonic() if now is None else now
+        decided = 0
+        while self.traces:
+            trace_id, entry = next(iter(self.traces.items()))
+            if now - entry.last_seen < self.decision_wait:
+                break
+            self._decide(trace_id, 'idle')
+            decided += 1
+        self.update_gauges()
+        return decided
+
+    def take_batch(self, max_spans: int) -> List[otlp.Span]:
+        """Remove and return up to max_spans kept spans"""
+        batch = self.pending[:max_spans]
+        del self.pending[:max_spans]
+        return batch
+
+    def update_gauges(self):
+        """Refresh buffer gauges"""
+        self.m_traces.set(len(self.traces))
+        self.m_spans.set(self.span_count)
+        self.m_bytes.set(self.byte_count)
+        self.m_pending.set(len(self.pending))
+
+
+class TailSamplingProxy:
+    """
+    OTLP/HTTP front-end for the tail sampler.
+
+    Accepts POST /v1/traces (protobuf or JSON), serves GET /metrics, and
+    forwards kept spans to the upstream collector in batches.
+    """
+
+    def __init__(self, sampler: TailSampler, upstream: str, host: str = '0.0.0.0', port: int = 4318,
+                 batch_size: int = 2000, flush_interval: float = 1.0, upstream_connections: int = 4):
+        """
+        Initialize the proxy.
+
+        Args:
+            sampler: Configured TailSampler
+            upstream: Upstream OTLP/HTTP base URL (e.g. http://jaeger:4318)
+            host: Listen address
+            port: Listen port
+            batch_size: Spans per forwarded request
+            flush_interval: Maximum seconds a kept span waits before forwarding
+            upstream_connections: Concurrent upstream requests
+        """
+        self.sampler = sampler
+        self.server = HTTPServer(self.handle, host, port)
+        self.upstream = HTTPClient(upstream, max_connections=upstream_connections)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.upstream_connections = upstream_connections
+        self._tasks = []
+
+    async def handle(self, request: Request) -> Response:
+        """Route one HTTP request"""
+        if request.path == '/v1/traces' and request.method == 'POST':
+            content_type = request.headers.get('content-type', otlp.CONTENT_TYPE_PROTOBUF)
+            try:
+                spans = otlp.decode_request(request.body, content_type)
+            except ValueError as e:
+                self.sampler.m_dropped.inc('decode_error')
+                return Response(400, str(e).encode('utf-8'), content_type='text/plain')
+            self.sampler.add_spans(spans)
+            if 'json' in content_type:
+                return Response(200, b'{}', content_type=otlp.CONTENT_TYPE_JSON)
+            return Response(200, b'', content_type=otlp.CONTENT_TYPE_PROTOBUF)
+
+        if request.path == '/metrics' and request.method == 'GET':
+            self.sampler.update_gauges()
+            return Response(200, self.sampler.registry.render(), content_type=CONTENT_TYPE)
+
+        return Response(404, b'not found', content_type='text/plain')
+
+    async def _sweep_loop(self):
+        interval = max(0.05, min(0.5, self.sampler.decision_wait / 4))
+        while True:
+            await asyncio.sleep(interval)
+            self.sampler.sweep()
+
+    async def _send(self, batch: List[otlp.Span]):
+        for body, content_type, count in otlp.encode_batches(batch):
+            started = time.monotonic()
+            try:
+                status, _, _ = await self.upstream.request(
+                    'POST', '/v1/traces', body, {'Content-Type': content_type})
+            except (OSError, asyncio.TimeoutError, ConnectionError):
+                status = 0
+            self.sampler.m_forward_latency.observe(time.monotonic() - started)
+            if 200 <= status < 300:
+                self.sampler.m_forwarded.inc(amount=count)
+            else:
+                self.sampler.m_forward_errors.inc()
+                self.sampler.m_dropped.inc('forward_failed', amount=count)
+
+    async def _flush_loop(self):
+        in_flight = set()
+        last_flush = time.monotonic()
+        while True:
+            await asyncio.sleep(0.02)
+            pending = len(self.sampler.pending)
+            due = time.monotonic() - last_flush >= self.flush_interval
+            while pending and (pending >= self.batch_size or due) and len(in_flight) < self.upstream_connections:
+                batch = self.sampler.take_batch(self.batch_size)
+                task = asyncio.ensure_future(self._send(batch))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+                pending = len(self.sampler.pending)
+                last_flush = time.monotonic()
+            if due:
+                last_flush = time.monotonic()
+
+    async def start(self):
+        """Start listening and the background sweep/flush tasks"""
+        await self.server.start()
+        self._tasks = [asyncio.ensure_future(self._sweep_loop()), asyncio.ensure_future(self._flush_loop())]
+
+    async def stop(self):
+        """Stop tasks, decide every buffered trace and flush what was kept"""
+        for task in self._tasks:
+            task.cancel()
+        await self.server.close()
+        self.sampler.sweep(now=float('inf'))
+        while self.sampler.pending:
+            await self._send(self.sampler.take_batch(self.batch_size))
+        await self.upstream.close()
+
+
+def synthetic_requests(traces: int, spans_per_trace: int, spans_per_request: int,
+                       error_every: int = 50, slow_every: int = 20) -> List[bytes]:
+    """
+    Build protobuf export requests carrying synthetic traces.
+
+    Args:
+        traces: Number of traces
+        spans_per_trace: Spans per trace
+        spans_per_request: Spans per export request
+        error_every: Every Nth trace contains an error span
+        slow_every: Every Nth trace exceeds two seconds
+
+    Returns:
+        List of request bodies
+    """
+    services = ['user-service', 'order-service', 'product-service']
+    now_ns = time.time_ns()
+    requests = []
+    current = {service: [] for service in services}
+
+    for t in range(traces):
+        trace_id = os.urandom(16)
+        root_id = os.urandom(8)
+        duration = 2_500_000_000 if t % slow_every == 0 else 40_000_000
+        for s in range(spans_per_trace):
+            service = services[s % len(services)]
+            span_id = root_id if s == 0 else os.urandom(8)
+            status = otlp.STATUS_ERROR if (t % error_every == 0 and s == spans_per_trace - 1) else otlp.STATUS_UNSET
+            raw = otlp.build_proto_span(
+                trace_id, span_id, b'' if s == 0 else root_id, f"op-{s}", otlp.KIND_SERVER,
+                now_ns, now_ns + (duration if s == 0 else duration // 2), status)
+            current[service].append(raw)
+            if len(current[service]) >= spans_per_request:
+                requests.append(otlp.build_proto_request(service, current[service]))
+                current[service] = []
+
+    for service, raw_spans in current.items():
+        if raw_spans:
+            requests.append(otlp.build_proto_request(service, raw_spans))
+    return requests
+
+
+async def run_benchmark(traces: int, spans_per_trace: int, concurrency: int):
+    """
+    Measure spans/s through the sampler hot path and through the full proxy.
+
+    Args:
+        traces: Number of synthetic traces
+        spans_per_trace: Spans per trace
+        concurrency: Concurrent HTTP clients for the end-to-end run
+    """
+    print(f"{Colors.CYAN}ℹ Generating {traces:,} traces × {spans_per_trace} spans...{Colors.END}")
+    requests = synthetic_requests(traces, spans_per_trace, spans_per_request=100)
+    total_spans = traces * spans_per_trace
+
+    # 1. Hot path: decode + buffer + decide, no network
+    sampler = TailSampler(SamplingPolicy(latency_threshold=1.0, baseline_rate=0.05), decision_wait=0.0)
+    started = time.perf_counter()
+    for body in requests:
+        sampler.add_spans(otlp.decode_protobuf(body))
+        sampler.pending.clear()
+    sampler.sweep(now=float('inf'))
+    elapsed = time.perf_counter() - started
+    kept = int(sum(v for (decision, _), v in sampler.m_decisions.values.items() if decision == 'keep'))
+    print(f"{Colors.GREEN}✓ Hot path:   {total_spans / elapsed:>12,.0f} spans/s "
+          f"({kept:,} of {traces:,} traces kept){Colors.END}")
+
+    # 2. End to end over HTTP with a null upstream collector
+    received = [0]
+
+    async def sink(request: Request) -> Response:
+        received[0] += len(otlp.decode_protobuf(request.body))
+        return Response(200, b'')
+
+    upstream = HTTPServer(sink, '127.0.0.1', 0)
+    await upstream.start()
+
+    sampler = TailSampler(SamplingPolicy(latency_threshold=1.0, baseline_rate=0.05), decision_wait=0.2)
+    proxy = TailSamplingProxy(sampler, f"http://127.0.0.1:{upstream.port}", '127.0.0.1', 0)
+    await proxy.start()
+
+    queue = asyncio.Queue()
+    for body in requests:
+        queue.put_nowait(body)
+
+    async def client():
+        http = HTTPClient(f"http://127.0.0.1:{proxy.server.port}", max_connections=1)
+        while not queue.empty():
+            body = queue.get_nowait()
+            await http.request('POST', '/v1/traces', body, {'Content-Type': otlp.CONTENT_TYPE_PROTOBUF})
+        await http.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    ingest_elapsed = time.perf_counter() - started
+    await proxy.stop()
+    await upstream.close()
+
+    print(f"{Colors.GREEN}✓ Via proxy:  {total_spans / ingest_elapsed:>12,.0f} spans/s ingested, "
+          f"{received[0]:,} spans forwarded upstream{Colors.END}")
+
+
+def main():
+    """Main entry point for the tail sampling proxy"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Tail-based sampling OTLP/HTTP proxy in front of Jaeger",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python tail_sampler.py --port 4318 --upstream http://jaeger:4318
+  python tail_sampler.py --port 14318 --upstream http://localhost:4318 --latency-threshold 0.5
+  python tail_sampler.py --benchmark --traces 20000
+
+Point applications' OTLP exporter at the proxy; Prometheus can scrape /metrics
+on the same port.
+        """
+    )
+
+    parser.add_argument("--host", default="0.0.0.0", help="Listen address")
+    parser.add_argument("--port", type=int, default=4318, help="Listen port (default: 4318)")
+    parser.add_argument("--upstream", default="http://jaeger:4318", help="Jaeger OTLP/HTTP URL")
+    parser.add_argument("--latency-threshold", type=float, default=1.0, help="Keep traces slower than this (s)")
+    parser.add_argument("--baseline-rate", type=float, default=0.05, help="Probabilistic keep rate (0..1)")
+    parser.add_argument("--decision-wait", type=float, default=5.0, help="Idle seconds before deciding a trace")
+    parser.add_argument("--max-trace-age", type=float, default=30.0, help="Force a decision after this long (s)")
+    parser.add_argument("--max-traces", type=int, default=50000, help="Buffered trace cap")
+    parser.add_argument("--max-spans", type=int, default=1000000, help="Buffered span cap")
+    parser.add_argument("--max-memory-mb", type=int, default=256, help="Buffered bytes cap in MB")
+    parser.add_argument("--eviction", choices=['decide', 'drop'], default='decide',
+                        help="On cap: decide the oldest trace early, or drop it")
+    parser.add_argument("--batch-size", type=int, default=2000, help="Spans per upstream request")
+    parser.add_argument("--flush-interval", type=float, default=1.0, help="Max seconds before forwarding")
+    parser.add_argument("--benchmark", action="store_true", help="Run the spans/s benchmark and exit")
+    parser.add_argument("--traces", type=int, default=10000, help="Benchmark traces")
+    parser.add_argument("--spans-per-trace", type=int, default=10, help="Benchmark spans per trace")
+    parser.add_argument("--concurrency", type=int, default=8, help="Benchmark HTTP clients")
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        asyncio.run(run_benchmark(args.traces, args.spans_per_trace, args.concurrency))
+        return
+
+    sampler = TailSampler(
+        SamplingPolicy(args.latency_threshold, args.baseline_rate),
+        decision_wait=args.decision_wait,
+        max_trace_age=args.max_trace_age,
+        max_traces=args.max_traces,
+        max_spans=args.max_spans,
+        max_bytes=args.max_memory_mb * 1024 * 1024,
+        eviction=args.eviction,
+    )
+    proxy = TailSamplingProxy(sampler, args.upstream, args.host, args.port,
+                              batch_size=args.batch_size, flush_interval=args.flush_interval)
+
+    async def serve():
+        await proxy.start()
+        print(f"{Colors.GREEN}✓ Tail sampler listening on {args.host}:{proxy.server.port} "
+              f"→ {args.upstream}{Colors.END}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await proxy.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print(f"\n{Colors.YELLOW}⚠ Stopped - buffered traces were decided and flushed{Colors.END}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,568 @@
+"""
+Prometheus file_sd Target Registry
+Discovers scrape targets from Docker (prometheus.io/* labels or the catalog in
+prometheus/targets/catalog.yml), tracks container health and atomically rewrites
+one file_sd JSON file per job so Prometheus follows changes without a reload
+"""
+
+import http.client
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlparse
+
+import promql
+import yaml_lite
+
+
+class Colors:
+    """ANSI color codes for terminal output"""
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    END = '\033[0m'
+    BOLD = '\033[1m'
+
+
+PROMETHEUS_DIR = Path(__file__).parent.parent / 'prometheus'
+TARGETS_DIR = PROMETHEUS_DIR / 'targets'
+
+LABEL_PREFIX = 'prometheus.io/'
+COMPOSE_SERVICE = 'com.docker.compose.service'
+
+# Container events that can change the target set
+WATCHED_EVENTS = ['start', 'restart', 'die', 'stop', 'kill', 'destroy', 'pause', 'unpause', 'health_status']
+
+
+# ============================================================================
+# Docker
+# ============================================================================
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP over the Docker daemon's unix socket"""
+
+    def __init__(self, socket_path: str, timeout: Optional[float] = 10.0):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+class Container:
+    """The parts of a Docker container summary the registry uses"""
+
+    __slots__ = ('id', 'name', 'service', 'state', 'health', 'labels', 'networks', 'ports')
+
+    def __init__(self, id: str, name: str, state: str, health: Optional[str] = None,
+                 labels: Optional[Dict[str, str]] = None, networks: Optional[Dict[str, str]] = None,
+                 ports: Optional[Dict[int, int]] = None):
+        self.id = id
+        self.name = name
+        self.labels = labels or {}
+        self.service = self.labels.get(COMPOSE_SERVICE, name)
+        self.state = state
+        self.health = health
+        self.networks = networks or {}  # network name -> IP address
+        self.ports = ports or {}        # private TCP port -> published host port (0 if unpublished)
+
+    @property
+    def ready(self) -> bool:
+        """Running and either healthy or without a healthcheck"""
+        return self.state == 'running' and self.health in (None, 'healthy')
+
+
+def parse_health(status: str) -> Optional[str]:
+    """Health from a `docker ps` status such as 'Up 3 minutes (healthy)'"""
+    if '(healthy)' in status:
+        return 'healthy'
+    if '(unhealthy)' in status:
+        return 'unhealthy'
+    if '(health: starting)' in status:
+        return 'starting'
+    return None
+
+
+class DockerClient:
+    """Minimal client for the Docker Engine API"""
+
+    def __init__(self, docker_host: Optional[str] = None, timeout: float = 10.0):
+        """
+        Initialize the client.
+
+        Args:
+            docker_host: unix:///path or tcp://host:port (default: $DOCKER_HOST or the local socket)
+            timeout: Socket timeout for regular requests
+        """
+        self.docker_host = docker_host or os.environ.get('DOCKER_HOST') or 'unix:///var/run/docker.sock'
+        self.timeout = timeout
+
+    def _connection(self, timeout: Optional[float]) -> http.client.HTTPConnection:
+        parsed = urlparse(self.docker_host)
+        if parsed.scheme == 'unix':
+            return UnixHTTPConnection(parsed.path, timeout=timeout)
+        return http.client.HTTPConnection(parsed.hostname or 'localhost', parsed.port or 2375, timeout=timeout)
+
+    def containers(self) -> List[Container]:
+        """
+        All containers, including stopped ones.
+
+        Raises:
+            RuntimeError: If the daemon cannot be reached
+        """
+        conn = self._connection(self.timeout)
+        try:
+            conn.request('GET', '/containers/json?all=1')
+            response = conn.getresponse()
+            body = response.read()
+        except OSError as e:
+            raise RuntimeError(f"Docker daemon unreachable at {self.docker_host}: {e}")
+        finally:
+            conn.close()
+        if response.status != 200:
+            raise RuntimeError(f"Docker API returned {response.status}: {body[:200]!r}")
+
+        containers = []
+        for entry in json.loads(body.decode('utf-8')):
+            networks = {name: (settings or {}).get('IPAddress', '')
+                        for name, settings in ((entry.get('NetworkSettings') or {}).get('Networks') or {}).items()}
+            ports = {}
+            for port in entry.get('Ports') or []:
+                if port.get('Type', 'tcp') == 'tcp':
+                    ports[port['PrivatePort']] = port.get('PublicPort') or ports.get(port['PrivatePort'], 0)
+            containers.append(Container(
+                id=entry['Id'],
+                name=(entry.get('Names') or ['/' + entry['Id'][:12]])[0].lstrip('/'),
+                state=entry.get('State', ''),
+                health=parse_health(entry.get('Status', '')),
+                labels=entry.get('Labels') or {},
+                networks=networks,
+                ports=ports,
+            ))
+        return containers
+
+    def watch(self, on_event: Callable[[], None], stop: threading.Event):
+        """Call on_event for every relevant container event until stop is set; reconnects on errors"""
+        filters = quote(json.dumps({'type': ['container'], 'event': WATCHED_EVENTS}))
+        while not stop.is_set():
+            conn = self._connection(None)
+            try:
+                conn.request('GET', f'/events?filters={filters}')
+                response = conn.getresponse()
+                while not stop.is_set():
+                    line = response.readline()
+                    if not line:
+                        break
+                    on_event()
+            except (OSError, http.client.HTTPException):
+                pass
+            finally:
+                conn.close()
+            stop.wait(2.0)
+
+
+class SimulatedDocker:
+    """
+    Scripted container lifecycle for --simulate.
+
+    Each call to containers() advances one step: the stack comes up with some
+    services missing, one goes unhealthy and recovers, one is removed and a
+    labelled container joins.
+    """
+
+    NETWORK = 'monitoring_monitoring_backend'
+
+    def __init__(self):
+        self.step = 0
+        self.script = [
+            ('start', 'prometheus', None), ('start', 'user-service', 'healthy'),
+            ('start', 'order-service', 'starting'), ('start', 'redis-exporter', None),
+            ('health', 'order-service', 'healthy'),
+            ('health', 'user-service', 'unhealthy'),
+            ('label', 'billing-service', '8080'),
+            ('remove', 'redis-exporter', None),
+            ('health', 'user-service', 'healthy'),
+            ('stop', 'order-service', None),
+        ]
+        self._containers: Dict[str, Container] = {}
+
+    def describe(self) -> str:
+        if self.step == 0 or self.step > len(self.script):
+            return ''
+        action, name, arg = self.script[self.step - 1]
+        return f"{action} {name}" + (f" ({arg})" if arg else '')
+
+    def containers(self) -> List[Container]:
+        if self.step < len(self.script):
+            action, name, arg = self.script[self.step]
+            if action == 'start':
+                self._containers[name] = Container(f"sim-{name}", f"monitoring-{name}-1", 'running', arg,
+                                                   {COMPOSE_SERVICE: name}, {self.NETWORK: f"172.20.0.{len(self._containers) + 2}"})
+            elif action == 'label':
+                self._containers[name] = Container(f"sim-{name}", f"monitoring-{name}-1", 'running', None,
+                                                   {COMPOSE_SERVICE: name, LABEL_PREFIX + 'scrape': 'true',
+                                                    LABEL_PREFIX + 'port': arg, LABEL_PREFIX + 'job': 'billing'},
+                                                   {self.NETWORK: '172.20.0.50'})
+            elif action == 'health':
+                self._containers[name].health = arg
+            elif action == 'stop':
+                self._containers[name].state = 'exited'
+            elif action == 'remove':
+                del self._containers[name]
+        self.step += 1
+        return list(self._containers.values())
+
+    def watch(self, on_event: Callable[[], None], stop: threading.Event):
+        stop.wait()
+
+
+# ============================================================================
+# Registry
+# ============================================================================
+
+class Target:
+    """A scrape target and how long it has been unavailable"""
+
+    __slots__ = ('job', 'address', 'labels', 'container', 'down_since')
+
+    def __init__(self, job: str, address: str, labels: Dict[str, str], container: str):
+        self.job = job
+        self.address = address
+        self.labels = labels
+        self.container = container
+        self.down_since: Optional[float] = None
+
+
+def load_catalog(path: Path) -> Dict[str, Dict]:
+    """Catalog entries keyed by the container (compose service) they match"""
+    if not path.exists():
+        return {}
+    document = yaml_lite.load_file(path) or {}
+    catalog = {}
+    for job, entry in (document.get('jobs') or {}).items():
+        entry = dict(entry or {})
+        entry['job'] = job
+        catalog[str(entry.get('container', job))] = entry
+    return catalog
+
+
+class TargetRegistry:
+    """
+    Keeps targets/<job>.json in line with the running containers.
+
+    A container becomes a target once it is running and healthy (or has no
+    healthcheck), so services absent from a deployment never appear. When a
+    target's container stops or turns unhealthy it is kept for `retain`
+    seconds so `up == 0` alerts still fire for real outages, then dropped;
+    a container that is removed is dropped at once.
+    """
+
+    def __init__(self, docker, catalog: Dict[str, Dict], targets_dir: Path, retain: float = 600.0,
+                 address_mode: str = 'auto', clock: Callable[[], float] = time.time):
+        """
+        Initialize the registry.
+
+        Args:
+            docker: DockerClient or SimulatedDocker
+            catalog: Entries from load_catalog()
+            targets_dir: Directory of the file_sd JSON files
+            retain: Seconds an unavailable target is kept
+            address_mode: auto, name (compose service DNS name) or ip
+            clock: Time source
+        """
+        self.docker = docker
+        self.catalog = catalog
+        self.targets_dir = targets_dir
+        self.retain = retain
+        self.address_mode = address_mode
+        self.clock = clock
+        self.targets: Dict[Tuple[str, str], Target] = {}
+        self.writes = 0
+
+    def resolve(self, container: Container, prometheus: Optional[Container]) -> Optional[Target]:
+        """The target a container should be scraped as, or None"""
+        labels = container.labels
+        if labels.get(LABEL_PREFIX + 'scrape', '').lower() == 'true':
+            job = labels.get(LABEL_PREFIX + 'job') or container.service
+            port = labels.get(LABEL_PREFIX + 'port') or (min(container.ports) if container.ports else None)
+            path = labels.get(LABEL_PREFIX + 'path')
+            scheme = labels.get(LABEL_PREFIX + 'scheme')
+            extra = {}
+        else:
+            entry = self.catalog.get(container.service) or self.catalog.get(container.name)
+            if entry is None:
+                return None
+            job, port, path, scheme = entry['job'], entry.get('port'), entry.get('path'), entry.get('scheme')
+            extra = {str(k): str(v) for k, v in (entry.get('labels') or {}).items()}
+        if not port:
+            return None
+
+        port = int(port)
+        address = self._address(container, port, prometheus)
+        if address is None:
+            return None
+        target_labels = dict(extra, job=job, container=container.name)
+        if path:
+            target_labels['__metrics_path__'] = str(path)
+        if scheme:
+            target_labels['__scheme__'] = str(scheme)
+        return Target(job, address, target_labels, container.id)
+
+    def _address(self, container: Container, port: int, prometheus: Optional[Container]) -> Optional[str]:
+        """host:port at which Prometheus can reach the container"""
+        shared = prometheus is not None and bool(set(container.networks) & set(prometheus.networks))
+        if self.address_mode == 'name' or (self.address_mode == 'auto' and shared):
+            return f"{container.service}:{port}"
+        if self.address_mode == 'auto' and container.ports.get(port):
+            host = 'host.docker.internal' if prometheus is not None else 'localhost'
+            return f"{host}:{container.ports[port]}"
+        ips = [ip for ip in container.networks.values() if ip]
+        return f"{ips[0]}:{port}" if ips else None
+
+    def sync(self) -> List[str]:
+        """
+        Reconcile targets with Docker and rewrite changed files.
+
+        Returns:
+            Human-readable changes
+
+        Raises:
+            RuntimeError: If Docker cannot be queried
+        """
+        now = self.clock()
+        containers = self.docker.containers()
+        prometheus = next((c for c in containers if c.service == 'prometheus' and c.state == 'running'), None)
+        present = {c.id for c in containers}
+        changes = []
+
+        seen = set()
+        for container in containers:
+            target = self.resolve(container, prometheus)
+            if target is None:
+                continue
+            key = (target.job, target.address)
+            seen.add(key)
+            current = self.targets.get(key)
+            if container.ready:
+                if current is None:
+                    self.targets[key] = target
+                    changes.append(f"+ {target.job:<18} {target.address}")
+                elif current.down_since is not None:
+                    current.down_since = None
+                    changes.append(f"↺ {target.job:<18} {target.address} recovered")
+                current = self.targets[key]
+                current.labels, current.container = target.labels, target.container
+            elif current is not None and current.down_since is None:
+                current.down_since = now
+                state = container.health if container.state == 'running' else container.state
+                changes.append(f"⚠ {target.job:<18} {target.address} {state}; kept for {self.retain:.0f}s")
+
+        for key, target in list(self.targets.items()):
+            if target.container not in present or key not in seen:
+                del self.targets[key]
+                reason = 'container removed' if target.container not in present else 'address changed'
+                changes.append(f"- {target.job:<18} {target.address} ({reason})")
+            elif target.down_since is not None and now - target.down_since >= self.retain:
+                del self.targets[key]
+                changes.append(f"- {target.job:<18} {target.address} (unavailable for {self.retain:.0f}s)")
+
+        self.write()
+        return changes
+
+    def groups(self) -> Dict[str, List[Dict]]:
+        """file_sd target groups per job"""
+        jobs: Dict[str, List[Dict]] = {}
+        for target in sorted(self.targets.values(), key=lambda t: (t.job, t.address)):
+            jobs.setdefault(target.job, []).append({'targets': [target.address], 'labels': target.labels})
+        return jobs
+
+    def write(self):
+        """Write each job's file when its content changed and delete files of vanished jobs"""
+        self.targets_dir.mkdir(parents=True, exist_ok=True)
+        groups = self.groups()
+        for job, entries in groups.items():
+            content = json.dumps(entries, indent=2, sort_keys=True) + '\n'
+            if atomic_write(self.targets_dir / f"{job}.json", content):
+                self.writes += 1
+        for path in self.targets_dir.glob('*.json'):
+            # _<name>.json files belong to other tools (e.g. alert_latency.py)
+            if path.stem not in groups and not path.name.startswith('_'):
+                path.unlink()
+                self.writes += 1
+
+
+def atomic_write(path: Path, content: str) -> bool:
+    """
+    Replace a file so readers only ever see the old or the new content.
+
+    The data is written to a hidden temporary file in the same directory
+    (outside Prometheus' *.json glob), flushed to disk and renamed over the
+    target. Returns False without writing when the content is unchanged.
+    """
+    try:
+        if path.read_text(encoding='utf-8') == content:
+            return False
+    except OSError:
+        pass
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o644)  # mkstemp creates 0600; Prometheus runs as another user
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return True
+
+
+# ============================================================================
+# Main
+# ============================================================================
+
+def print_changes(changes: List[str]):
+    stamp = time.strftime('%H:%M:%S')
+    for change in changes:
+        color = Colors.GREEN if change[0] in '+↺' else Colors.YELLOW if change[0] == '⚠' else Colors.RED
+        print(f"{Colors.CYAN}{stamp}{Colors.END} {color}{change}{Colors.END}", flush=True)
+
+
+def run(registry: TargetRegistry, interval: float, debounce: float = 0.5):
+    """Resync on every Docker event (debounced) and at least every interval seconds"""
+    trigger = threading.Event()
+    stop = threading.Event()
+    watcher = threading.Thread(target=registry.docker.watch, args=(trigger.set, stop), daemon=True)
+    watcher.start()
+    try:
+        while True:
+            try:
+                print_changes(registry.sync())
+            except RuntimeError as e:
+                print(f"{Colors.RED}✗ {e}{Colors.END}", flush=True)
+            if trigger.wait(interval):
+                time.sleep(debounce)  # let bursts such as compose up settle
+            trigger.clear()
+    finally:
+        stop.set()
+
+
+def simulate(targets_dir: Path, catalog: Dict[str, Dict]) -> bool:
+    """Run the scripted container lifecycle and show the resulting files"""
+    clock = [0.0]
+    registry = TargetRegistry(SimulatedDocker(), catalog, targets_dir, retain=30.0, clock=lambda: clock[0])
+    steps = len(registry.docker.script) + 4
+    for _ in range(steps):
+        started = time.perf_counter()
+        changes = registry.sync()
+        elapsed = (time.perf_counter() - started) * 1000
+        event = registry.docker.describe()
+        if event or changes:
+            print(f"\n{Colors.BOLD}t={clock[0]:>3.0f}s{Colors.END} {event or '(no event)'} "
+                  f"{Colors.CYAN}[sync {elapsed:.2f} ms]{Colors.END}")
+            print_changes(changes)
+        clock[0] += 10.0
+
+    print(f"\n{Colors.HEADER}{Colors.BOLD}Files in {targets_dir}{Colors.END}")
+    for path in sorted(targets_dir.glob('*.json')):
+        entries = json.loads(path.read_text(encoding='utf-8'))
+        print(f"  {path.name:<22} {', '.join(t for e in entries for t in e['targets'])}")
+    stray = list(targets_dir.glob('.*.tmp'))
+    if stray:
+        print(f"{Colors.RED}✗ Temporary files left behind: {stray}{Colors.END}")
+        return False
+    print(f"{Colors.GREEN}✓ {registry.writes} atomic file update(s); no temporary files left{Colors.END}")
+    return True
+
+
+def main():
+    """Main entry point for the target registry"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Maintain Prometheus file_sd target files from Docker discovery and health",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python target_registry.py
+  python target_registry.py --once
+  python target_registry.py --docker-host tcp://127.0.0.1:2375 --retain 15m
+  python target_registry.py --simulate
+
+Prometheus reads prometheus/targets/*.json through file_sd_configs (see the
+docker-targets job in prometheus/prometheus.yml) and picks up every rewrite
+within seconds; no reload is needed. Opt a container in with labels:
+  prometheus.io/scrape: "true"
+  prometheus.io/port: "8080"
+  prometheus.io/path: /metrics      (optional)
+  prometheus.io/job: billing        (optional, defaults to the service name)
+        """
+    )
+
+    parser.add_argument("--docker-host", default=None, help="Docker API (default: $DOCKER_HOST or the local socket)")
+    parser.add_argument("--catalog", type=Path, default=TARGETS_DIR / 'catalog.yml', help="Target catalog")
+    parser.add_argument("--targets-dir", type=Path, default=TARGETS_DIR, help="Directory for file_sd JSON files")
+    parser.add_argument("--interval", default="30s", help="Full resync interval besides Docker events (default: 30s)")
+    parser.add_argument("--retain", default="10m", help="Keep stopped or unhealthy targets this long (default: 10m)")
+    parser.add_argument("--address-mode", choices=['auto', 'name', 'ip'], default='auto',
+                        help="How targets are addressed (default: service name on shared networks)")
+    parser.add_argument("--once", action="store_true", help="Sync once and exit")
+    parser.add_argument("--simulate", action="store_true", help="Run a scripted container lifecycle offline")
+
+    args = parser.parse_args()
+
+    try:
+        interval = promql.parse_duration(args.interval)
+        retain = promql.parse_duration(args.retain)
+    except promql.PromQLError as e:
+        parser.error(str(e))
+
+    try:
+        catalog = load_catalog(args.catalog)
+    except (OSError, ValueError) as e:
+        print(f"{Colors.RED}✗ Failed to load catalog: {e}{Colors.END}")
+        sys.exit(1)
+
+    if args.simulate:
+        with tempfile.TemporaryDirectory(prefix='file-sd-') as work_dir:
+            ok = simulate(Path(work_dir), catalog)
+        if ok:
+            print(f"\n{Colors.GREEN}🎉 Simulation completed successfully!{Colors.END}")
+        sys.exit(0 if ok else 1)
+
+    registry = TargetRegistry(DockerClient(args.docker_host), catalog, args.targets_dir, retain=retain,
+                              address_mode=args.address_mode)
+    print(f"{Colors.GREEN}✓ {len(catalog)} catalog job(s); writing {args.targets_dir}/<job>.json{Colors.END}")
+    if args.once:
+        try:
+            print_changes(registry.sync())
+        except RuntimeError as e:
+            print(f"{Colors.RED}✗ {e}{Colors.END}")
+            sys.exit(1)
+        print(f"\n{Colors.GREEN}🎉 Sync completed successfully!{Colors.END}")
+        sys.exit(0)
+
+    try:
+        run(registry, interval)
+    except KeyboardInterrupt:
+        print(f"\n{Colors.YELLOW}⚠ Stopped{Colors.END}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+"""
+YAML Helpers
+Loads YAML with PyYAML when it is installed and falls back to a parser for the
+block-style subset used by this stack's config files; dumps readable YAML
+(block scalars for multi-line strings) without any dependency
+"""
+
+import json
+import re
+from typing import Any, List, Tuple
+
+
+INT_RE = re.compile(r'^[-+]?(0|[1-9][0-9_]*)$')
+FLOAT_RE = re.compile(r'^[-+]?(\d[\d_]*)?\.?\d+([eE][-+]?\d+)?$|^[-+]?\.(inf|Inf|INF)$|^\.(nan|NaN|NAN)$')
+BOOLEANS = {'true': True, 'True': True, 'TRUE': True, 'false': False, 'False': False, 'FALSE': False}
+NULLS = {'', '~', 'null', 'Null', 'NULL'}
+
+
+class YAMLError(ValueError):
+    """Raised when the fallback parser meets YAML it does not support"""
+
+
+def load(text: str) -> Any:
+    """
+    Parse a YAML document.
+
+    Args:
+        text: YAML text
+
+    Returns:
+        Parsed document (dicts, lists and scalars)
+    """
+    try:
+        import yaml
+    except ImportError:
+        return _Parser(text).parse()
+    return yaml.safe_load(text)
+
+
+def load_file(path) -> Any:
+    """Parse a YAML file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return load(f.read())
+
+
+# ============================================================================
+# Fallback parser
+# ============================================================================
+
+def _strip_comment(text: str) -> str:
+    """Remove a trailing # comment that is outside quotes"""
+    quote = None
+    for i, char in enumerate(text):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ('"', "'"):
+            quote = char
+        elif char == '#' and (i == 0 or text[i - 1] in ' \t'):
+            return text[:i].rstrip()
+    return text.rstrip()
+
+
+def _split_flow(text: str) -> List[str]:
+    """Split the inside of a flow collection on top-level commas"""
+    items, depth, quote, current = [], 0, None, ''
+    for char in text:
+        if quote:
+            current += char
+            if char == quote:
+                quote = None
+            continue
+        if char in ('"', "'"):
+            quote = char
+        elif char in '[{':
+            depth += 1
+        elif char in ']}':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            items.append(current.strip())
+            current = ''
+            continue
+        current += char
+    if current.strip():
+        items.append(current.strip())
+    return items
+
+
+def _find_colon(text: str) -> int:
+    """Index of the key/value separator, or -1"""
+    quote = None
+    depth = 0
+    for i, char in enumerate(text):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ('"', "'") and (i == 0 or text[i - 1] in ' [{,'):
+            quote = char
+        elif char in '[{':
+            depth += 1
+        elif char in ']}':
+            depth -= 1
+        elif char == ':' and depth == 0 and (i + 1 == len(text) or text[i + 1] in ' \t'):
+            return i
+    return -1
+
+
+def _scalar(text: str) -> Any:
+    """Convert a plain or quoted inline value"""
+    text = text.strip()
+    if text.startswith('"') and text.endswith('"') and len(text) >= 2:
+        return json.loads(text)
+    if text.startswith("'") and text.endswith("'") and len(text) >= 2:
+        return text[1:-1].replace("''", "'")
+    if text.startswith('[') and text.endswith(']'):
+        return [_scalar(item) for item in _split_flow(text[1:-1])]
+    if text.startswith('{') and text.endswith('}'):
+        result = {}
+        for item in _split_flow(text[1:-1]):
+            colon = _find_colon(item)
+            if colon == -1:
+                result[_scalar(item)] = None
+            else:
+                result[_scalar(item[:colon])] = _scalar(item[colon + 1:])
+        return result
+    if text in NULLS:
+        return None
+    if text in BOOLEANS:
+        return BOOLEANS[text]
+    if INT_RE.match(text):
+        return int(text.replace('_', ''))
+    if FLOAT_RE.match(text):
+        lowered = text.lower()
+        if lowered.endswith('inf'):
+            return float('-inf') if lowered.startswith('-') else float('inf')
+        if lowered.endswith('nan'):
+            return float('nan')
+        return float(text.replace('_', ''))
+    return text
+
+
+class _Parser:
+    """Indentation-driven parser for block mappings, sequences and scalars"""
+
+    def __init__(self, text: str):
+        self.lines = text.replace('\t', '    ').split('\n')
+        self.pos = 0
+
+    @staticmethod
+    def _indent(line: str) -> int:
+        return len(line) - len(line.lstrip(' '))
+
+    def _next_significant(self) -> Tuple[int, str]:
+        """(index, line) of the next non-blank, non-comment line"""
+        i = self.pos
+        while i < len(self.lines):
+            stripped = self.lines[i].strip()
+            if stripped and not stripped.startswith('#') and stripped not in ('---', '...'):
+                return i, self.lines[i]
+            i += 1
+        return -1, ''
+
+    def parse(self) -> Any:
+        index, line = self._next_significant()
+        if index == -1:
+            return None
+        self.pos = index
+        return self._block(self._indent(line))
+
+    def _block(self, indent: int) -> Any:
+        index, line = self._next_significant()
+        stripped = line.strip()
+        if stripped.startswith('- ') or stripped == '-':
+            return self._sequence(indent)
+        if _find_colon(_strip_comment(stripped)) == -1:
+            # A lone scalar (e.g. a multi-line plain string) - join it
+            parts = []
+            while index != -1 and self._indent(line) >= indent:
+                parts.append(_strip_comment(line.strip()))
+                self.pos = index + 1
+                index, line = self._next_significant()
+            return _scalar(' '.join(parts))
+        return self._mapping(indent)
+
+    def _value(self, rest: str, indent: int) -> Any:
+        """Parse what follows 'key:' or '- '"""
+        rest = _strip_comment(rest).strip()
+        if rest and rest[0] in '|>':
+            return self._block_scalar(rest, indent)
+        if rest:
+            if rest[0] in '[{' and not rest.endswith((']', '}')):
+                # Flow collection continued on following lines
+                while self.pos < len(self.lines):
+                    rest += ' ' + _strip_comment(self.lines[self.pos].strip())
+                    self.pos += 1
+                    if rest.endswith((']', '}')):
+                        break
+            return _scalar(rest)
+
+        index, line = self._next_significant()
+        if index == -1:
+            return None
+        child_indent = self._indent(line)
+        stripped = line.strip()
+        if child_indent > indent or (child_indent == indent and (stripped.startswith('- ') or stripped == '-')):
+            self.pos = index
+            return self._block(child_indent)
+        return None
+
+    def _mapping(self, indent: int) -> dict:
+        result = {}
+        while True:
+            index, line = self._next_significant()
+            if index == -1 or self._indent(line) != indent:
+                break
+            stripped = line.strip()
+            if stripped.startswith('- ') or stripped == '-':
+                break
+            content = _strip_comment(stripped)
+            colon = _find_colon(content)
+            if colon == -1:
+                raise YAMLError(f"Expected 'key: value' at line {index + 1}: {stripped}")
+            key = _scalar(content[:colon])
+            self.pos = index + 1
+            result[key] = self._value(stripped[colon + 1:], indent)
+        return result
+
+    def _sequence(self, indent: int) -> list:
+        result = []
+        while True:
+            index, line = self._next_significant()
+            if index == -1 or self._indent(line) != indent:
+                break
+            stripped = line.strip()
+            if not (stripped.startswith('- ') or stripped == '-'):
+                break
+            content = stripped[1:].lstrip(' ')
+            if not content or content.startswith('#'):
+                self.pos = index + 1
+                result.append(self._value('', indent))
+                continue
+
+            inner_indent = indent + (len(stripped) - len(content))
+            is_mapping = _find_colon(_strip_comment(content)) != -1 and content[0] not in '[{"\''
+            if is_mapping or content.startswith('- '):
+                # Re-read the item as a block indented where its content starts
+                self.lines[index] = ' ' * inner_indent + content
+                self.pos = index
+                result.append(self._block(inner_indent))
+            else:
+                self.pos = index + 1
+                result.append(self._value(content, indent))
+        return result
+
+    def _block_scalar(self, header: str, indent: int) -> str:
+        style = header[0]
+        chomp = header[1:2] if header[1:2] in ('-', '+') else ''
+        lines = []
+        block_indent = None
+        while self.pos < len(self.lines):
+            line = self.lines[self.pos]
+            if line.strip():
+                current = self._indent(line)
+                if current <= indent:
+                    break
+                if block_indent is None:
+                    block_indent = current
+                if current < block_indent:
+                    break
+                lines.append(line[block_indent:])
+            else:
+                lines.append('')
+            self.pos += 1
+
+        while lines and lines[-1] == '' and chomp != '+':
+            lines.pop()
+
+        if style == '|':
+            text = '\n'.join(lines)
+        else:
+            text = ''
+            for i, line in enumerate(lines):
+                if not line:
+                    text += '\n'
+                elif text and not text.endswith('\n') and not line.startswith(' '):
+                    text += ' ' + line
+                else:
+                    text += line
+        if chomp != '-' and lines:
+            text += '\n'
+        return text
+
+
+# ============================================================================
+# Emitter
+# ============================================================================
+
+def _needs_quotes(text: str) -> bool:
+    if text in NULLS or text in BOOLEANS or text.lower() in ('yes', 'no', 'on', 'off'):
+        return True
+    if INT_RE.match(text) or FLOAT_RE.match(text):
+        return True
+    if text != text.strip() or text[0] in '!&*-?{}[]|>@`"\'%#,:' and not (text[0] == '-' and len(text) > 1
+                                                                         and text[1] not in ' '):
+        return True
+    return ': ' in text or ' #' in text or text.endswith(':')
+
+
+def _format_scalar(value: Any) -> str:
+    if value is None:
+        return 'null'
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if isinstance(value, (int, float)):
+        if value != value:
+            return '.nan'
+        if value in (float('inf'), float('-inf')):
+            return '.inf' if value > 0 else '-.inf'
+        return repr(value)
+    text = str(value)
+    if any(ord(c) < 32 and c not in '\n' for c in text):
+        return json.dumps(text)
+    if _needs_quotes(text):
+        return "'" + text.replace("'", "''") + "'"
+    return text
+
+
+def _emit(value: Any, indent: int, lines: List[str], prefix: str):
+    """Append YAML for value; prefix is the text that precedes it on its first line"""
+    pad = ' ' * indent
+    if isinstance(value, dict) and value:
+        first = True
+        for key, item in value.items():
+            lead = prefix if first else pad
+            first = False
+            key_text = _format_scalar(key)
+            if isinstance(item, (dict, list)) and item:
+                lines.append(f"{lead}{key_text}:")
+                _emit(item, indent + 2, lines, ' ' * (indent + 2))
+            elif isinstance(item, str) and '\n' in item:
+                _block_string(item, f"{lead}{key_text}: ", indent + 2, lines)
+            else:
+                lines.append(f"{lead}{key_text}: {_format_empty(item)}")
+    elif isinstance(value, list) and value:
+        first = True
+        for item in value:
+            lead = prefix if first else pad
+            first = False
+            if isinstance(item, (dict, list)) and item:
+                _emit(item, indent + 2, lines, f"{lead}- ")
+            elif isinstance(item, str) and '\n' in item:
+                _block_string(item, f"{lead}- ", indent + 2, lines)
+            else:
+                lines.append(f"{lead}- {_format_empty(item)}")
+    else:
+        lines.append(f"{prefix}{_format_empty(value)}")
+
+
+def _format_empty(value: Any) -> str:
+    if isinstance(value, dict):
+        return '{}'
+    if isinstance(value, list):
+        return '[]'
+    return _format_scalar(value)
+
+
+def _block_string(text: str, lead: str, indent: int, lines: List[str]):
+    chomp = '' if text.endswith('\n') else '-'
+    lines.append(f"{lead}|{chomp}")
+    for line in text.rstrip('\n').split('\n'):
+        lines.append((' ' * indent + line) if line else '')
+
+
+def dump(value: Any) -> str:
+    """
+    Render a document as block-style YAML.
+
+    Args:
+        value: Dicts, lists and scalars
+
+    Returns:
+        YAML text ending in a newline
+    """
+    lines: List[str] = []
+    _emit(value, 0, lines, '')
+    return '\n'.join(lines) + '\n'